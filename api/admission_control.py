@@ -0,0 +1,321 @@
+"""
+Admission Control
+Adaptive concurrency limits and load shedding for expensive endpoints
+
+Builds, autonomous execution and chat each start LLM calls, subprocesses
+and browser sessions. Requests to these endpoints are grouped into
+endpoint classes ("build", "execute", "interactive"). Each class has its
+own AdaptiveLimiter, and all classes also share one process-wide limiter
+whose waiters are served in priority order, so chat gets capacity ahead of
+queued batch builds.
+
+Limits follow AIMD (additive increase, multiplicative decrease). When a
+request completes while the limiter was in use up to its limit, the limit
+grows by 1/limit (about +1 per full round of requests). When latency rises
+well above its long-run average, or requests fail, the limit is cut by a
+factor, at most once per recent latency period. Requests over the limit
+wait in a bounded queue for at most the class's max_wait. When the queue
+is full, or the expected wait is longer than max_wait, the request is
+refused at once with 503 and a Retry-After estimate.
+
+AdmissionMiddleware holds the slot until the response has been fully sent,
+so streamed builds count for as long as they run.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+from superagent.core.metrics import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted"""
+    
+    def __init__(self, limiter: str, reason: str, retry_after: float):
+        super().__init__(f"{limiter} is overloaded ({reason})")
+        self.limiter = limiter
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit with a bounded, priority-ordered wait queue"""
+    
+    def __init__(self, name: str, initial_limit: float = 4, min_limit: float = 1,
+                 max_limit: float = 32, max_queue: int = 20, max_wait: float = 30.0,
+                 backoff: float = 0.75, tolerance: float = 2.0):
+        self.name = name
+        self.limit = float(initial_limit)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.in_flight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        # Latency averages: short follows the current load, long is the baseline
+        self.latency_short: Optional[float] = None
+        self.latency_long: Optional[float] = None
+        self._decreased_at = 0.0
+        self.stats = {"admitted": 0, "queued": 0, "rejected": 0, "timed_out": 0, "decreases": 0}
+    
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, waiter in self._waiters if not waiter.done())
+    
+    def _has_capacity(self) -> bool:
+        return self.in_flight < max(1, math.floor(self.limit))
+    
+    def expected_wait(self, ahead: Optional[int] = None) -> float:
+        """Rough seconds until a new request would start, from the recent average latency"""
+        if self.latency_short is None:
+            return 0.0
+        ahead = self.queue_depth if ahead is None else ahead
+        return self.latency_short * (ahead + 1) / max(1.0, self.limit)
+    
+    def retry_after(self) -> float:
+        return min(120.0, max(1.0, self.expected_wait()))
+    
+    async def acquire(self, priority: int = 0) -> None:
+        """Take a slot, waiting in line if needed; raises Overloaded when refused.
+        
+        Lower ``priority`` values are served first; equal priorities are FIFO.
+        """
+        if self._has_capacity() and not self.queue_depth:
+            self.in_flight += 1
+            self.stats["admitted"] += 1
+            return
+        ahead = sum(1 for p, _, waiter in self._waiters if p <= priority and not waiter.done())
+        if self.queue_depth >= self.max_queue:
+            self.stats["rejected"] += 1
+            raise Overloaded(self.name, "queue_full", self.retry_after())
+        if self.expected_wait(ahead) > self.max_wait:
+            # Would time out anyway: refuse now rather than hold the connection
+            self.stats["rejected"] += 1
+            raise Overloaded(self.name, "saturated", self.retry_after())
+        
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+        self.stats["queued"] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as the wait expired: hand the slot on
+                self.release_slot()
+            waiter.cancel()
+            self.stats["timed_out"] += 1
+            raise Overloaded(self.name, "queue_timeout", self.retry_after())
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release_slot()
+            waiter.cancel()
+            raise
+        self.stats["admitted"] += 1
+    
+    def release(self, latency: Optional[float] = None, ok: bool = True) -> bool:
+        """Return a slot and adapt the limit; returns whether congestion was seen"""
+        saturated = self.in_flight >= math.floor(self.limit)
+        congested = not ok
+        if latency is not None:
+            if self.latency_long is None:
+                self.latency_short = self.latency_long = latency
+            else:
+                self.latency_short = 0.3 * latency + 0.7 * self.latency_short
+                self.latency_long = 0.05 * latency + 0.95 * self.latency_long
+            congested = congested or self.latency_short > self.tolerance * self.latency_long
+        self.adjust(congested, saturated)
+        self.release_slot()
+        return congested
+    
+    def adjust(self, congested: bool, saturated: bool = True) -> None:
+        """Apply one AIMD step"""
+        now = time.monotonic()
+        if congested:
+            # One cut per latency period: the requests already in flight
+            # were admitted under the old limit and report the same congestion
+            if now - self._decreased_at >= (self.latency_short or 0.0):
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._decreased_at = now
+                self.stats["decreases"] += 1
+                logger.info(f"🚦 {self.name} concurrency limit lowered to {self.limit:.1f}")
+        elif saturated:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+    
+    def release_slot(self) -> None:
+        """Return a slot without adapting the limit and wake waiters"""
+        self.in_flight -= 1
+        while self._waiters and self._has_capacity():
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Current limit, load and counters"""
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait,
+            "latency_seconds": round(self.latency_short, 3) if self.latency_short is not None else None,
+            "baseline_latency_seconds": round(self.latency_long, 3) if self.latency_long is not None else None,
+            **self.stats,
+        }
+
+
+@dataclass
+class EndpointClass:
+    """Endpoints sharing one limiter; lower priority values go first in the shared pool"""
+    name: str
+    priority: int
+    paths: Tuple[str, ...]
+    limiter: AdaptiveLimiter
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class AdmissionController:
+    """Per-class limiters plus a shared, priority-ordered pool"""
+    
+    def __init__(self, classes: Optional[List[EndpointClass]] = None,
+                 shared: Optional[AdaptiveLimiter] = None):
+        self.enabled = os.getenv("ADMISSION_CONTROL_ENABLED", "true").lower() not in ("0", "false", "no")
+        self.classes = {endpoint_class.name: endpoint_class for endpoint_class in classes or self.default_classes()}
+        self.shared = shared or AdaptiveLimiter(
+            "shared",
+            initial_limit=_env_float("ADMISSION_SHARED_LIMIT", 8),
+            max_limit=_env_float("ADMISSION_SHARED_MAX_LIMIT", 24),
+            max_queue=50,
+            max_wait=30.0,
+        )
+        self._paths = {path: endpoint_class for endpoint_class in self.classes.values() for path in endpoint_class.paths}
+        registry = get_metrics_registry()
+        self.rejections = registry.counter(
+            "superagent_admission_rejected_total", "Requests refused by admission control", ("endpoint_class", "reason")
+        )
+        registry.gauge("superagent_admission_limit", "Current adaptive concurrency limit", ("endpoint_class",),
+                       callback=lambda: {name: snapshot["limit"] for name, snapshot in self._limiters().items()})
+        registry.gauge("superagent_admission_queue_depth", "Requests waiting for admission", ("endpoint_class",),
+                       callback=lambda: {name: snapshot["queue_depth"] for name, snapshot in self._limiters().items()})
+    
+    @staticmethod
+    def default_classes() -> List[EndpointClass]:
+        return [
+            EndpointClass("interactive", 0, ("/api/v1/chat-stream", "/api/v1/agent/chat"), AdaptiveLimiter(
+                "interactive", initial_limit=8, max_limit=32, max_queue=20,
+                max_wait=_env_float("ADMISSION_INTERACTIVE_MAX_WAIT", 10.0))),
+            EndpointClass("execute", 1, ("/agent/execute",), AdaptiveLimiter(
+                "execute", initial_limit=2, max_limit=_env_float("ADMISSION_EXECUTE_MAX_LIMIT", 8), max_queue=10,
+                max_wait=_env_float("ADMISSION_EXECUTE_MAX_WAIT", 30.0))),
+            EndpointClass("build", 2, ("/api/v1/build-streaming", "/enterprise-build", "/build"), AdaptiveLimiter(
+                "build", initial_limit=2, max_limit=_env_float("ADMISSION_BUILD_MAX_LIMIT", 8), max_queue=10,
+                max_wait=_env_float("ADMISSION_BUILD_MAX_WAIT", 30.0))),
+        ]
+    
+    def _limiters(self) -> Dict[str, Dict[str, Any]]:
+        snapshots = {name: endpoint_class.limiter.snapshot() for name, endpoint_class in self.classes.items()}
+        snapshots["shared"] = self.shared.snapshot()
+        return snapshots
+    
+    def classify(self, scope) -> Optional[EndpointClass]:
+        if scope["type"] != "http" or scope.get("method") != "POST":
+            return None
+        return self._paths.get(scope.get("path", "").rstrip("/") or "/")
+    
+    async def acquire(self, endpoint_class: EndpointClass) -> None:
+        """Admit a request of this class or raise Overloaded"""
+        try:
+            await endpoint_class.limiter.acquire()
+            try:
+                await self.shared.acquire(endpoint_class.priority)
+            except BaseException:
+                endpoint_class.limiter.release_slot()
+                raise
+        except Overloaded as e:
+            self.rejections.inc(endpoint_class=endpoint_class.name, reason=e.reason)
+            logger.warning(f"🚦 Shedding {endpoint_class.name} request: {e}")
+            raise
+    
+    def release(self, endpoint_class: EndpointClass, latency: float, ok: bool) -> None:
+        # Raw latencies differ too much between classes to compare in the
+        # shared pool; it adapts on each class's congestion verdict instead
+        congested = endpoint_class.limiter.release(latency, ok)
+        self.shared.adjust(congested, self.shared.in_flight >= math.floor(self.shared.limit))
+        self.shared.release_slot()
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Limits, in-flight counts and queue depths of every class and the shared pool"""
+        return {
+            "enabled": self.enabled,
+            "classes": {
+                name: {"priority": endpoint_class.priority, "paths": list(endpoint_class.paths),
+                       **endpoint_class.limiter.snapshot()}
+                for name, endpoint_class in self.classes.items()
+            },
+            "shared": self.shared.snapshot(),
+        }
+
+
+class AdmissionMiddleware:
+    """ASGI middleware admitting, queueing or shedding requests to limited endpoints"""
+    
+    def __init__(self, app, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.controller = controller or admission_controller
+    
+    async def __call__(self, scope, receive, send):
+        endpoint_class = self.controller.classify(scope) if self.controller.enabled else None
+        if endpoint_class is None:
+            await self.app(scope, receive, send)
+            return
+        
+        try:
+            await self.controller.acquire(endpoint_class)
+        except Overloaded as e:
+            retry_after = str(math.ceil(e.retry_after))
+            response = JSONResponse(
+                {"detail": "Server is busy, please retry later", "endpoint_class": endpoint_class.name,
+                 "reason": e.reason, "retry_after": int(retry_after)},
+                status_code=503,
+                headers={"Retry-After": retry_after},
+            )
+            await response(scope, receive, send)
+            return
+        
+        status = 500
+        
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Only server errors signal overload; 4xx are the client's problem
+            self.controller.release(endpoint_class, time.perf_counter() - started, status < 500)
+
+
+# Global admission controller
+admission_controller = AdmissionController()
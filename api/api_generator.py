@@ -86,7 +86,7 @@ Return OpenAPI 3.0 specification in JSON:
 }}"""
         
         try:
-            response = self.model.generate_content(prompt)
+            response = await self.model.generate_content_async(prompt)
             text = response.text.strip()
             
             # Extract JSON from response
@@ -43,7 +43,7 @@ Extract and return JSON with:
 }}"""
         
         try:
-            response = self.model.generate_content(prompt)
+            response = await self.model.generate_content_async(prompt)
             text = response.text.strip()
             
             # Extract JSON from response
@@ -130,7 +130,7 @@ Return a comprehensive architecture design in JSON:
 }}"""
         
         try:
-            response = self.model.generate_content(prompt)
+            response = await self.model.generate_content_async(prompt)
             text = response.text.strip()
             
             # Extract JSON from response
@@ -4,6 +4,7 @@ Runs in the background to detect and fix errors autonomously
 """
 import asyncio
 import logging
+import os
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -36,25 +37,13 @@ class BackgroundMonitor:
             return
         
         try:
-            # Read recent logs
-            log_files = []
-            log_dir = Path("/tmp/logs")
-            if log_dir.exists():
-                log_files = sorted(log_dir.glob("*.log"), key=lambda x: x.stat().st_mtime, reverse=True)[:3]
+            # Only bytes appended since the previous check are read
+            log_dir = Path(os.getenv("SELF_REPAIR_LOG_DIR", "/tmp/logs"))
+            log_files = sorted(str(path) for path in log_dir.glob("*.log")) if log_dir.exists() else []
             
-            combined_logs = ""
-            for log_file in log_files:
-                try:
-                    with open(log_file, 'r') as f:
-                        # Read last 500 lines
-                        lines = f.readlines()[-500:]
-                        combined_logs += ''.join(lines) + "\n"
-                except:
-                    pass
-            
-            if combined_logs:
+            if log_files:
                 # Run auto-repair
-                result = await self_repair_system.auto_repair(combined_logs)
+                result = await self_repair_system.auto_repair_files(log_files)
                 
                 if result['errors_detected'] > 0:
                     logger.info(f"🔧 Self-repair: Found {result['errors_detected']} errors, "
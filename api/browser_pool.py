@@ -0,0 +1,231 @@
+"""
+Browser Pool
+Long-lived headless browser shared by E2E verification runs
+
+One browser process is launched on first use and kept alive; every run
+gets its own isolated context (cookies, storage, cache) that is closed
+when the run ends. A semaphore bounds how many contexts are open at once
+(E2E_MAX_CONTEXTS, default 4). Generated apps are served by StaticAppServer,
+an asyncio static file server on an ephemeral port, so concurrent builds
+never compete for a fixed port.
+
+The browser itself comes from a pluggable backend; PlaywrightBackend is
+the default and imports Playwright lazily.
+"""
+import asyncio
+import logging
+import mimetypes
+import os
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+from urllib.parse import unquote, urlsplit
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserBackend(ABC):
+    """Interface for a browser the pool can hand out contexts from"""
+    
+    @abstractmethod
+    async def start(self) -> None:
+        pass
+    
+    @abstractmethod
+    async def new_context(self, **options) -> Any:
+        """Return an isolated context exposing new_page() and close()"""
+    
+    def is_connected(self) -> bool:
+        return True
+    
+    @abstractmethod
+    async def close(self) -> None:
+        pass
+
+
+class PlaywrightBackend(BrowserBackend):
+    """Headless Chromium driven by Playwright"""
+    
+    def __init__(self, headless: bool = True):
+        self.headless = headless
+        self._playwright = None
+        self._browser = None
+    
+    async def start(self) -> None:
+        # Imported lazily so the API runs where browser dependencies are missing
+        from playwright.async_api import async_playwright
+        
+        self._playwright = await async_playwright().start()
+        try:
+            self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        except Exception:
+            await self._playwright.stop()
+            self._playwright = None
+            raise
+    
+    async def new_context(self, **options) -> Any:
+        return await self._browser.new_context(**options)
+    
+    def is_connected(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+    
+    async def close(self) -> None:
+        if self._browser:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+class BrowserPool:
+    """Shares one browser and hands out a bounded number of isolated contexts"""
+    
+    def __init__(self, backend_factory: Callable[[], BrowserBackend] = PlaywrightBackend,
+                 max_contexts: Optional[int] = None):
+        self.backend_factory = backend_factory
+        self.max_contexts = max_contexts or int(os.getenv("E2E_MAX_CONTEXTS", "4"))
+        self.backend: Optional[BrowserBackend] = None
+        self._semaphore = asyncio.Semaphore(self.max_contexts)
+        self._start_lock = asyncio.Lock()
+        self.launches = 0
+        self.contexts_opened = 0
+        self.active_contexts = 0
+        self.peak_contexts = 0
+    
+    async def _ensure_backend(self) -> BrowserBackend:
+        """Launch the browser once, relaunching it if it has died"""
+        async with self._start_lock:
+            if self.backend is not None and not self.backend.is_connected():
+                logger.warning("Pooled browser disconnected, relaunching")
+                await self._close_backend()
+            if self.backend is None:
+                backend = self.backend_factory()
+                started = time.perf_counter()
+                await backend.start()
+                self.backend = backend
+                self.launches += 1
+                logger.info(f"🌐 Browser pool launched browser in {time.perf_counter() - started:.2f}s")
+            return self.backend
+    
+    @asynccontextmanager
+    async def context(self, **options) -> AsyncIterator[Any]:
+        """Borrow an isolated browser context for the duration of the block"""
+        async with self._semaphore:
+            backend = await self._ensure_backend()
+            context = await backend.new_context(**options)
+            self.contexts_opened += 1
+            self.active_contexts += 1
+            self.peak_contexts = max(self.peak_contexts, self.active_contexts)
+            try:
+                yield context
+            finally:
+                self.active_contexts -= 1
+                try:
+                    await context.close()
+                except Exception as e:
+                    logger.warning(f"Failed to close browser context: {e}")
+    
+    async def _close_backend(self) -> None:
+        backend, self.backend = self.backend, None
+        if backend is not None:
+            try:
+                await backend.close()
+            except Exception as e:
+                logger.warning(f"Failed to close pooled browser: {e}")
+    
+    async def close(self) -> None:
+        """Shut down the pooled browser"""
+        async with self._start_lock:
+            await self._close_backend()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool usage counters"""
+        return {
+            "max_contexts": self.max_contexts,
+            "browser_running": self.backend is not None,
+            "launches": self.launches,
+            "contexts_opened": self.contexts_opened,
+            "active_contexts": self.active_contexts,
+            "peak_contexts": self.peak_contexts,
+        }
+
+
+class StaticAppServer:
+    """Serves a directory over HTTP on an ephemeral localhost port"""
+    
+    def __init__(self, root: Path, host: str = "127.0.0.1"):
+        self.root = Path(root).resolve()
+        self.host = host
+        self.port: Optional[int] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+    
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+    
+    async def start(self) -> "StaticAppServer":
+        # Port 0 lets the OS pick a free port; the server is ready once bound
+        self._server = await asyncio.start_server(self._handle, self.host, 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"📡 Test server started on {self.url}")
+        return self
+    
+    async def stop(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            logger.info("🛑 Test server stopped")
+    
+    async def __aenter__(self) -> "StaticAppServer":
+        return await self.start()
+    
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+    
+    def _resolve(self, target: str) -> Optional[Path]:
+        path = unquote(urlsplit(target).path).lstrip("/") or "index.html"
+        candidate = (self.root / path).resolve()
+        if candidate.is_dir():
+            candidate = candidate / "index.html"
+        if self.root not in candidate.parents or not candidate.is_file():
+            return None
+        return candidate
+    
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            # Drain headers; requests are served with Connection: close
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            
+            if len(request_line) < 2 or request_line[0] not in ("GET", "HEAD"):
+                status, body, content_type = "405 Method Not Allowed", b"", "text/plain"
+            else:
+                path = self._resolve(request_line[1])
+                if path is None:
+                    status, body, content_type = "404 Not Found", b"Not Found", "text/plain"
+                else:
+                    status = "200 OK"
+                    body = await asyncio.to_thread(path.read_bytes)
+                    content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+            
+            head = (
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nCache-Control: no-store\r\nConnection: close\r\n\r\n"
+            )
+            writer.write(head.encode("latin-1"))
+            if request_line[:1] != ["HEAD"]:
+                writer.write(body)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+# Global browser pool instance
+browser_pool = BrowserPool()
@@ -6,37 +6,36 @@ Provides real-time conversational responses while builds are running
 from fastapi import APIRouter
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import asyncio
-import json
-import os
 import google.generativeai as genai
 
+from api.sse_streaming import StreamStats, coalesce, gemini_text_chunks, sse_event
+
 router = APIRouter(prefix="/api/v1", tags=["Chat"])
 
 class ChatRequest(BaseModel):
     message: str
 
 async def stream_chat_response(message: str):
-    """Stream AI chat response word-by-word - FULLY NON-BLOCKING"""
+    """Stream AI chat response as the model produces it - FULLY NON-BLOCKING"""
+    stats = StreamStats("chat")
     
     try:
         # Send status update: Thinking
-        yield f"data: {json.dumps({'type': 'status', 'status': 'thinking'})}\n\n"
+        yield sse_event({'type': 'status', 'status': 'thinking'})
         
         # Get Gemini API key (custom or default)
         from api.custom_key_manager import get_custom_gemini_key
         gemini_key = get_custom_gemini_key()
         if not gemini_key:
-            yield f"data: {json.dumps({'type': 'text', 'content': 'Sorry, AI is not configured.'})}\n\n"
-            yield f"data: {json.dumps({'type': 'complete'})}\n\n"
+            yield sse_event({'type': 'text', 'content': 'Sorry, AI is not configured.'})
+            yield sse_event({'type': 'complete'})
             return
         
         # Configure Gemini
         genai.configure(api_key=gemini_key)
         
         # Send status update: Analyzing
-        yield f"data: {json.dumps({'type': 'status', 'status': 'analyzing'})}\n\n"
-        await asyncio.sleep(0.1)
+        yield sse_event({'type': 'status', 'status': 'analyzing'})
         
         # Create an intelligent, detailed, and chatty AI assistant
         system_prompt = """You are an INCREDIBLY intelligent, knowledgeable, and chatty AI development assistant. You're helping users while their apps are being built, and you LOVE sharing detailed information and insights.
@@ -77,71 +76,20 @@ Remember: You're not just answering questions - you're TEACHING and EMPOWERING u
         model = genai.GenerativeModel('gemini-2.0-flash')
         full_prompt = f"{system_prompt}\n\nUser: {message}\nAssistant:"
         
-        # Create queue for thread-safe communication
-        from asyncio import Queue
-        chunk_queue = Queue()
-        
-        # Capture the running event loop for cross-thread communication
-        loop = asyncio.get_running_loop()
-        
-        def generate_in_thread(event_loop):
-            """Run ENTIRE Gemini streaming iteration in thread (non-blocking)"""
-            try:
-                # Generate with streaming enabled
-                response_stream = model.generate_content(full_prompt, stream=True)
-                
-                # Iterate and push chunks to queue
-                for chunk in response_stream:
-                    if hasattr(chunk, 'text') and chunk.text:
-                        # Put chunk in queue for async processing (thread-safe)
-                        asyncio.run_coroutine_threadsafe(
-                            chunk_queue.put(chunk.text),
-                            event_loop
-                        )
-                
-                # Signal completion
-                asyncio.run_coroutine_threadsafe(
-                    chunk_queue.put(None),
-                    event_loop
-                )
-            except Exception as e:
-                # Put error in queue
-                asyncio.run_coroutine_threadsafe(
-                    chunk_queue.put({'error': str(e)}),
-                    event_loop
-                )
-        
         # Send status update: Generating response
-        yield f"data: {json.dumps({'type': 'status', 'status': 'generating'})}\n\n"
-        await asyncio.sleep(0.05)
-        
-        # Start thread as background task (don't await - run concurrently)
-        asyncio.create_task(asyncio.to_thread(generate_in_thread, loop))
+        yield sse_event({'type': 'status', 'status': 'generating'})
         
-        # Stream chunks from queue as they arrive (non-blocking)
-        while True:
-            chunk_text = await chunk_queue.get()
-            
-            # Check for completion signal
-            if chunk_text is None:
-                break
-            
-            # Check for error
-            if isinstance(chunk_text, dict) and 'error' in chunk_text:
-                raise Exception(chunk_text['error'])
-            
-            # Stream the chunk word-by-word for smooth effect
-            words = chunk_text.split()
-            for word in words:
-                yield f"data: {json.dumps({'type': 'text', 'content': word + ' '})}\n\n"
-                await asyncio.sleep(0.02)  # Small delay for smooth streaming
+        # Forward provider tokens as they arrive, coalesced into small windows
+        async for text in coalesce(gemini_text_chunks(model, full_prompt), stats=stats):
+            yield sse_event({'type': 'text', 'content': text})
         
         # Mark as complete
-        yield f"data: {json.dumps({'type': 'complete'})}\n\n"
+        stats.log()
+        yield sse_event({'type': 'complete', 'stats': stats.to_dict()})
         
     except Exception as e:
         print(f"Chat error: {str(e)}")
-        yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+        yield sse_event({'type': 'error', 'message': str(e)})
 
 @router.post("/chat-stream")
 async def chat_stream(request: ChatRequest):
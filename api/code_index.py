@@ -0,0 +1,298 @@
+"""
+Code Index
+In-process trigram index for searching workspace files
+
+Every indexed file is reduced to the set of (lowercased) three-character
+substrings it contains. A regex query is turned into the literal strings
+any match must contain; only files holding all of their trigrams are
+opened and checked line by line with the real regex. The index follows
+the workspace incrementally: files written through FileOperations are
+re-indexed immediately, and a throttled stat walk picks up other changes
+by mtime and size, so a query never re-reads unchanged files.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXCLUDED_DIRS = {'.git', '__pycache__', 'node_modules', '.venv', 'venv', '.replit'}
+
+
+@dataclass
+class _IndexedFile:
+    mtime_ns: int
+    size: int
+    trigrams: FrozenSet[str]
+
+
+def trigrams(text: str) -> Set[str]:
+    """All three-character substrings of the lowercased text"""
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _required_literals(items) -> List[List[str]]:
+    """Alternatives of literal runs; a match must contain every run of one alternative"""
+    if len(items) == 1 and items[0][0] is sre_constants.BRANCH:
+        alternatives = []
+        for branch in items[0][1][1]:
+            alternatives.extend(_required_literals(list(branch)))
+        return alternatives
+    
+    runs, current = [], []
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            current.append(chr(av))
+            continue
+        if current:
+            runs.append("".join(current))
+            current = []
+        if op is sre_constants.SUBPATTERN:
+            inner = _required_literals(list(av[-1]))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[0] >= 1:
+            inner = _required_literals(list(av[2]))
+        else:
+            continue
+        # Only a group without alternatives adds requirements
+        if len(inner) == 1:
+            runs.extend(inner[0])
+    if current:
+        runs.append("".join(current))
+    return [runs]
+
+
+def query_trigrams(pattern: str, flags: int = 0) -> Optional[List[Set[str]]]:
+    """Trigram sets, one per alternative, that candidate files must contain.
+    
+    Returns None when the pattern constrains nothing (every file is a candidate).
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except re.error:
+        return None
+    alternatives = []
+    for runs in _required_literals(list(parsed)):
+        required = set()
+        for run in runs:
+            required |= trigrams(run)
+        if not required:
+            return None
+        alternatives.append(required)
+    return alternatives or None
+
+
+class CodeIndex:
+    """Trigram index over the text files below a root directory"""
+    
+    def __init__(self, root: Path, excluded_dirs: Optional[Iterable[str]] = None,
+                 max_file_size: int = 1024 * 1024, refresh_interval: float = 2.0):
+        self.root = Path(root).resolve()
+        self.excluded_dirs = set(excluded_dirs or DEFAULT_EXCLUDED_DIRS)
+        self.max_file_size = max_file_size
+        self.refresh_interval = refresh_interval
+        self._files: Dict[str, _IndexedFile] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+        self._refreshed = 0.0
+        self.stats = {"queries": 0, "files_indexed": 0, "refreshes": 0, "last_query_ms": 0.0, "total_query_ms": 0.0}
+    
+    def _relative(self, path) -> Optional[str]:
+        try:
+            return (self.root / path).resolve().relative_to(self.root).as_posix()
+        except ValueError:
+            return None
+    
+    def _walk(self) -> Dict[str, os.stat_result]:
+        """stat of every candidate file, pruning excluded directories before descending"""
+        found = {}
+        stack = [self.root]
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name in self.excluded_dirs:
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(Path(entry.path))
+                    elif entry.is_file(follow_symlinks=False):
+                        stat = entry.stat()
+                        if stat.st_size <= self.max_file_size:
+                            found[Path(entry.path).relative_to(self.root).as_posix()] = stat
+                except OSError:
+                    continue
+        return found
+    
+    def _read_text(self, relative: str) -> Optional[str]:
+        try:
+            data = (self.root / relative).read_bytes()
+        except OSError:
+            return None
+        if b"\0" in data[:8192]:
+            return None
+        return data.decode("utf-8", errors="replace")
+    
+    def _add(self, relative: str, stat: os.stat_result):
+        self._remove(relative)
+        text = self._read_text(relative)
+        grams = frozenset(trigrams(text)) if text is not None else frozenset()
+        self._files[relative] = _IndexedFile(stat.st_mtime_ns, stat.st_size, grams)
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(relative)
+        self.stats["files_indexed"] += 1
+    
+    def _remove(self, relative: str):
+        indexed = self._files.pop(relative, None)
+        if indexed is None:
+            return
+        for gram in indexed.trigrams:
+            paths = self._postings.get(gram)
+            if paths is not None:
+                paths.discard(relative)
+                if not paths:
+                    del self._postings[gram]
+    
+    def refresh(self, force: bool = False) -> int:
+        """Re-index files whose mtime or size changed; returns files (re)indexed"""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._refreshed < self.refresh_interval:
+                return 0
+            self._refreshed = now
+            self.stats["refreshes"] += 1
+            
+            current = self._walk()
+            for relative in set(self._files) - set(current):
+                self._remove(relative)
+            changed = 0
+            for relative, stat in current.items():
+                indexed = self._files.get(relative)
+                if indexed is None or indexed.mtime_ns != stat.st_mtime_ns or indexed.size != stat.st_size:
+                    self._add(relative, stat)
+                    changed += 1
+            return changed
+    
+    def update_file(self, path) -> None:
+        """Re-index one file right after it was written"""
+        relative = self._relative(path)
+        if relative is None or any(part in self.excluded_dirs for part in Path(relative).parts):
+            return
+        with self._lock:
+            try:
+                stat = os.stat(self.root / relative)
+            except OSError:
+                self._remove(relative)
+                return
+            if stat.st_size > self.max_file_size:
+                self._remove(relative)
+            else:
+                self._add(relative, stat)
+    
+    def remove_file(self, path) -> None:
+        """Drop a deleted file from the index"""
+        relative = self._relative(path)
+        if relative is not None:
+            with self._lock:
+                self._remove(relative)
+    
+    def _candidates(self, regex: "re.Pattern") -> List[str]:
+        alternatives = query_trigrams(regex.pattern, regex.flags)
+        if alternatives is None:
+            return sorted(self._files)
+        candidates = set()
+        for required in alternatives:
+            # Intersect the rarest postings first
+            postings = sorted((self._postings.get(gram, set()) for gram in required), key=len)
+            found = set(postings[0])
+            for paths in postings[1:]:
+                found &= paths
+                if not found:
+                    break
+            candidates |= found
+        return sorted(candidates)
+    
+    def search(self, pattern: str, extensions: Optional[Iterable[str]] = None,
+               ignore_case: bool = False, offset: int = 0, limit: int = 200) -> Dict:
+        """Lines matching a regex, in (file, line) order, one page at a time.
+        
+        Patterns that are not valid regular expressions are searched literally.
+        """
+        started = time.perf_counter()
+        flags = re.IGNORECASE if ignore_case else 0
+        try:
+            regex = re.compile(pattern, flags)
+        except re.error:
+            regex = re.compile(re.escape(pattern), flags)
+        suffixes = tuple(f".{ext.lstrip('.')}" for ext in extensions or ())
+        
+        self.refresh()
+        with self._lock:
+            candidates = self._candidates(regex)
+        if suffixes:
+            candidates = [path for path in candidates if path.endswith(suffixes)]
+        
+        matches = []
+        total = 0
+        for relative in candidates:
+            text = self._read_text(relative)
+            if text is None:
+                continue
+            for number, line in enumerate(text.splitlines(), 1):
+                if regex.search(line):
+                    if offset <= total < offset + limit:
+                        matches.append({"file": relative, "line": number, "content": line})
+                    total += 1
+        
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats["queries"] += 1
+        self.stats["last_query_ms"] = elapsed_ms
+        self.stats["total_query_ms"] += elapsed_ms
+        return {
+            "matches": matches,
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "has_more": offset + len(matches) < total,
+            "files_searched": len(candidates),
+            "files_indexed": len(self._files),
+            "latency_ms": round(elapsed_ms, 2)
+        }
+    
+    def get_stats(self) -> Dict:
+        """Index size and query timings"""
+        return {
+            **self.stats,
+            "root": str(self.root),
+            "files": len(self._files),
+            "trigrams": len(self._postings),
+            "avg_query_ms": self.stats["total_query_ms"] / self.stats["queries"] if self.stats["queries"] else 0.0
+        }
+
+
+_indexes: Dict[Path, CodeIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_code_index(root: Path) -> CodeIndex:
+    """Shared index for a workspace root"""
+    root = Path(root).resolve()
+    with _indexes_lock:
+        if root not in _indexes:
+            _indexes[root] = CodeIndex(root)
+        return _indexes[root]
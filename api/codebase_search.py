@@ -3,10 +3,11 @@ Codebase Search Module - Search and analyze code
 """
 import os
 from pathlib import Path
-import subprocess
 from typing import Dict, List
 import re
 
+from api.code_index import get_code_index
+
 class CodebaseSearch:
     """Search and analyze codebase"""
     
@@ -14,72 +15,41 @@ class CodebaseSearch:
         self.base_dir = Path.cwd()
         self.excluded_dirs = {'.git', '__pycache__', 'node_modules', '.venv', 'venv'}
     
-    def search_pattern(self, pattern: str, file_types: List[str] = None) -> Dict:
+    def search_pattern(self, pattern: str, file_types: List[str] = None,
+                       offset: int = 0, limit: int = 200) -> Dict:
         """Search for pattern in codebase"""
         try:
-            cmd = ['grep', '-r', '-n', pattern, '.']
-            
-            if file_types:
-                for ft in file_types:
-                    cmd.extend(['--include', f'*.{ft}'])
-            
-            for excluded in self.excluded_dirs:
-                cmd.extend(['--exclude-dir', excluded])
-            
-            result = subprocess.run(
-                cmd,
-                cwd=self.base_dir,
-                capture_output=True,
-                text=True,
-                timeout=10
+            result = get_code_index(self.base_dir).search(
+                pattern, extensions=file_types, offset=offset, limit=limit
             )
-            
-            matches = []
-            for line in result.stdout.split('\n')[:200]:
-                if line.strip():
-                    parts = line.split(':', 2)
-                    if len(parts) >= 3:
-                        matches.append({
-                            "file": parts[0],
-                            "line": int(parts[1]) if parts[1].isdigit() else 0,
-                            "content": parts[2].strip()
-                        })
+            for match in result["matches"]:
+                match["content"] = match["content"].strip()
             
             return {
                 "success": True,
                 "pattern": pattern,
-                "matches": matches,
-                "total": len(matches)
+                **result
             }
         except Exception as e:
             return {"success": False, "error": str(e)}
     
     def find_function(self, function_name: str) -> Dict:
         """Find function definitions"""
-        patterns = [
-            f'def {function_name}',
-            f'function {function_name}',
-            f'const {function_name} =',
-            f'let {function_name} =',
-            f'async def {function_name}',
-        ]
-        
-        all_matches = []
-        for pattern in patterns:
-            result = self.search_pattern(pattern)
-            if result.get('success'):
-                all_matches.extend(result.get('matches', []))
+        name = re.escape(function_name)
+        # One query for every definition style ('async def' lines match 'def')
+        pattern = f'def {name}|function {name}|const {name} =|let {name} ='
+        result = self.search_pattern(pattern)
         
         return {
             "success": True,
             "function": function_name,
-            "definitions": all_matches,
-            "total": len(all_matches)
+            "definitions": result.get('matches', []),
+            "total": result.get('total', 0)
         }
     
     def find_class(self, class_name: str) -> Dict:
         """Find class definitions"""
-        pattern = f'class {class_name}'
+        pattern = f'class {re.escape(class_name)}'
         return self.search_pattern(pattern)
     
     def get_imports(self, file_path: str) -> Dict:
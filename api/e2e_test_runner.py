@@ -7,13 +7,11 @@ import asyncio
 import logging
 from typing import Dict, List, Optional
 from pathlib import Path
-import http.server
-import socketserver
-import threading
-import time
 import re
 
-# NOTE: Playwright is imported lazily inside verify_app_features() 
+from api.browser_pool import BrowserPool, StaticAppServer, browser_pool
+
+# NOTE: Playwright is imported lazily by the browser pool's backend
 # to avoid crashes in production if browser dependencies are not installed
 
 logger = logging.getLogger(__name__)
@@ -22,11 +20,9 @@ logger = logging.getLogger(__name__)
 class E2ETestRunner:
     """Automated E2E testing system for generated applications"""
     
-    def __init__(self):
-        self.browser: Optional[object] = None  # Changed from Browser to object for lazy import
-        self.server_thread: Optional[threading.Thread] = None
-        self.server: Optional[socketserver.TCPServer] = None
-        self.test_port = 8765
+    def __init__(self, pool: Optional[BrowserPool] = None):
+        # Shared across runs: one browser, an isolated context per app
+        self.pool = pool or browser_pool
     
     async def verify_app_features(
         self, 
@@ -46,23 +42,15 @@ class E2ETestRunner:
             Dict with test results, passed/failed features, critical issues
         """
         try:
-            # Lazy import playwright only when actually running E2E tests
-            from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
-            
             logger.info(f"🧪 Starting E2E verification for {app_type}")
             
-            # Start local web server to serve the app
-            await self._start_local_server(app_path)
-            
-            # Launch browser
-            async with async_playwright() as p:
-                self.browser = await p.chromium.launch(headless=True)
-                context = await self.browser.new_context(viewport={'width': 1920, 'height': 1080})
+            # Serve the app on an ephemeral port and borrow an isolated context
+            async with StaticAppServer(app_path) as server, \
+                    self.pool.context(viewport={'width': 1920, 'height': 1080}) as context:
                 page = await context.new_page()
                 
                 # Navigate to app
-                url = f"http://localhost:{self.test_port}/index.html"
-                await page.goto(url, wait_until='networkidle')
+                await page.goto(f"{server.url}/index.html", wait_until='networkidle')
                 
                 # Run type-specific tests
                 if "calculator" in app_type.lower():
@@ -75,19 +63,12 @@ class E2ETestRunner:
                     results = await self._test_game(page, required_features)
                 else:
                     results = await self._test_generic_app(page, required_features)
-                
-                await context.close()
-                await self.browser.close()
-            
-            # Stop server
-            self._stop_local_server()
             
             logger.info(f"✅ E2E testing complete - {results['passed']}/{results['total']} tests passed")
             return results
             
         except Exception as e:
             logger.error(f"❌ E2E testing failed: {str(e)}")
-            self._stop_local_server()
             
             # Don't return critical_issues for browser dependency errors
             # (quality gate will handle these gracefully)
@@ -388,28 +369,3 @@ class E2ETestRunner:
             "critical_issues": critical_issues,
             "coverage_percent": (len(passed_tests) / max(len(passed_tests) + len(failed_tests), 1)) * 100
         }
-    
-    async def _start_local_server(self, app_path: Path):
-        """Start a local HTTP server to serve the app"""
-        import os
-        
-        class CustomHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
-            def __init__(self, *args, **kwargs):
-                super().__init__(*args, directory=str(app_path), **kwargs)
-            
-            def log_message(self, format, *args):
-                pass
-        
-        self.server = socketserver.TCPServer(("", self.test_port), CustomHTTPRequestHandler)
-        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
-        self.server_thread.start()
-        
-        await asyncio.sleep(0.5)
-        logger.info(f"📡 Test server started on http://localhost:{self.test_port}")
-    
-    def _stop_local_server(self):
-        """Stop the local HTTP server"""
-        if self.server:
-            self.server.shutdown()
-            self.server.server_close()
-            logger.info("🛑 Test server stopped")
@@ -12,6 +12,10 @@ import json
 from datetime import datetime
 import time
 from api.e2e_test_runner import E2ETestRunner
+from api.preview_cache import preview_cache
+from superagent.core.stage_graph import Stage, StageGraph
+from superagent.modules.dependency_cache import get_dependency_cache
+from superagent.core.tracing import tracer
 
 class EnterpriseBuildSystem:
     """
@@ -19,15 +23,32 @@ class EnterpriseBuildSystem:
     Adds: checkpoints, multi-step builds, testing, verification, production outputs
     """
     
+    # Per-stage timeouts in seconds (None = no limit). Optional stages that time
+    # out are reported as degraded instead of failing the build.
+    STAGE_TIMEOUTS = {
+        "checkpoint": 60,
+        "architecture_planning": 120,
+        "code_generation": None,
+        "create_files": 120,
+        "install_dependencies": 600,
+        "e2e_verification": 300,
+        "automated_testing": 300,
+        "security_scan": 120,
+        "code_verification": 180,
+        "production_outputs": 60,
+    }
+
     def __init__(self, basic_builder, rollback_system, hallucination_fixer, cybersecurity_ai):
         self.basic_builder = basic_builder
         self.rollback_system = rollback_system
         self.hallucination_fixer = hallucination_fixer
         self.cybersecurity_ai = cybersecurity_ai
         self.e2e_test_runner = E2ETestRunner()
+        self.dependency_cache = get_dependency_cache()
         self.build_stages = []
         self.current_stage = 0
         
+    @tracer.traced("enterprise_build", kind="build")
     async def enterprise_build(
         self,
         instruction: str,
@@ -36,10 +57,18 @@ class EnterpriseBuildSystem:
         enable_testing: bool = True,
         enable_security_scan: bool = True,
         enable_multi_file: bool = True,
-        progress_callback: Optional[Callable] = None
+        progress_callback: Optional[Callable] = None,
+        preview_callback: Optional[Callable] = None
     ) -> Dict:
         """
         Enterprise-grade build process with all safety features
+
+        Stages run as a stage graph (superagent/core/stage_graph.py): everything that only
+        needs the written project (dependencies, tests, E2E, security scan,
+        verification) runs concurrently once stage 4 is done. preview_callback(url)
+        is awaited as soon as the preview has passed the required E2E gate,
+        without waiting for optional stages; if the build still fails after
+        that, preview_callback(None) revokes it.
         
         Stages:
         1. Pre-Build Safety (Checkpoint)
@@ -64,7 +93,8 @@ class EnterpriseBuildSystem:
             "security_issues": [],
             "build_time": 0,
             "checkpoint_before": None,
-            "checkpoint_after": None
+            "checkpoint_after": None,
+            "trace_id": tracer.current_trace_id()
         }
         
         # 🎯 INTELLIGENT LANGUAGE OVERRIDE: Detect intended app type
@@ -146,184 +176,192 @@ class EnterpriseBuildSystem:
                 print(f"   Overriding language from '{language}' → 'html' for visual interface")
                 language = "html"
         
-        try:
-            # STAGE 1: Pre-Build Safety - Create Checkpoint
-            if enable_checkpoints:
-                stage_result = await self._stage_create_checkpoint(instruction)
-                results["checkpoint_before"] = stage_result["checkpoint_id"]
-                results["stages"].append(stage_result)
-                if progress_callback:
-                    await progress_callback("Stage 1/9: Checkpoint created for safety", 11)
-            
-            # STAGE 2: Architecture Planning
+        stage_results: Dict[str, Dict] = {}
+        should_run_e2e = language.lower() in ["html", "web"]
+
+        async def run_checkpoint_before(inputs: Dict) -> Dict:
+            stage_result = await self._stage_create_checkpoint(instruction)
+            stage_results["checkpoint_before"] = stage_result
+            results["checkpoint_before"] = stage_result["checkpoint_id"]
+            return {"checkpoint_before": stage_result["checkpoint_id"]}
+
+        async def run_architecture(inputs: Dict) -> Dict:
             stage_result = await self._stage_architecture_planning(instruction, language, enable_multi_file)
-            results["stages"].append(stage_result)
-            architecture = stage_result["architecture"]
-            if progress_callback:
-                await progress_callback("Stage 2/9: Architecture planned", 22)
-            
-            # STAGE 3: Code Generation (Multi-file or single-file)
-            stage_result = await self._stage_code_generation(instruction, language, architecture)
-            results["stages"].append(stage_result)
-            
+            stage_results["architecture_planning"] = stage_result
+            return {"architecture": stage_result["architecture"]}
+
+        async def run_code_generation(inputs: Dict) -> Dict:
+            stage_result = await self._stage_code_generation(instruction, language, inputs["architecture"])
+            stage_results["code_generation"] = stage_result
+
             # CRITICAL: Check if code generation succeeded
             if not stage_result["success"] or len(stage_result["files"]) == 0:
                 raise Exception(f"Code generation failed: {stage_result.get('error', 'No files generated')}")
-            
+
             results["files_created"].extend(stage_result["files"])
-            generated_files = stage_result["files"]
-            if progress_callback:
-                await progress_callback(f"Stage 3/9: Generated {len(generated_files)} files", 33)
-            
-            # STAGE 4: Create Project Structure
-            stage_result = await self._stage_create_files(generated_files, instruction)
-            results["stages"].append(stage_result)
-            
+            return {"generated_files": stage_result["files"]}
+
+        async def run_create_files(inputs: Dict) -> Dict:
+            stage_result = await self._stage_create_files(inputs["generated_files"], instruction)
+            stage_results["create_files"] = stage_result
+
             # Validate project directory was created
             if not stage_result["success"] or not stage_result["project_dir"]:
                 raise Exception(f"Failed to create project structure: {stage_result.get('error', 'Unknown error')}")
-            
-            project_dir = stage_result["project_dir"]
-            preview_url = stage_result.get("preview_url")
+
+            results["project_dir"] = stage_result["project_dir"]
+            return {"project_dir": stage_result["project_dir"], "preview_url": stage_result.get("preview_url")}
+
+        async def run_deliver_preview(inputs: Dict) -> Dict:
+            # Runs once the required gate passed; optional stages only enrich the app
+            preview_url = inputs["preview_url"]
             if preview_url:
                 results["preview_url"] = preview_url
-            if progress_callback:
-                await progress_callback("Stage 4/9: Project structure created", 44)
-            
-            # STAGE 5: Dependency Installation
-            stage_result = await self._stage_install_dependencies(project_dir, language, architecture)
+                if preview_callback:
+                    await preview_callback(preview_url)
+            return {"preview_delivered": bool(preview_url)}
+
+        async def run_install_dependencies(inputs: Dict) -> Dict:
+            stage_result = await self._stage_install_dependencies(inputs["project_dir"], language, inputs["architecture"])
+            stage_results["install_dependencies"] = stage_result
             results["dependencies_installed"] = stage_result["installed"]
-            results["stages"].append(stage_result)
-            if progress_callback:
-                await progress_callback(f"Stage 5/11: Installed {len(stage_result['installed'])} dependencies", 45)
-            
-            # STAGE 6: E2E Feature Verification (NEW - validates features actually work!)
-            # Run E2E for ALL web apps with interactive features (not just "advanced" keyword apps)
-            should_run_e2e = language.lower() in ["html", "web"]
-            
-            if should_run_e2e:
-                print("\n" + "="*70)
-                print("🧪 STAGE 6: E2E FEATURE VERIFICATION (Real Browser Testing)")
-                print("="*70)
-                
-                stage_result = await self._stage_e2e_verification(
-                    project_dir=Path(project_dir),
-                    app_type=architecture.get("type", "generic"),
-                    instruction=instruction,
-                    architecture=architecture
-                )
-                results["e2e_results"] = stage_result
-                results["stages"].append(stage_result)
-                
-                # QUALITY GATE: Check E2E results
-                critical_issues = stage_result.get("critical_issues", [])
-                passed = stage_result.get("passed", 0)
-                total = stage_result.get("total", 0)
-                coverage = stage_result.get("coverage_percent", 0)
-                error = stage_result.get("error")
-                
-                if progress_callback:
-                    e2e_status = f"{passed}/{total} features work ({coverage:.0f}% coverage)"
-                    await progress_callback(f"Stage 6/11: E2E verified - {e2e_status}", 55)
-                
-                # Check if E2E runner itself failed (browser dependencies missing)
-                if error and "BrowserType.launch" in str(error):
-                    # GRACEFUL SKIP: Browser dependencies not available
-                    print(f"\n⚠️  E2E Testing Unavailable:")
-                    print(f"   Browser dependencies not available in this environment")
-                    print(f"   ℹ️  App will be delivered but may have untested features")
-                    print(f"   💡 Static code analysis passed - app should work")
-                    results["e2e_skipped"] = "Browser dependencies unavailable"
-                    # Don't fail the build - just warn
-                
-                elif error:
-                    # BLOCK BUILD: E2E runner failed for other reasons (timeout, crash, server startup, etc.)
-                    print(f"\n❌ E2E RUNNER FAILED:")
-                    print(f"   {error}")
-                    print("\n🚫 BUILD BLOCKED: E2E testing failed to run properly!")
-                    print("   Cannot verify app quality without successful E2E tests.")
-                    
-                    results["success"] = False
-                    results["e2e_critical_issues"] = critical_issues if critical_issues else [f"E2E runner failed: {error}"]
-                    results["failure_reason"] = f"E2E testing failed: {error}"
-                    
-                    # Stop build process - can't deliver untested app
-                    raise Exception(f"E2E Quality Gate Failed: E2E runner error - {error}")
-                
-                # ENFORCE QUALITY GATE: Fail build if critical issues found in actual app testing
-                elif critical_issues:
-                    # E2E ran successfully but found broken features
-                    print(f"\n❌ E2E VERIFICATION FAILED - {len(critical_issues)} CRITICAL ISSUES:")
-                    for issue in critical_issues:
-                        print(f"   • {issue}")
-                    print("\n🚫 BUILD BLOCKED: This app cannot be delivered with broken features!")
-                    print("   SuperAgent's quality standards require all advertised features to work.")
-                    
-                    results["success"] = False
-                    results["e2e_critical_issues"] = critical_issues
-                    results["failure_reason"] = "E2E tests failed - critical features broken"
-                    
-                    # Stop build process - don't continue with broken app
-                    raise Exception(f"E2E Quality Gate Failed: {len(critical_issues)} critical issues found. Build blocked.")
-                
-                # WARN if coverage is low (but don't fail)
-                elif coverage < 70 and coverage > 0:
-                    print(f"\n⚠️  E2E Coverage Warning: Only {coverage:.0f}% of expected features verified")
-                    print(f"   Passed: {passed}/{total} tests")
-                    print("   This app may have incomplete functionality.")
-                    results["e2e_warning"] = f"Low coverage: {coverage:.0f}%"
-                elif passed > 0:
-                    print(f"\n✅ E2E VERIFICATION PASSED:")
-                    print(f"   ✓ {passed}/{total} features verified ({coverage:.0f}% coverage)")
-                    print(f"   ✓ No critical issues found")
-                    print(f"   ✓ App is ready for delivery")
-            else:
-                if progress_callback:
-                    await progress_callback("Stage 6/11: E2E testing skipped (non-web app)", 55)
-            
-            # STAGE 7: Automated Testing
-            if enable_testing:
-                stage_result = await self._stage_run_tests(project_dir, language)
-                results["tests_passed"] = stage_result["tests_passed"]
-                results["stages"].append(stage_result)
-                if progress_callback:
-                    await progress_callback(f"Stage 7/11: {stage_result['tests_passed']} tests passed", 64)
-            
-            # STAGE 8: Security Scanning
-            if enable_security_scan:
-                stage_result = await self._stage_security_scan(generated_files)
-                results["security_issues"] = stage_result["issues"]
-                results["stages"].append(stage_result)
-                if progress_callback:
-                    await progress_callback(f"Stage 8/11: Security scan complete ({len(stage_result['issues'])} issues)", 73)
-            
-            # STAGE 9: Code Verification
-            stage_result = await self._stage_code_verification(generated_files, instruction)
+            return {"dependencies_installed": stage_result["installed"]}
+
+        async def run_e2e_verification(inputs: Dict) -> Dict:
+            print("\n" + "="*70)
+            print("🧪 STAGE 6: E2E FEATURE VERIFICATION (Real Browser Testing)")
+            print("="*70)
+
+            stage_result = await self._stage_e2e_verification(
+                project_dir=Path(inputs["project_dir"]),
+                app_type=inputs["architecture"].get("type", "generic"),
+                instruction=instruction,
+                architecture=inputs["architecture"]
+            )
+            stage_results["e2e_verification"] = stage_result
+            results["e2e_results"] = stage_result
+            self._apply_e2e_quality_gate(stage_result, results)
+            return {"e2e_results": stage_result}
+
+        async def run_tests(inputs: Dict) -> Dict:
+            stage_result = await self._stage_run_tests(inputs["project_dir"], language)
+            stage_results["automated_testing"] = stage_result
+            results["tests_passed"] = stage_result["tests_passed"]
+            return {"tests_passed": stage_result["tests_passed"]}
+
+        async def run_security_scan(inputs: Dict) -> Dict:
+            stage_result = await self._stage_security_scan(inputs["generated_files"])
+            stage_results["security_scan"] = stage_result
+            results["security_issues"] = stage_result["issues"]
+            return {"security_issues": stage_result["issues"]}
+
+        async def run_code_verification(inputs: Dict) -> Dict:
+            stage_result = await self._stage_code_verification(inputs["generated_files"], instruction)
+            stage_results["code_verification"] = stage_result
             results["verification_score"] = stage_result["score"]
-            results["stages"].append(stage_result)
-            if progress_callback:
-                await progress_callback(f"Stage 9/11: Code verified (score: {stage_result['score']}/100)", 82)
-            
-            # STAGE 10: Production Outputs (Dockerfile, CI/CD, Docs)
-            stage_result = await self._stage_production_outputs(project_dir, language, architecture)
+            return {"verification_score": stage_result["score"]}
+
+        async def run_production_outputs(inputs: Dict) -> Dict:
+            stage_result = await self._stage_production_outputs(inputs["project_dir"], language, inputs["architecture"])
+            stage_results["production_outputs"] = stage_result
             results["production_files"] = stage_result["files"]
-            results["stages"].append(stage_result)
-            if progress_callback:
-                await progress_callback("Stage 10/11: Production files created", 91)
-            
-            # Final Checkpoint
-            if enable_checkpoints:
-                final_checkpoint = await self._stage_create_checkpoint(f"Completed: {instruction}")
-                results["checkpoint_after"] = final_checkpoint["checkpoint_id"]
-            
+            return {"production_files": stage_result["files"]}
+
+        async def run_checkpoint_after(inputs: Dict) -> Dict:
+            stage_result = await self._stage_create_checkpoint(f"Completed: {instruction}")
+            results["checkpoint_after"] = stage_result["checkpoint_id"]
+            return {"checkpoint_after": stage_result["checkpoint_id"]}
+
+        timeouts = self.STAGE_TIMEOUTS
+        stages = [
+            Stage("architecture_planning", run_architecture, outputs=("architecture",),
+                  timeout=timeouts.get("architecture_planning"),
+                  describe=lambda out: "Stage 2/11: Architecture planned"),
+            Stage("code_generation", run_code_generation, inputs=("architecture",), outputs=("generated_files",),
+                  timeout=timeouts.get("code_generation"), weight=4,
+                  describe=lambda out: f"Stage 3/11: Generated {len(out['generated_files'])} files"),
+            Stage("create_files", run_create_files, inputs=("generated_files",),
+                  outputs=("project_dir", "preview_url"),
+                  after=("checkpoint_before",) if enable_checkpoints else (),
+                  timeout=timeouts.get("create_files"),
+                  describe=lambda out: "Stage 4/11: Project structure created"),
+            Stage("deliver_preview", run_deliver_preview, inputs=("preview_url",), outputs=("preview_delivered",),
+                  after=("e2e_verification",) if should_run_e2e else (),
+                  describe=lambda out: f"👁️ Preview ready at {results['preview_url']}"
+                  if out["preview_delivered"] else ""),
+            Stage("install_dependencies", run_install_dependencies, inputs=("project_dir", "architecture"),
+                  outputs=("dependencies_installed",), optional=True,
+                  timeout=timeouts.get("install_dependencies"), weight=2,
+                  describe=lambda out: f"Stage 5/11: Installed {len(out['dependencies_installed'])} dependencies"),
+            Stage("security_scan", run_security_scan, inputs=("generated_files",),
+                  outputs=("security_issues",), optional=True, timeout=timeouts.get("security_scan"),
+                  describe=lambda out: f"Stage 8/11: Security scan complete ({len(out['security_issues'])} issues)"),
+            Stage("code_verification", run_code_verification, inputs=("generated_files",),
+                  outputs=("verification_score",), optional=True, timeout=timeouts.get("code_verification"),
+                  describe=lambda out: f"Stage 9/11: Code verified (score: {out['verification_score']}/100)"),
+            # Writes into the project, so it waits for the stages that test and serve it
+            Stage("production_outputs", run_production_outputs, inputs=("project_dir", "architecture"),
+                  outputs=("production_files",), optional=True, timeout=timeouts.get("production_outputs"),
+                  after=tuple(name for name, enabled in (("e2e_verification", should_run_e2e),
+                                                         ("automated_testing", enable_testing)) if enabled),
+                  describe=lambda out: "Stage 10/11: Production files created"),
+        ]
+        if enable_checkpoints:
+            stages.append(Stage("checkpoint_before", run_checkpoint_before, outputs=("checkpoint_before",),
+                                timeout=timeouts.get("checkpoint"),
+                                describe=lambda out: "Stage 1/11: Checkpoint created for safety"))
+        if should_run_e2e:
+            # Needs installed dependencies to serve the app, but runs even if installation failed
+            stages.append(Stage("e2e_verification", run_e2e_verification, inputs=("project_dir", "architecture"),
+                                outputs=("e2e_results",), after=("install_dependencies",),
+                                timeout=timeouts.get("e2e_verification"), weight=3,
+                                describe=lambda out: "Stage 6/11: E2E verified - {passed}/{total} features work "
+                                "({coverage:.0f}% coverage)".format(
+                                    passed=out["e2e_results"].get("passed", 0),
+                                    total=out["e2e_results"].get("total", 0),
+                                    coverage=out["e2e_results"].get("coverage_percent", 0)
+                                )))
+        if enable_testing:
+            stages.append(Stage("automated_testing", run_tests, inputs=("project_dir",), outputs=("tests_passed",),
+                                after=("install_dependencies",), optional=True,
+                                timeout=timeouts.get("automated_testing"),
+                                describe=lambda out: f"Stage 7/11: {out['tests_passed']} tests passed"))
+        if not enable_security_scan:
+            stages = [stage for stage in stages if stage.name != "security_scan"]
+        if enable_checkpoints:
+            stages.append(Stage("checkpoint_after", run_checkpoint_after, outputs=("checkpoint_after",),
+                                after=tuple(stage.name for stage in stages), timeout=timeouts.get("checkpoint")))
+
+        async def on_stage_event(event: Dict) -> None:
+            if not progress_callback:
+                return
+            if event["type"] == "stage_completed" and event["message"]:
+                await progress_callback(event["message"], min(event["progress"], 99))
+            elif event["type"] in ("stage_failed", "stage_timeout") and event["optional"]:
+                reason = "timed out" if event["type"] == "stage_timeout" else "failed"
+                await progress_callback(
+                    f"⚠️ Optional stage {event['stage']} {reason}; continuing without it", min(event["progress"], 99)
+                )
+
+        graph = StageGraph(stages, on_event=on_stage_event)
+        try:
+            await graph.run()
+
+            results["degraded_stages"] = [
+                name for name, outcome in graph.outcomes.items() if outcome.status in ("failed", "timeout")
+            ]
             results["build_time"] = round(time.time() - build_start, 2)
-            results["project_dir"] = project_dir
             results["message"] = f"✅ Enterprise build complete in {results['build_time']}s"
-            
+            if progress_callback:
+                await progress_callback(results["message"], 100)
+
         except Exception as e:
             results["success"] = False
             results["error"] = str(e)
             results["message"] = f"❌ Build failed: {str(e)}"
+            if results.pop("preview_url", None) and preview_callback:
+                # A later required stage failed; the delivered preview is no longer valid
+                await preview_callback(None)
             
             # Rollback to checkpoint if available
             if enable_checkpoints and results.get("checkpoint_before"):
@@ -332,9 +370,73 @@ class EnterpriseBuildSystem:
                     results["rollback"] = "Rolled back to pre-build checkpoint"
                 except:
                     pass
+        finally:
+            results["stages"] = [stage_results[stage.name] for stage in stages if stage.name in stage_results]
+            results["stage_timings"] = graph.timings()
         
         return results
     
+    def _apply_e2e_quality_gate(self, stage_result: Dict, results: Dict) -> None:
+        """Record E2E outcome on the build results; raise if the build must be blocked"""
+        critical_issues = stage_result.get("critical_issues", [])
+        passed = stage_result.get("passed", 0)
+        total = stage_result.get("total", 0)
+        coverage = stage_result.get("coverage_percent", 0)
+        error = stage_result.get("error")
+        
+        # Check if E2E runner itself failed (browser dependencies missing)
+        if error and "BrowserType.launch" in str(error):
+            # GRACEFUL SKIP: Browser dependencies not available
+            print(f"\n⚠️  E2E Testing Unavailable:")
+            print(f"   Browser dependencies not available in this environment")
+            print(f"   ℹ️  App will be delivered but may have untested features")
+            print(f"   💡 Static code analysis passed - app should work")
+            results["e2e_skipped"] = "Browser dependencies unavailable"
+            # Don't fail the build - just warn
+        
+        elif error:
+            # BLOCK BUILD: E2E runner failed for other reasons (timeout, crash, server startup, etc.)
+            print(f"\n❌ E2E RUNNER FAILED:")
+            print(f"   {error}")
+            print("\n🚫 BUILD BLOCKED: E2E testing failed to run properly!")
+            print("   Cannot verify app quality without successful E2E tests.")
+            
+            results["success"] = False
+            results["e2e_critical_issues"] = critical_issues if critical_issues else [f"E2E runner failed: {error}"]
+            results["failure_reason"] = f"E2E testing failed: {error}"
+            
+            # Stop build process - can't deliver untested app
+            raise Exception(f"E2E Quality Gate Failed: E2E runner error - {error}")
+        
+        # ENFORCE QUALITY GATE: Fail build if critical issues found in actual app testing
+        elif critical_issues:
+            # E2E ran successfully but found broken features
+            print(f"\n❌ E2E VERIFICATION FAILED - {len(critical_issues)} CRITICAL ISSUES:")
+            for issue in critical_issues:
+                print(f"   • {issue}")
+            print("\n🚫 BUILD BLOCKED: This app cannot be delivered with broken features!")
+            print("   SuperAgent's quality standards require all advertised features to work.")
+            
+            results["success"] = False
+            results["e2e_critical_issues"] = critical_issues
+            results["failure_reason"] = "E2E tests failed - critical features broken"
+            
+            # Stop build process - don't continue with broken app
+            raise Exception(f"E2E Quality Gate Failed: {len(critical_issues)} critical issues found. Build blocked.")
+        
+        # WARN if coverage is low (but don't fail)
+        elif coverage < 70 and coverage > 0:
+            print(f"\n⚠️  E2E Coverage Warning: Only {coverage:.0f}% of expected features verified")
+            print(f"   Passed: {passed}/{total} tests")
+            print("   This app may have incomplete functionality.")
+            results["e2e_warning"] = f"Low coverage: {coverage:.0f}%"
+        elif passed > 0:
+            print(f"\n✅ E2E VERIFICATION PASSED:")
+            print(f"   ✓ {passed}/{total} features verified ({coverage:.0f}% coverage)")
+            print(f"   ✓ No critical issues found")
+            print(f"   ✓ App is ready for delivery")
+    
+    @tracer.traced("checkpoint", kind="stage")
     async def _stage_create_checkpoint(self, description: str) -> Dict:
         """Stage 1 & 9: Create safety checkpoint"""
         try:
@@ -353,6 +455,7 @@ class EnterpriseBuildSystem:
                 "error": str(e)
             }
     
+    @tracer.traced("architecture_planning", kind="stage")
     async def _stage_architecture_planning(self, instruction: str, language: str, multi_file: bool) -> Dict:
         """Stage 2: Plan architecture and file structure"""
         try:
@@ -463,19 +566,32 @@ class EnterpriseBuildSystem:
         from api.rate_limit_failover import get_rate_limit_tracker
         
         try:
-            if provider == "groq":
-                # GROQ uses OpenAI-compatible API
-                response = model.chat.completions.create(
-                    model="llama-3.3-70b-versatile",  # Best GROQ model
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.7,
-                    max_tokens=8000
-                )
-                return response.choices[0].message.content
-            else:
-                # Gemini
-                response = model.generate_content(prompt)
-                return response.text
+            with tracer.span("llm.generate", kind="llm", **{
+                "llm.provider": provider,
+                "llm.prompt_chars": len(prompt),
+            }) as span:
+                if provider == "groq":
+                    # GROQ uses OpenAI-compatible API
+                    span.set_attribute("llm.model", "llama-3.3-70b-versatile")
+                    response = model.chat.completions.create(
+                        model="llama-3.3-70b-versatile",  # Best GROQ model
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=0.7,
+                        max_tokens=8000
+                    )
+                    usage = getattr(response, "usage", None)
+                    if usage:
+                        tracer.record_llm_usage(span, usage.prompt_tokens, usage.completion_tokens, cache_hit=False)
+                    return response.choices[0].message.content
+                else:
+                    # Gemini
+                    response = model.generate_content(prompt)
+                    usage = getattr(response, "usage_metadata", None)
+                    if usage:
+                        tracer.record_llm_usage(
+                            span, usage.prompt_token_count, usage.candidates_token_count, cache_hit=False
+                        )
+                    return response.text
         
         except Exception as e:
             error_str = str(e)
@@ -536,6 +652,7 @@ class EnterpriseBuildSystem:
                 # Not a rate limit error, or already retried
                 raise
     
+    @tracer.traced("code_generation", kind="stage")
     async def _stage_code_generation(self, instruction: str, language: str, architecture: Dict) -> Dict:
         """Stage 3: Generate code for all files"""
         try:
@@ -1201,6 +1318,7 @@ Generate ONLY the code (no explanations). Make it {"EXCEPTIONAL" if wants_advanc
                 "files": []
             }
     
+    @tracer.traced("create_files", kind="stage")
     async def _stage_create_files(self, files: List[Dict], instruction: str) -> Dict:
         """Stage 4: Create project directory and write files"""
         try:
@@ -1227,6 +1345,9 @@ Generate ONLY the code (no explanations). Make it {"EXCEPTIONAL" if wants_advanc
                 filepath.write_text(file_info["code"])
                 created_files.append(str(filepath))
             
+            # Previews of this directory must not serve stale bytes
+            preview_cache.invalidate_prefix(project_dir)
+            
             # Generate preview URL for web apps
             preview_url = None
             if html_files:
@@ -1251,10 +1372,12 @@ Generate ONLY the code (no explanations). Make it {"EXCEPTIONAL" if wants_advanc
                 "preview_url": None
             }
     
+    @tracer.traced("install_dependencies", kind="stage")
     async def _stage_install_dependencies(self, project_dir: str, language: str, architecture: Dict) -> Dict:
         """Stage 5: Install real dependencies"""
         try:
             installed = []
+            cache_result = {}
             
             if language.lower() == "python":
                 # Create requirements.txt if needed
@@ -1265,14 +1388,9 @@ Generate ONLY the code (no explanations). Make it {"EXCEPTIONAL" if wants_advanc
                     if deps:
                         requirements_file.write_text("\n".join(deps))
                 
-                # Install with pip
+                # Install from the dependency layer cache (built once per lockfile hash)
                 if requirements_file.exists():
-                    result = await asyncio.create_subprocess_exec(
-                        "pip", "install", "-r", str(requirements_file),
-                        stdout=asyncio.subprocess.PIPE,
-                        stderr=asyncio.subprocess.PIPE
-                    )
-                    await result.wait()
+                    cache_result = await self.dependency_cache.install_python(project_dir)
                     installed = [line.strip() for line in requirements_file.read_text().split("\n") if line.strip()]
             
             elif language.lower() in ["javascript", "typescript", "node"]:
@@ -1287,22 +1405,19 @@ Generate ONLY the code (no explanations). Make it {"EXCEPTIONAL" if wants_advanc
                     }
                     package_file.write_text(json.dumps(package_data, indent=2))
                 
-                # Install with npm
+                # Install from the dependency layer cache (built once per lockfile hash)
                 if package_file.exists():
-                    result = await asyncio.create_subprocess_exec(
-                        "npm", "install",
-                        cwd=project_dir,
-                        stdout=asyncio.subprocess.PIPE,
-                        stderr=asyncio.subprocess.PIPE
-                    )
-                    await result.wait()
+                    cache_result = await self.dependency_cache.install_node(project_dir)
                     installed = list(json.loads(package_file.read_text()).get("dependencies", {}).keys())
             
             return {
                 "stage": "install_dependencies",
                 "success": True,
                 "installed": installed,
-                "count": len(installed)
+                "count": len(installed),
+                "cache_hit": cache_result.get("cache_hit", False),
+                "cache_key": cache_result.get("key"),
+                "build_time": cache_result.get("build_time", 0.0)
             }
         except Exception as e:
             return {
@@ -1312,6 +1427,7 @@ Generate ONLY the code (no explanations). Make it {"EXCEPTIONAL" if wants_advanc
                 "installed": []
             }
     
+    @tracer.traced("automated_testing", kind="stage")
     async def _stage_run_tests(self, project_dir: str, language: str) -> Dict:
         """Stage 6: Run automated tests"""
         try:
@@ -1319,14 +1435,21 @@ Generate ONLY the code (no explanations). Make it {"EXCEPTIONAL" if wants_advanc
             tests_failed = 0
             
             if language.lower() == "python":
-                # Try to run pytest
-                result = await asyncio.create_subprocess_exec(
-                    "python", "-m", "pytest", "--tb=short",
-                    cwd=project_dir,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                stdout, stderr = await result.communicate()
+                # Try to run pytest (with cached dependencies on the path)
+                env = os.environ.copy()
+                pydeps = Path(project_dir) / self.dependency_cache.PYTHON_LINK_NAME
+                if pydeps.exists():
+                    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(pydeps), env.get("PYTHONPATH")]))
+                with tracer.span("pytest", kind="subprocess", command="python -m pytest") as span:
+                    result = await asyncio.create_subprocess_exec(
+                        "python", "-m", "pytest", "--tb=short",
+                        cwd=project_dir,
+                        env=env,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.PIPE
+                    )
+                    stdout, stderr = await result.communicate()
+                    span.set_attribute("exit_code", result.returncode)
                 
                 # Parse pytest output
                 output = stdout.decode()
@@ -1350,6 +1473,7 @@ Generate ONLY the code (no explanations). Make it {"EXCEPTIONAL" if wants_advanc
                 "tests_passed": 0
             }
     
+    @tracer.traced("security_scan", kind="stage")
     async def _stage_security_scan(self, files: List[Dict]) -> Dict:
         """Stage 7: Security scanning with cybersecurity AI"""
         try:
@@ -1378,6 +1502,7 @@ Generate ONLY the code (no explanations). Make it {"EXCEPTIONAL" if wants_advanc
                 "issues": []
             }
     
+    @tracer.traced("e2e_verification", kind="stage")
     async def _stage_e2e_verification(
         self, 
         project_dir: Path,
@@ -1531,6 +1656,7 @@ Generate ONLY the code (no explanations). Make it {"EXCEPTIONAL" if wants_advanc
                 "error": str(e)
             }
     
+    @tracer.traced("code_verification", kind="stage")
     async def _stage_code_verification(self, files: List[Dict], instruction: str) -> Dict:
         """Stage 8: Multi-layer code verification"""
         try:
@@ -1562,6 +1688,7 @@ Generate ONLY the code (no explanations). Make it {"EXCEPTIONAL" if wants_advanc
                 "score": 0
             }
     
+    @tracer.traced("production_outputs", kind="stage")
     async def _stage_production_outputs(self, project_dir: str, language: str, architecture: Dict) -> Dict:
         """Stage 9: Generate production files (Dockerfile, CI/CD, docs)"""
         try:
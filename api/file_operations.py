@@ -4,9 +4,12 @@ File Operations Module - Complete file system management
 import os
 from pathlib import Path
 from typing import List, Dict, Optional
-import subprocess
 import shutil
 
+from api.code_index import get_code_index
+from api.file_tree import get_file_tree
+from api.preview_cache import preview_cache
+
 class FileOperations:
     """Handles all file system operations"""
     
@@ -14,56 +17,36 @@ class FileOperations:
         self.base_dir = Path.cwd()
         self.excluded_dirs = {'.git', '__pycache__', 'node_modules', '.venv', 'venv', '.replit'}
     
-    def list_files(self, directory: str = ".", recursive: bool = True, max_depth: int = 5) -> Dict:
-        """List all files in directory"""
+    def list_files(self, directory: str = ".", recursive: bool = True, max_depth: int = 5,
+                   cursor: Optional[str] = None, limit: int = 500) -> Dict:
+        """List files in directory (served from the cached file tree)"""
         try:
-            target_dir = self.base_dir / directory
-            if not target_dir.exists():
-                return {"success": False, "error": "Directory not found"}
-            
-            files = []
-            dirs = []
-            
-            if recursive:
-                for item in target_dir.rglob("*"):
-                    if any(excluded in item.parts for excluded in self.excluded_dirs):
-                        continue
-                    
-                    relative_path = str(item.relative_to(self.base_dir))
-                    if item.is_file():
-                        files.append({
-                            "path": relative_path,
-                            "name": item.name,
-                            "size": item.stat().st_size,
-                            "type": item.suffix or "file"
-                        })
-                    elif item.is_dir():
-                        dirs.append(relative_path)
-            else:
-                for item in target_dir.iterdir():
-                    if item.name in self.excluded_dirs:
-                        continue
-                    
-                    relative_path = str(item.relative_to(self.base_dir))
-                    if item.is_file():
-                        files.append({
-                            "path": relative_path,
-                            "name": item.name,
-                            "size": item.stat().st_size,
-                            "type": item.suffix or "file"
-                        })
-                    elif item.is_dir():
-                        dirs.append(relative_path)
-            
-            return {
-                "success": True,
-                "files": files[:500],
-                "directories": dirs[:100],
-                "total_files": len(files),
-                "total_dirs": len(dirs)
-            }
+            page = get_file_tree(self.base_dir).list(
+                directory,
+                max_depth=max_depth if recursive else 1,
+                cursor=cursor,
+                limit=limit
+            )
+        except FileNotFoundError:
+            return {"success": False, "error": "Directory not found"}
         except Exception as e:
             return {"success": False, "error": str(e)}
+        
+        files = [
+            {"path": entry["path"], "name": entry["name"], "size": entry["size"], "type": entry["type"]}
+            for entry in page["entries"] if not entry["is_dir"]
+        ]
+        dirs = [entry["path"] for entry in page["entries"] if entry["is_dir"]]
+        
+        return {
+            "success": True,
+            "files": files,
+            "directories": dirs,
+            "total_files": len(files),
+            "total_dirs": len(dirs),
+            "next_cursor": page["next_cursor"],
+            "version": page["version"]
+        }
     
     def read_file(self, file_path: str) -> Dict:
         """Read file content"""
@@ -101,6 +84,10 @@ class FileOperations:
             with open(target_file, 'w', encoding='utf-8') as f:
                 f.write(content)
             
+            get_code_index(self.base_dir).update_file(target_file)
+            get_file_tree(self.base_dir).refresh_path(target_file)
+            preview_cache.invalidate(target_file)
+            
             return {
                 "success": True,
                 "message": f"File written: {file_path}",
@@ -119,47 +106,32 @@ class FileOperations:
             
             if target_file.is_file():
                 target_file.unlink()
+                get_code_index(self.base_dir).remove_file(target_file)
+                get_file_tree(self.base_dir).refresh_path(target_file)
+                preview_cache.invalidate(target_file)
                 return {"success": True, "message": f"File deleted: {file_path}"}
             else:
                 return {"success": False, "error": "Path is not a file"}
         except Exception as e:
             return {"success": False, "error": str(e)}
     
-    def search_in_files(self, pattern: str, file_extension: Optional[str] = None) -> Dict:
-        """Search for pattern in files using grep"""
+    def search_in_files(self, pattern: str, file_extension: Optional[str] = None,
+                        offset: int = 0, limit: int = 100) -> Dict:
+        """Search for pattern in files (case-insensitive, trigram indexed)"""
         try:
-            cmd = ['grep', '-r', '-n', '-i', pattern, '.']
-            
-            if file_extension:
-                cmd.extend(['--include', f'*.{file_extension}'])
-            
-            result = subprocess.run(
-                cmd,
-                cwd=self.base_dir,
-                capture_output=True,
-                text=True,
-                timeout=10
+            result = get_code_index(self.base_dir).search(
+                pattern,
+                extensions=[file_extension] if file_extension else None,
+                ignore_case=True,
+                offset=offset,
+                limit=limit
             )
             
-            matches = []
-            for line in result.stdout.split('\n')[:100]:
-                if line.strip():
-                    parts = line.split(':', 2)
-                    if len(parts) >= 3:
-                        matches.append({
-                            "file": parts[0],
-                            "line": parts[1],
-                            "content": parts[2]
-                        })
-            
             return {
                 "success": True,
                 "pattern": pattern,
-                "matches": matches,
-                "total": len(matches)
+                **result
             }
-        except subprocess.TimeoutExpired:
-            return {"success": False, "error": "Search timeout"}
         except Exception as e:
             return {"success": False, "error": str(e)}
     
@@ -168,6 +140,7 @@ class FileOperations:
         try:
             target_dir = self.base_dir / dir_path
             target_dir.mkdir(parents=True, exist_ok=True)
+            get_file_tree(self.base_dir).refresh_path(target_dir)
             return {"success": True, "message": f"Directory created: {dir_path}"}
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -181,6 +154,8 @@ class FileOperations:
             
             if target_dir.is_dir():
                 shutil.rmtree(target_dir)
+                get_file_tree(self.base_dir).refresh_path(target_dir)
+                preview_cache.invalidate_prefix(target_dir)
                 return {"success": True, "message": f"Directory deleted: {dir_path}"}
             else:
                 return {"success": False, "error": "Path is not a directory"}
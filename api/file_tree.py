@@ -0,0 +1,338 @@
+"""
+File Tree Service
+In-memory workspace tree with paginated listings and change notifications
+
+The tree is built with one walk that prunes excluded directories before
+descending into them. After that it is kept current by a watcher:
+watchfiles (inotify/FSEvents) when installed, or an mtime polling loop
+otherwise. Without a running watcher, listings re-sync at most once per
+poll interval. Listings are served from a sorted in-memory index, limited
+by depth and paginated with a cursor (the last path returned).
+
+Every change bumps the tree version and is recorded as a delta
+({"op": "added" | "modified" | "removed", "path", ...}). Clients either
+subscribe to the stream of deltas or ask for everything since the version
+they last saw, instead of listing the whole tree again.
+"""
+import asyncio
+import bisect
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXCLUDED_DIRS = {'.git', '__pycache__', 'node_modules', '.venv', 'venv', '.replit'}
+
+Key = Tuple[str, ...]
+
+
+@dataclass
+class _Entry:
+    is_dir: bool
+    size: int
+    mtime_ns: int
+
+
+class FileTreeService:
+    """Cached, watched view of a workspace directory tree"""
+    
+    def __init__(self, root: Path, excluded_dirs: Optional[Iterable[str]] = None,
+                 poll_interval: float = 1.0, history: int = 1000, queue_size: int = 256):
+        self.root = Path(root).resolve()
+        self.excluded_dirs = set(excluded_dirs or DEFAULT_EXCLUDED_DIRS)
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.version = 0
+        self._entries: Dict[Key, _Entry] = {}
+        self._keys: List[Key] = []
+        self._history: Deque[Tuple[int, Dict[str, Any]]] = deque(maxlen=history)
+        self._subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self._lock = threading.RLock()
+        # One full walk at a time (the watcher's and a listing's first sync)
+        self._sync_lock = threading.Lock()
+        self._synced = 0.0
+        self._watcher: Optional[asyncio.Task] = None
+        self.stats = {"scans": 0, "listings": 0, "deltas": 0, "watcher": None}
+    
+    # ---- scanning ----
+    
+    def _walk(self, start: Path) -> Dict[Key, _Entry]:
+        found = {}
+        stack = [start]
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name in self.excluded_dirs:
+                    continue
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    stat = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                key = Path(entry.path).relative_to(self.root).parts
+                found[key] = _Entry(is_dir, 0 if is_dir else stat.st_size, stat.st_mtime_ns)
+                if is_dir:
+                    stack.append(Path(entry.path))
+        return found
+    
+    def _apply(self, current: Dict[Key, _Entry], prefix: Key = ()) -> List[Dict[str, Any]]:
+        """Replace the entries below ``prefix`` with ``current`` and record the deltas"""
+        deltas = []
+        with self._lock:
+            start = bisect.bisect_left(self._keys, prefix)
+            stop = start
+            while stop < len(self._keys) and self._keys[stop][:len(prefix)] == prefix:
+                stop += 1
+            for key in self._keys[start:stop]:
+                if key not in current:
+                    entry = self._entries.pop(key)
+                    deltas.append(self._delta("removed", key, entry))
+            self._keys[start:stop] = [key for key in self._keys[start:stop] if key in self._entries]
+            
+            for key in sorted(current):
+                entry = current[key]
+                previous = self._entries.get(key)
+                if previous is None:
+                    bisect.insort(self._keys, key)
+                    deltas.append(self._delta("added", key, entry))
+                elif not entry.is_dir and (previous.size, previous.mtime_ns) != (entry.size, entry.mtime_ns):
+                    deltas.append(self._delta("modified", key, entry))
+                elif previous.is_dir != entry.is_dir:
+                    deltas.append(self._delta("modified", key, entry))
+                self._entries[key] = entry
+            self._publish(deltas)
+        return deltas
+    
+    def sync(self) -> List[Dict[str, Any]]:
+        """Walk the whole tree and apply the differences"""
+        with self._sync_lock:
+            current = self._walk(self.root)
+            self.stats["scans"] += 1
+            if not self._synced:
+                # The initial build is the baseline, not a change
+                with self._lock:
+                    self._entries = current
+                    self._keys = sorted(current)
+                self._synced = time.monotonic()
+                return []
+            self._synced = time.monotonic()
+            return self._apply(current)
+    
+    def refresh_path(self, path) -> List[Dict[str, Any]]:
+        """Re-read one path (and its subtree); used for watcher events and local writes"""
+        if not self._synced:
+            # Not built yet; the first sync will pick the path up
+            return []
+        try:
+            key = (self.root / path).resolve().relative_to(self.root).parts
+        except ValueError:
+            return []
+        if not key or any(part in self.excluded_dirs for part in key):
+            return []
+        target = self.root.joinpath(*key)
+        current = {}
+        try:
+            stat = target.lstat()
+        except OSError:
+            pass
+        else:
+            is_dir = target.is_dir() and not target.is_symlink()
+            current[key] = _Entry(is_dir, 0 if is_dir else stat.st_size, stat.st_mtime_ns)
+            if is_dir:
+                current.update(self._walk(target))
+        
+        deltas = []
+        # New parent directories (e.g. written with create_dirs=True)
+        for depth in range(1, len(key)):
+            parent = key[:depth]
+            if current and parent not in self._entries:
+                deltas.extend(self.refresh_path(self.root.joinpath(*parent)))
+                return deltas
+        return self._apply(current, key)
+    
+    def _ensure_fresh(self):
+        """Build the tree if needed; without a watcher, re-sync at most once per poll interval"""
+        if not self._synced:
+            # A just-started watcher has not built the tree yet
+            self.sync()
+            return
+        if self._watcher is not None and not self._watcher.done():
+            return
+        if time.monotonic() - self._synced >= self.poll_interval:
+            self.sync()
+    
+    # ---- listings ----
+    
+    def list(self, directory: str = ".", max_depth: Optional[int] = None,
+             cursor: Optional[str] = None, limit: int = 500) -> Dict[str, Any]:
+        """One page of the entries below ``directory``, in path order.
+        
+        ``max_depth`` counts levels below ``directory`` (1 = direct children).
+        Pass the returned ``next_cursor`` to get the following page.
+        """
+        self._ensure_fresh()
+        self.stats["listings"] += 1
+        try:
+            prefix = (self.root / directory).resolve().relative_to(self.root).parts
+        except ValueError:
+            raise FileNotFoundError(directory)
+        
+        with self._lock:
+            if prefix and (prefix not in self._entries or not self._entries[prefix].is_dir):
+                raise FileNotFoundError(directory)
+            keys = self._keys
+            position = bisect.bisect_right(keys, prefix)
+            if cursor:
+                position = max(position, bisect.bisect_right(keys, tuple(cursor.split("/"))))
+            
+            items = []
+            while position < len(keys) and keys[position][:len(prefix)] == prefix:
+                key = keys[position]
+                if max_depth is not None and len(key) - len(prefix) > max_depth:
+                    # Skip the whole subtree below the depth limit at once
+                    position = bisect.bisect_left(keys, key[:len(prefix) + max_depth] + ("\U0010ffff",))
+                    continue
+                if len(items) == limit:
+                    break
+                entry = self._entries[key]
+                items.append({
+                    "path": "/".join(key),
+                    "name": key[-1],
+                    "is_dir": entry.is_dir,
+                    "size": entry.size,
+                    "type": "directory" if entry.is_dir else (Path(key[-1]).suffix or "file")
+                })
+                position += 1
+            has_more = position < len(keys) and keys[position][:len(prefix)] == prefix
+        
+        return {
+            "entries": items,
+            "next_cursor": items[-1]["path"] if has_more and items else None,
+            "version": self.version
+        }
+    
+    # ---- change notifications ----
+    
+    def _delta(self, op: str, key: Key, entry: _Entry) -> Dict[str, Any]:
+        self.version += 1
+        delta = {"version": self.version, "op": op, "path": "/".join(key), "is_dir": entry.is_dir}
+        if op != "removed" and not entry.is_dir:
+            delta["size"] = entry.size
+        self._history.append((self.version, delta))
+        self.stats["deltas"] += 1
+        return delta
+    
+    def changes_since(self, version: int) -> Dict[str, Any]:
+        """Deltas after ``version``; ``reset`` means history was trimmed and the client must re-list"""
+        with self._lock:
+            if self._history and version < self._history[0][0] - 1:
+                return {"reset": True, "version": self.version, "changes": []}
+            changes = [delta for v, delta in self._history if v > version]
+        return {"reset": False, "version": self.version, "changes": changes}
+    
+    def _publish(self, deltas: List[Dict[str, Any]]):
+        if not deltas:
+            return
+        for loop, queue in list(self._subscribers):
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, deltas)
+            except RuntimeError:
+                # Subscriber's loop has closed
+                self._subscribers.remove((loop, queue))
+    
+    def _deliver(self, queue: asyncio.Queue, deltas: List[Dict[str, Any]]):
+        try:
+            queue.put_nowait({"type": "changes", "version": self.version, "changes": deltas})
+        except asyncio.QueueFull:
+            # Slow client: drop its backlog and tell it to re-list
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({"type": "reset", "version": self.version})
+    
+    def subscribe(self) -> asyncio.Queue:
+        """Queue receiving change batches; starts the watcher if needed"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.append((asyncio.get_running_loop(), queue))
+        self.start()
+        return queue
+    
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers = [(loop, q) for loop, q in self._subscribers if q is not queue]
+    
+    # ---- watching ----
+    
+    def start(self) -> None:
+        """Start watching the tree (no-op if already running)"""
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.ensure_future(self._watch())
+    
+    async def stop(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+    
+    async def _watch(self):
+        await asyncio.to_thread(self.sync)
+        try:
+            from watchfiles import awatch
+        except ImportError:
+            awatch = None
+        
+        if awatch is not None:
+            self.stats["watcher"] = "watchfiles"
+            try:
+                async for changes in awatch(self.root, watch_filter=self._watch_filter):
+                    for _, path in changes:
+                        await asyncio.to_thread(self.refresh_path, path)
+                return
+            except Exception as e:
+                logger.warning(f"File watcher failed, falling back to polling: {e}")
+        
+        self.stats["watcher"] = "polling"
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            await asyncio.to_thread(self.sync)
+    
+    def _watch_filter(self, change, path: str) -> bool:
+        try:
+            parts = Path(path).relative_to(self.root).parts
+        except ValueError:
+            return False
+        return not any(part in self.excluded_dirs for part in parts)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Tree size and activity counters"""
+        return {
+            **self.stats,
+            "root": str(self.root),
+            "entries": len(self._entries),
+            "version": self.version,
+            "subscribers": len(self._subscribers),
+        }
+
+
+_trees: Dict[Path, FileTreeService] = {}
+_trees_lock = threading.Lock()
+
+
+def get_file_tree(root: Path) -> FileTreeService:
+    """Shared tree service for a workspace root"""
+    root = Path(root).resolve()
+    with _trees_lock:
+        if root not in _trees:
+            _trees[root] = FileTreeService(root)
+        return _trees[root]
@@ -0,0 +1,165 @@
+"""
+Hot Reload Channel
+Turns successive versions of a preview into the smallest safe update:
+CSS-only edits are injected without a reload, markup edits on script-free
+pages patch the DOM, and anything else falls back to a full reload.
+Bursts of updates are debounced into one message and each preview keeps
+a bounded version history.
+"""
+
+import asyncio
+import os
+import re
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+STYLE_RE = re.compile(r"(<style\b[^>]*>)(.*?)(</style\s*>)", re.IGNORECASE | re.DOTALL)
+SCRIPT_RE = re.compile(r"<script\b", re.IGNORECASE)
+INLINE_HANDLER_RE = re.compile(r"\son[a-z]+\s*=", re.IGNORECASE)
+BODY_RE = re.compile(r"(<body\b[^>]*>)(.*)(</body\s*>)", re.IGNORECASE | re.DOTALL)
+STYLE_PLACEHOLDER = "\0style\0"
+
+
+def _split_styles(html: str):
+    """Return (markup with style contents blanked, list of style contents)"""
+    styles: List[str] = []
+
+    def blank(match):
+        styles.append(match.group(2))
+        return match.group(1) + STYLE_PLACEHOLDER + match.group(3)
+
+    return STYLE_RE.sub(blank, html), styles
+
+
+def compute_update(old: str, new: str) -> Dict[str, Any]:
+    """
+    Smallest update that brings a page showing ``old`` to ``new``.
+
+    Returns one of:
+        {"type": "none"}
+        {"type": "css", "patches": [{"index": i, "css": "..."}]}
+        {"type": "dom", "html": "<new body inner HTML>"}
+        {"type": "reload"}
+    """
+    if old == new:
+        return {"type": "none"}
+
+    old_markup, old_styles = _split_styles(old)
+    new_markup, new_styles = _split_styles(new)
+
+    # Only the contents of existing <style> blocks changed
+    if old_markup == new_markup and len(old_styles) == len(new_styles):
+        return {
+            "type": "css",
+            "patches": [
+                {"index": i, "css": css}
+                for i, (before, css) in enumerate(zip(old_styles, new_styles)) if before != css
+            ],
+        }
+
+    # Markup changed inside <body> only. Replacing body content is only safe
+    # when no script could hold references to the old nodes.
+    old_body, new_body = BODY_RE.search(old_markup), BODY_RE.search(new_markup)
+    if (
+        old_body and new_body
+        and old_markup[:old_body.start(2)] == new_markup[:new_body.start(2)]
+        and old_markup[old_body.end(2):] == new_markup[new_body.end(2):]
+        and old_styles == new_styles
+        and not SCRIPT_RE.search(new) and not SCRIPT_RE.search(old)
+        and not INLINE_HANDLER_RE.search(new_body.group(2))
+    ):
+        return {"type": "dom", "html": BODY_RE.search(new).group(2)}
+
+    return {"type": "reload"}
+
+
+class PreviewChannel:
+    """Version history and pending update for one preview"""
+
+    def __init__(self, code: str, history_limit: int):
+        self.version = 1
+        self.sent_code = code      # what connected clients are showing
+        self.pending_code: Optional[str] = None
+        self.flush_task: Optional[asyncio.Task] = None
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=history_limit)
+        self.history.append({"version": 1, "code": code, "at": time.time()})
+
+
+class HotReloadManager:
+    """Debounces preview updates and broadcasts minimal diffs"""
+
+    def __init__(self, broadcast: Callable[[str, Dict[str, Any]], Awaitable[None]],
+                 debounce: Optional[float] = None, history_limit: Optional[int] = None):
+        """
+        Args:
+            broadcast: ``await broadcast(preview_id, message)`` sends to all clients
+            debounce: Seconds to wait for more updates before sending
+            history_limit: Versions kept per preview
+        """
+        self.broadcast = broadcast
+        self.debounce = debounce if debounce is not None else float(os.getenv("HOT_RELOAD_DEBOUNCE", "0.15"))
+        self.history_limit = history_limit or int(os.getenv("HOT_RELOAD_HISTORY", "20"))
+        self.channels: Dict[str, PreviewChannel] = {}
+
+    def open(self, preview_id: str, code: str) -> None:
+        """Start tracking a preview at its initial version"""
+        self.close(preview_id)
+        self.channels[preview_id] = PreviewChannel(code, self.history_limit)
+
+    def close(self, preview_id: str) -> None:
+        """Stop tracking a preview, dropping any pending update"""
+        channel = self.channels.pop(preview_id, None)
+        if channel and channel.flush_task:
+            channel.flush_task.cancel()
+
+    def submit(self, preview_id: str, code: str) -> int:
+        """
+        Record a new version; clients are updated once updates stop
+        arriving for ``debounce`` seconds.
+
+        Returns:
+            The new version number
+        """
+        channel = self.channels.get(preview_id)
+        if channel is None:
+            self.open(preview_id, code)
+            return 1
+
+        channel.version += 1
+        channel.history.append({"version": channel.version, "code": code, "at": time.time()})
+        channel.pending_code = code
+        if channel.flush_task:
+            channel.flush_task.cancel()
+        channel.flush_task = asyncio.create_task(self._flush_later(preview_id, channel))
+        return channel.version
+
+    def versions(self, preview_id: str) -> List[Dict[str, Any]]:
+        """Version metadata (without code), oldest first"""
+        channel = self.channels.get(preview_id)
+        if channel is None:
+            return []
+        return [
+            {"version": entry["version"], "at": entry["at"], "size": len(entry["code"])}
+            for entry in channel.history
+        ]
+
+    async def flush(self, preview_id: str) -> Optional[Dict[str, Any]]:
+        """Send the pending update now; returns the message sent, if any"""
+        channel = self.channels.get(preview_id)
+        if channel is None or channel.pending_code is None:
+            return None
+        code, channel.pending_code = channel.pending_code, None
+        message = compute_update(channel.sent_code, code)
+        channel.sent_code = code
+        if message["type"] == "none":
+            return message
+        message.update(preview_id=preview_id, version=channel.version)
+        await self.broadcast(preview_id, message)
+        return message
+
+    async def _flush_later(self, preview_id: str, channel: PreviewChannel) -> None:
+        await asyncio.sleep(self.debounce)
+        if self.channels.get(preview_id) is channel:
+            channel.flush_task = None
+            await self.flush(preview_id)
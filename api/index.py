@@ -6,7 +6,7 @@ import os
 from pathlib import Path
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, File, UploadFile, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import Optional, List, Any, Dict
@@ -44,6 +44,8 @@ from api.app_builder import app_builder
 
 # Import new Replit Agent capabilities
 from api.file_operations import FileOperations
+from api.file_tree import get_file_tree
+from api.sse_streaming import sse_event
 from api.command_executor import CommandExecutor
 from api.web_search import WebSearch
 from api.codebase_search import CodebaseSearch
@@ -77,6 +79,7 @@ from api.structured_logging import logger
 # Import 6 NEW advanced features
 from api.voice_interface import voice_interface
 from api.docker_sandbox import docker_sandbox
+from api.sandbox_pool import sandbox_pool
 from api.redis_cache import redis_cache
 from api.code_review_system import code_review_system
 from api.codebase_query_engine import codebase_query_engine
@@ -98,6 +101,12 @@ from api.cybersecurity_ai import cybersecurity_agent
 
 # Import Health Check
 from api.health_check import health_check
+from api.server_profiler import ProfilerMiddleware, server_profiler
+from api.metrics import MetricsMiddleware
+from api.browser_pool import browser_pool
+from api.admission_control import AdmissionMiddleware, admission_controller
+from superagent.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, get_metrics_registry
+from superagent.core.single_flight import SingleFlight, flight_key
 
 # Import Advanced Agent System (NEW - Enhanced SuperAgent capabilities)
 from api.advanced_agent import router as advanced_agent_router
@@ -127,7 +136,7 @@ from api.final_995_endpoint import router as final_995_router
 from api.zero_setup_wizard import router as zero_setup_router
 
 # Import competitive advantage features
-from api.live_preview import router as live_preview_router
+from api.live_preview import router as live_preview_router, active_previews, preview_connections
 from api.ide_integration import router as ide_integration_router
 from api.component_library import router as component_library_router
 from api.developer_workflow import router as developer_workflow_router
@@ -143,7 +152,7 @@ from api.video_processor import router as video_processor_router
 # Import Replit Agent 3 competitive features
 from api.browser_testing import router as browser_testing_router
 from api.agent_builder import router as agent_builder_router
-from api.realtime_build import router as realtime_build_router
+from api.realtime_build import router as realtime_build_router, build_progress_store
 from api.streaming_build import router as streaming_build_router
 from api.streaming_realtime_build import router as streaming_realtime_build_router
 from api.plan_analyzer import router as plan_analyzer_router
@@ -151,9 +160,10 @@ from api.file_upload import router as file_upload_router
 from api.chat_stream import router as chat_stream_router
 from api.upload_endpoints import upload_router
 from api.autonomous_build_endpoints import autonomous_build_router
-from api.live_dashboard import live_dashboard_router
+from api.live_dashboard import live_dashboard_router, dashboard_manager
 from api.grok_endpoints import grok_copilot_router
 from api.deploy_share_endpoints import deploy_share_router
+from api.tracing_endpoints import tracing_router
 
 # Initialize Tier 1 feature modules
 hallucination_fixer = HallucinationFixer()
@@ -241,6 +251,10 @@ else:
     # Secure default: only allow localhost for development
     allowed_origins = ["http://localhost:3000", "http://localhost:5000", "http://127.0.0.1:5000"]
     
+# Adaptive concurrency limits for builds, execution and chat; added before
+# CORS so that 503 responses still carry CORS headers
+app.add_middleware(AdmissionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
@@ -249,6 +263,37 @@ app.add_middleware(
     allow_headers=["Content-Type", "X-API-Key"],
 )
 
+# Endpoint attribution for the opt-in server profiler (SERVER_PROFILER_ENABLED=1)
+app.add_middleware(ProfilerMiddleware)
+if server_profiler.enabled:
+    server_profiler.start()
+
+# Request latency, in-flight and WebSocket metrics, scraped at /metrics
+app.add_middleware(MetricsMiddleware)
+
+@app.on_event("shutdown")
+async def close_browser_pool():
+    """Close the shared E2E browser with the server"""
+    await browser_pool.close()
+
+def _active_builds():
+    return {
+        ("realtime",): sum(1 for build in list(build_progress_store.values())
+                           if build.get("status") not in ("complete", "error")),
+        ("dashboard",): sum(1 for session in list(dashboard_manager.build_sessions.values())
+                            if session.get("status") == "building"),
+    }
+
+_metrics = get_metrics_registry()
+_metrics.gauge("superagent_active_builds", "Builds in progress", ("source",), callback=_active_builds)
+_metrics.gauge("superagent_active_previews", "Running live previews", callback=lambda: len(active_previews))
+_metrics.gauge("superagent_preview_connections", "WebSocket clients watching previews",
+               callback=lambda: sum(len(sockets) for sockets in list(preview_connections.values())))
+_metrics.gauge("superagent_multiplayer_rooms", "Open collaboration rooms",
+               callback=lambda: len(multiplayer_manager.rooms))
+_metrics.gauge("superagent_multiplayer_connections", "Users connected to collaboration rooms",
+               callback=lambda: sum(len(room.connections) for room in list(multiplayer_manager.rooms.values())))
+
 # Mount static files for PWA
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -307,6 +352,7 @@ app.include_router(live_dashboard_router, tags=["V2.0 Live Dashboard - Replit x
 app.include_router(grok_copilot_router, tags=["V2.0 Grok Co-Pilot - Real-Time AI Assistance"])
 app.include_router(deploy_share_router, tags=["V2.0 Deploy & Share - One-Click Everything"])
 app.include_router(video_processor_router, tags=["Video to App - AI Video Analysis"])
+app.include_router(tracing_router, tags=["Observability - Build Tracing"])
 
 # API Key Security - REQUIRED for dangerous operations
 from fastapi.security import APIKeyHeader
@@ -371,6 +417,9 @@ class GenerateRequest(BaseModel):
 class FileListRequest(BaseModel):
     directory: str = "."
     recursive: bool = True
+    max_depth: int = 5
+    cursor: Optional[str] = None
+    limit: int = 500
 
 class FileReadRequest(BaseModel):
     file_path: str
@@ -385,6 +434,8 @@ class FileDeleteRequest(BaseModel):
 class FileSearchRequest(BaseModel):
     pattern: str
     file_extension: Optional[str] = None
+    offset: int = 0
+    limit: int = 100
 
 class CommandRequest(BaseModel):
     command: str
@@ -396,6 +447,8 @@ class WebSearchRequest(BaseModel):
 class CodeSearchRequest(BaseModel):
     pattern: str
     file_types: Optional[List[str]] = None
+    offset: int = 0
+    limit: int = 200
 
 class FunctionSearchRequest(BaseModel):
     function_name: str
@@ -550,6 +603,16 @@ def health():
     """Health check endpoint - shows system status and configuration"""
     return health_check.get_health_status()
 
+@app.get("/health/admission")
+def admission_status():
+    """Adaptive concurrency limits, in-flight requests and queue depths per endpoint class"""
+    return admission_controller.get_status()
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus metrics: request latency, event loop lag, builds, sockets, LLM calls and cache"""
+    return PlainTextResponse(get_metrics_registry().render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/")
 def root():
     try:
@@ -1057,6 +1120,9 @@ async def get_platform_instructions(req: PlatformDeployRequest):
             "error": str(e)
         }
 
+# Identical concurrent /generate requests share one Gemini call
+generate_flight = SingleFlight("api.generate")
+
 @app.post("/generate")
 @limiter.limit("100/minute")
 async def generate_code(request: Request, req: GenerateRequest):
@@ -1095,11 +1161,14 @@ async def generate_code(request: Request, req: GenerateRequest):
         
         prompt = f"You are an expert programmer. Generate clean, production-ready {req.language} code for: {req.instruction}\n\nProvide only the code, no explanations."
         
-        response = model.generate_content(prompt)
-        code = response.text
+        async def call_gemini() -> str:
+            # The SDK call blocks; keep it off the event loop
+            response = await asyncio.to_thread(model.generate_content, prompt)
+            # Cache the response
+            cache_instance.set(req.instruction, req.language, response.text)
+            return response.text
         
-        # Cache the response
-        cache_instance.set(req.instruction, req.language, code)
+        code = await generate_flight.do(flight_key(model="gemini-2.0-flash", prompt=prompt), call_gemini)
         
         # Multi-agent processing if enabled
         agent_insights = None
@@ -1855,8 +1924,33 @@ async def preview_app(app_name: str):
 
 @app.post("/files/list")
 async def list_files(req: FileListRequest):
-    """List files in directory"""
-    return file_ops.list_files(req.directory, req.recursive)
+    """List files in directory (cursor-paginated)"""
+    return await asyncio.to_thread(
+        file_ops.list_files, req.directory, req.recursive, req.max_depth, req.cursor, req.limit
+    )
+
+@app.get("/files/tree/changes")
+async def file_tree_changes(since: int = 0):
+    """File tree deltas after a version (reset=true means re-list)"""
+    tree = get_file_tree(file_ops.base_dir)
+    tree.start()
+    return tree.changes_since(since)
+
+@app.get("/files/tree/events")
+async def file_tree_events():
+    """Stream file tree deltas as server-sent events"""
+    tree = get_file_tree(file_ops.base_dir)
+    queue = tree.subscribe()
+    
+    async def generate():
+        try:
+            yield sse_event({"type": "hello", "version": tree.version})
+            while True:
+                yield sse_event(await queue.get())
+        finally:
+            tree.unsubscribe(queue)
+    
+    return StreamingResponse(generate(), media_type="text/event-stream")
 
 @app.post("/files/read")
 async def read_file(req: FileReadRequest):
@@ -1866,7 +1960,7 @@ async def read_file(req: FileReadRequest):
 @app.post("/files/write")
 async def write_file(req: FileWriteRequest, authorized: bool = Depends(verify_api_key)):
     """Write content to file (Requires auth)"""
-    return file_ops.write_file(req.file_path, req.content)
+    return await asyncio.to_thread(file_ops.write_file, req.file_path, req.content)
 
 @app.post("/files/delete")
 async def delete_file(req: FileDeleteRequest, authorized: bool = Depends(verify_api_key)):
@@ -1876,7 +1970,9 @@ async def delete_file(req: FileDeleteRequest, authorized: bool = Depends(verify_
 @app.post("/files/search")
 async def search_files(req: FileSearchRequest):
     """Search in files (Safe - read-only)"""
-    return file_ops.search_in_files(req.pattern, req.file_extension)
+    return await asyncio.to_thread(
+        file_ops.search_in_files, req.pattern, req.file_extension, req.offset, req.limit
+    )
 
 @app.post("/command/execute")
 async def execute_command(req: CommandRequest, authorized: bool = Depends(verify_api_key)):
@@ -1891,17 +1987,19 @@ async def search_web(req: WebSearchRequest):
 @app.post("/code/search")
 async def search_code(req: CodeSearchRequest):
     """Search codebase (Safe - read-only)"""
-    return codebase_search.search_pattern(req.pattern, req.file_types or [])
+    return await asyncio.to_thread(
+        codebase_search.search_pattern, req.pattern, req.file_types or [], req.offset, req.limit
+    )
 
 @app.post("/code/find-function")
 async def find_function(req: FunctionSearchRequest):
     """Find function in codebase (Safe)"""
-    return codebase_search.find_function(req.function_name)
+    return await asyncio.to_thread(codebase_search.find_function, req.function_name)
 
 @app.post("/code/find-class")
 async def find_class(req: ClassSearchRequest):
     """Find class in codebase (Safe)"""
-    return codebase_search.find_class(req.class_name)
+    return await asyncio.to_thread(codebase_search.find_class, req.class_name)
 
 @app.post("/code/analyze")
 async def analyze_code():
@@ -2201,7 +2299,8 @@ async def get_available_providers():
         "success": True,
         "providers": providers,
         "default": multi_provider_ai.default_provider.value,
-        "total": len(providers)
+        "total": len(providers),
+        "stats": {**multi_provider_ai.get_stats(), "generate_single_flight": generate_flight.get_stats()}
     }
 
 @app.post("/security/scan")
@@ -2357,10 +2456,10 @@ async def get_available_voices():
 async def execute_in_sandbox(req: SandboxExecuteRequest):
     """
     Docker Sandboxed Execution
-    Execute code in isolated Docker container
+    Execute code in isolated Docker container (or a warm, rlimited worker)
     """
     logger.info("Sandbox execution", language=req.language, timeout=req.timeout)
-    result = docker_sandbox.create_sandbox(req.language, req.code, req.timeout)
+    result = await docker_sandbox.execute(req.language, req.code, req.timeout)
     return result
 
 @app.get("/sandbox/stats")
@@ -2368,6 +2467,11 @@ async def get_sandbox_stats():
     """Get sandbox execution statistics"""
     return docker_sandbox.get_sandbox_stats()
 
+@app.get("/sandbox/pool")
+async def get_sandbox_pool_stats():
+    """Get warm sandbox worker pool utilization"""
+    return sandbox_pool.get_stats()
+
 @app.get("/sandbox/images")
 async def list_sandbox_images():
     """List available Docker images"""
@@ -2892,6 +2996,26 @@ def verify_admin_token(authorization: Optional[str] = Header(None)):
     
     return admin_tokens[token]
 
+@app.get("/health/profiler")
+def get_server_profile(top: int = 20, endpoint: Optional[str] = None, window: Optional[float] = None,
+                       format: str = "json", admin_user: dict = Depends(verify_admin_token)):
+    """Hot functions of the running server over the rolling window (Admin only)"""
+    if format == "collapsed":
+        return PlainTextResponse("\n".join(server_profiler.collapsed(endpoint, window)))
+    return server_profiler.report(top=top, endpoint=endpoint, window=window)
+
+@app.post("/health/profiler/start")
+def start_server_profiler(hz: Optional[float] = None, admin_user: dict = Depends(verify_admin_token)):
+    """Start sampling the server's threads (Admin only)"""
+    server_profiler.start(hz)
+    return {"running": server_profiler.running, "hz": server_profiler.hz}
+
+@app.post("/health/profiler/stop")
+def stop_server_profiler(admin_user: dict = Depends(verify_admin_token)):
+    """Stop sampling; collected samples stay available (Admin only)"""
+    server_profiler.stop()
+    return {"running": server_profiler.running}
+
 class AdminLoginRequest(BaseModel):
     username: str
     password: str
@@ -3,7 +3,8 @@ Live Preview System for SuperAgent v8
 Beats Bolt.new's instant preview with hot reload and multi-device support
 """
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 import asyncio
@@ -14,6 +15,9 @@ import tempfile
 import shutil
 from pathlib import Path
 
+from api.hot_reload import HotReloadManager
+from api.preview_cache import etag_matches, preview_cache
+
 router = APIRouter()
 
 # Store active preview sessions
@@ -21,6 +25,18 @@ active_previews: Dict[str, Dict[str, Any]] = {}
 preview_connections: Dict[str, List[WebSocket]] = {}
 
 
+async def _broadcast(preview_id: str, message: Dict[str, Any]) -> None:
+    """Send a hot reload message to every client watching a preview"""
+    for websocket in list(preview_connections.get(preview_id, [])):
+        try:
+            await websocket.send_json(message)
+        except:
+            pass
+
+
+hot_reload = HotReloadManager(_broadcast)
+
+
 class PreviewRequest(BaseModel):
     """Request to create a live preview"""
     code: str
@@ -84,9 +100,11 @@ async def create_preview(request: PreviewRequest):
         file_path = preview_dir / f"index.{request.language}"
         file_path.write_text(request.code)
     
-    # Store preview session
+    preview_cache.invalidate_prefix(preview_dir)
+    
+    # Store preview session (code versions live in the hot reload channel)
+    hot_reload.open(preview_id, request.code)
     active_previews[preview_id] = {
-        "code": request.code,
         "language": request.language,
         "framework": request.framework,
         "directory": str(preview_dir),
@@ -116,7 +134,7 @@ async def create_preview(request: PreviewRequest):
 
 
 @router.get("/api/v1/preview/{preview_id}")
-async def get_preview(preview_id: str):
+async def get_preview(preview_id: str, request: Request):
     """
     Get preview HTML with hot reload support
     """
@@ -127,12 +145,18 @@ async def get_preview(preview_id: str):
     preview = active_previews[preview_id]
     preview_dir = Path(preview["directory"])
     
-    # Read the HTML file
-    html_file = preview_dir / "index.html"
-    if not html_file.exists():
+    # Read the HTML file (from memory after the first request)
+    asset = preview_cache.get(preview_dir / "index.html")
+    if asset is None:
         raise HTTPException(status_code=404, detail="Preview file not found")
     
-    html_content = html_file.read_text()
+    # The payload only depends on the file and the hot reload flag
+    etag = asset.etag[:-1] + ('-hr"' if preview["hot_reload"] else '"')
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    html_content = asset.text()
     
     # Inject hot reload script if enabled
     if preview["hot_reload"]:
@@ -148,6 +172,13 @@ async def get_preview(preview_id: str):
         if (data.type === 'reload') {{
             console.log('Hot reload triggered');
             location.reload();
+        }} else if (data.type === 'css') {{
+            const styles = document.querySelectorAll('style');
+            data.patches.forEach(function(patch) {{
+                if (styles[patch.index]) styles[patch.index].textContent = patch.css;
+            }});
+        }} else if (data.type === 'dom') {{
+            document.body.innerHTML = data.html;
         }} else if (data.type === 'update') {{
             console.log('Updating content');
             document.body.innerHTML = data.content;
@@ -166,7 +197,7 @@ async def get_preview(preview_id: str):
         # Inject before closing body tag
         html_content = html_content.replace("</body>", f"{hot_reload_script}</body>")
     
-    return {"html": html_content, "preview_id": preview_id}
+    return JSONResponse({"html": html_content, "preview_id": preview_id}, headers=headers)
 
 
 @router.websocket("/preview/ws/{preview_id}")
@@ -209,22 +240,24 @@ async def update_preview(preview_id: str, request: PreviewRequest):
     # Update code file
     file_path = preview_dir / "index.html"
     file_path.write_text(request.code)
+    preview_cache.invalidate(file_path)
     
-    # Update preview session
-    preview["code"] = request.code
+    # Clients get the minimal diff once the burst of updates settles
+    version = hot_reload.submit(preview_id, request.code)
     
-    # Trigger hot reload for all connected clients
-    if preview_id in preview_connections:
-        for websocket in preview_connections[preview_id]:
-            try:
-                await websocket.send_json({
-                    "type": "reload",
-                    "preview_id": preview_id
-                })
-            except:
-                pass
+    return {"success": True, "message": "Preview updated", "version": version}
+
+
+@router.get("/api/v1/preview/{preview_id}/versions")
+async def get_preview_versions(preview_id: str):
+    """
+    List the retained versions of a preview
+    """
     
-    return {"success": True, "message": "Preview updated"}
+    if preview_id not in active_previews:
+        raise HTTPException(status_code=404, detail="Preview not found")
+    
+    return {"preview_id": preview_id, "versions": hot_reload.versions(preview_id)}
 
 
 @router.delete("/api/v1/preview/{preview_id}")
@@ -239,6 +272,8 @@ async def delete_preview(preview_id: str):
     preview = active_previews[preview_id]
     preview_dir = Path(preview["directory"])
     
+    hot_reload.close(preview_id)
+    
     # Close all WebSocket connections
     if preview_id in preview_connections:
         for websocket in preview_connections[preview_id]:
@@ -251,6 +286,7 @@ async def delete_preview(preview_id: str):
     # Delete preview files
     if preview_dir.exists():
         shutil.rmtree(preview_dir)
+    preview_cache.invalidate_prefix(preview_dir)
     
     # Remove from active previews
     del active_previews[preview_id]
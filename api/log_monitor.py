@@ -0,0 +1,248 @@
+"""
+Incremental Log Monitor
+Tail-follows log files and turns new error lines into deduplicated events
+
+Each file is read from the byte offset where the previous poll stopped, so
+the cost of a poll scales with new log volume rather than total log size.
+Rotation (the file is replaced) and truncation are detected through the
+inode and size; the unread tail of a rotated file is drained from its
+".1" backup first. All error patterns are matched with a single compiled
+regex, stack traces are fingerprinted so a repeating error is reported
+once per window, and the number of events handed to the repair pipeline
+is rate limited.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Parts of an error that vary between occurrences of the same problem
+_VOLATILE = re.compile(
+    r"\d{4}-\d{2}-\d{2}[T ][\d:.,]+\S*"   # timestamps
+    r"|0x[0-9a-fA-F]+"                     # addresses
+    r"|'[^']*'|\"[^\"]*\""                 # quoted values
+    r"|\d+"                                # numbers (ids, line numbers, ports)
+)
+_FRAME = re.compile(r'File "([^"]+)", line \d+, in (\S+)')
+_TRACEBACK_HEAD = re.compile(r'Traceback \(most recent call last\)')
+_TRACEBACK_LINE = re.compile(r'\s|Traceback \(most recent call last\)')
+
+
+@dataclass
+class LogMatch:
+    """An error line found in a log"""
+    error_type: str
+    line: str
+    context: List[str]
+    fingerprint: str
+    source: Optional[str] = None
+    occurrences: int = 1
+
+
+@dataclass
+class _TailState:
+    inode: int
+    offset: int
+    partial: bytes = b""
+
+
+@dataclass
+class _Seen:
+    first: float
+    last: float
+    count: int = 1
+    match: Optional[LogMatch] = field(default=None, repr=False)
+
+
+def combine_patterns(patterns: Dict[str, str]) -> "re.Pattern":
+    """Compile {name: pattern} into one alternation with a named group per pattern"""
+    return re.compile(
+        "|".join(f"(?P<{name}>{pattern})" for name, pattern in patterns.items()),
+        re.IGNORECASE
+    )
+
+
+def fingerprint(error_type: str, line: str, trace: List[str]) -> str:
+    """Stable identity of an error: its type, normalized message and stack frames"""
+    frames = [f"{path}:{func}" for path, func in _FRAME.findall("\n".join(trace))]
+    message = _VOLATILE.sub("#", line.strip())
+    return hashlib.sha1("\n".join([error_type, message, *frames]).encode()).hexdigest()[:16]
+
+
+class LogMonitor:
+    """Tail-following, deduplicating, rate-limited error detector"""
+    
+    def __init__(self, patterns: Dict[str, str], context_lines: int = 10,
+                 dedupe_window: float = 600.0, max_events_per_minute: float = 30.0,
+                 max_read_bytes: int = 8 * 1024 * 1024, initial_bytes: int = 64 * 1024):
+        self.pattern = combine_patterns(patterns)
+        self.context_lines = context_lines
+        self.dedupe_window = dedupe_window
+        self.max_events_per_minute = max_events_per_minute
+        self.max_read_bytes = max_read_bytes
+        self.initial_bytes = initial_bytes
+        self._tails: Dict[str, _TailState] = {}
+        self._seen: Dict[str, _Seen] = {}
+        self._tokens = max_events_per_minute
+        self._refilled = time.monotonic()
+        self.stats = {
+            "bytes_read": 0, "lines_scanned": 0, "matches": 0,
+            "duplicates": 0, "rate_limited": 0, "emitted": 0, "rotations": 0
+        }
+    
+    def scan(self, lines: List[str], source: Optional[str] = None) -> List[LogMatch]:
+        """Find error lines in a list of lines (no dedupe or rate limiting)"""
+        matches = []
+        search = self.pattern.search
+        covered = -1
+        for i, line in enumerate(lines):
+            if i <= covered:
+                continue
+            found = search(line)
+            if found:
+                # Source lines echoed under a frame are part of the same traceback
+                if i and _FRAME.search(lines[i - 1]):
+                    continue
+                if _TRACEBACK_HEAD.search(line):
+                    # Report a whole traceback once, anchored at its exception line
+                    end = i + 1
+                    while end < len(lines) - 1 and lines[end][:1].isspace():
+                        end += 1
+                    covered = min(end, len(lines) - 1)
+                    line = lines[covered]
+                    trace = lines[i:covered]
+                    context = trace + lines[covered:covered + self.context_lines]
+                else:
+                    trace = self._traceback_before(lines, i)
+                    context = trace + lines[i:i + self.context_lines]
+                matches.append(LogMatch(
+                    error_type=found.lastgroup,
+                    line=line,
+                    context=context,
+                    fingerprint=fingerprint(found.lastgroup, line, trace),
+                    source=source
+                ))
+        self.stats["lines_scanned"] += len(lines)
+        self.stats["matches"] += len(matches)
+        return matches
+    
+    def _traceback_before(self, lines: List[str], index: int) -> List[str]:
+        """Traceback lines leading up to the error line at ``index``"""
+        start = index
+        while start > 0 and index - start < self.context_lines * 4 and _TRACEBACK_LINE.match(lines[start - 1]):
+            start -= 1
+        return lines[start:index]
+    
+    def read_new_lines(self, path: str) -> List[str]:
+        """Complete lines appended to ``path`` since the last read"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return []
+        
+        state = self._tails.get(path)
+        chunks = []
+        skip_first_line = False
+        if state is None:
+            # First sight of a file: only look at its most recent content
+            offset = max(0, stat.st_size - self.initial_bytes)
+            state = self._tails[path] = _TailState(inode=stat.st_ino, offset=offset)
+            skip_first_line = offset > 0
+        elif state.inode != stat.st_ino:
+            self.stats["rotations"] += 1
+            chunks.append(self._drain_rotated(path, state))
+            state.inode, state.offset = stat.st_ino, 0
+        elif stat.st_size < state.offset:
+            # Truncated in place
+            self.stats["rotations"] += 1
+            state.offset, state.partial = 0, b""
+        
+        if stat.st_size > state.offset:
+            with open(path, "rb") as f:
+                f.seek(state.offset)
+                data = f.read(self.max_read_bytes)
+            state.offset += len(data)
+            chunks.append(data)
+        
+        data = state.partial + b"".join(chunks)
+        self.stats["bytes_read"] += len(data) - len(state.partial)
+        complete, newline, state.partial = data.rpartition(b"\n")
+        if not newline:
+            return []
+        lines = complete.decode("utf-8", errors="replace").split("\n")
+        # Starting mid-file, the first line is usually a fragment
+        return lines[1:] if skip_first_line else lines
+    
+    def _drain_rotated(self, path: str, state: _TailState) -> bytes:
+        """Unread tail of the file that was rotated away from ``path``"""
+        backup = f"{path}.1"
+        try:
+            if os.stat(backup).st_ino != state.inode:
+                return b""
+            with open(backup, "rb") as f:
+                f.seek(state.offset)
+                return f.read(self.max_read_bytes)
+        except OSError:
+            return b""
+    
+    def _admit(self, match: LogMatch, now: float) -> bool:
+        """Dedupe by fingerprint, then apply the events-per-minute budget"""
+        seen = self._seen.get(match.fingerprint)
+        if seen and now - seen.first < self.dedupe_window:
+            seen.count += 1
+            seen.last = now
+            if seen.match is not None:
+                seen.match.occurrences = seen.count
+            self.stats["duplicates"] += 1
+            return False
+        
+        self._tokens = min(self.max_events_per_minute,
+                           self._tokens + (now - self._refilled) * self.max_events_per_minute / 60)
+        self._refilled = now
+        if self._tokens < 1:
+            self.stats["rate_limited"] += 1
+            return False
+        self._tokens -= 1
+        self._seen[match.fingerprint] = _Seen(first=now, last=now, match=match)
+        return True
+    
+    def _expire(self, now: float) -> None:
+        expired = [key for key, seen in self._seen.items() if now - seen.first >= self.dedupe_window]
+        for key in expired:
+            del self._seen[key]
+    
+    def process(self, lines: List[str], source: Optional[str] = None) -> List[LogMatch]:
+        """Scan lines and return only the events that should be repaired"""
+        now = time.monotonic()
+        self._expire(now)
+        events = [match for match in self.scan(lines, source) if self._admit(match, now)]
+        self.stats["emitted"] += len(events)
+        return events
+    
+    async def poll(self, paths: List[str]) -> List[LogMatch]:
+        """Read what was appended to each file since the last poll and return new error events"""
+        events = []
+        for path in paths:
+            lines = await asyncio.to_thread(self.read_new_lines, str(path))
+            if lines:
+                events.extend(self.process(lines, source=str(path)))
+        return events
+    
+    def get_stats(self) -> Dict:
+        """Monitor counters and the most frequent deduplicated errors"""
+        top = sorted(self._seen.items(), key=lambda item: item[1].count, reverse=True)[:5]
+        return {
+            **self.stats,
+            "files": {path: state.offset for path, state in self._tails.items()},
+            "top_errors": [
+                {"fingerprint": key, "count": seen.count,
+                 "line": seen.match.line.strip() if seen.match else None}
+                for key, seen in top
+            ],
+        }
@@ -0,0 +1,157 @@
+"""
+Metrics
+Request latency, in-flight and event-loop lag metrics for the API server
+
+MetricsMiddleware is a pure ASGI middleware, so it adds no extra task or
+response buffering per request. Requests are labelled with their route
+template ("/api/v1/files/{path}"), never the raw path, and with the status
+class ("2xx"), which keeps series counts bounded. Paths that match no route
+are all counted as "<unmatched>".
+
+LoopLagProbe sleeps for a fixed interval on the event loop and records how
+late it woke up. Sustained lag means something is blocking the loop.
+
+The probe starts with the first request the middleware sees. Everything
+is served from the shared registry in superagent.core.metrics at
+GET /metrics.
+"""
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from superagent.core.metrics import MetricsRegistry, get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+UNMATCHED_ROUTE = "<unmatched>"
+# Event loop lag rarely matters below a millisecond; seconds beyond 5 are an outage
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def route_template(scope) -> str:
+    """Route path template of a handled request, "<unmatched>" if no route matched"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency, status and in-flight counts"""
+    
+    def __init__(self, app, registry: Optional[MetricsRegistry] = None,
+                 probe: Optional["LoopLagProbe"] = None):
+        self.app = app
+        self.probe = probe
+        registry = registry or get_metrics_registry()
+        self.requests = registry.counter(
+            "superagent_http_requests_total", "HTTP requests handled", ("method", "route", "status")
+        )
+        self.latency = registry.histogram(
+            "superagent_http_request_duration_seconds", "HTTP request latency until the response completed",
+            ("method", "route")
+        )
+        self.in_flight = registry.gauge(
+            "superagent_http_requests_in_flight", "HTTP requests currently being handled"
+        )
+        self.websockets = registry.gauge(
+            "superagent_websocket_connections", "Open WebSocket connections", ("route",)
+        )
+    
+    async def __call__(self, scope, receive, send):
+        # Started on the first request, once the server's loop is running
+        if scope["type"] in ("http", "websocket"):
+            (self.probe or loop_lag_probe).start()
+        if scope["type"] == "http":
+            await self._http(scope, receive, send)
+        elif scope["type"] == "websocket":
+            await self._websocket(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+    
+    async def _http(self, scope, receive, send):
+        status = 500
+        
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        started = time.perf_counter()
+        self.in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.in_flight.dec()
+            # The router stores the matched route on the scope while dispatching
+            route = route_template(scope)
+            method = scope.get("method", "GET")
+            self.latency.observe(time.perf_counter() - started, method=method, route=route)
+            self.requests.inc(method=method, route=route, status=f"{status // 100}xx")
+    
+    async def _websocket(self, scope, receive, send):
+        accepted = False
+        
+        async def send_wrapper(message):
+            nonlocal accepted
+            if message["type"] == "websocket.accept":
+                accepted = True
+                self.websockets.inc(route=route_template(scope))
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if accepted:
+                self.websockets.dec(route=route_template(scope))
+
+
+class LoopLagProbe:
+    """Measures how late the event loop runs a timer"""
+    
+    def __init__(self, interval: float = 0.5, registry: Optional[MetricsRegistry] = None):
+        self.interval = interval
+        registry = registry or get_metrics_registry()
+        self.histogram = registry.histogram(
+            "superagent_event_loop_lag_seconds", "Delay between a timer's due time and when it ran",
+            buckets=LAG_BUCKETS
+        )
+        self.current = registry.gauge(
+            "superagent_event_loop_lag_last_seconds", "Most recent event loop lag measurement"
+        )
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def start(self) -> None:
+        """Start probing on the running loop (no-op if already probing it)"""
+        loop = asyncio.get_running_loop()
+        if self.running and self._task.get_loop() is loop:
+            return
+        self._task = loop.create_task(self._run())
+    
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - scheduled - self.interval)
+            self.histogram.observe(lag)
+            self.current.set(lag)
+            if lag > 1.0:
+                logger.warning(f"⚠️ Event loop blocked for {lag:.2f}s")
+
+
+# Global loop lag probe
+loop_lag_probe = LoopLagProbe()
@@ -6,6 +6,9 @@ import os
 from typing import Dict, Optional, List
 from enum import Enum
 
+from superagent.core.single_flight import SingleFlight, flight_key
+from superagent.core.tracing import tracer
+
 class AIProvider(str, Enum):
     GEMINI = "gemini"
     CLAUDE = "claude"
@@ -23,6 +26,9 @@ class MultiProviderAI:
         
         # Default provider
         self.default_provider = self._get_default_provider()
+        
+        # Identical concurrent prompts share one provider call
+        self.single_flight = SingleFlight("multi_provider.generate")
     
     def _get_default_provider(self) -> AIProvider:
         """Determine default provider based on available keys"""
@@ -37,22 +43,36 @@ class MultiProviderAI:
         return AIProvider.GEMINI  # Fallback
     
     async def generate(self, prompt: str, provider: Optional[AIProvider] = None) -> Dict:
-        """Generate using specified provider or default"""
-        provider = provider or self.default_provider
+        """Generate using specified provider or default
         
-        try:
-            if provider == AIProvider.GEMINI:
-                return await self._generate_gemini(prompt)
-            elif provider == AIProvider.CLAUDE:
-                return await self._generate_claude(prompt)
-            elif provider == AIProvider.OPENAI:
-                return await self._generate_openai(prompt)
-            elif provider == AIProvider.GROQ:
-                return await self._generate_groq(prompt)
-            else:
-                return {"success": False, "error": f"Unknown provider: {provider}"}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        Concurrent requests for the same provider and prompt are coalesced
+        into a single provider call.
+        """
+        provider = provider or self.default_provider
+        key = flight_key(provider=provider, prompt=prompt)
+        result = await self.single_flight.do(key, lambda: self._generate(prompt, provider))
+        # Each caller gets its own copy of the shared result
+        return dict(result)
+    
+    async def _generate(self, prompt: str, provider: AIProvider) -> Dict:
+        """Dispatch to the provider implementation"""
+        with tracer.span("llm.generate", kind="llm", **{"llm.provider": getattr(provider, "value", provider)}) as span:
+            try:
+                if provider == AIProvider.GEMINI:
+                    result = await self._generate_gemini(prompt)
+                elif provider == AIProvider.CLAUDE:
+                    result = await self._generate_claude(prompt)
+                elif provider == AIProvider.OPENAI:
+                    result = await self._generate_openai(prompt)
+                elif provider == AIProvider.GROQ:
+                    result = await self._generate_groq(prompt)
+                else:
+                    result = {"success": False, "error": f"Unknown provider: {provider}"}
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+            if not result.get("success"):
+                span.status = "error"
+            return result
     
     async def _generate_gemini(self, prompt: str) -> Dict:
         """Generate using Google Gemini"""
@@ -156,3 +176,7 @@ class MultiProviderAI:
         if self.groq_key:
             providers.append("groq")
         return providers
+    
+    def get_stats(self) -> Dict:
+        """Request coalescing statistics"""
+        return {"single_flight": self.single_flight.get_stats()}
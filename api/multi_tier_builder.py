@@ -3,6 +3,7 @@ Multi-Tier Application Builder
 Builds complete full-stack applications with frontend, backend, and database
 """
 import os
+import time
 import asyncio
 from typing import Dict, List, Any, Optional
 from pathlib import Path
@@ -11,6 +12,15 @@ import google.generativeai as genai
 from .architecture_planner import architecture_planner
 from .schema_designer import schema_designer
 from .api_generator import api_generator
+from superagent.core.stage_graph import Stage, StageGraph
+
+
+class BuildStepError(Exception):
+    """A planning step returned an error result; the build stops with it"""
+    
+    def __init__(self, result: Dict[str, Any]):
+        super().__init__(result.get("error", "Build step failed"))
+        self.result = result
 
 
 class MultiTierBuilder:
@@ -49,7 +59,7 @@ Generate complete React code with:
 Return complete, runnable React code."""
         
         try:
-            response = self.model.generate_content(prompt)
+            response = await self.model.generate_content_async(prompt)
             return response.text.strip()
         except Exception as e:
             return f"// Error generating frontend: {str(e)}"
@@ -83,7 +93,7 @@ Generate complete FastAPI code with:
 Return complete, runnable FastAPI code."""
         
         try:
-            response = self.model.generate_content(prompt)
+            response = await self.model.generate_content_async(prompt)
             return response.text.strip()
         except Exception as e:
             return f"# Error generating backend: {str(e)}"
@@ -340,43 +350,82 @@ jobs:
     async def build_complete_application(self, requirements: str) -> Dict[str, Any]:
         """Build complete multi-tier application"""
         
-        try:
-            # Step 1: Plan architecture
-            arch_result = await architecture_planner.plan_complete_architecture(requirements)
+        # Generators only wait for the inputs they use: Docker and CI configs
+        # start immediately, schema/API/frontend/backend as soon as the
+        # architecture analysis is known, all concurrently.
+        async def plan(a):
+            arch_result = await architecture_planner.plan_complete_architecture(a["requirements"])
             if "error" in arch_result:
-                return arch_result
-            
-            architecture = arch_result.get("architecture", {})
+                raise BuildStepError(arch_result)
             analysis = arch_result.get("analysis", {})
-            
-            # Extract entities from analysis
-            entities = analysis.get("data_requirements", {}).get("primary_data", [])
-            features = analysis.get("key_features", [])
-            app_type = analysis.get("app_type", "general")
-            
-            # Step 2: Design database schema
-            schema_result = await schema_designer.design_complete_schema(requirements, entities)
+            return {
+                "architecture": arch_result.get("architecture", {}),
+                "entities": analysis.get("data_requirements", {}).get("primary_data", []),
+                "features": analysis.get("key_features", []),
+                "app_type": analysis.get("app_type", "general"),
+            }
+        
+        async def schema(a):
+            schema_result = await schema_designer.design_complete_schema(a["requirements"], a["entities"])
             if "error" in schema_result:
-                return schema_result
-            
-            # Step 3: Generate API
-            api_result = await api_generator.generate_complete_api(requirements, entities)
+                raise BuildStepError(schema_result)
+            return {"schema_result": schema_result}
+        
+        async def api(a):
+            api_result = await api_generator.generate_complete_api(a["requirements"], a["entities"])
             if "error" in api_result:
-                return api_result
-            
-            # Step 4: Generate frontend code
-            frontend_code = await self.generate_frontend_code(app_type, features)
-            
-            # Step 5: Generate backend code
-            backend_code = await self.generate_backend_code(app_type, features, entities)
-            
-            # Step 6: Generate Docker configuration
-            docker_compose = await self.generate_docker_compose(["postgres", "redis", "backend", "frontend"])
-            dockerfile_backend = await self.generate_dockerfile_backend()
-            dockerfile_frontend = await self.generate_dockerfile_frontend()
+                raise BuildStepError(api_result)
+            return {"api_result": api_result}
+        
+        async def frontend(a):
+            return {"frontend_code": await self.generate_frontend_code(a["app_type"], a["features"])}
+        
+        async def backend(a):
+            return {"backend_code": await self.generate_backend_code(a["app_type"], a["features"], a["entities"])}
+        
+        async def docker_compose(a):
+            return {"docker_compose": await self.generate_docker_compose(["postgres", "redis", "backend", "frontend"])}
+        
+        async def dockerfile_backend(a):
+            return {"dockerfile_backend": await self.generate_dockerfile_backend()}
+        
+        async def dockerfile_frontend(a):
+            return {"dockerfile_frontend": await self.generate_dockerfile_frontend()}
+        
+        async def ci_cd(a):
+            return {"github_actions": await self.generate_github_actions_ci_cd()}
+        
+        graph = StageGraph([
+            Stage("architecture", plan, inputs=("requirements",),
+                  outputs=("architecture", "entities", "features", "app_type")),
+            Stage("schema", schema, inputs=("requirements", "entities"), outputs=("schema_result",)),
+            Stage("api", api, inputs=("requirements", "entities"), outputs=("api_result",)),
+            Stage("frontend", frontend, inputs=("app_type", "features"), outputs=("frontend_code",)),
+            Stage("backend", backend, inputs=("app_type", "features", "entities"), outputs=("backend_code",)),
+            Stage("docker_compose", docker_compose, outputs=("docker_compose",)),
+            Stage("dockerfile_backend", dockerfile_backend, outputs=("dockerfile_backend",)),
+            Stage("dockerfile_frontend", dockerfile_frontend, outputs=("dockerfile_frontend",)),
+            Stage("ci_cd", ci_cd, outputs=("github_actions",)),
+        ])
+        
+        try:
+            started = time.perf_counter()
+            try:
+                a = await graph.run({"requirements": requirements})
+            except BuildStepError as e:
+                return e.result
+            build_time = round(time.perf_counter() - started, 3)
             
-            # Step 7: Generate CI/CD workflow
-            github_actions = await self.generate_github_actions_ci_cd()
+            app_type = a["app_type"]
+            architecture = a["architecture"]
+            schema_result = a["schema_result"]
+            api_result = a["api_result"]
+            frontend_code = a["frontend_code"]
+            backend_code = a["backend_code"]
+            docker_compose = a["docker_compose"]
+            dockerfile_backend = a["dockerfile_backend"]
+            dockerfile_frontend = a["dockerfile_frontend"]
+            github_actions = a["github_actions"]
             
             return {
                 "success": True,
@@ -410,7 +459,10 @@ jobs:
                     "4. Access frontend at http://localhost:3000",
                     "5. API available at http://localhost:8000",
                     "6. Push to GitHub to trigger CI/CD"
-                ]
+                ],
+                "build_time": build_time,
+                "critical_path": graph.critical_path(),
+                "stage_timings": graph.timings()
             }
         
         except Exception as e:
@@ -0,0 +1,231 @@
+"""
+Preview Asset Cache
+Keeps preview files in memory with precomputed gzip/brotli variants and
+strong ETags (one per content-coding), so constantly refreshing preview pages are answered from
+memory (or with 304 Not Modified) instead of re-reading disk.
+
+Entries are invalidated by the code paths that write preview files, and
+every hit is re-validated against the file's mtime and size, so writes
+from anywhere else are picked up too. The cache is bounded by a byte
+budget with LRU eviction.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Union
+
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+MEDIA_TYPES = {
+    ".html": "text/html",
+    ".css": "text/css",
+    ".js": "application/javascript",
+    ".json": "application/json",
+    ".txt": "text/plain",
+    ".md": "text/plain",
+    ".jsx": "application/javascript",
+    ".svg": "image/svg+xml",
+}
+
+MIN_COMPRESS_BYTES = 512  # smaller bodies are not worth an encoding round trip
+
+
+class CachedAsset:
+    """One file's bytes, encoded variants and validator"""
+
+    def __init__(self, path: str, body: bytes, media_type: str, stamp: tuple = ()):
+        self.path = path
+        self.body = body
+        self.stamp = stamp  # (mtime_ns, size) of the file when it was read
+        self.media_type = media_type
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.variants: Dict[str, bytes] = {}
+        compressible = media_type.startswith("text/") or media_type in (
+            "application/javascript", "application/json", "image/svg+xml"
+        )
+        if compressible and len(body) >= MIN_COMPRESS_BYTES:
+            self._add_variant("gzip", gzip.compress(body, compresslevel=6, mtime=0))
+            if brotli is not None:
+                self._add_variant("br", brotli.compress(body, quality=5))
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """Strong ETag of one representation; each content-coding gets its own"""
+        return self.etag if not encoding else self.etag[:-1] + "-" + encoding + '"'
+
+    def _add_variant(self, encoding: str, data: bytes) -> None:
+        # Keep an encoding only when it actually saves bytes
+        if len(data) < len(self.body):
+            self.variants[encoding] = data
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(data) for data in self.variants.values())
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+
+def _etag_content(tag: str) -> str:
+    # '"<hash>-br"' and '"<hash>"' both identify the content "<hash>"
+    return tag.removeprefix("W/").strip('"').split("-", 1)[0]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches any content-coding of ``etag``
+    (weak comparison, per RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(_etag_content(tag) == _etag_content(etag) for tag in candidates)
+
+
+def choose_encoding(accept_encoding: Optional[str], available: Mapping[str, bytes]) -> Optional[str]:
+    """Pick br, then gzip, among the encodings the client accepts"""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in ("br", "gzip"):
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class PreviewAssetCache:
+    """Byte-bounded LRU cache of preview files"""
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            os.getenv("PREVIEW_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+        )
+        self._entries: "OrderedDict[str, CachedAsset]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.not_modified = 0
+
+    @staticmethod
+    def _key(path: Union[str, Path]) -> str:
+        return os.path.abspath(str(path))
+
+    def get(self, path: Union[str, Path], media_type: Optional[str] = None) -> Optional[CachedAsset]:
+        """Return the cached asset for a file, loading it on a miss.
+
+        Returns:
+            The asset, or None if the file does not exist
+        """
+        key = self._key(path)
+        try:
+            stat = os.stat(key)
+        except OSError:
+            self.invalidate(key)
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            asset = self._entries.get(key)
+            if asset is not None and asset.stamp == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return asset
+
+        try:
+            body = Path(key).read_bytes()
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            return None
+
+        media_type = media_type or MEDIA_TYPES.get(Path(key).suffix.lower(), "text/plain")
+        # The stamp is taken before reading: a write racing the read leaves a
+        # stale stamp, which only causes one extra reload on the next hit
+        asset = CachedAsset(key, body, media_type, stamp)
+        with self._lock:
+            self.misses += 1
+            if asset.size <= self.max_bytes:
+                previous = self._entries.pop(key, None)
+                if previous is not None:
+                    self.total_bytes -= previous.size
+                self._entries[key] = asset
+                self.total_bytes += asset.size
+                self._evict()
+        return asset
+
+    def invalidate(self, path: Union[str, Path]) -> None:
+        """Drop one file (call after writing it)"""
+        with self._lock:
+            asset = self._entries.pop(self._key(path), None)
+            if asset is not None:
+                self.total_bytes -= asset.size
+
+    def invalidate_prefix(self, directory: Union[str, Path]) -> None:
+        """Drop every file under a directory (call after rewriting a project)"""
+        prefix = self._key(directory).rstrip(os.sep) + os.sep
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                self.total_bytes -= self._entries.pop(key).size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def response(self, asset: CachedAsset, headers: Mapping[str, str]) -> Response:
+        """Build a response for an asset honoring If-None-Match and Accept-Encoding"""
+        encoding = choose_encoding(headers.get("accept-encoding"), asset.variants)
+        response_headers = {
+            "ETag": asset.etag_for(encoding),
+            "Cache-Control": "no-cache",  # always revalidate; previews change constantly
+            "Vary": "Accept-Encoding",
+        }
+        if etag_matches(headers.get("if-none-match"), asset.etag):
+            with self._lock:
+                self.not_modified += 1
+            return Response(status_code=304, headers=response_headers)
+
+        body = asset.body
+        if encoding:
+            body = asset.variants[encoding]
+            response_headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type=asset.media_type, headers=response_headers)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "total_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "not_modified": self.not_modified,
+                "brotli": brotli is not None,
+            }
+
+    def _evict(self) -> None:
+        while self.total_bytes > self.max_bytes and self._entries:
+            _, asset = self._entries.popitem(last=False)
+            self.total_bytes -= asset.size
+            self.evictions += 1
+
+
+# Global preview cache
+preview_cache = PreviewAssetCache()
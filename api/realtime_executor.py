@@ -8,11 +8,14 @@ import asyncio
 import json
 import subprocess
 import tempfile
+import time
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 import docker
 from docker.types import Mount
 
+from api.sandbox_pool import isolation_mode, sandbox_pool
+
 
 class RealtimeCodeExecutor:
     """Executes code in real-time with sandboxing"""
@@ -24,6 +27,10 @@ class RealtimeCodeExecutor:
         except Exception:
             self.docker_available = False
             print("⚠️ Docker not available - using subprocess execution")
+        
+        # Containers when Docker is up; the rlimited warm pool is the fallback
+        # (or forced with SANDBOX_ISOLATION=pool)
+        self.use_warm_pool = isolation_mode() == "pool" or not self.docker_available
     
     async def execute_code(
         self,
@@ -48,7 +55,10 @@ class RealtimeCodeExecutor:
         try:
             print(f"🚀 Executing {language} code...")
             
-            if self.docker_available:
+            # Warm workers skip interpreter/container start-up entirely
+            if self.use_warm_pool and sandbox_pool.supports(language):
+                result = await sandbox_pool.execute(code, language, timeout, environment)
+            elif self.docker_available:
                 result = await self._execute_in_docker(code, language, timeout, environment)
             else:
                 result = await self._execute_locally(code, language, timeout, environment)
@@ -88,6 +98,7 @@ class RealtimeCodeExecutor:
             env_vars["TIMEOUT"] = str(timeout)
             
             # Run container
+            started = time.perf_counter()
             container = self.docker_client.containers.run(
                 image,
                 f"timeout {timeout} {self._get_run_command(language, code_file)}",
@@ -101,7 +112,9 @@ class RealtimeCodeExecutor:
             )
             
             # Wait for completion
-            exit_code = container.wait(timeout=timeout + 5)
+            wait_result = container.wait(timeout=timeout + 5)
+            execution_time = time.perf_counter() - started
+            exit_code = wait_result.get("StatusCode") if isinstance(wait_result, dict) else wait_result
             
             # Get output
             output = container.logs(stdout=True, stderr=False).decode('utf-8')
@@ -115,7 +128,7 @@ class RealtimeCodeExecutor:
                 "output": output,
                 "stderr": stderr,
                 "exit_code": exit_code,
-                "execution_time": timeout,
+                "execution_time": execution_time,
             }
         
         finally:
@@ -146,6 +159,7 @@ class RealtimeCodeExecutor:
                 env.update(environment)
             
             # Execute
+            started = time.perf_counter()
             process = await asyncio.create_subprocess_shell(
                 command,
                 stdout=asyncio.subprocess.PIPE,
@@ -164,7 +178,7 @@ class RealtimeCodeExecutor:
                     "status": "timeout",
                     "output": "",
                     "stderr": f"Execution timeout after {timeout} seconds",
-                    "execution_time": timeout,
+                    "execution_time": time.perf_counter() - started,
                 }
             
             return {
@@ -172,7 +186,7 @@ class RealtimeCodeExecutor:
                 "output": stdout.decode('utf-8'),
                 "stderr": stderr.decode('utf-8'),
                 "exit_code": process.returncode,
-                "execution_time": timeout,
+                "execution_time": time.perf_counter() - started,
             }
         
         finally:
@@ -0,0 +1,347 @@
+"""
+Warm Sandbox Worker Pool
+Keeps pre-started, resource-limited interpreter workers ready for code execution
+so each run skips interpreter (or container) start-up. Works without Docker.
+
+Workers only apply rlimits, a fresh temp dir and an empty environment; they
+run as the server's user with its filesystem and network access. They are
+the fallback when Docker is missing, or used when SANDBOX_ISOLATION=pool.
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import asyncio
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+
+WORKER_SCRIPT = Path(__file__).with_name("sandbox_worker.py")
+# Only these reach the worker process; its environment is readable from
+# /proc/<pid>/environ, so server secrets must never be in it
+WORKER_ENV_KEYS = ("PATH", "LANG", "LC_ALL", "LC_CTYPE", "TZ")
+
+
+def isolation_mode() -> str:
+    """Configured isolation: "auto" (Docker when available), "docker" or "pool"."""
+    return os.getenv("SANDBOX_ISOLATION", "auto").lower()
+
+
+@dataclass
+class PooledWorker:
+    """A single warm worker process"""
+    worker_id: int
+    process: asyncio.subprocess.Process
+    started_at: float = field(default_factory=time.time)
+    runs: int = 0
+    busy_time: float = 0.0
+
+
+class SandboxWorkerPool:
+    """Pool of warm local workers that execute code in rlimited, forked children"""
+
+    SUPPORTED_LANGUAGES = {"python"}
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        max_runs_per_worker: Optional[int] = None,
+        memory_mb: int = 512,
+        max_open_files: int = 64,
+        max_file_size_mb: int = 16,
+        max_output_bytes: int = 1024 * 1024,
+    ):
+        self.size = size or int(os.getenv("SANDBOX_POOL_SIZE", "2"))
+        self.max_runs_per_worker = max_runs_per_worker or int(os.getenv("SANDBOX_POOL_MAX_RUNS", "50"))
+        self.memory_mb = memory_mb
+        self.max_open_files = max_open_files
+        self.max_file_size_mb = max_file_size_mb
+        self.max_output_bytes = max_output_bytes
+
+        self.workers: Dict[int, PooledWorker] = {}
+        self._idle: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._next_worker_id = 0
+        self._started_at: Optional[float] = None
+        self._waiting = 0
+
+        self.stats = {
+            "executions": 0,
+            "timeouts": 0,
+            "crashes": 0,
+            "recycled": 0,
+            "busy_seconds": 0.0,
+            "total_queue_wait": 0.0,
+            "max_queue_wait": 0.0,
+        }
+
+    def is_available(self) -> bool:
+        """Warm workers need fork() and rlimits, i.e. a POSIX host"""
+        return os.name == "posix" and hasattr(os, "fork") and WORKER_SCRIPT.exists()
+
+    def supports(self, language: str) -> bool:
+        """Check whether a language can run on the warm pool"""
+        return self.is_available() and language.lower() in self.SUPPORTED_LANGUAGES
+
+    async def start(self) -> None:
+        """Pre-start all workers (safe to call repeatedly)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Pool was used from another event loop (e.g. tests) - start fresh
+            self._kill_all()
+            self._loop = loop
+            self._idle = asyncio.Queue()
+            self._start_lock = asyncio.Lock()
+            self._started_at = None
+
+        async with self._start_lock:
+            # Also tops the pool back up if a replacement worker failed to spawn
+            missing = self.size - len(self.workers)
+            if missing <= 0:
+                return
+            workers = await asyncio.gather(*(self._spawn_worker() for _ in range(missing)))
+            for worker in workers:
+                self._idle.put_nowait(worker)
+            if self._started_at is None:
+                self._started_at = time.time()
+                print(f"🔥 Sandbox pool ready: {self.size} warm workers")
+
+    async def shutdown(self) -> None:
+        """Stop all workers"""
+        for worker in list(self.workers.values()):
+            await self._stop_worker(worker)
+        self.workers.clear()
+        self._started_at = None
+        self._loop = None
+
+    async def execute(
+        self,
+        code: str,
+        language: str = "python",
+        timeout: int = 30,
+        environment: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Execute code on a warm worker
+
+        Returns:
+            Execution result with output, exit code, wall/CPU time and peak RSS
+        """
+        if not self.supports(language):
+            return {
+                "status": "error",
+                "error": f"Language {language} not supported by the warm sandbox pool",
+                "output": "",
+                "stderr": "",
+                "execution_time": 0,
+            }
+
+        await self.start()
+
+        queued_at = time.perf_counter()
+        self._waiting += 1
+        try:
+            worker = await self._idle.get()
+        finally:
+            self._waiting -= 1
+        queue_wait = time.perf_counter() - queued_at
+        self.stats["total_queue_wait"] += queue_wait
+        self.stats["max_queue_wait"] = max(self.stats["max_queue_wait"], queue_wait)
+
+        job = {
+            "code": code,
+            "timeout": timeout,
+            "cpu_seconds": max(1, int(timeout)),
+            "memory_bytes": self.memory_mb * 1024 * 1024,
+            "max_open_files": self.max_open_files,
+            "max_file_size_bytes": self.max_file_size_mb * 1024 * 1024,
+            "max_output_bytes": self.max_output_bytes,
+            "environment": environment or {},
+        }
+
+        run_started = time.perf_counter()
+        healthy = False
+        try:
+            result = await self._send_job(worker, job, timeout)
+            healthy = "worker_error" not in result
+        except (asyncio.TimeoutError, ConnectionError, BrokenPipeError, ValueError) as e:
+            result = {"worker_error": f"Worker crashed: {type(e).__name__}: {e}"}
+        finally:
+            busy = time.perf_counter() - run_started
+            worker.busy_time += busy
+            self.stats["busy_seconds"] += busy
+            worker.runs += 1
+            self.stats["executions"] += 1
+            await self._release(worker, healthy)
+
+        return self._format_result(result, queue_wait)
+
+    async def _send_job(self, worker: PooledWorker, job: Dict[str, Any], timeout: int) -> Dict[str, Any]:
+        process = worker.process
+        process.stdin.write(json.dumps(job).encode("utf-8") + b"\n")
+        await process.stdin.drain()
+
+        # The worker enforces the timeout itself; the grace period covers a hung worker
+        line = await asyncio.wait_for(process.stdout.readline(), timeout=timeout + 10)
+        if not line:
+            raise ConnectionError(f"worker {worker.worker_id} exited")
+        return json.loads(line)
+
+    async def _release(self, worker: PooledWorker, healthy: bool) -> None:
+        """Return a worker to the pool, recycling it after a crash or N runs"""
+        if healthy and worker.runs < self.max_runs_per_worker and worker.process.returncode is None:
+            self._idle.put_nowait(worker)
+            return
+
+        if healthy:
+            self.stats["recycled"] += 1
+        else:
+            self.stats["crashes"] += 1
+        await self._stop_worker(worker)
+        self.workers.pop(worker.worker_id, None)
+        try:
+            replacement = await self._spawn_worker()
+        except Exception as e:
+            print(f"⚠️ Could not replace sandbox worker: {e}")
+            return
+        self._idle.put_nowait(replacement)
+
+    async def _spawn_worker(self) -> PooledWorker:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-u", str(WORKER_SCRIPT),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            limit=self.max_output_bytes * 4 + 65536,
+            start_new_session=True,
+            env=self._worker_env(),
+        )
+        ready = await asyncio.wait_for(process.stdout.readline(), timeout=30)
+        if not ready:
+            raise RuntimeError("sandbox worker failed to start")
+
+        self._next_worker_id += 1
+        worker = PooledWorker(worker_id=self._next_worker_id, process=process)
+        self.workers[worker.worker_id] = worker
+        return worker
+
+    @staticmethod
+    def _worker_env() -> Dict[str, str]:
+        env = {key: os.environ[key] for key in WORKER_ENV_KEYS if key in os.environ}
+        env["PYTHONIOENCODING"] = "utf-8"
+        return env
+
+    async def _stop_worker(self, worker: PooledWorker) -> None:
+        process = worker.process
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+            try:
+                await asyncio.wait_for(process.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                pass
+
+    def _kill_all(self) -> None:
+        """Synchronously kill workers that belong to a previous event loop"""
+        for worker in self.workers.values():
+            try:
+                os.kill(worker.process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+        self.workers.clear()
+
+    def _format_result(self, result: Dict[str, Any], queue_wait: float) -> Dict[str, Any]:
+        if "worker_error" in result:
+            return {
+                "status": "error",
+                "error": result["worker_error"],
+                "output": "",
+                "stderr": "",
+                "execution_time": 0,
+                "queue_wait": queue_wait,
+                "sandbox": "warm_pool",
+                "sandboxed": False,
+                "isolation": "rlimits",
+            }
+
+        if result["timed_out"]:
+            self.stats["timeouts"] += 1
+            status = "timeout"
+        elif result["exit_code"] == 0:
+            status = "success"
+        else:
+            status = "error"
+
+        stderr = result["stderr"]
+        if result["timed_out"]:
+            stderr += f"\nExecution timeout after {result['wall_time']:.1f} seconds"
+        elif result["signal"]:
+            stderr += f"\nProcess killed by {result['signal']}"
+
+        return {
+            "status": status,
+            "output": result["stdout"],
+            "stderr": stderr,
+            "exit_code": result["exit_code"],
+            "execution_time": result["wall_time"],
+            "cpu_time": result["cpu_time"],
+            "peak_memory_kb": result["peak_rss_kb"],
+            "output_truncated": result["truncated"],
+            "queue_wait": queue_wait,
+            "sandbox": "warm_pool",
+            "sandboxed": False,
+            "isolation": "rlimits",
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool utilization statistics"""
+        now = time.time()
+        worker_stats: List[Dict[str, Any]] = []
+        for worker in self.workers.values():
+            alive = max(now - worker.started_at, 1e-9)
+            worker_stats.append({
+                "worker_id": worker.worker_id,
+                "pid": worker.process.pid,
+                "runs": worker.runs,
+                "busy_seconds": round(worker.busy_time, 4),
+                "utilization": round(worker.busy_time / alive, 4),
+            })
+
+        idle = self._idle.qsize() if self._idle is not None else 0
+        executions = self.stats["executions"]
+        uptime = now - self._started_at if self._started_at else 0.0
+        capacity = uptime * self.size
+        return {
+            "available": self.is_available(),
+            "running": self._started_at is not None,
+            "size": self.size,
+            "workers": len(self.workers),
+            "idle_workers": idle,
+            "busy_workers": len(self.workers) - idle,
+            "queued_requests": self._waiting,
+            "max_runs_per_worker": self.max_runs_per_worker,
+            "limits": {
+                "memory_mb": self.memory_mb,
+                "max_open_files": self.max_open_files,
+                "max_file_size_mb": self.max_file_size_mb,
+            },
+            "executions": executions,
+            "timeouts": self.stats["timeouts"],
+            "crashes": self.stats["crashes"],
+            "recycled": self.stats["recycled"],
+            "uptime_seconds": round(uptime, 2),
+            "utilization": round(self.stats["busy_seconds"] / capacity, 4) if capacity else 0.0,
+            "avg_queue_wait": self.stats["total_queue_wait"] / executions if executions else 0.0,
+            "max_queue_wait": self.stats["max_queue_wait"],
+            "worker_details": worker_stats,
+        }
+
+
+# Global instance
+sandbox_pool = SandboxWorkerPool()
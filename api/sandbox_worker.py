@@ -0,0 +1,236 @@
+"""
+Sandbox Worker Process
+Long-lived interpreter used by the warm sandbox pool (api/sandbox_pool.py).
+
+The worker reads one JSON job per line on stdin and writes one JSON result
+per line on stdout. Every job runs in a forked child with its own temp dir
+and rlimits, so the worker only pays interpreter start-up once.
+"""
+
+import json
+import os
+import resource
+import select
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import traceback
+
+# Modules imported once in the worker so forked runs get them for free
+PRELOAD_MODULES = (
+    "collections", "datetime", "decimal", "functools", "itertools",
+    "json", "math", "random", "re", "statistics", "string", "typing",
+)
+
+
+def _preload():
+    for name in PRELOAD_MODULES:
+        try:
+            __import__(name)
+        except ImportError:
+            pass
+
+
+def _apply_limits(job):
+    """Apply per-run resource limits inside the forked child"""
+    cpu = int(job.get("cpu_seconds", 30))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+
+    memory = int(job.get("memory_bytes", 0))
+    if memory > 0:
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+
+    files = int(job.get("max_open_files", 64))
+    resource.setrlimit(resource.RLIMIT_NOFILE, (files, files))
+
+    file_size = int(job.get("max_file_size_bytes", 0))
+    if file_size > 0:
+        resource.setrlimit(resource.RLIMIT_FSIZE, (file_size, file_size))
+
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+
+def _run_child(job, workdir, script_path, stdout_path, stderr_path):
+    """Body of the forked child - never returns"""
+    exit_code = 1
+    try:
+        os.setsid()
+
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        out_fd = os.open(stdout_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        err_fd = os.open(stderr_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.dup2(devnull, 0)
+        os.dup2(out_fd, 1)
+        os.dup2(err_fd, 2)
+        for fd in (devnull, out_fd, err_fd):
+            os.close(fd)
+
+        os.chdir(workdir)
+        os.environ.clear()
+        os.environ.update(job.get("environment") or {})
+        os.environ["HOME"] = workdir
+        os.environ["TMPDIR"] = workdir
+
+        _apply_limits(job)
+
+        sys.argv = [script_path]
+        sys.path[0] = workdir
+        with open(script_path, "r", encoding="utf-8") as f:
+            source = f.read()
+
+        namespace = {"__name__": "__main__", "__file__": script_path, "__builtins__": __builtins__}
+        try:
+            exec(compile(source, script_path, "exec"), namespace)
+            exit_code = 0
+        except SystemExit as e:
+            if e.code is None:
+                exit_code = 0
+            elif isinstance(e.code, int):
+                exit_code = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                exit_code = 1
+        except BaseException:
+            traceback.print_exc()
+            exit_code = 1
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except Exception:
+            pass
+        os._exit(exit_code & 0xFF)
+
+
+def _wait_child(pid, timeout):
+    """Wait for the child with a deadline. Returns (status, rusage, timed_out)"""
+    deadline = time.perf_counter() + timeout
+
+    pidfd = None
+    if hasattr(os, "pidfd_open"):
+        try:
+            pidfd = os.pidfd_open(pid)
+        except OSError:
+            pidfd = None
+
+    try:
+        while True:
+            wpid, status, rusage = os.wait4(pid, os.WNOHANG)
+            if wpid:
+                return status, rusage, False
+
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+
+            if pidfd is not None:
+                select.select([pidfd], [], [], remaining)
+            else:
+                time.sleep(min(0.002, remaining))
+    finally:
+        if pidfd is not None:
+            os.close(pidfd)
+
+    _kill_group(pid)
+    _, status, rusage = os.wait4(pid, 0)
+    return status, rusage, True
+
+
+def _kill_group(pid):
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _read_output(path, limit):
+    try:
+        with open(path, "rb") as f:
+            data = f.read(limit + 1)
+    except OSError:
+        return "", False
+    truncated = len(data) > limit
+    return data[:limit].decode("utf-8", errors="replace"), truncated
+
+
+def run_job(job):
+    """Run a single job in a forked, resource-limited child"""
+    workdir = tempfile.mkdtemp(prefix="sandbox_run_")
+    try:
+        script_path = os.path.join(workdir, job.get("filename", "main.py"))
+        stdout_path = os.path.join(workdir, ".stdout")
+        stderr_path = os.path.join(workdir, ".stderr")
+        with open(script_path, "w", encoding="utf-8") as f:
+            f.write(job.get("code", ""))
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        started = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            _run_child(job, workdir, script_path, stdout_path, stderr_path)
+
+        status, rusage, timed_out = _wait_child(pid, float(job.get("timeout", 30)))
+        wall_time = time.perf_counter() - started
+        _kill_group(pid)
+
+        limit = int(job.get("max_output_bytes", 1024 * 1024))
+        stdout, stdout_truncated = _read_output(stdout_path, limit)
+        stderr, stderr_truncated = _read_output(stderr_path, limit)
+
+        exit_code = os.waitstatus_to_exitcode(status)
+        signal_name = None
+        if exit_code < 0:
+            try:
+                signal_name = signal.Signals(-exit_code).name
+            except ValueError:
+                signal_name = str(-exit_code)
+
+        # ru_maxrss is KiB on Linux and bytes on macOS
+        peak_rss = rusage.ru_maxrss
+        if sys.platform == "darwin":
+            peak_rss //= 1024
+
+        return {
+            "exit_code": exit_code,
+            "signal": signal_name,
+            "timed_out": timed_out,
+            "stdout": stdout,
+            "stderr": stderr,
+            "truncated": stdout_truncated or stderr_truncated,
+            "wall_time": wall_time,
+            "cpu_time": rusage.ru_utime + rusage.ru_stime,
+            "peak_rss_kb": peak_rss,
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    _preload()
+    # Jobs come in on stdin; nothing else may write to the protocol stream
+    protocol_in = sys.stdin.buffer
+    protocol_out = sys.stdout.buffer
+
+    print(json.dumps({"ready": True, "pid": os.getpid()}), file=sys.stdout, flush=True)
+
+    while True:
+        line = protocol_in.readline()
+        if not line:
+            break
+        try:
+            job = json.loads(line)
+            result = run_job(job)
+        except Exception as e:
+            result = {"worker_error": f"{type(e).__name__}: {e}"}
+        protocol_out.write(json.dumps(result).encode("utf-8") + b"\n")
+        protocol_out.flush()
+
+
+if __name__ == "__main__":
+    main()
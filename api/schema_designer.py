@@ -62,7 +62,7 @@ Return a comprehensive schema design in JSON:
 }}"""
         
         try:
-            response = self.model.generate_content(prompt)
+            response = await self.model.generate_content_async(prompt)
             text = response.text.strip()
             
             # Extract JSON from response
@@ -11,6 +11,8 @@ from typing import Dict, List, Optional
 from dataclasses import dataclass, asdict
 import google.generativeai as genai
 
+from api.log_monitor import LogMatch, LogMonitor
+
 @dataclass
 class ErrorDetection:
     """Detected error information"""
@@ -58,26 +60,32 @@ class SelfRepairSystem:
             'database_error': r'DatabaseError|OperationalError',
             'api_error': r'API.*Error|HTTP.*Error|Status.*[45]\d\d'
         }
+        
+        # Tail-follows log files; all patterns are matched in one compiled regex
+        self.log_monitor = LogMonitor(self.error_patterns)
     
     async def monitor_logs(self, log_content: str) -> List[ErrorDetection]:
         """Monitor logs for errors"""
-        errors = []
-        lines = log_content.split('\n')
-        
-        for i, line in enumerate(lines):
-            for error_type, pattern in self.error_patterns.items():
-                if re.search(pattern, line, re.IGNORECASE):
-                    # Extract error details
-                    error = self._extract_error_details(line, lines[i:i+10], error_type)
-                    if error:
-                        errors.append(error)
+        matches = self.log_monitor.scan(log_content.split('\n'))
+        return [error for error in map(self._detection_from_match, matches) if error]
+    
+    async def monitor_log_files(self, paths: List[str]) -> List[ErrorDetection]:
+        """Detect errors appended to log files since the last call.
         
-        return errors
+        Only new bytes are read; repeated errors are deduplicated by stack
+        trace fingerprint and the number of events is rate limited.
+        """
+        self.last_check = datetime.now()
+        matches = await self.log_monitor.poll(paths)
+        return [error for error in map(self._detection_from_match, matches) if error]
+    
+    def _detection_from_match(self, match: LogMatch) -> Optional[ErrorDetection]:
+        return self._extract_error_details(match.line, match.context, match.error_type)
     
     def _extract_error_details(self, error_line: str, context_lines: List[str], error_type: str) -> Optional[ErrorDetection]:
         """Extract detailed error information"""
         # Parse stack trace
-        stack_trace = '\n'.join(context_lines[:10])
+        stack_trace = '\n'.join(context_lines)
         
         # Extract file and line number
         file_match = re.search(r'File "([^"]+)", line (\d+)', stack_trace)
@@ -285,7 +293,15 @@ Return ONLY a JSON object with this structure:
         """Automatically detect and repair errors"""
         # Detect errors
         errors = await self.monitor_logs(log_content)
-        
+        return await self.repair_errors(errors)
+    
+    async def auto_repair_files(self, paths: List[str]) -> Dict:
+        """Detect and repair errors appended to log files since the last check"""
+        errors = await self.monitor_log_files(paths)
+        return await self.repair_errors(errors)
+    
+    async def repair_errors(self, errors: List[ErrorDetection]) -> Dict:
+        """Generate and apply fixes for auto-fixable errors"""
         repairs_attempted = 0
         repairs_successful = 0
         
@@ -331,7 +347,8 @@ Return ONLY a JSON object with this structure:
                 if self.repair_history else 0
             ),
             'last_check': self.last_check.isoformat(),
-            'monitoring_active': self.monitoring_active
+            'monitoring_active': self.monitoring_active,
+            'log_monitor': self.log_monitor.get_stats()
         }
 
 # Global instance
@@ -0,0 +1,328 @@
+"""
+Server Profiler
+Opt-in, always-on sampling profiler for the API process itself
+
+A daemon thread wakes SERVER_PROFILER_HZ times a second (default 50),
+reads every thread's current frame with sys._current_frames() and counts
+the collapsed stack. Nothing is instrumented per call, so the only cost
+is the sampler's own CPU time, which is measured and reported.
+
+Samples are attributed to endpoints: ProfilerMiddleware tags each
+request's asyncio task with its ASGI scope, and the sampler looks up the
+task currently running on the event loop thread. The middleware also puts
+the scope in a context variable, which the AnyIO threadpool (sync routes)
+and asyncio.to_thread copy into their worker threads; while the profiler
+runs, work handed to either is wrapped so the worker thread records that
+scope for as long as it runs. Samples from other threads are grouped by
+thread name. Threads parked in known wait points (selector, locks, queue
+gets) count as idle and are left out of the hot function tables.
+
+Counts are kept in time buckets so reports cover a rolling window
+(SERVER_PROFILER_WINDOW seconds, default 300). Enable at startup with
+SERVER_PROFILER_ENABLED=1 or at runtime through the admin endpoint.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+import anyio.to_thread
+
+from superagent.modules.profile_runner import frame_label
+from superagent.modules.sampling_profiler import collapsed_lines, top_functions
+
+logger = logging.getLogger(__name__)
+
+# (file name, function) of leaf frames where a thread is waiting, not working
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("socket.py", "accept"),
+    ("profile_runner.py", "_run"),
+}
+MAX_DEPTH = 64
+
+# ASGI scope of the request the current code is serving
+_request_scope: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar(
+    "profiler_request_scope", default=None
+)
+_running_profilers: Set["ServerProfiler"] = set()
+_original_thread_runners: Dict[str, Callable] = {}
+
+
+def _run_in_request(func, *args, **kwargs):
+    """Run thread work, recording the request it serves for this thread"""
+    scope = _request_scope.get()
+    if scope is None or not _running_profilers:
+        return func(*args, **kwargs)
+    thread_id = threading.get_ident()
+    profilers = list(_running_profilers)
+    for profiler in profilers:
+        profiler._thread_scopes[thread_id] = scope
+    try:
+        return func(*args, **kwargs)
+    finally:
+        for profiler in profilers:
+            profiler._thread_scopes.pop(thread_id, None)
+
+
+async def _anyio_run_sync(func, *args, **kwargs):
+    return await _original_thread_runners["anyio"](functools.partial(_run_in_request, func), *args, **kwargs)
+
+
+async def _asyncio_to_thread(func, *args, **kwargs):
+    return await _original_thread_runners["asyncio"](_run_in_request, func, *args, **kwargs)
+
+
+def _install_thread_hooks() -> None:
+    # Both runners are looked up on their module at call time (Starlette's
+    # run_in_threadpool, asyncio.to_thread callers), so wrapping them there
+    # covers sync routes and offloaded work without touching call sites
+    if not _original_thread_runners:
+        _original_thread_runners["anyio"] = anyio.to_thread.run_sync
+        _original_thread_runners["asyncio"] = asyncio.to_thread
+        anyio.to_thread.run_sync = _anyio_run_sync
+        asyncio.to_thread = _asyncio_to_thread
+
+
+def _remove_thread_hooks() -> None:
+    if _original_thread_runners:
+        anyio.to_thread.run_sync = _original_thread_runners.pop("anyio")
+        asyncio.to_thread = _original_thread_runners.pop("asyncio")
+
+
+class ServerProfiler:
+    """Rolling, endpoint-aware stack sampler for the running server"""
+    
+    def __init__(self, hz: Optional[float] = None, window: Optional[float] = None,
+                 bucket_seconds: float = 10.0):
+        self.hz = hz or float(os.getenv("SERVER_PROFILER_HZ", "50"))
+        self.window = window or float(os.getenv("SERVER_PROFILER_WINDOW", "300"))
+        self.bucket_seconds = bucket_seconds
+        self.enabled = os.getenv("SERVER_PROFILER_ENABLED", "").lower() in ("1", "true", "yes")
+        self._buckets: Deque[Tuple[float, Counter]] = deque(maxlen=max(1, int(self.window / bucket_seconds) + 1))
+        self._lock = threading.Lock()
+        self._labels: Dict[Any, str] = {}
+        self._loops: Dict[int, asyncio.AbstractEventLoop] = {}
+        self._task_scopes: Dict[asyncio.Task, Dict[str, Any]] = {}
+        self._thread_scopes: Dict[int, Dict[str, Any]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._started_at = 0.0
+        self._sampler_cpu = 0.0
+        self.samples = 0
+        self.idle_samples = 0
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self, hz: Optional[float] = None) -> None:
+        """Start sampling (no-op if already running)"""
+        if hz:
+            self.hz = hz
+        if self.running:
+            return
+        self._stop.clear()
+        self._started_at = time.perf_counter()
+        self._sampler_cpu = 0.0
+        self._thread = threading.Thread(target=self._run, name="server-profiler", daemon=True)
+        _running_profilers.add(self)
+        _install_thread_hooks()
+        self._thread.start()
+        logger.info(f"🔥 Server profiler sampling at {self.hz:g} Hz")
+    
+    def stop(self) -> None:
+        """Stop sampling; collected data stays available"""
+        self._stop.set()
+        _running_profilers.discard(self)
+        if not _running_profilers:
+            _remove_thread_hooks()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self.samples = 0
+            self.idle_samples = 0
+    
+    # ---- request attribution ----
+    
+    def tag_request(self, scope: Dict[str, Any]) -> None:
+        """Attribute samples of the current asyncio task to this request"""
+        task = asyncio.current_task()
+        if task is None:
+            return
+        self._loops[threading.get_ident()] = asyncio.get_running_loop()
+        self._task_scopes[task] = scope
+        task.add_done_callback(self._untag)
+    
+    def _untag(self, task: asyncio.Task) -> None:
+        self._task_scopes.pop(task, None)
+    
+    @staticmethod
+    def endpoint_name(scope: Dict[str, Any]) -> str:
+        # The router records the matched route on the scope; use its template
+        # so /items/1 and /items/2 aggregate together
+        route = scope.get("route")
+        path = getattr(route, "path", None) or scope.get("path", "?")
+        return f"{scope.get('method', '')} {path}".strip()
+    
+    def _endpoint(self, thread_id: int) -> str:
+        scope = self._thread_scopes.get(thread_id)
+        if scope is not None:
+            # Worker thread running a sync route or offloaded request work
+            return self.endpoint_name(scope)
+        loop = self._loops.get(thread_id)
+        if loop is not None:
+            current_tasks = getattr(asyncio.tasks, "_current_tasks", {})
+            scope = self._task_scopes.get(current_tasks.get(loop))
+            return self.endpoint_name(scope) if scope is not None else "<event loop>"
+        thread = threading._active.get(thread_id)
+        return f"<thread {thread.name}>" if thread else "<thread>"
+    
+    # ---- sampling ----
+    
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            if len(self._labels) > 50_000:
+                self._labels.clear()
+            label = self._labels[code] = frame_label(code)
+        return label
+    
+    def _collapse(self, frame) -> str:
+        labels = []
+        while frame is not None and len(labels) < MAX_DEPTH:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        labels.reverse()
+        return ";".join(labels)
+    
+    def sample_once(self) -> None:
+        """Take one sample of every thread except the sampler"""
+        me = threading.get_ident()
+        now = time.time()
+        found = Counter()
+        idle = 0
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == me:
+                continue
+            code = frame.f_code
+            if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                idle += 1
+                continue
+            found[(self._endpoint(thread_id), self._collapse(frame))] += 1
+        
+        with self._lock:
+            if not self._buckets or now - self._buckets[-1][0] >= self.bucket_seconds:
+                self._buckets.append((now, Counter()))
+            self._buckets[-1][1].update(found)
+            self.samples += sum(found.values())
+            self.idle_samples += idle
+    
+    def _run(self) -> None:
+        interval = 1.0 / self.hz
+        next_at = time.perf_counter()
+        while not self._stop.is_set():
+            cpu = time.thread_time()
+            try:
+                self.sample_once()
+            except Exception as e:
+                logger.debug(f"Profiler sample failed: {e}")
+            self._sampler_cpu += time.thread_time() - cpu
+            next_at += interval
+            delay = next_at - time.perf_counter()
+            if delay < 0:
+                # Fell behind (e.g. GIL contention): skip missed ticks
+                next_at, delay = time.perf_counter(), 0
+            self._stop.wait(delay)
+    
+    # ---- reports ----
+    
+    def _window_counts(self, window: Optional[float] = None) -> Counter:
+        cutoff = time.time() - (window or self.window)
+        merged = Counter()
+        with self._lock:
+            for started, counts in self._buckets:
+                if started + self.bucket_seconds >= cutoff:
+                    merged.update(counts)
+        return merged
+    
+    def overhead_percent(self) -> float:
+        """Sampler CPU time as a percentage of wall time since start"""
+        if not self._started_at:
+            return 0.0
+        elapsed = time.perf_counter() - self._started_at
+        return 100 * self._sampler_cpu / elapsed if elapsed > 0 else 0.0
+    
+    def report(self, top: int = 20, endpoint: Optional[str] = None,
+               window: Optional[float] = None) -> Dict[str, Any]:
+        """Hot functions (overall or for one endpoint) over the rolling window"""
+        counts = self._window_counts(window)
+        per_endpoint = Counter()
+        stacks = Counter()
+        for (name, stack), count in counts.items():
+            per_endpoint[name] += count
+            if endpoint is None or name == endpoint:
+                stacks[stack] += count
+        total = sum(per_endpoint.values()) or 1
+        per_sample = 1.0 / self.hz
+        
+        return {
+            "running": self.running,
+            "hz": self.hz,
+            "window_seconds": window or self.window,
+            "samples": sum(stacks.values()),
+            "idle_samples": self.idle_samples,
+            "overhead_percent": round(self.overhead_percent(), 3),
+            "endpoints": [
+                {"endpoint": name, "samples": count, "percent": round(100 * count / total, 2)}
+                for name, count in per_endpoint.most_common(top)
+            ],
+            "endpoint": endpoint,
+            "top_functions": top_functions(stacks, per_sample, top),
+            "top_self": top_functions(stacks, per_sample, top, by="self"),
+        }
+    
+    def collapsed(self, endpoint: Optional[str] = None, window: Optional[float] = None) -> List[str]:
+        """Collapsed stacks rooted at their endpoint, ready for flamegraph.pl or speedscope"""
+        stacks = Counter()
+        for (name, stack), count in self._window_counts(window).items():
+            if endpoint is None or name == endpoint:
+                stacks[f"{name};{stack}"] += count
+        return collapsed_lines(stacks)
+
+
+class ProfilerMiddleware:
+    """ASGI middleware tagging request tasks for endpoint attribution"""
+    
+    def __init__(self, app, profiler: Optional[ServerProfiler] = None):
+        self.app = app
+        self.profiler = profiler or server_profiler
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.running:
+            await self.app(scope, receive, send)
+            return
+        self.profiler.tag_request(scope)
+        token = _request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_scope.reset(token)
+
+
+# Global server profiler instance
+server_profiler = ServerProfiler()
@@ -3,7 +3,7 @@ Real-Time STREAMING Build API - Like Manus/Replit/Cursor
 Streams AI responses token-by-token in real-time with Enterprise Build System
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, Union
@@ -15,6 +15,9 @@ from datetime import datetime
 import google.generativeai as genai
 from asyncio import Queue
 
+from api.preview_cache import preview_cache
+from api.sse_streaming import StreamStats, coalesce, gemini_text_chunks, sse_event
+
 router = APIRouter(prefix="/api/v1", tags=["Streaming Build"])
 
 def _analyze_project_type(files_created: list, project_dir: str) -> dict:
@@ -166,22 +169,11 @@ class StreamingBuildRequest(BaseModel):
     auto_deploy: bool = False
 
 async def stream_log_message(message: str, icon: str = ''):
-    """Stream a log message smoothly like a chat conversation"""
+    """Stream a log message as a log-stream entry (one delta, then complete)"""
     log_id = str(uuid.uuid4())
-    
-    # Split message into words for smooth streaming
-    words = message.split(' ')
-    
-    for i, word in enumerate(words):
-        # Add space before word (except first word)
-        text = (' ' + word) if i > 0 else word
-        
-        yield f"data: {json.dumps({'type': 'log-stream', 'id': log_id, 'delta': text, 'icon': icon if i == 0 else ''})}\n\n"
-        await asyncio.sleep(0.015)  # Small delay for smooth streaming effect
-    
+    yield sse_event({'type': 'log-stream', 'id': log_id, 'delta': message, 'icon': icon})
     # Mark as complete (removes typing cursor)
-    yield f"data: {json.dumps({'type': 'log-stream', 'id': log_id, 'complete': True})}\n\n"
-    await asyncio.sleep(0.05)
+    yield sse_event({'type': 'log-stream', 'id': log_id, 'complete': True})
 
 async def stream_build_progress(instruction: str, plan_mode: bool, enterprise_mode: bool):
     """Stream build progress in real-time using Enterprise Build System"""
@@ -287,6 +279,21 @@ async def stream_build_progress(instruction: str, plan_mode: bool, enterprise_mo
                     'percent': percent
                 })
             
+            # Preview becomes available once E2E passed, before optional stages (security scan etc.) finish
+            async def preview_callback(preview_url: Optional[str]):
+                if preview_url is None:
+                    # The build failed after the preview was delivered
+                    await progress_queue.put({
+                        'type': 'preview_revoked',
+                        'message': '⚠️ Preview withdrawn: the build failed'
+                    })
+                    return
+                await progress_queue.put({
+                    'type': 'preview',
+                    'preview_url': preview_url,
+                    'message': f'👁️ Preview ready: {preview_url}'
+                })
+            
             # Background task to run enterprise build
             async def run_build():
                 try:
@@ -297,7 +304,8 @@ async def stream_build_progress(instruction: str, plan_mode: bool, enterprise_mo
                         enable_testing=True,
                         enable_security_scan=True,
                         enable_multi_file=True,
-                        progress_callback=progress_callback
+                        progress_callback=progress_callback,
+                        preview_callback=preview_callback
                     )
                     build_complete['result'] = result
                 except Exception as e:
@@ -309,29 +317,35 @@ async def stream_build_progress(instruction: str, plan_mode: bool, enterprise_mo
             # Start the build in background
             build_task = asyncio.create_task(run_build())
             
-            # Stream progress updates as they arrive
-            while True:
-                try:
-                    # Wait for next progress update (with timeout)
-                    update = await asyncio.wait_for(progress_queue.get(), timeout=1.0)
+            # Stream progress updates as they arrive; a disconnected client cancels the build
+            try:
+                while True:
+                    try:
+                        # Wait for next progress update (with timeout)
+                        update = await asyncio.wait_for(progress_queue.get(), timeout=1.0)
                     
-                    if update is None:  # Build complete signal
-                        break
+                        if update is None:  # Build complete signal
+                            break
                     
-                    # Send the progress update to frontend
-                    yield f"data: {json.dumps(update)}\n\n"
+                        # Send the progress update to frontend
+                        yield f"data: {json.dumps(update)}\n\n"
                     
-                    # Update step status based on percentage
-                    percent = update.get('percent', 0)
-                    step = max(1, min(5, (percent // 20) + 1))
-                    status = 'active' if percent < 100 else 'complete'
-                    yield f"data: {json.dumps({'type': 'step', 'step': step, 'status': status})}\n\n"
+                        # Update step status based on percentage
+                        if 'percent' in update:
+                            percent = update['percent']
+                            step = max(1, min(5, (percent // 20) + 1))
+                            status = 'active' if percent < 100 else 'complete'
+                            yield f"data: {json.dumps({'type': 'step', 'step': step, 'status': status})}\n\n"
                     
-                except asyncio.TimeoutError:
-                    # No update in 1 second, send heartbeat
-                    if build_complete['done']:
-                        break
-                    continue
+                    except asyncio.TimeoutError:
+                        # No update in 1 second, send heartbeat
+                        if build_complete['done']:
+                            break
+                        continue
+            
+            except (asyncio.CancelledError, GeneratorExit):
+                build_task.cancel()
+                raise
             
             # Wait for build task to complete
             await build_task
@@ -410,8 +424,14 @@ Requirements:
 
 Return ONLY the complete HTML code."""
             
-            response = model.generate_content(prompt)
-            generated_code = response.text
+            # Forward the code to the client as the model writes it
+            stats = StreamStats("simple_build")
+            parts = []
+            async for text in coalesce(gemini_text_chunks(model, prompt), stats=stats):
+                parts.append(text)
+                yield sse_event({'type': 'code-stream', 'delta': text})
+            generated_code = ''.join(parts)
+            stats.log()
             
             # Save file
             build_id = str(uuid.uuid4())[:8]
@@ -427,7 +447,7 @@ Return ONLY the complete HTML code."""
             async for chunk in stream_log_message(f'💾 Saved as {filename}', '💾'):
                 yield chunk
             yield f"data: {json.dumps({'type': 'preview', 'url': f'/preview/{filename}'})}\n\n"
-            yield f"data: {json.dumps({'type': 'complete', 'filename': filename})}\n\n"
+            yield sse_event({'type': 'complete', 'filename': filename, 'stats': stats.to_dict()})
             
         except Exception as e:
             async for chunk in stream_log_message(f'❌ Error: {str(e)}', '❌'):
@@ -435,9 +455,8 @@ Return ONLY the complete HTML code."""
             yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
 
 @router.get("/preview/{project_name}/{file_path:path}")
-async def preview_static_file(project_name: str, file_path: str):
-    """Serve static files for preview (HTML/CSS/JS only)"""
-    from fastapi.responses import FileResponse, HTMLResponse
+async def preview_static_file(project_name: str, file_path: str, request: Request):
+    """Serve static files for preview (HTML/CSS/JS only) from the preview cache"""
     from fastapi import HTTPException
     import os
     
@@ -459,22 +478,11 @@ async def preview_static_file(project_name: str, file_path: str):
     if not os.path.abspath(full_path).startswith(os.path.abspath(project_dir)):
         raise HTTPException(status_code=403, detail="Access denied")
     
-    if not os.path.exists(full_path):
+    asset = preview_cache.get(full_path)
+    if asset is None:
         raise HTTPException(status_code=404, detail="File not found")
     
-    # Determine media type
-    if file_path.endswith('.html'):
-        media_type = 'text/html'
-    elif file_path.endswith('.css'):
-        media_type = 'text/css'
-    elif file_path.endswith('.js'):
-        media_type = 'application/javascript'
-    elif file_path.endswith('.json'):
-        media_type = 'application/json'
-    else:
-        media_type = 'text/plain'
-    
-    return FileResponse(full_path, media_type=media_type)
+    return preview_cache.response(asset, request.headers)
 
 @router.get("/download-project/{project_name}")
 async def download_project(project_name: str):
@@ -1,36 +1,250 @@
 """
 Structured Logging
 Production-grade logging system
+
+Records are handed to a background writer thread through a bounded queue,
+so request paths never block on formatting or file I/O. The writer
+batches writes, rotates the log file by size and age, and counts records
+dropped when the queue is full. Noisy event types can be sampled or rate
+limited (LOG_SAMPLING="cache_hit=0.01", LOG_RATE_LIMITS="websocket_message=20").
 """
+import atexit
 import logging
 import json
+import os
+import queue
+import sys
+import threading
+import time
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 
+
+def _parse_event_map(value: Optional[str]) -> Dict[str, float]:
+    """Parse "event=number,event=number" settings"""
+    result = {}
+    for item in (value or "").split(","):
+        if "=" in item:
+            event, number = item.split("=", 1)
+            try:
+                result[event.strip()] = float(number)
+            except ValueError:
+                continue
+    return result
+
+
+class EventThrottle:
+    """Per-event-type sampling and rate limiting for noisy low-level events"""
+    
+    def __init__(self, sampling: Optional[Dict[str, float]] = None,
+                 rate_limits: Optional[Dict[str, float]] = None):
+        self.sampling: Dict[str, float] = dict(sampling or {})
+        self.rate_limits: Dict[str, float] = dict(rate_limits or {})
+        self._seen: Dict[str, int] = {}
+        self._buckets: Dict[str, List[float]] = {}  # event -> [tokens, last refill]
+        self._lock = threading.Lock()
+        self.sampled_out = 0
+        self.rate_limited = 0
+    
+    def allow(self, event: str) -> bool:
+        """Whether a record of this event type should be logged"""
+        rate = self.sampling.get(event)
+        limit = self.rate_limits.get(event)
+        if rate is None and limit is None:
+            return True
+        
+        with self._lock:
+            if rate is not None:
+                # Deterministic 1-in-N sampling that keeps the first occurrence
+                every = max(1, round(1 / rate)) if rate > 0 else 0
+                seen = self._seen.get(event, 0)
+                self._seen[event] = seen + 1
+                if every == 0 or seen % every:
+                    self.sampled_out += 1
+                    return False
+            
+            if limit is not None:
+                # Token bucket holding up to one second's worth of records
+                now = time.monotonic()
+                tokens, last = self._buckets.get(event, [limit, now])
+                tokens = min(limit, tokens + (now - last) * limit)
+                if tokens < 1:
+                    self._buckets[event] = [tokens, now]
+                    self.rate_limited += 1
+                    return False
+                self._buckets[event] = [tokens - 1, now]
+        return True
+
+
+class RotatingLogWriter:
+    """Appends batches to a log file, rotating it by size and by age"""
+    
+    def __init__(self, path: str, max_bytes: int, max_age: float, backup_count: int):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backup_count = backup_count
+        self.rotations = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+        self._opened_at = time.time()
+    
+    def write(self, lines: List[str]) -> None:
+        data = "".join(line + "\n" for line in lines)
+        if self._size and (
+            (self.max_bytes and self._size + len(data) > self.max_bytes)
+            or (self.max_age and time.time() - self._opened_at >= self.max_age)
+        ):
+            self.rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+    
+    def rotate(self) -> None:
+        """superagent.log -> superagent.log.1 -> ... -> superagent.log.N (oldest dropped)"""
+        self._file.close()
+        for index in range(self.backup_count - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{index}")
+            if source.exists():
+                source.replace(self.path.with_name(f"{self.path.name}.{index + 1}"))
+        if self.backup_count > 0:
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = 0
+        self._opened_at = time.time()
+        self.rotations += 1
+    
+    def close(self) -> None:
+        self._file.close()
+
+
+class QueueLogHandler(logging.Handler):
+    """Enqueues records for a background thread that formats and writes them in batches"""
+    
+    def __init__(self, writer: RotatingLogWriter, console: bool = True, max_queue: int = 10000,
+                 batch_size: int = 256, flush_interval: float = 0.2):
+        super().__init__()
+        self.writer = writer
+        self.console = console
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.json_formatter = JsonFormatter()
+        self.color_formatter = ColorFormatter()
+        self.queue: "queue.Queue[Optional[logging.LogRecord]]" = queue.Queue(maxsize=max_queue)
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="structured-log-writer", daemon=True)
+        self._thread.start()
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        # Resolve the message now; its arguments may change after we return
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+    
+    def flush(self, timeout: float = 5.0) -> None:
+        """Block until everything enqueued so far has been written"""
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and time.monotonic() < deadline and self._thread.is_alive():
+            time.sleep(0.005)
+    
+    def close(self) -> None:
+        if not self._stopped:
+            self._stopped = True
+            self.queue.put(None)
+            self._thread.join(timeout=5)
+            self.writer.close()
+        super().close()
+    
+    def _run(self) -> None:
+        while True:
+            record = self.queue.get()
+            batch = [record]
+            deadline = time.monotonic() + self.flush_interval
+            while record is not None and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    record = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(record)
+            
+            records = [r for r in batch if r is not None]
+            try:
+                self._write(records)
+            except Exception:
+                pass  # logging must never take the process down
+            for _ in batch:
+                self.queue.task_done()
+            if len(records) != len(batch):
+                return
+    
+    def _write(self, records: List[logging.LogRecord]) -> None:
+        if not records:
+            return
+        self.writer.write([self.json_formatter.format(record) for record in records])
+        if self.console:
+            sys.stderr.write("".join(self.color_formatter.format(record) + "\n" for record in records))
+            sys.stderr.flush()
+        self.written += len(records)
+        self.batches += 1
+
+
 class StructuredLogger:
     """Production-grade structured logging"""
     
-    def __init__(self, name: str = "SuperAgent"):
+    def __init__(self, name: str = "SuperAgent", log_dir: Optional[str] = None, console: bool = True):
         self.name = name
         self.logger = logging.getLogger(name)
         self.logger.setLevel(logging.INFO)
         
         # Create logs directory
-        Path("logs").mkdir(exist_ok=True)
+        log_dir = log_dir or os.getenv("LOG_DIR", "logs")
+        Path(log_dir).mkdir(parents=True, exist_ok=True)
         
-        # File handler with JSON formatting
-        file_handler = logging.FileHandler("logs/superagent.log")
-        file_handler.setFormatter(JsonFormatter())
-        self.logger.addHandler(file_handler)
+        # JSON file and console output, both written off the caller's thread
+        writer = RotatingLogWriter(
+            os.path.join(log_dir, "superagent.log"),
+            max_bytes=int(os.getenv("LOG_MAX_BYTES", str(20 * 1024 * 1024))),
+            max_age=float(os.getenv("LOG_ROTATE_SECONDS", "86400")),
+            backup_count=int(os.getenv("LOG_BACKUP_COUNT", "5")),
+        )
+        self.handler = QueueLogHandler(writer, console=console,
+                                       max_queue=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+        self.logger.addHandler(self.handler)
         
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(ColorFormatter())
-        self.logger.addHandler(console_handler)
+        # Sampling and rate limits for noisy events (never applied to warnings and above)
+        self.throttle = EventThrottle(
+            _parse_event_map(os.getenv("LOG_SAMPLING")),
+            _parse_event_map(os.getenv("LOG_RATE_LIMITS")),
+        )
+        atexit.register(self.close)
     
     def log(self, level: str, message: str, **kwargs):
-        """Log structured message"""
+        """Log structured message.
+        
+        Debug/info records are subject to sampling and rate limits keyed by
+        the ``event`` field (or the message text when there is none).
+        """
+        if level in ("debug", "info") and not self.throttle.allow(kwargs.get("event", message)):
+            return
+        
         extra = {
             "timestamp": datetime.utcnow().isoformat(),
             "logger": self.name,
@@ -67,6 +281,36 @@ class StructuredLogger:
     def critical(self, message: str, **kwargs):
         """Log critical message"""
         self.log("critical", message, **kwargs)
+    
+    def set_sampling(self, event: str, rate: float):
+        """Keep roughly ``rate`` (0..1) of the records of an event type"""
+        self.throttle.sampling[event] = rate
+    
+    def set_rate_limit(self, event: str, per_second: float):
+        """Log at most ``per_second`` records of an event type per second"""
+        self.throttle.rate_limits[event] = per_second
+    
+    def flush(self):
+        """Wait until queued records are written"""
+        self.handler.flush()
+    
+    def close(self):
+        """Drain the queue and stop the writer thread"""
+        self.logger.removeHandler(self.handler)
+        self.handler.close()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue, writer and throttling counters"""
+        return {
+            "enqueued": self.handler.enqueued,
+            "written": self.handler.written,
+            "dropped": self.handler.dropped,
+            "queued": self.handler.queue.qsize(),
+            "batches": self.handler.batches,
+            "rotations": self.handler.writer.rotations,
+            "sampled_out": self.throttle.sampled_out,
+            "rate_limited": self.throttle.rate_limited,
+        }
 
 class JsonFormatter(logging.Formatter):
     """JSON formatter for structured logs"""
@@ -91,10 +335,13 @@ class JsonFormatter(logging.Formatter):
                           "levelname", "levelno", "lineno", "module", "msecs",
                           "message", "pathname", "process", "processName",
                           "relativeCreated", "thread", "threadName", "exc_info",
-                          "exc_text", "stack_info", "timestamp", "logger"]:
+                          "exc_text", "stack_info", "timestamp", "logger",
+                          "taskName"]:
                 log_data[key] = value
+        if record.exc_text:
+            log_data["exception"] = record.exc_text
         
-        return json.dumps(log_data)
+        return json.dumps(log_data, default=str)
 
 class ColorFormatter(logging.Formatter):
     """Colored formatter for console output"""
@@ -112,7 +359,7 @@ class ColorFormatter(logging.Formatter):
         color = self.COLORS.get(record.levelname, self.COLORS["RESET"])
         reset = self.COLORS["RESET"]
         
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = datetime.fromtimestamp(record.created).strftime("%Y-%m-%d %H:%M:%S")
         return f"{color}[{timestamp}] {record.levelname:8s}{reset} {record.getMessage()}"
 
 # Global logger instance
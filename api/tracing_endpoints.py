@@ -0,0 +1,41 @@
+"""
+Tracing API Endpoints
+Inspect build traces, export them as OTLP and view latency/cost profiles
+"""
+from fastapi import APIRouter, HTTPException, Query
+from superagent.core.tracing import tracer
+
+router = APIRouter(prefix="/api/v1/traces", tags=["tracing"])
+
+
+@router.get("")
+async def list_traces(limit: int = Query(20, ge=1, le=200)):
+    """List the most recent traces"""
+    return {"traces": tracer.recent_traces(limit)}
+
+
+@router.get("/profile")
+async def get_profile(window_seconds: int = Query(3600, ge=60, le=30 * 24 * 3600)):
+    """p50/p95 latency and token profiles per build stage and LLM provider"""
+    return tracer.aggregate(window_seconds)
+
+
+@router.get("/{trace_id}")
+async def get_trace(trace_id: str):
+    """Get all spans of a trace"""
+    spans = tracer.get_trace(trace_id)
+    if not spans:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return {"trace_id": trace_id, "spans": spans}
+
+
+@router.get("/{trace_id}/otlp")
+async def export_trace(trace_id: str):
+    """Export a trace as OpenTelemetry OTLP/JSON"""
+    spans = tracer.get_trace(trace_id)
+    if not spans:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return tracer.export_otlp(spans)
+
+
+tracing_router = router
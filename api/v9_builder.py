@@ -4,9 +4,12 @@ Next.js 15 + TypeScript + Tailwind + shadcn/ui + Supabase + Stripe
 Production-ready apps in under 12 minutes
 """
 import os
+import re
 import json
+import time
+import random
 import asyncio
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Callable, Dict, List, Optional
 from api.rate_limit_failover import get_rate_limit_tracker
 import google.generativeai as genai
 
@@ -96,6 +99,50 @@ class SuperAgentV9Builder:
         self.system_prompt = SUPER_AGENT_V9_PROMPT
         self.tech_stack = V9_TECH_STACK
         self.build_time_limit = 720  # 12 minutes in seconds
+        self.model_name = 'gemini-2.0-flash-exp'
+        self.max_concurrency = max(1, int(os.getenv("V9_MAX_CONCURRENCY", "6")))
+        self.max_retries = max(0, int(os.getenv("V9_FILE_RETRIES", "2")))
+        self.retry_base_delay = 1.0
+        self._configured_key: Optional[str] = None
+    
+    def _configure(self) -> None:
+        """Configure the Gemini SDK once (again only if the API key changes)"""
+        api_key = os.getenv("GEMINI_API_KEY")
+        if api_key != self._configured_key:
+            genai.configure(api_key=api_key)
+            self._configured_key = api_key
+    
+    def _build_shared_context(self, plan: Dict, instruction: str) -> str:
+        """Project context shared by every file prompt, built once per plan"""
+        file_list = "\n".join(
+            f"- {file_plan['path']}: {file_plan.get('description', file_plan.get('type', ''))}"
+            for file_plan in plan['files']
+        )
+        return f"""{self.system_prompt}
+
+PROJECT: {plan['project_name']}
+USER REQUEST: "{instruction}"
+TECH STACK: {json.dumps(self.tech_stack)}
+
+PROJECT FILES (keep imports and names consistent across them):
+{file_list}
+
+REQUIREMENTS:
+✅ TypeScript with strict type safety
+✅ Tailwind CSS for styling (dark mode support)
+✅ shadcn/ui components when applicable
+✅ Supabase client for database operations
+✅ Zod validation for all forms
+✅ Server Actions for mutations
+✅ Error boundaries and loading states
+✅ Fully responsive design
+✅ Production-ready code (no TODOs or placeholders)"""
+    
+    def _create_file_model(self, shared_context: str):
+        """Model whose system instruction carries the shared context, so every
+        file request starts with an identical, cacheable prefix"""
+        self._configure()
+        return genai.GenerativeModel(self.model_name, system_instruction=shared_context)
     
     async def build_v9_app(self, instruction: str, requirements: Optional[Dict] = None) -> Dict:
         """
@@ -117,6 +164,7 @@ class SuperAgentV9Builder:
         print(f"📋 Instruction: {instruction}")
         print(f"⚡ Tech Stack: {json.dumps(self.tech_stack, indent=2)}")
         
+        started = time.perf_counter()
         try:
             # Phase 1: Planning
             print("\n" + "="*70)
@@ -162,7 +210,7 @@ class SuperAgentV9Builder:
                 "deploy_command": deploy_info['command'],
                 "deploy_url": deploy_info['url'],
                 "tech_stack": self.tech_stack,
-                "build_time": 180,  # Estimated 3 minutes
+                "build_time": round(time.perf_counter() - started, 2),
                 "quality_score": 99.5,
                 "v9_features": {
                     "next_js_15": True,
@@ -213,15 +261,14 @@ Think carefully and output ONLY valid JSON:"""
 
         # Use Gemini for planning
         try:
-            genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-            model = genai.GenerativeModel('gemini-2.0-flash-exp')
-            response = model.generate_content(planning_prompt)
+            self._configure()
+            model = genai.GenerativeModel(self.model_name)
+            response = await model.generate_content_async(planning_prompt)
             response_text = response.text
         except:
             response_text = "{}"
         
         # Parse JSON response
-        import re
         json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
         if json_match:
             try:
@@ -248,58 +295,69 @@ Think carefully and output ONLY valid JSON:"""
         
         return plan
     
-    async def _generate_all_files(self, plan: Dict, instruction: str) -> List[Dict]:
-        """Generate all project files in parallel"""
+    async def _generate_all_files(self, plan: Dict, instruction: str,
+                                  on_file: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """Generate all project files in parallel, preserving plan order"""
         files = []
+        async for file in self.stream_generated_files(plan, instruction):
+            files.append(file)
+            if on_file:
+                on_file(file)
+        return files
+    
+    async def stream_generated_files(self, plan: Dict, instruction: str) -> AsyncIterator[Dict]:
+        """
+        Generate every planned file concurrently (bounded by max_concurrency)
+        and yield each one, in plan order, as soon as it and all files before
+        it are done
+        """
+        shared_context = self._build_shared_context(plan, instruction)
+        model = self._create_file_model(shared_context)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
         
-        # Generate each file
-        for file_plan in plan['files'][:10]:  # Limit to first 10 for demo
-            file_content = await self._generate_file(file_plan, plan, instruction)
-            files.append({
+        async def generate(file_plan: Dict) -> Dict:
+            async with semaphore:
+                content = await self._generate_file(model, file_plan)
+            return {
                 "path": file_plan['path'],
-                "content": file_content,
+                "content": content,
                 "type": file_plan.get('type', 'code')
-            })
+            }
         
-        return files
+        tasks = [asyncio.create_task(generate(file_plan)) for file_plan in plan['files']]
+        try:
+            for task in tasks:
+                yield await task
+        finally:
+            # Consumer stopped early or the build was cancelled
+            for task in tasks:
+                task.cancel()
     
-    async def _generate_file(self, file_plan: Dict, full_plan: Dict, instruction: str) -> str:
-        """Generate a single file with V9 quality"""
+    async def _generate_file(self, model, file_plan: Dict) -> str:
+        """Generate a single file with V9 quality, retrying with backoff"""
         
-        file_prompt = f"""{self.system_prompt}
-
-PROJECT: {full_plan['project_name']}
-USER REQUEST: "{instruction}"
-TECH STACK: {json.dumps(self.tech_stack)}
-
-GENERATE FILE: {file_plan['path']}
+        file_prompt = f"""GENERATE FILE: {file_plan['path']}
 DESCRIPTION: {file_plan.get('description', 'Part of the application')}
 
-REQUIREMENTS:
-✅ TypeScript with strict type safety
-✅ Tailwind CSS for styling (dark mode support)
-✅ shadcn/ui components when applicable
-✅ Supabase client for database operations
-✅ Zod validation for all forms
-✅ Server Actions for mutations
-✅ Error boundaries and loading states
-✅ Fully responsive design
-✅ Production-ready code (no TODOs or placeholders)
-
 Generate the COMPLETE file contents. Output ONLY the code, no explanations:"""
 
         # Use Gemini for file generation
-        try:
-            genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-            model = genai.GenerativeModel('gemini-2.0-flash-exp')
-            response = model.generate_content(file_prompt)
-            content = response.text
-        except Exception as e:
-            print(f"File generation error: {e}")
-            content = f"// Error generating {file_plan['path']}: {e}"
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await model.generate_content_async(file_prompt)
+                content = response.text
+                break
+            except Exception as e:
+                if "429" in str(e) or "quota" in str(e).lower():
+                    get_rate_limit_tracker().mark_rate_limited("gemini", reset_seconds=60)
+                if attempt == self.max_retries:
+                    print(f"File generation error: {e}")
+                    content = f"// Error generating {file_plan['path']}: {e}"
+                    break
+                delay = self.retry_base_delay * (2 ** attempt)
+                await asyncio.sleep(delay + random.uniform(0, delay / 2))
         
         # Clean markdown code fences
-        import re
         content = re.sub(r'^```[\w]*\n', '', content)
         content = re.sub(r'\n```$', '', content)
         
@@ -307,9 +365,6 @@ Generate the COMPLETE file contents. Output ONLY the code, no explanations:"""
     
     async def _write_project_files(self, files: List[Dict], instruction: str) -> str:
         """Write all files to disk"""
-        import time
-        import re
-        
         # Create project directory
         project_name = re.sub(r'[^a-z0-9]+', '_', instruction.lower())[:30]
         project_name = f"v9_{project_name}_{int(time.time())}"
@@ -0,0 +1 @@
+"""Offline, reproducible benchmark suite for SuperAgent."""
@@ -0,0 +1,165 @@
+"""Deterministic LLM provider for offline benchmarks."""
+
+import asyncio
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import structlog
+
+from superagent.core.llm import LLMProvider
+
+logger = structlog.get_logger()
+
+
+def response_key(prompt: str, system: Optional[str] = None) -> str:
+    """Stable key identifying a (system, prompt) pair in a recordings file."""
+    return hashlib.sha256(f"{system or ''}\x00{prompt}".encode()).hexdigest()[:24]
+
+
+class NullCache:
+    """Cache stand-in that never hits, so every iteration does the real work."""
+
+    async def get(self, key: str) -> Optional[Any]:
+        return None
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        return None
+
+    def _generate_key(self, *args, **kwargs) -> str:
+        return hashlib.sha256(repr((args, kwargs)).encode()).hexdigest()
+
+
+class FakeLLMProvider(LLMProvider):
+    """
+    Offline LLM provider returning recorded or canned responses.
+
+    Responses are looked up by ``response_key(prompt, system)`` in the
+    recordings first; anything not recorded gets a deterministic canned
+    response chosen from the prompt (plans, supervisor verdicts, JSON
+    answers or generated code). An optional fixed latency per call models
+    provider round trips without making results depend on the network.
+    """
+
+    def __init__(self, recordings: Optional[Dict[str, str]] = None, latency_ms: float = 0.0):
+        """Initialize fake provider.
+
+        Args:
+            recordings: Mapping of response keys to recorded responses
+            latency_ms: Simulated latency added to every call
+        """
+        super().__init__(api_key="offline-benchmark", model="fake-recorded")
+        self.recordings = dict(recordings or {})
+        self.latency_ms = latency_ms
+        self.calls = 0
+        self.recorded_hits = 0
+
+    @classmethod
+    def from_file(cls, path: str, latency_ms: float = 0.0) -> "FakeLLMProvider":
+        """Load recordings from JSON: ``{"responses": {response_key: text}}``."""
+        recordings = json.loads(Path(path).read_text())
+        return cls(recordings=recordings.get("responses", recordings), latency_ms=latency_ms)
+
+    async def generate(self, prompt: str, system: Optional[str] = None,
+                       temperature: Optional[float] = None,
+                       max_tokens: Optional[int] = None) -> str:
+        """Return the recorded or canned response for a prompt."""
+        self.calls += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+        key = response_key(prompt, system)
+        if key in self.recordings:
+            self.recorded_hits += 1
+            response = self.recordings[key]
+        else:
+            response = self._canned_response(prompt, system or "")
+
+        prompt_tokens = (len(prompt) + len(system or "")) // 4
+        output_tokens = len(response) // 4
+        self.prompt_tokens_used += prompt_tokens
+        self.output_tokens_used += output_tokens
+        self.total_tokens_used += prompt_tokens + output_tokens
+        self.total_calls += 1
+        return response
+
+    async def stream_generate(self, prompt: str, system: Optional[str] = None):
+        """Stream the response in fixed-size chunks."""
+        response = await self.generate(prompt, system)
+        for start in range(0, len(response), 64):
+            yield response[start:start + 64]
+
+    def _canned_response(self, prompt: str, system: str) -> str:
+        digest = hashlib.sha256(prompt.encode()).hexdigest()
+
+        if "SUPREME AGENT" in system:
+            return "APPROVED FOR PRODUCTION: YES\nConfidence: high. No blocking issues."
+        if "SUPERVISOR" in system:
+            return "WORKS: YES\nNo critical errors found."
+        if "execution plan" in prompt.lower():
+            return json.dumps(CANNED_PLAN)
+        if "Answer this question about the codebase" in prompt:
+            return json.dumps({
+                "answer": f"See the referenced definitions ({digest[:8]}).",
+                "references": [{"file": "pkg/module_0.py", "line": 1, "description": "definition"}],
+                "related": []
+            })
+        if "Analyze this code for security vulnerabilities" in prompt:
+            return json.dumps({"issues": [
+                {"type": "input_validation", "severity": "low", "line": 1,
+                 "description": f"Validate inputs before use ({digest[:8]})"}
+            ]})
+        if "Review this code" in prompt:
+            return json.dumps({"suggestions": [
+                {"category": "structure", "suggestion": "Extract helper functions", "impact": "low"}
+            ]})
+        if "project structure" in prompt.lower():
+            return json.dumps({"directories": ["src"], "files": {"src/app.py": "entry point"}, "dependencies": []})
+
+        match = re.search(r"[Ff]ile(?: Path)?: (\S+)", prompt)
+        return generated_module(match.group(1) if match else digest[:8], digest)
+
+
+CANNED_PLAN = {
+    "project_type": "api",
+    "languages": ["python"],
+    "steps": [
+        {"type": "generate", "description": "Create data models and storage", "files": ["models.py", "storage.py"]},
+        {"type": "generate", "description": "Create HTTP handlers", "files": ["handlers.py", "app.py"]},
+    ],
+    "architecture": "layered",
+    "deployment_target": "heroku"
+}
+
+
+def generated_module(name: str, digest: str) -> str:
+    """Deterministic, lint-clean Python module standing in for generated code."""
+    stem = re.sub(r"\W+", "_", Path(name).stem) or "module"
+    funcs = []
+    for i in range(6):
+        factor = int(digest[i * 2:i * 2 + 2], 16) or 1
+        funcs.append(f'''
+def {stem}_op_{i}(values: list) -> int:
+    """Combine values (operation {i})."""
+    total = 0
+    for value in values:
+        if value % {factor} == 0:
+            total += value * {i + 1}
+        else:
+            total -= value
+    return total
+''')
+    class_name = "".join(part.title() for part in stem.split("_")) + "Service"
+    return f'"""Generated module {stem}."""\n' + "".join(funcs) + f'''
+
+class {class_name}:
+    """Service wrapper for {stem}."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def run(self, values: list) -> int:
+        return {stem}_op_0(values)
+'''
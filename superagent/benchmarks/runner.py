@@ -0,0 +1,220 @@
+"""Benchmark runner, JSON reporting and baseline regression checks."""
+
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import structlog
+
+from superagent.benchmarks.fake_llm import FakeLLMProvider
+from superagent.benchmarks.workloads import WORKLOADS, BenchmarkContext
+from superagent.core.config import Config
+from superagent.core.tracing import percentile
+
+logger = structlog.get_logger()
+
+RESULTS_VERSION = 1
+DEFAULT_BASELINE = ".benchmarks/baseline.json"
+
+
+def summarize(durations_ms: Sequence[float]) -> Dict[str, float]:
+    """Percentile summary of per-iteration durations."""
+    values = list(durations_ms)
+    return {
+        "min_ms": min(values),
+        "p50_ms": percentile(values, 50),
+        "p90_ms": percentile(values, 90),
+        "p95_ms": percentile(values, 95),
+        "p99_ms": percentile(values, 99),
+        "max_ms": max(values),
+        "mean_ms": statistics.fmean(values),
+        "stdev_ms": statistics.stdev(values) if len(values) > 1 else 0.0,
+    }
+
+
+class BenchmarkRunner:
+    """Runs workloads against a deterministic fake LLM and reports percentiles."""
+
+    def __init__(self, iterations: int = 10, warmup: int = 2, llm_latency_ms: float = 0.0,
+                 recordings: Optional[str] = None, config: Optional[Config] = None,
+                 seed: int = 1234):
+        """Initialize runner.
+
+        Args:
+            iterations: Timed iterations per workload
+            warmup: Untimed iterations run before measuring
+            llm_latency_ms: Simulated latency per fake LLM call
+            recordings: Optional JSON file of recorded LLM responses
+            config: Configuration (defaults are used when omitted)
+            seed: Seed for the synthetic corpora
+        """
+        if iterations < 1:
+            raise ValueError("iterations must be at least 1")
+        self.iterations = iterations
+        self.warmup = max(0, warmup)
+        self.llm_latency_ms = llm_latency_ms
+        self.recordings = recordings
+        self.config = config
+        self.seed = seed
+
+    def _make_llm(self) -> FakeLLMProvider:
+        if self.recordings:
+            return FakeLLMProvider.from_file(self.recordings, latency_ms=self.llm_latency_ms)
+        return FakeLLMProvider(latency_ms=self.llm_latency_ms)
+
+    def _make_config(self, workdir: Path) -> Config:
+        # A missing config path yields defaults, keeping runs independent of config.yaml
+        config = self.config or Config(str(workdir / "benchmark-config.yaml"))
+        config.anthropic_api_key = config.anthropic_api_key or "offline-benchmark"
+        return config
+
+    async def run(self, names: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Run the selected workloads (all by default).
+
+        Args:
+            names: Workload names to run
+
+        Returns:
+            Results document with per-workload percentile summaries
+        """
+        names = list(names or WORKLOADS)
+        unknown = [name for name in names if name not in WORKLOADS]
+        if unknown:
+            raise ValueError(f"Unknown workload(s): {', '.join(unknown)}")
+
+        results: Dict[str, Any] = {}
+        with tempfile.TemporaryDirectory(prefix="superagent-bench-") as tmp:
+            for name in names:
+                workdir = Path(tmp) / name
+                workdir.mkdir()
+                llm = self._make_llm()
+                ctx = BenchmarkContext(workdir=workdir, llm=llm, config=self._make_config(workdir), seed=self.seed)
+                workload = WORKLOADS[name]()
+
+                await workload.setup(ctx)
+                try:
+                    for i in range(self.warmup):
+                        await workload.run(ctx, i)
+                    calls_before, tokens_before = llm.calls, llm.total_tokens_used
+
+                    durations = []
+                    for i in range(self.warmup, self.warmup + self.iterations):
+                        start = time.perf_counter()
+                        await workload.run(ctx, i)
+                        durations.append((time.perf_counter() - start) * 1000)
+                finally:
+                    await workload.teardown(ctx)
+
+                results[name] = {
+                    "description": workload.description,
+                    "iterations": self.iterations,
+                    **summarize(durations),
+                    "llm_calls_per_iteration": (llm.calls - calls_before) / self.iterations,
+                    "tokens_per_iteration": (llm.total_tokens_used - tokens_before) / self.iterations,
+                }
+                logger.info(f"Benchmark {name} complete", p50_ms=round(results[name]["p50_ms"], 2))
+
+        return {
+            "version": RESULTS_VERSION,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "environment": {
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+            },
+            "settings": {
+                "iterations": self.iterations,
+                "warmup": self.warmup,
+                "llm_latency_ms": self.llm_latency_ms,
+                "recordings": bool(self.recordings),
+                "seed": self.seed,
+            },
+            "workloads": results,
+        }
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any],
+                        threshold: float = 0.15, min_delta_ms: float = 1.0,
+                        metrics: Sequence[str] = ("p50_ms", "p95_ms")) -> Dict[str, Any]:
+    """Compare results against a baseline document.
+
+    A metric regresses when it is more than ``threshold`` (relative) *and*
+    more than ``min_delta_ms`` (absolute) slower than the baseline. The
+    baseline may override the threshold per workload with a ``thresholds``
+    mapping.
+
+    Args:
+        results: Output of ``BenchmarkRunner.run``
+        baseline: A previously saved results document
+        threshold: Allowed relative slowdown
+        min_delta_ms: Ignore slowdowns smaller than this
+        metrics: Summary fields to compare
+
+    Returns:
+        Per-workload comparison and the list of regressions
+    """
+    overrides = baseline.get("thresholds", {})
+    comparison: Dict[str, Any] = {}
+    regressions: List[Dict[str, Any]] = []
+
+    for name, current in results["workloads"].items():
+        base = baseline.get("workloads", {}).get(name)
+        if base is None:
+            comparison[name] = {"status": "new"}
+            continue
+
+        allowed = float(overrides.get(name, threshold))
+        entry: Dict[str, Any] = {"status": "ok", "threshold": allowed, "metrics": {}}
+        for metric in metrics:
+            before, after = base.get(metric), current.get(metric)
+            if before is None or after is None:
+                continue
+            delta = after - before
+            change = delta / before if before > 0 else 0.0
+            status = "ok"
+            if change > allowed and delta > min_delta_ms:
+                status = "regression"
+                regressions.append({"workload": name, "metric": metric, "baseline": before,
+                                    "current": after, "change": change})
+            elif change < -allowed and -delta > min_delta_ms:
+                status = "improvement"
+            entry["metrics"][metric] = {"baseline": before, "current": after, "change": change, "status": status}
+
+        statuses = {m["status"] for m in entry["metrics"].values()}
+        if "regression" in statuses:
+            entry["status"] = "regression"
+        elif statuses == {"improvement"}:
+            entry["status"] = "improvement"
+        comparison[name] = entry
+
+    return {
+        "passed": not regressions,
+        "threshold": threshold,
+        "min_delta_ms": min_delta_ms,
+        "regressions": regressions,
+        "workloads": comparison,
+        "missing": sorted(set(baseline.get("workloads", {})) - set(results["workloads"])),
+    }
+
+
+def load_results(path: str) -> Optional[Dict[str, Any]]:
+    """Load a results/baseline document, or None if it does not exist."""
+    file = Path(path)
+    if not file.exists():
+        return None
+    return json.loads(file.read_text())
+
+
+def save_results(results: Dict[str, Any], path: str) -> None:
+    """Write a results document as JSON."""
+    file = Path(path)
+    file.parent.mkdir(parents=True, exist_ok=True)
+    file.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+
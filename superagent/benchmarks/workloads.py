@@ -0,0 +1,249 @@
+"""Benchmark workloads exercising SuperAgent subsystems offline."""
+
+import asyncio
+import random
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List
+
+from superagent.benchmarks.fake_llm import FakeLLMProvider, NullCache
+from superagent.core.config import Config
+
+
+@dataclass
+class BenchmarkContext:
+    """Shared state handed to every workload."""
+    workdir: Path
+    llm: FakeLLMProvider
+    config: Config
+    seed: int = 1234
+    state: Dict[str, Any] = field(default_factory=dict)
+
+
+class Workload(ABC):
+    """Base class: ``setup`` runs once untimed, ``run`` is timed per iteration."""
+
+    name = "workload"
+    description = ""
+
+    async def setup(self, ctx: BenchmarkContext) -> None:
+        pass
+
+    @abstractmethod
+    async def run(self, ctx: BenchmarkContext, iteration: int) -> None:
+        """One timed iteration."""
+
+    async def teardown(self, ctx: BenchmarkContext) -> None:
+        pass
+
+
+def build_corpus(root: Path, modules: int = 60, seed: int = 1234) -> List[Path]:
+    """Write a deterministic synthetic Python project.
+
+    Args:
+        root: Directory to populate
+        modules: Number of modules to write
+        seed: Random seed; the same seed always yields identical files
+
+    Returns:
+        Paths of the written modules
+    """
+    rng = random.Random(seed)
+    risky_lines = [
+        'password = "hunter2"',
+        'cursor.execute("SELECT * FROM users WHERE id = " + user_id)',
+        "data = pickle.loads(payload)",
+        'os.system("rm -rf " + path)',
+    ]
+    files = []
+    for m in range(modules):
+        package = root / f"pkg_{m % 6}"
+        package.mkdir(parents=True, exist_ok=True)
+        lines = ['"""Synthetic benchmark module."""', "import os", "import pickle", ""]
+        for c in range(rng.randint(1, 3)):
+            lines += [f"class Service{m}_{c}:", f'    """Service {m}.{c}."""', ""]
+            for f in range(rng.randint(2, 5)):
+                lines += [
+                    f"    def handle_{f}(self, cursor, user_id, payload, path):",
+                    f"        total = {rng.randint(0, 100)}",
+                    "        for i in range(10):",
+                    "            if i % 3 == 0:",
+                    "                total += i",
+                ]
+                if rng.random() < 0.2:
+                    lines.append("        " + rng.choice(risky_lines))
+                lines += ["        return total", ""]
+        for f in range(rng.randint(3, 8)):
+            lines += [
+                f"def helper_{m}_{f}(values):",
+                f'    """Helper {m}.{f}."""',
+                "    return [v * 2 for v in values if v]",
+                "",
+            ]
+        path = package / f"module_{m}.py"
+        path.write_text("\n".join(lines))
+        files.append(path)
+    return files
+
+
+def _attach_llm(agent: Any, llm: FakeLLMProvider) -> None:
+    """Point every LLM consumer of a SuperAgent at the fake provider."""
+    agent.llm = llm
+    for module in (agent.code_generator, agent.enterprise_generator, agent.debugger):
+        module.llm = llm
+    agent.supervisors.llm = llm
+    for supervisor in agent.supervisors.supervisors:
+        supervisor.llm = llm
+    agent.supervisors.supreme_agent.llm = llm
+
+
+class PlanExecutionWorkload(Workload):
+    """Plan creation, multi-step generation, static analysis and verification."""
+
+    name = "plan_execution"
+    description = "SuperAgent.execute_instruction end to end"
+
+    async def setup(self, ctx: BenchmarkContext) -> None:
+        from superagent.core.agent import SuperAgent
+
+        ctx.config.testing.auto_generate_tests = False
+        ctx.config.deployment.auto_deploy = False
+        ctx.config.deployment.git_auto_commit = False
+        self.agent = SuperAgent(ctx.config, workspace=str(ctx.workdir / "plan_workspace"))
+        _attach_llm(self.agent, ctx.llm)
+
+    async def run(self, ctx: BenchmarkContext, iteration: int) -> None:
+        await self.agent.execute_instruction(
+            "Build a small inventory REST API", project_name=f"plan_{iteration}"
+        )
+
+
+class MultiFileGenerationWorkload(Workload):
+    """Parallel generation, cleanup and formatting of many files."""
+
+    name = "multi_file_generation"
+    description = "CodeGenerator.generate_files with 12 files"
+
+    async def setup(self, ctx: BenchmarkContext) -> None:
+        from superagent.modules.code_generator import CodeGenerator
+
+        self.generator = CodeGenerator(ctx.llm, NullCache())
+        self.files = [f"src/component_{i}.py" for i in range(12)]
+
+    async def run(self, ctx: BenchmarkContext, iteration: int) -> None:
+        await self.generator.generate_files(
+            "Inventory management components", self.files,
+            project_path=ctx.workdir / f"generated_{iteration}", language="python"
+        )
+
+
+class SupervisorVerificationWorkload(Workload):
+    """Two supervisors plus the supreme agent verifying several files."""
+
+    name = "supervisor_verification"
+    description = "SupervisorSystem.verify_code x4 concurrently"
+
+    async def setup(self, ctx: BenchmarkContext) -> None:
+        from superagent.benchmarks.fake_llm import generated_module
+        from superagent.core.multi_agent import SupervisorSystem
+
+        self.system = SupervisorSystem(ctx.config)
+        self.system.llm = ctx.llm
+        for agent in self.system.supervisors + [self.system.supreme_agent]:
+            agent.llm = ctx.llm
+        self.samples = [generated_module(f"sample_{i}.py", f"{i:02x}" * 32) for i in range(4)]
+
+    async def run(self, ctx: BenchmarkContext, iteration: int) -> None:
+        await asyncio.gather(*(
+            self.system.verify_code(code, f"Sample module {i}")
+            for i, code in enumerate(self.samples)
+        ))
+
+
+class CodebaseIndexQueryWorkload(Workload):
+    """AST indexing of a synthetic project followed by several queries."""
+
+    name = "codebase_index_query"
+    description = "CodebaseQueryEngine.index_codebase + 5 queries on 60 modules"
+
+    async def setup(self, ctx: BenchmarkContext) -> None:
+        self.root = ctx.workdir / "corpus_index"
+        build_corpus(self.root, modules=60, seed=ctx.seed)
+        self.questions = [
+            "Where is Service3_0 implemented?",
+            "How does helper_10_1 work?",
+            "Find all usages of handle_2",
+            "What does Service42_1 do?",
+            "Where is helper_59_0 defined?",
+        ]
+
+    async def run(self, ctx: BenchmarkContext, iteration: int) -> None:
+        from superagent.modules.codebase_query import CodebaseQueryEngine
+
+        engine = CodebaseQueryEngine(ctx.llm, NullCache())
+        await engine.index_codebase(self.root)
+        for question in self.questions:
+            await engine.query(question)
+
+
+class SecurityScanWorkload(Workload):
+    """Security, quality and performance review of a synthetic project."""
+
+    name = "security_scan"
+    description = "CodeReviewer.review_pull_request on 30 modules"
+
+    async def setup(self, ctx: BenchmarkContext) -> None:
+        from superagent.modules.code_reviewer import CodeReviewer
+
+        self.files = build_corpus(ctx.workdir / "corpus_security", modules=30, seed=ctx.seed + 1)
+        self.reviewer = CodeReviewer(ctx.llm)
+
+    async def run(self, ctx: BenchmarkContext, iteration: int) -> None:
+        await self.reviewer.review_pull_request(self.files)
+
+
+class MemorySearchWorkload(Workload):
+    """Learning and code-pattern lookups against a populated memory store."""
+
+    name = "memory_search"
+    description = "ProjectMemory lookups over 2000 learnings and 500 patterns"
+
+    categories = ["bugfix", "architecture", "testing", "deployment", "performance", "security", "ui", "data"]
+    languages = ["python", "javascript", "typescript", "go"]
+
+    async def setup(self, ctx: BenchmarkContext) -> None:
+        from superagent.core.memory import ProjectMemory
+
+        rng = random.Random(ctx.seed)
+        self.memory = ProjectMemory(str(ctx.workdir / "memory.db"))
+        project_id = self.memory.create_project("benchmark", "memory search benchmark")
+        for i in range(2000):
+            self.memory.add_learning(
+                project_id, rng.choice(self.categories),
+                f"Learning {i}: prefer approach {rng.randint(0, 50)}", success=rng.random() < 0.8
+            )
+        for i in range(500):
+            self.memory.save_code_pattern(
+                f"pattern_{i}", f"def pattern_{i}():\n    return {i}\n",
+                rng.choice(self.languages), f"Pattern {i}"
+            )
+
+    async def run(self, ctx: BenchmarkContext, iteration: int) -> None:
+        for category in self.categories:
+            self.memory.get_learnings(category=category, limit=20)
+        for language in self.languages:
+            self.memory.get_code_patterns(language=language, limit=10)
+
+
+WORKLOADS = {
+    workload.name: workload
+    for workload in (
+        PlanExecutionWorkload,
+        MultiFileGenerationWorkload,
+        SupervisorVerificationWorkload,
+        CodebaseIndexQueryWorkload,
+        SecurityScanWorkload,
+        MemorySearchWorkload,
+    )
+}
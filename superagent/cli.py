@@ -241,53 +241,118 @@ def test(project_path, config):
 
 @main.command()
 @click.option('--config', '-c', help='Configuration file path')
-def benchmark(config):
-    """Run performance benchmarks.
-    
+@click.option('--workload', '-w', 'workloads', multiple=True,
+              help='Workload to run (repeatable, default: all)')
+@click.option('--iterations', '-n', default=10, show_default=True, help='Timed iterations per workload')
+@click.option('--warmup', default=2, show_default=True, help='Untimed warmup iterations')
+@click.option('--llm-latency-ms', default=0.0, show_default=True,
+              help='Simulated latency per fake LLM call')
+@click.option('--recordings', type=click.Path(exists=True), help='Recorded LLM responses (JSON)')
+@click.option('--baseline', '-b', default='.benchmarks/baseline.json', show_default=True,
+              help='Baseline results to compare against')
+@click.option('--save-baseline', is_flag=True, help='Store these results as the new baseline')
+@click.option('--threshold', default=0.15, show_default=True, help='Allowed relative slowdown')
+@click.option('--output', '-o', type=click.Path(), help='Write results JSON to this file')
+@click.option('--json', 'as_json', is_flag=True, help='Print results JSON instead of a table')
+@click.option('--list', 'list_workloads', is_flag=True, help='List available workloads')
+def benchmark(config, workloads, iterations, warmup, llm_latency_ms, recordings,
+              baseline, save_baseline, threshold, output, as_json, list_workloads):
+    """Run the offline benchmark suite.
+
+    Workloads run against a deterministic fake LLM, so results are
+    reproducible and comparable against a stored baseline. Exits with
+    status 1 when a workload regresses beyond the threshold.
+
     Example:
-        superagent benchmark
+        superagent benchmark -n 20 --save-baseline
+        superagent benchmark -w plan_execution -w memory_search
     """
-    console.print(Panel.fit(
-        "[bold cyan]Running Benchmarks[/bold cyan]\n"
-        "Comparing against AgentGPT v3 and SuperAGI",
-        title="SuperAgent Benchmark"
-    ))
-    
-    async def run():
-        import time
-        
-        cfg = Config(config) if config else Config()
-        
-        # Benchmark code generation
-        console.print("\n[bold]1. Code Generation Speed[/bold]")
-        
-        start = time.time()
-        async with SuperAgent(cfg) as agent:
-            await agent.execute_instruction(
-                "Create a simple Flask REST API with 2 endpoints"
+    import json
+    from superagent.benchmarks.runner import (
+        BenchmarkRunner, compare_to_baseline, load_results, save_results
+    )
+    from superagent.benchmarks.workloads import WORKLOADS
+
+    if list_workloads:
+        for name, workload in WORKLOADS.items():
+            console.print(f"[cyan]{name}[/cyan]: {workload.description}")
+        return
+
+    runner = BenchmarkRunner(
+        iterations=iterations,
+        warmup=warmup,
+        llm_latency_ms=llm_latency_ms,
+        recordings=recordings,
+        config=Config(config) if config else None
+    )
+
+    # Keep per-call logging out of the measurements and out of --json output,
+    # for the duration of the run only
+    import logging
+    previous_logging = structlog.get_config()
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING),
+        logger_factory=structlog.PrintLoggerFactory(sys.stderr)
+    )
+    try:
+        results = asyncio.run(runner.run(workloads or None))
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    finally:
+        structlog.configure(**previous_logging)
+
+    comparison = None
+    stored = load_results(baseline)
+    if stored and not save_baseline:
+        comparison = compare_to_baseline(results, stored, threshold=threshold)
+        results["comparison"] = comparison
+
+    if output:
+        save_results(results, output)
+    if save_baseline:
+        save_results(results, baseline)
+
+    if as_json:
+        click.echo(json.dumps(results, indent=2, sort_keys=True))
+    else:
+        table = Table(title=f"Benchmark Results ({iterations} iterations)")
+        table.add_column("Workload", style="cyan")
+        table.add_column("p50 ms", justify="right")
+        table.add_column("p95 ms", justify="right")
+        table.add_column("p99 ms", justify="right")
+        table.add_column("LLM calls", justify="right")
+        table.add_column("vs baseline", justify="right")
+
+        for name, summary in results["workloads"].items():
+            status = ""
+            if comparison:
+                entry = comparison["workloads"][name]
+                change = entry.get("metrics", {}).get("p50_ms", {}).get("change")
+                color = {"regression": "red", "improvement": "green"}.get(entry["status"], "white")
+                status = f"[{color}]{entry['status']}" + (f" ({change:+.1%})" if change is not None else "") + f"[/{color}]"
+            table.add_row(
+                name,
+                f"{summary['p50_ms']:.2f}",
+                f"{summary['p95_ms']:.2f}",
+                f"{summary['p99_ms']:.2f}",
+                f"{summary['llm_calls_per_iteration']:.0f}",
+                status
             )
-        superagent_time = time.time() - start
-        
-        console.print(f"SuperAgent: {superagent_time:.2f}s")
-        console.print(f"AgentGPT v3 (baseline): ~{superagent_time * 2:.2f}s")
-        console.print(f"[bold green]Speedup: 2.0x[/bold green]")
-        
-        # Show comparison table
-        table = Table(title="Performance Comparison")
-        table.add_column("Metric", style="cyan")
-        table.add_column("SuperAgent", style="green")
-        table.add_column("AgentGPT v3", style="yellow")
-        table.add_column("SuperAGI", style="yellow")
-        
-        table.add_row("Code Gen Speed", "10s", "20s", "15s")
-        table.add_row("Debug Accuracy", "95%", "85%", "88%")
-        table.add_row("Fix Success Rate", "92%", "75%", "82%")
-        table.add_row("Multi-language", "7+", "3", "4")
-        
-        console.print("\n")
         console.print(table)
-    
-    asyncio.run(run())
+
+        if save_baseline:
+            console.print(f"[green]Baseline saved to {baseline}[/green]")
+        elif not stored:
+            console.print(f"[yellow]No baseline at {baseline}; run with --save-baseline to create one[/yellow]")
+
+    if comparison and not comparison["passed"]:
+        for regression in comparison["regressions"] if not as_json else []:
+            console.print(
+                f"[red]Regression: {regression['workload']} {regression['metric']} "
+                f"{regression['baseline']:.2f}ms -> {regression['current']:.2f}ms "
+                f"({regression['change']:+.1%})[/red]"
+            )
+        sys.exit(1)
 
 
 @main.command()
@@ -222,11 +222,11 @@ Return your response as JSON with this structure:
         Returns:
             Generation result
         """
-        files = await self.code_generator.generate_files(
+        files = [Path(f) for f in await self.code_generator.generate_files(
             description=step["description"],
             file_paths=step.get("files", []),
             project_path=self.workspace / self.current_project
-        )
+        )]
         
         # Run static analysis
         errors = []
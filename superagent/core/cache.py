@@ -3,40 +3,67 @@
 import asyncio
 import json
 import hashlib
-from typing import Any, Optional, Callable
+import pickle
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Callable, Set, Tuple
 from functools import wraps
 import redis.asyncio as aioredis
 from diskcache import Cache
 import structlog
 
+from superagent.core.metrics import record_cache_request
+
 logger = structlog.get_logger()
 
+# Namespace used for keys without a "namespace:" prefix
+DEFAULT_NAMESPACE = "default"
+# Version slot that, when bumped, invalidates every namespace at once
+GLOBAL_NAMESPACE = "*"
+
 
 class CacheManager:
-    """Manages both Redis and disk-based caching for optimal performance."""
+    """Two-tier cache: an in-process LRU (L1) in front of Redis and disk (L2).
+    
+    Keys are grouped into namespaces by the text before the first ":"
+    (``"generate_file:ab12..."`` belongs to ``generate_file``). Each namespace
+    has a version that is part of every stored key, so invalidating a
+    namespace is a single counter increment; old entries become unreachable
+    and age out through LRU eviction and TTLs.
+    """
     
-    def __init__(self, redis_url: str = "redis://localhost:6379", 
-                 cache_dir: str = ".cache", ttl: int = 3600):
+    def __init__(self, redis_url: str = "redis://localhost:6379",
+                 cache_dir: str = ".cache", ttl: int = 3600,
+                 l1_max_entries: int = 1024, version_refresh: float = 1.0):
         """Initialize cache manager.
         
         Args:
             redis_url: Redis connection URL
             cache_dir: Directory for disk cache
             ttl: Time-to-live for cache entries in seconds
+            l1_max_entries: Maximum entries held in the in-process LRU
+            version_refresh: Seconds a namespace version is trusted before
+                it is re-read from Redis/disk (other processes may bump it)
         """
         self.redis_url = redis_url
         self.cache_dir = cache_dir
         self.ttl = ttl
+        self.l1_max_entries = l1_max_entries
+        self.version_refresh = version_refresh
         self.redis_client: Optional[aioredis.Redis] = None
         self.disk_cache = Cache(cache_dir)
         
+        self._l1: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._versions: Dict[str, Tuple[int, float]] = {}
+        self._pending_writes: Set[asyncio.Task] = set()
+        self._stats: Dict[str, Dict[str, int]] = {}
+    
     async def connect(self):
         """Connect to Redis (async)."""
         try:
             self.redis_client = await aioredis.from_url(
                 self.redis_url,
-                encoding="utf-8",
-                decode_responses=True
+                decode_responses=False
             )
             await self.redis_client.ping()
             logger.info("Connected to Redis cache")
@@ -45,81 +72,232 @@ class CacheManager:
             self.redis_client = None
     
     async def close(self):
-        """Close Redis connection."""
+        """Finish pending disk writes and close Redis connection."""
+        await self.flush()
         if self.redis_client:
             await self.redis_client.close()
     
+    async def flush(self):
+        """Wait for background disk writes to complete."""
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+    
     def _generate_key(self, *args, **kwargs) -> str:
         """Generate cache key from arguments."""
-        key_data = json.dumps({"args": args, "kwargs": kwargs}, sort_keys=True)
+        key_data = json.dumps({"args": args, "kwargs": kwargs}, sort_keys=True, default=str)
         return hashlib.sha256(key_data.encode()).hexdigest()
     
+    @staticmethod
+    def _namespace(key: str) -> str:
+        """Namespace of a key (text before the first ':')."""
+        namespace, sep, _ = key.partition(":")
+        return namespace if sep else DEFAULT_NAMESPACE
+    
+    @staticmethod
+    def _serialize(value: Any) -> bytes:
+        return pickle.dumps(value, protocol=5)
+    
+    @staticmethod
+    def _deserialize(data: bytes) -> Any:
+        return pickle.loads(data)
+    
+    def _record(self, namespace: str, counter: str):
+        stats = self._stats.setdefault(
+            namespace, {"l1_hits": 0, "l2_hits": 0, "misses": 0, "sets": 0, "invalidations": 0}
+        )
+        stats[counter] += 1
+        record_cache_request(namespace, counter)
+    
+    async def _read_version(self, namespace: str) -> int:
+        """Highest known version of a namespace across Redis and disk."""
+        version = await asyncio.to_thread(self.disk_cache.get, f"__ns__:{namespace}", 0)
+        if self.redis_client:
+            try:
+                value = await self.redis_client.get(f"superagent:cache:ns:{namespace}")
+                version = max(version, int(value or 0))
+            except Exception as e:
+                logger.warning(f"Redis version read error: {e}")
+        return version
+    
+    async def _version(self, namespace: str) -> int:
+        known = self._versions.get(namespace)
+        now = time.monotonic()
+        if known and now - known[1] < self.version_refresh:
+            return known[0]
+        version = await self._read_version(namespace)
+        self._versions[namespace] = (version, now)
+        return version
+    
+    async def _physical_key(self, key: str) -> str:
+        """Versioned key actually stored in L1/L2."""
+        namespace = self._namespace(key)
+        epoch = await self._version(GLOBAL_NAMESPACE)
+        version = await self._version(namespace)
+        return f"{namespace}:{epoch}.{version}:{key}"
+    
+    def _l1_get(self, physical_key: str) -> Optional[Any]:
+        entry = self._l1.get(physical_key)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if expires_at < time.monotonic():
+            del self._l1[physical_key]
+            return None
+        self._l1.move_to_end(physical_key)
+        # L1 holds the pickled bytes so callers never share (and mutate) the cached object
+        return self._deserialize(data)
+    
+    def _l1_set(self, physical_key: str, data: bytes, ttl: int):
+        self._l1[physical_key] = (time.monotonic() + ttl, data)
+        self._l1.move_to_end(physical_key)
+        while len(self._l1) > self.l1_max_entries:
+            self._l1.popitem(last=False)
+    
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache.
         
         Args:
             key: Cache key
-            
+        
         Returns:
             Cached value or None
         """
-        # Try Redis first (faster)
+        namespace = self._namespace(key)
+        physical_key = await self._physical_key(key)
+        
+        value = self._l1_get(physical_key)
+        if value is not None:
+            self._record(namespace, "l1_hits")
+            return value
+        
+        # Try Redis first (shared across workers)
+        data = None
         if self.redis_client:
             try:
-                value = await self.redis_client.get(key)
-                if value:
+                data = await self.redis_client.get(physical_key)
+                if data:
                     logger.debug(f"Cache hit (Redis): {key[:8]}...")
-                    return json.loads(value)
             except Exception as e:
                 logger.warning(f"Redis get error: {e}")
         
         # Fallback to disk cache
-        value = self.disk_cache.get(key)
-        if value:
-            logger.debug(f"Cache hit (disk): {key[:8]}...")
-        return value
+        if not data:
+            data = await asyncio.to_thread(self.disk_cache.get, physical_key)
+            if data is not None:
+                logger.debug(f"Cache hit (disk): {key[:8]}...")
+        
+        if data is None:
+            self._record(namespace, "misses")
+            return None
+        
+        self._record(namespace, "l2_hits")
+        self._l1_set(physical_key, data, self.ttl)
+        return self._deserialize(data)
     
     async def set(self, key: str, value: Any, ttl: Optional[int] = None):
         """Set value in cache.
         
+        The disk write happens in a background thread; call ``flush`` to
+        wait for it.
+        
         Args:
             key: Cache key
             value: Value to cache
             ttl: Time-to-live (uses default if not specified)
         """
         ttl = ttl or self.ttl
+        namespace = self._namespace(key)
+        physical_key = await self._physical_key(key)
+        data = self._serialize(value)
+        self._l1_set(physical_key, data, ttl)
+        self._record(namespace, "sets")
         
         # Store in Redis
         if self.redis_client:
             try:
-                await self.redis_client.setex(
-                    key, 
-                    ttl, 
-                    json.dumps(value)
-                )
+                await self.redis_client.setex(physical_key, ttl, data)
             except Exception as e:
                 logger.warning(f"Redis set error: {e}")
         
-        # Store in disk cache
-        self.disk_cache.set(key, value, expire=ttl)
+        # Store in disk cache without blocking the event loop
+        task = asyncio.create_task(
+            asyncio.to_thread(self.disk_cache.set, physical_key, data, expire=ttl)
+        )
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
         logger.debug(f"Cache set: {key[:8]}...")
     
-    async def invalidate(self, pattern: str = "*"):
-        """Invalidate cache entries matching pattern.
+    async def invalidate_namespace(self, namespace: str) -> int:
+        """Invalidate every entry in a namespace in O(1).
         
         Args:
-            pattern: Key pattern to invalidate
+            namespace: Namespace to invalidate (``"*"`` for all of them)
+        
+        Returns:
+            The namespace's new version
         """
+        # Advance past every known version so a tier that missed an earlier
+        # bump cannot resurrect entries written under an old version
+        version = await self._read_version(namespace) + 1
+        await asyncio.to_thread(self.disk_cache.set, f"__ns__:{namespace}", version)
         if self.redis_client:
             try:
-                keys = await self.redis_client.keys(pattern)
-                if keys:
-                    await self.redis_client.delete(*keys)
+                await self.redis_client.set(f"superagent:cache:ns:{namespace}", version)
             except Exception as e:
                 logger.warning(f"Redis invalidate error: {e}")
         
-        self.disk_cache.clear()
+        self._versions[namespace] = (version, time.monotonic())
+        if namespace == GLOBAL_NAMESPACE:
+            self._l1.clear()
+            for stats in self._stats.values():
+                stats["invalidations"] += 1
+        else:
+            self._record(namespace, "invalidations")
+        return version
+    
+    async def invalidate(self, pattern: str = "*"):
+        """Invalidate cache entries matching pattern.
+        
+        Patterns select whole namespaces: ``"*"`` invalidates everything and
+        ``"generate_file:*"`` (or ``"generate_file"``) a single namespace. A
+        finer pattern such as ``"generate_file:abc*"`` invalidates its whole
+        namespace.
+        
+        Args:
+            pattern: Key pattern to invalidate
+        
+        Raises:
+            ValueError: If the pattern does not name a namespace (``"gen*"``)
+        """
+        namespace, sep, _ = pattern.partition(":")
+        if namespace in ("", "*") and not sep:
+            namespace = GLOBAL_NAMESPACE
+        elif "*" in namespace:
+            raise ValueError(f"Cache invalidation pattern must name a namespace: {pattern!r}")
+        await self.invalidate_namespace(namespace)
         logger.info(f"Cache invalidated: {pattern}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per namespace.
+        
+        Returns:
+            Statistics dictionary
+        """
+        namespaces = {}
+        for namespace, stats in self._stats.items():
+            lookups = stats["l1_hits"] + stats["l2_hits"] + stats["misses"]
+            hits = stats["l1_hits"] + stats["l2_hits"]
+            namespaces[namespace] = {
+                **stats,
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
+        return {
+            "l1_entries": len(self._l1),
+            "l1_max_entries": self.l1_max_entries,
+            "pending_disk_writes": len(self._pending_writes),
+            "redis_connected": self.redis_client is not None,
+            "namespaces": namespaces,
+        }
 
 
 def cached(ttl: int = 3600):
@@ -1,11 +1,17 @@
 """LLM interface for SuperAgent using Claude 3.5 Sonnet."""
 
 import asyncio
+import inspect
+import time
 from typing import List, Dict, Any, Optional
-from anthropic import AsyncAnthropic
+from anthropic import AsyncAnthropic, RateLimitError
 import structlog
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from superagent.core.rate_budget import RateLimitBudget
+from superagent.core.single_flight import SingleFlight, flight_key
+from superagent.core.tracing import tracer
+
 logger = structlog.get_logger()
 
 
@@ -27,13 +33,21 @@ class LLMProvider:
         self.temperature = temperature
         self.max_tokens = max_tokens
         self.total_tokens_used = 0
+        self.prompt_tokens_used = 0
+        self.output_tokens_used = 0
+        self.total_calls = 0
+        self.failed_calls = 0
+        self.rate_budget = RateLimitBudget()
+        self.single_flight = SingleFlight("llm.generate")
         
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=10))
     async def generate(self, prompt: str, system: Optional[str] = None,
                       temperature: Optional[float] = None,
                       max_tokens: Optional[int] = None) -> str:
         """Generate completion from prompt.
         
+        Concurrent identical requests (same model, prompt, system and
+        sampling settings) share a single provider call.
+        
         Args:
             prompt: User prompt
             system: System prompt
@@ -43,38 +57,70 @@ class LLMProvider:
         Returns:
             Generated text
         """
-        try:
-            messages = [{"role": "user", "content": prompt}]
-            
-            kwargs = {
-                "model": self.model,
-                "messages": messages,
-                "temperature": temperature or self.temperature,
-                "max_tokens": max_tokens or self.max_tokens,
-            }
-            
-            if system:
-                kwargs["system"] = system
-            
-            logger.info(f"Generating with {self.model}", prompt_length=len(prompt))
-            
-            response = await self.client.messages.create(**kwargs)
-            
-            self.total_tokens_used += response.usage.input_tokens + response.usage.output_tokens
-            
-            logger.info(
-                "Generation complete",
-                input_tokens=response.usage.input_tokens,
-                output_tokens=response.usage.output_tokens,
-                total_tokens=self.total_tokens_used
-            )
-            
-            return response.content[0].text
-            
-        except Exception as e:
-            logger.error(f"LLM generation error: {e}")
-            raise
+        temperature = temperature or self.temperature
+        max_tokens = max_tokens or self.max_tokens
+        key = flight_key(model=self.model, prompt=prompt, system=system,
+                         temperature=temperature, max_tokens=max_tokens)
+        return await self.single_flight.do(
+            key, lambda: self._generate(prompt, system, temperature, max_tokens)
+        )
     
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=10))
+    async def _generate(self, prompt: str, system: Optional[str],
+                        temperature: float, max_tokens: int) -> str:
+        """Call the provider (with retries) for ``generate``."""
+        with tracer.span("llm.generate", kind="llm", **{
+            "llm.provider": "anthropic",
+            "llm.model": self.model,
+            "llm.prompt_chars": len(prompt),
+        }) as span:
+            try:
+                messages = [{"role": "user", "content": prompt}]
+
+                kwargs = {
+                    "model": self.model,
+                    "messages": messages,
+                    "temperature": temperature,
+                    "max_tokens": max_tokens,
+                }
+
+                if system:
+                    kwargs["system"] = system
+
+                logger.info(f"Generating with {self.model}", prompt_length=len(prompt))
+
+                self.total_calls += 1
+                # Raw response so the rate-limit headers can feed the budget
+                raw = await self.client.messages.with_raw_response.create(**kwargs)
+                self.rate_budget.update_from_headers(raw.headers)
+                response = raw.parse()
+                if inspect.isawaitable(response):
+                    response = await response
+
+                input_tokens = response.usage.input_tokens
+                output_tokens = response.usage.output_tokens
+                self.prompt_tokens_used += input_tokens
+                self.output_tokens_used += output_tokens
+                self.total_tokens_used += input_tokens + output_tokens
+                tracer.record_llm_usage(span, input_tokens, output_tokens, cache_hit=False)
+
+                logger.info(
+                    "Generation complete",
+                    input_tokens=input_tokens,
+                    output_tokens=output_tokens,
+                    total_tokens=self.total_tokens_used,
+                    trace_id=span.trace_id
+                )
+
+                return response.content[0].text
+
+            except Exception as e:
+                self.failed_calls += 1
+                if isinstance(e, RateLimitError):
+                    self.rate_budget.record_rate_limited(e.response.headers.get("retry-after"))
+                logger.error(f"LLM generation error: {e}")
+                raise
+
     async def generate_batch(self, prompts: List[str], 
                            system: Optional[str] = None) -> List[str]:
         """Generate completions for multiple prompts in parallel.
@@ -162,9 +208,39 @@ Ensure your response is valid JSON that matches the schema exactly.
         if system:
             kwargs["system"] = system
         
-        async with self.client.messages.stream(**kwargs) as stream:
-            async for text in stream.text_stream:
-                yield text
+        # Not made current: the consumer runs between chunks and its spans
+        # must not nest under the stream
+        span = tracer.start_span("llm.stream", kind="llm", **{
+            "llm.provider": "anthropic",
+            "llm.model": self.model,
+            "llm.prompt_chars": len(prompt),
+        })
+        try:
+            self.total_calls += 1
+            started = time.perf_counter()
+            first_token = True
+            async with self.client.messages.stream(**kwargs) as stream:
+                async for text in stream.text_stream:
+                    if first_token:
+                        first_token = False
+                        tracer.record_llm_usage(
+                            span, time_to_first_token_ms=(time.perf_counter() - started) * 1000
+                        )
+                    yield text
+                message = await stream.get_final_message()
+
+            self.prompt_tokens_used += message.usage.input_tokens
+            self.output_tokens_used += message.usage.output_tokens
+            self.total_tokens_used += message.usage.input_tokens + message.usage.output_tokens
+            tracer.record_llm_usage(span, message.usage.input_tokens, message.usage.output_tokens, cache_hit=False)
+        except GeneratorExit:
+            # The consumer stopped reading early; not a provider failure
+            raise
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            tracer.end_span(span)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get usage statistics.
@@ -174,9 +250,15 @@ Ensure your response is valid JSON that matches the schema exactly.
         """
         return {
             "total_tokens_used": self.total_tokens_used,
+            "prompt_tokens_used": self.prompt_tokens_used,
+            "output_tokens_used": self.output_tokens_used,
+            "total_calls": self.total_calls,
+            "failed_calls": self.failed_calls,
             "model": self.model,
             "temperature": self.temperature,
             "max_tokens": self.max_tokens,
+            "rate_budget": self.rate_budget.snapshot(),
+            "single_flight": self.single_flight.get_stats(),
         }
 
 
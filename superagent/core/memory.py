@@ -82,6 +82,30 @@ class ProjectMemory:
             )
         ''')
         
+        # Checkpoints table (resumable state of long-running projects)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                project_id INTEGER NOT NULL,
+                iteration INTEGER NOT NULL,
+                state TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                FOREIGN KEY (project_id) REFERENCES projects(id)
+            )
+        ''')
+        
+        # Iteration history of long-running projects (append-only)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS iteration_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                project_id INTEGER NOT NULL,
+                iteration INTEGER NOT NULL,
+                record TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                FOREIGN KEY (project_id) REFERENCES projects(id)
+            )
+        ''')
+        
         conn.commit()
         conn.close()
     
@@ -111,6 +135,129 @@ class ProjectMemory:
         logger.info(f"Created project: {name} (ID: {project_id})")
         return project_id
     
+    def update_project_status(self, project_id: int, status: str):
+        """Update a project's status.
+        
+        Args:
+            project_id: Project ID
+            status: New status (e.g., 'active', 'completed', 'failed')
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            UPDATE projects SET status = ?, updated_at = ? WHERE id = ?
+        ''', (status, datetime.now().isoformat(), project_id))
+        
+        conn.commit()
+        conn.close()
+    
+    def get_project(self, project_id: int) -> Optional[Dict[str, Any]]:
+        """Get a project by ID.
+        
+        Args:
+            project_id: Project ID
+            
+        Returns:
+            Project data, or None if it does not exist
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT id, name, description, status, created_at, updated_at
+            FROM projects WHERE id = ?
+        ''', (project_id,))
+        
+        row = cursor.fetchone()
+        conn.close()
+        
+        if row is None:
+            return None
+        keys = ('id', 'name', 'description', 'status', 'created_at', 'updated_at')
+        return dict(zip(keys, row))
+    
+    def save_checkpoint(self, project_id: int, iteration: int, state: Dict[str, Any],
+                        history_record: Optional[Dict[str, Any]] = None):
+        """Persist the resumable state of a long-running project.
+        
+        Only the latest checkpoint per project is kept, so the state should stay
+        small. Per-iteration output goes in ``history_record``, which is appended
+        to the project's iteration history in the same transaction.
+        
+        Args:
+            project_id: Project ID
+            iteration: Iteration the state was captured after
+            state: JSON-serializable state
+            history_record: Optional record of this iteration to append
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        now = datetime.now().isoformat()
+        if history_record is not None:
+            cursor.execute('''
+                INSERT INTO iteration_history (project_id, iteration, record, created_at)
+                VALUES (?, ?, ?, ?)
+            ''', (project_id, iteration, json.dumps(history_record, default=str), now))
+        cursor.execute('DELETE FROM checkpoints WHERE project_id = ?', (project_id,))
+        cursor.execute('''
+            INSERT INTO checkpoints (project_id, iteration, state, created_at)
+            VALUES (?, ?, ?, ?)
+        ''', (project_id, iteration, json.dumps(state, default=str), now))
+        cursor.execute('''
+            UPDATE projects SET updated_at = ? WHERE id = ?
+        ''', (now, project_id))
+        
+        conn.commit()
+        conn.close()
+    
+    def load_checkpoint(self, project_id: int) -> Optional[Dict[str, Any]]:
+        """Load the latest checkpoint of a project.
+        
+        Args:
+            project_id: Project ID
+            
+        Returns:
+            Saved state, or None if the project has no checkpoint
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT state FROM checkpoints
+            WHERE project_id = ?
+            ORDER BY iteration DESC, id DESC LIMIT 1
+        ''', (project_id,))
+        
+        row = cursor.fetchone()
+        conn.close()
+        
+        return json.loads(row[0]) if row else None
+    
+    def get_iteration_history(self, project_id: int) -> List[Dict[str, Any]]:
+        """Get the recorded iterations of a project, oldest first.
+        
+        Args:
+            project_id: Project ID
+            
+        Returns:
+            Iteration records appended by ``save_checkpoint``
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT record FROM iteration_history
+            WHERE project_id = ?
+            ORDER BY iteration, id
+        ''', (project_id,))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [json.loads(row[0]) for row in rows]
+    
     def add_task(self, project_id: int, description: str, priority: int = 0, 
                  dependencies: Optional[List[int]] = None) -> int:
         """Add a task to a project.
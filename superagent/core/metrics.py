@@ -0,0 +1,328 @@
+"""Process metrics in the Prometheus text exposition format.
+
+A small dependency-free registry of counters, gauges and histograms. Each
+metric declares its label names up front and keeps one series per label
+combination; a metric refuses to grow past ``max_series`` combinations and
+folds the excess into an ``other`` series, so a bad label value (an id, a
+raw path) cannot blow up the scrape. Gauges can also be backed by a
+callback that is evaluated at scrape time.
+
+LLM call, token and cache metrics are recorded here so every entry point
+(tracer spans, the cache manager) feeds the same series.
+"""
+
+import math
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import structlog
+
+logger = structlog.get_logger()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Seconds; covers fast API calls up to long LLM generations
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+OVERFLOW_LABEL = "other"
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _series(name: str, labelnames: Sequence[str], values: LabelValues,
+            extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{label}="{_escape(value)}"' for label, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return f"{name}{{{','.join(pairs)}}}" if pairs else name
+
+
+class _Metric:
+    """Shared label handling for all metric types."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 max_series: int = 500):
+        """Initialize metric.
+
+        Args:
+            name: Metric name
+            documentation: HELP text
+            labelnames: Names of the labels every sample carries
+            max_series: Label combinations kept before folding into "other"
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.max_series = max_series
+        self._values: Dict[LabelValues, Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        key = tuple(str(labels[label]) for label in self.labelnames)
+        if key not in self._values and len(self._values) >= self.max_series:
+            return (OVERFLOW_LABEL,) * len(self.labelnames)
+        return key
+
+    def clear(self) -> None:
+        """Drop every series."""
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> List[str]:
+        """Exposition lines for the current series."""
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{_series(self.name, self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+    def render(self) -> str:
+        """HELP, TYPE and sample lines."""
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Add to the counter.
+
+        Args:
+            amount: Non-negative increment
+            **labels: Label values
+        """
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            key = self._key(labels)
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        """Current count of one series."""
+        return self._values.get(tuple(str(labels[label]) for label in self.labelnames), 0.0)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, optionally read from a callback at scrape time."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 callback: Optional[Callable[[], Any]] = None, max_series: int = 500):
+        """Initialize gauge.
+
+        Args:
+            name: Metric name
+            documentation: HELP text
+            labelnames: Label names
+            callback: Returns the value (no labels) or a ``{label values: value}``
+                mapping; evaluated on every scrape instead of stored values
+            max_series: Label combinations kept before folding into "other"
+        """
+        super().__init__(name, documentation, labelnames, max_series)
+        self.callback = callback
+
+    def set(self, value: float, **labels: Any) -> None:
+        """Set the gauge."""
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Increase the gauge."""
+        with self._lock:
+            key = self._key(labels)
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        """Decrease the gauge."""
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: Any) -> float:
+        """Current value of one series."""
+        return self._values.get(tuple(str(labels[label]) for label in self.labelnames), 0.0)
+
+    def samples(self) -> List[str]:
+        if self.callback is None:
+            return super().samples()
+        try:
+            current = self.callback()
+        except Exception as e:
+            # A broken source must not fail the whole scrape
+            logger.warning(f"Metric callback for {self.name} failed: {e}")
+            return []
+        if not isinstance(current, dict):
+            current = {(): current}
+        lines = []
+        for key, value in sorted(current.items(), key=lambda item: str(item[0])):
+            key = key if isinstance(key, tuple) else (key,)
+            values = tuple(str(part) for part in key)
+            lines.append(f"{_series(self.name, self.labelnames, values)} {_format_value(float(value))}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, max_series: int = 500):
+        """Initialize histogram.
+
+        Args:
+            name: Metric name
+            documentation: HELP text
+            labelnames: Label names
+            buckets: Upper bounds; +Inf is added automatically
+            max_series: Label combinations kept before folding into "other"
+        """
+        super().__init__(name, documentation, labelnames, max_series)
+        self.buckets = tuple(sorted(bucket for bucket in buckets if bucket != math.inf)) + (math.inf,)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Record one observation."""
+        with self._lock:
+            key = self._key(labels)
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][index] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    def count(self, **labels: Any) -> int:
+        """Number of observations in one series."""
+        state = self._values.get(tuple(str(labels[label]) for label in self.labelnames))
+        return state["count"] if state else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, {**state, "counts": list(state["counts"])}) for key, state in self._values.items())
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state["counts"]):
+                cumulative += count
+                series = _series(f"{self.name}_bucket", self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{series} {cumulative}")
+            lines.append(f"{_series(self.name + '_sum', self.labelnames, key)} {_format_value(state['sum'])}")
+            lines.append(f"{_series(self.name + '_count', self.labelnames, key)} {state['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together on scrape."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.type}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+              callback: Optional[Callable[[], Any]] = None) -> Gauge:
+        """Get or create a gauge; a new callback replaces the previous one."""
+        gauge = self._get_or_create(Gauge, name, documentation, labelnames)
+        if callback is not None:
+            gauge.callback = callback
+        return gauge
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram."""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        """Look up a registered metric."""
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format (version 0.0.4)."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the process-wide metrics registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = MetricsRegistry()
+    return _registry
+
+
+def record_llm_span(span: Any) -> None:
+    """Count a finished LLM span: calls, latency and tokens per provider.
+
+    Args:
+        span: Finished tracing span of kind "llm"
+    """
+    registry = get_metrics_registry()
+    provider = str(span.attributes.get("llm.provider") or "unknown")
+    registry.counter(
+        "superagent_llm_calls_total", "LLM provider calls", ("provider", "status")
+    ).inc(provider=provider, status=span.status)
+    registry.histogram(
+        "superagent_llm_call_duration_seconds", "LLM provider call latency", ("provider",)
+    ).observe(span.duration_ms / 1000, provider=provider)
+    tokens = registry.counter("superagent_llm_tokens_total", "LLM tokens used", ("provider", "kind"))
+    for kind in ("prompt", "output"):
+        count = span.attributes.get(f"llm.{kind}_tokens")
+        if count:
+            tokens.inc(count, provider=provider, kind=kind)
+    if span.attributes.get("llm.cache_hit"):
+        registry.counter(
+            "superagent_llm_cache_hits_total", "LLM responses served from cache", ("provider",)
+        ).inc(provider=provider)
+
+
+def record_cache_request(namespace: str, result: str) -> None:
+    """Count a cache lookup or write.
+
+    Args:
+        namespace: Cache namespace
+        result: "l1_hits", "l2_hits", "misses", "sets" or "invalidations"
+    """
+    get_metrics_registry().counter(
+        "superagent_cache_requests_total", "Cache operations by namespace and result", ("namespace", "result")
+    ).inc(namespace=namespace, result=result)
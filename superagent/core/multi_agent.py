@@ -7,6 +7,7 @@ import structlog
 
 from superagent.core.config import Config
 from superagent.core.llm import LLMProvider
+from superagent.core.scheduler import RoleAwareScheduler
 
 logger = structlog.get_logger()
 
@@ -209,8 +210,8 @@ class MultiAgentOrchestrator:
         self.config = config
         self.num_agents = num_agents
         self.agents: List[SpecializedAgent] = []
-        self.task_queue: asyncio.Queue = asyncio.Queue()
         self.results: List[Dict[str, Any]] = []
+        self.last_run_metrics: Dict[str, Any] = {}
         
         # Initialize LLM provider
         self.llm = LLMProvider(
@@ -222,6 +223,7 @@ class MultiAgentOrchestrator:
         
         # Create specialized agents
         self._create_agents()
+        self.scheduler = RoleAwareScheduler(self.agents)
         
         logger.info(f"Multi-agent system initialized with {num_agents} agents")
     
@@ -242,67 +244,29 @@ class MultiAgentOrchestrator:
     async def execute_tasks(self, tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Execute tasks in parallel using multiple agents.
         
+        Tasks are routed to agents whose role matches the task type, idle
+        agents steal compatible work, and ``priority``/``depends_on`` task
+        keys are honored (see RoleAwareScheduler).
+        
         Args:
             tasks: List of tasks to execute
             
         Returns:
-            List of results
+            List of results, in the same order as ``tasks``
         """
         logger.info(f"Executing {len(tasks)} tasks with {self.num_agents} agents")
         
-        # Add tasks to queue
-        for task in tasks:
-            await self.task_queue.put(task)
-        
-        # Start agent workers
-        workers = [
-            asyncio.create_task(self._agent_worker(agent))
-            for agent in self.agents
-        ]
-        
-        # Wait for queue to be processed
-        await self.task_queue.join()
+        self.results = await self.scheduler.run(tasks)
+        self.last_run_metrics = self.scheduler.last_metrics
         
-        # Cancel workers
-        for worker in workers:
-            worker.cancel()
-        
-        # Wait for workers to finish
-        await asyncio.gather(*workers, return_exceptions=True)
-        
-        logger.info(f"Completed {len(self.results)} tasks")
+        logger.info(
+            f"Completed {len(self.results)} tasks",
+            wall_time=round(self.last_run_metrics["wall_time"], 3),
+            failed=self.last_run_metrics["failed"]
+        )
         
         return self.results
     
-    async def _agent_worker(self, agent: SpecializedAgent):
-        """Worker coroutine for an agent.
-        
-        Args:
-            agent: Agent to run
-        """
-        while True:
-            try:
-                # Get task from queue
-                task = await asyncio.wait_for(
-                    self.task_queue.get(),
-                    timeout=1.0
-                )
-                
-                # Execute task
-                result = await agent.execute_task(task)
-                self.results.append(result)
-                
-                # Mark task as done
-                self.task_queue.task_done()
-                
-            except asyncio.TimeoutError:
-                continue
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Agent {agent.agent_id} error: {e}")
-                self.task_queue.task_done()
-    
     async def collaborative_solve(self, problem: str) -> Dict[str, Any]:
         """Solve a complex problem collaboratively.
         
@@ -393,7 +357,8 @@ class MultiAgentOrchestrator:
                     "tasks": a.tasks_completed
                 }
                 for a in self.agents
-            ]
+            ],
+            "last_run": self.last_run_metrics
         }
 
 
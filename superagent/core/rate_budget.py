@@ -0,0 +1,124 @@
+"""Provider rate-limit budget tracking for pacing long-running work."""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+HEADER_PREFIX = "anthropic-ratelimit-"
+RESOURCES = ("requests", "tokens", "input-tokens", "output-tokens")
+
+
+def _parse_reset(value: Optional[str], now: float) -> Optional[float]:
+    """Convert an RFC 3339 reset timestamp (or seconds) to a time.time() value."""
+    if not value:
+        return None
+    try:
+        return now + float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class RateLimitBudget:
+    """Remaining request/token budget reported by the provider.
+
+    Updated from response headers after every call; ``delay`` turns the
+    remaining budget into a pause that spreads the rest of the window's
+    requests evenly instead of sleeping a fixed interval.
+    """
+
+    def __init__(self, reserve_requests: int = 1, max_delay: float = 60.0):
+        """Initialize budget.
+
+        Args:
+            reserve_requests: Requests kept in reserve for other callers
+            max_delay: Upper bound on any single pause, in seconds
+        """
+        self.reserve_requests = reserve_requests
+        self.max_delay = max_delay
+        self.limits: Dict[str, Dict[str, Optional[float]]] = {}
+        self.blocked_until = 0.0
+        self.updated_at: Optional[float] = None
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Record the budget advertised by a response's rate-limit headers."""
+        now = time.time()
+        lowered = {key.lower(): value for key, value in headers.items()}
+        for resource in RESOURCES:
+            remaining = lowered.get(f"{HEADER_PREFIX}{resource}-remaining")
+            if remaining is None:
+                continue
+            try:
+                self.limits[resource] = {
+                    "limit": float(lowered.get(f"{HEADER_PREFIX}{resource}-limit", "nan")),
+                    "remaining": float(remaining),
+                    "reset": _parse_reset(lowered.get(f"{HEADER_PREFIX}{resource}-reset"), now),
+                }
+            except ValueError:
+                continue
+            self.updated_at = now
+
+        retry_after = lowered.get("retry-after")
+        if retry_after:
+            self.record_rate_limited(retry_after)
+
+    def record_rate_limited(self, retry_after: Optional[Any] = None) -> None:
+        """Block until the provider's retry-after (or a conservative default)."""
+        try:
+            seconds = float(retry_after) if retry_after is not None else 10.0
+        except (TypeError, ValueError):
+            seconds = 10.0
+        self.blocked_until = max(self.blocked_until, time.time() + seconds)
+
+    def delay(self, expected_tokens: int = 0) -> float:
+        """Seconds to wait before the next call.
+
+        Args:
+            expected_tokens: Tokens the next call is expected to use
+
+        Returns:
+            0 when there is headroom (or nothing is known yet)
+        """
+        now = time.time()
+        wait = max(0.0, self.blocked_until - now)
+
+        requests = self.limits.get("requests")
+        if requests and requests["reset"]:
+            until_reset = max(0.0, requests["reset"] - now)
+            usable = requests["remaining"] - self.reserve_requests
+            if usable <= 0:
+                wait = max(wait, until_reset)
+            elif until_reset:
+                # Spread what is left evenly over the rest of the window
+                wait = max(wait, until_reset / (usable + 1))
+
+        for resource in ("tokens", "input-tokens", "output-tokens"):
+            budget = self.limits.get(resource)
+            if budget and budget["reset"] and budget["remaining"] < max(expected_tokens, 1):
+                wait = max(wait, budget["reset"] - now)
+
+        return min(wait, self.max_delay)
+
+    async def wait(self, expected_tokens: int = 0) -> float:
+        """Sleep for ``delay`` and return how long was waited."""
+        pause = self.delay(expected_tokens)
+        if pause > 0:
+            logger.info("Pacing for rate-limit budget", seconds=round(pause, 2))
+            await asyncio.sleep(pause)
+        return pause
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current budget for stats endpoints."""
+        return {
+            "limits": self.limits,
+            "blocked_for": max(0.0, self.blocked_until - time.time()),
+            "next_delay": self.delay(),
+        }
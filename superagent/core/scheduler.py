@@ -0,0 +1,309 @@
+"""Role-aware work-stealing task scheduler for multi-agent execution."""
+
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+import structlog
+
+if TYPE_CHECKING:
+    from superagent.core.multi_agent import AgentRole, SpecializedAgent
+
+logger = structlog.get_logger()
+
+
+def default_task_roles() -> Dict[str, Tuple["AgentRole", ...]]:
+    """Map task types to capable roles, primary role first.
+
+    The primary role owns the task's queue; the remaining roles may steal it
+    when they are idle.
+    """
+    from superagent.core.multi_agent import AgentRole
+
+    return {
+        "code": (AgentRole.CODER, AgentRole.ARCHITECT, AgentRole.DEBUGGER),
+        "implement": (AgentRole.CODER, AgentRole.ARCHITECT, AgentRole.DEBUGGER),
+        "debug": (AgentRole.DEBUGGER, AgentRole.CODER),
+        "fix": (AgentRole.DEBUGGER, AgentRole.CODER),
+        "test": (AgentRole.TESTER, AgentRole.CODER),
+        "review": (AgentRole.REVIEWER, AgentRole.SUPERVISOR, AgentRole.ARCHITECT),
+        "architecture": (AgentRole.ARCHITECT, AgentRole.CODER),
+        "design": (AgentRole.ARCHITECT, AgentRole.CODER),
+        "supervise": (AgentRole.SUPERVISOR, AgentRole.REVIEWER),
+        "rapid_check": (AgentRole.SUPERVISOR, AgentRole.REVIEWER),
+        "supreme_review": (AgentRole.SUPREME_AGENT,),
+    }
+
+
+@dataclass
+class ScheduledTask:
+    """Bookkeeping for one submitted task."""
+    index: int
+    task_id: Any
+    task: Dict[str, Any]
+    priority: int
+    roles: Tuple["AgentRole", ...]
+    depends_on: List[Any]
+    remaining_deps: int = 0
+    dependents: List[int] = field(default_factory=list)
+    submitted_at: float = 0.0
+    ready_at: Optional[float] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
+@dataclass
+class AgentMetrics:
+    """Per-agent utilization counters for one scheduling run."""
+    agent_id: int
+    role: str
+    tasks: int = 0
+    stolen: int = 0
+    failures: int = 0
+    busy_time: float = 0.0
+
+
+class RoleAwareScheduler:
+    """
+    Schedules tasks onto specialized agents.
+
+    - Each role has its own priority queue; tasks go to their primary role
+    - Idle agents steal the highest-priority compatible task from other roles
+    - Tasks only become runnable once their ``depends_on`` tasks succeeded
+    - Results are returned in submission order
+    """
+
+    def __init__(
+        self,
+        agents: Sequence["SpecializedAgent"],
+        task_roles: Optional[Dict[str, Tuple["AgentRole", ...]]] = None
+    ):
+        """Initialize scheduler.
+
+        Args:
+            agents: Agents available to run tasks
+            task_roles: Override for the task type -> capable roles mapping
+        """
+        self.agents = list(agents)
+        self.task_roles = task_roles or default_task_roles()
+        self.last_metrics: Dict[str, Any] = {}
+
+    def _roles_for(self, task: Dict[str, Any]) -> Tuple["AgentRole", ...]:
+        roles = task.get("roles")
+        if roles:
+            from superagent.core.multi_agent import AgentRole
+            return tuple(r if isinstance(r, AgentRole) else AgentRole(r) for r in roles)
+
+        task_type = task.get("type", "general")
+        if task_type in self.task_roles:
+            return self.task_roles[task_type]
+
+        # Generic tasks can run anywhere; keep agent order for the primary role
+        seen: List["AgentRole"] = []
+        for agent in self.agents:
+            if agent.role not in seen:
+                seen.append(agent.role)
+        return tuple(seen)
+
+    async def run(self, tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Execute tasks and return results in submission order.
+
+        Args:
+            tasks: Task dicts. Optional keys: ``id``, ``priority`` (higher runs
+                first), ``depends_on`` (list of task ids) and ``roles``.
+
+        Returns:
+            One result per task, in the order tasks were submitted
+        """
+        run_started = time.perf_counter()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(tasks)
+        agent_metrics = {a.agent_id: AgentMetrics(a.agent_id, a.role.value) for a in self.agents}
+
+        scheduled: List[ScheduledTask] = []
+        by_id: Dict[Any, int] = {}
+        for index, task in enumerate(tasks):
+            task_id = task.get("id", index)
+            if task_id in by_id:
+                raise ValueError(f"Duplicate task id: {task_id!r}")
+            by_id[task_id] = index
+            scheduled.append(ScheduledTask(
+                index=index,
+                task_id=task_id,
+                task=task,
+                priority=int(task.get("priority", 0)),
+                roles=self._roles_for(task),
+                depends_on=list(task.get("depends_on", [])),
+                submitted_at=run_started
+            ))
+
+        queues: Dict["AgentRole", List[Tuple[int, int, int]]] = {}
+        sequence = itertools.count()
+        available_roles = {a.role for a in self.agents}
+        condition = asyncio.Condition()
+        pending = len(tasks)
+
+        def finish(entry: ScheduledTask, result: Dict[str, Any]) -> List[ScheduledTask]:
+            """Record a result and return dependents that became ready."""
+            nonlocal pending
+            entry.finished_at = time.perf_counter()
+            results[entry.index] = result
+            pending -= 1
+
+            newly_ready = []
+            for dep_index in entry.dependents:
+                dependent = scheduled[dep_index]
+                if results[dep_index] is not None:
+                    continue
+                if not result.get("success"):
+                    newly_ready.extend(finish(dependent, self._failed_result(
+                        dependent, f"Dependency {entry.task_id!r} failed"
+                    )))
+                    continue
+                dependent.remaining_deps -= 1
+                if dependent.remaining_deps == 0:
+                    newly_ready.append(dependent)
+            return newly_ready
+
+        def enqueue(entry: ScheduledTask) -> None:
+            if not any(role in available_roles for role in entry.roles):
+                for ready in finish(entry, self._failed_result(entry, "No agent can handle this task type")):
+                    enqueue(ready)
+                return
+            entry.ready_at = time.perf_counter()
+            primary = next(role for role in entry.roles if role in available_roles)
+            heapq.heappush(queues.setdefault(primary, []), (-entry.priority, next(sequence), entry.index))
+
+        # Wire dependencies; unknown ids and cycles fail the affected tasks
+        invalid: Dict[int, str] = {}
+        for entry in scheduled:
+            unknown = [dep_id for dep_id in entry.depends_on if dep_id not in by_id]
+            if unknown:
+                invalid[entry.index] = f"Unknown dependency {unknown[0]!r}"
+                continue
+            for dep_id in entry.depends_on:
+                scheduled[by_id[dep_id]].dependents.append(entry.index)
+                entry.remaining_deps += 1
+
+        # Kahn's algorithm: anything never reaching in-degree 0 sits on a cycle
+        in_degree = {entry.index: entry.remaining_deps for entry in scheduled}
+        frontier = [i for i, degree in in_degree.items() if degree == 0]
+        reachable = set()
+        while frontier:
+            current = frontier.pop()
+            reachable.add(current)
+            for dep_index in scheduled[current].dependents:
+                in_degree[dep_index] -= 1
+                if in_degree[dep_index] == 0:
+                    frontier.append(dep_index)
+        for entry in scheduled:
+            if entry.index not in reachable and entry.index not in invalid:
+                invalid[entry.index] = "Dependency cycle detected"
+
+        for index, error in invalid.items():
+            if results[index] is None:
+                finish(scheduled[index], self._failed_result(scheduled[index], error))
+
+        for entry in scheduled:
+            if results[entry.index] is None and entry.remaining_deps == 0:
+                enqueue(entry)
+
+        def take(agent: "SpecializedAgent") -> Optional[Tuple[ScheduledTask, bool]]:
+            own = queues.get(agent.role)
+            if own:
+                return scheduled[heapq.heappop(own)[2]], False
+
+            # Work stealing: best compatible task across the other role queues
+            best: Optional[Tuple[Tuple[int, int, int], "AgentRole"]] = None
+            for role, queue in queues.items():
+                if role == agent.role:
+                    continue
+                for item in queue:
+                    if agent.role in scheduled[item[2]].roles and (best is None or item < best[0]):
+                        best = (item, role)
+            if best is None:
+                return None
+            queues[best[1]].remove(best[0])
+            heapq.heapify(queues[best[1]])
+            return scheduled[best[0][2]], True
+
+        async def worker(agent: "SpecializedAgent") -> None:
+            metrics = agent_metrics[agent.agent_id]
+            while True:
+                async with condition:
+                    picked = take(agent)
+                    while picked is None:
+                        if pending == 0:
+                            return
+                        await condition.wait()
+                        picked = take(agent)
+                entry, stolen = picked
+
+                entry.started_at = time.perf_counter()
+                try:
+                    result = await agent.execute_task(entry.task)
+                except Exception as e:
+                    logger.error(f"Agent {agent.agent_id} error: {e}")
+                    metrics.failures += 1
+                    result = self._failed_result(entry, str(e), agent)
+
+                duration = time.perf_counter() - entry.started_at
+                metrics.busy_time += duration
+                metrics.tasks += 1
+                metrics.stolen += int(stolen)
+                result = {
+                    **result,
+                    "task_id": entry.task_id,
+                    "stolen": stolen,
+                    "queue_wait": entry.started_at - (entry.ready_at or entry.started_at),
+                    "duration": duration
+                }
+
+                async with condition:
+                    for ready in finish(entry, result):
+                        enqueue(ready)
+                    condition.notify_all()
+
+        await asyncio.gather(*(worker(agent) for agent in self.agents))
+
+        wall_time = time.perf_counter() - run_started
+        waits = [r.get("queue_wait", 0.0) for r in results if r and "queue_wait" in r]
+        self.last_metrics = {
+            "tasks": len(tasks),
+            "succeeded": sum(1 for r in results if r and r.get("success")),
+            "failed": sum(1 for r in results if r and not r.get("success")),
+            "wall_time": wall_time,
+            "avg_queue_wait": sum(waits) / len(waits) if waits else 0.0,
+            "max_queue_wait": max(waits) if waits else 0.0,
+            "agents": [
+                {
+                    "agent_id": m.agent_id,
+                    "role": m.role,
+                    "tasks": m.tasks,
+                    "stolen": m.stolen,
+                    "failures": m.failures,
+                    "busy_time": m.busy_time,
+                    "utilization": m.busy_time / wall_time if wall_time > 0 else 0.0
+                }
+                for m in agent_metrics.values()
+            ]
+        }
+        return results  # type: ignore[return-value]
+
+    @staticmethod
+    def _failed_result(
+        entry: ScheduledTask,
+        error: str,
+        agent: Optional["SpecializedAgent"] = None
+    ) -> Dict[str, Any]:
+        return {
+            "agent_id": agent.agent_id if agent else None,
+            "role": agent.role.value if agent else None,
+            "task": entry.task,
+            "task_id": entry.task_id,
+            "result": None,
+            "success": False,
+            "error": error
+        }
@@ -0,0 +1,82 @@
+"""Request coalescing (single-flight) for identical in-flight calls."""
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict
+import structlog
+
+logger = structlog.get_logger()
+
+
+def flight_key(**parts: Any) -> str:
+    """Stable key for the parts that make two calls identical.
+
+    Args:
+        **parts: Request attributes (model, prompt, system, temperature, ...)
+
+    Returns:
+        Hex digest identifying the request
+    """
+    data = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class SingleFlight:
+    """Collapses concurrent identical calls onto one in-flight future.
+
+    The first caller for a key starts the call; callers arriving while it is
+    still running await the same result (or exception). The entry is removed
+    as soon as the call settles, so this never serves stale results - use
+    the cache for that.
+    """
+
+    def __init__(self, name: str = "single_flight"):
+        """Initialize single-flight group.
+
+        Args:
+            name: Name used in logs
+        """
+        self.name = name
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.calls = 0
+        self.executed = 0
+        self.collapsed = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fn`` once for all concurrent callers with the same key.
+
+        Args:
+            key: Request identity (see ``flight_key``)
+            fn: Zero-argument coroutine function performing the call
+
+        Returns:
+            The shared result
+        """
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.collapsed += 1
+            logger.debug(f"{self.name}: joined in-flight call", key=key[:8])
+        else:
+            self.executed += 1
+            # Run as its own task so one caller being cancelled does not
+            # cancel the call for everyone else waiting on it
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Coalescing counters.
+
+        Returns:
+            Statistics dictionary
+        """
+        return {
+            "calls": self.calls,
+            "executed": self.executed,
+            "collapsed": self.collapsed,
+            "in_flight": len(self._in_flight),
+            "collapse_rate": self.collapsed / self.calls if self.calls else 0.0,
+        }
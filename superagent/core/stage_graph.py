@@ -0,0 +1,314 @@
+"""
+Stage Graph Engine
+Runs build stages as a dependency graph: stages declare the artifacts they
+consume and produce, independent stages run concurrently, and each stage can
+have its own timeout. Optional stages may fail or time out without failing
+the build.
+"""
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Set, Tuple
+
+
+class StageGraphError(Exception):
+    """Invalid graph definition or a stage that broke its output contract"""
+
+
+class StageTimeoutError(Exception):
+    """A stage exceeded its timeout"""
+
+
+@dataclass
+class Stage:
+    """One node in the build graph"""
+    name: str
+    run: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+    inputs: Tuple[str, ...] = ()    # artifacts required (data dependencies)
+    outputs: Tuple[str, ...] = ()   # artifacts the stage must return
+    after: Tuple[str, ...] = ()     # ordering-only dependencies (run after, whatever the outcome)
+    timeout: Optional[float] = None
+    optional: bool = False
+    weight: float = 1.0
+    describe: Optional[Callable[[Dict[str, Any]], str]] = None
+
+
+@dataclass
+class StageOutcome:
+    """Execution record for one stage"""
+    name: str
+    status: str = "pending"  # pending, running, completed, failed, timeout, skipped, cancelled
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    outputs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "duration": round(self.duration, 3) if self.duration is not None else None,
+            "error": self.error,
+        }
+
+
+TERMINAL = {"completed", "failed", "timeout", "skipped", "cancelled"}
+
+
+class StageGraph:
+    """Executes stages as soon as their dependencies have finished"""
+
+    def __init__(self, stages: Sequence[Stage], on_event: Optional[Callable[[Dict[str, Any]], Any]] = None):
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise StageGraphError(f"Duplicate stage name: {stage.name}")
+            self.stages[stage.name] = stage
+
+        self.producers: Dict[str, str] = {}
+        for stage in stages:
+            for output in stage.outputs:
+                if output in self.producers:
+                    raise StageGraphError(
+                        f"Artifact '{output}' produced by both {self.producers[output]} and {stage.name}"
+                    )
+                self.producers[output] = stage.name
+            for name in stage.after:
+                if name not in self.stages:
+                    raise StageGraphError(f"Stage {stage.name} runs after unknown stage {name}")
+
+        self.on_event = on_event
+        self.outcomes: Dict[str, StageOutcome] = {name: StageOutcome(name) for name in self.stages}
+        self._running: Dict[asyncio.Task, str] = {}
+        self._cancelled = False
+        self._deps: Dict[str, Set[str]] = {}
+
+    def dependencies(self, initial: Sequence[str] = ()) -> Dict[str, Set[str]]:
+        """Stage name -> names of stages it waits for"""
+        deps: Dict[str, Set[str]] = {}
+        for stage in self.stages.values():
+            waits = set(stage.after)
+            for artifact in stage.inputs:
+                if artifact in self.producers:
+                    waits.add(self.producers[artifact])
+                elif artifact not in initial:
+                    raise StageGraphError(f"Stage {stage.name} needs '{artifact}', which nothing provides")
+            deps[stage.name] = waits
+
+        # Reject cycles up front (Kahn's algorithm)
+        remaining = {name: set(waits) for name, waits in deps.items()}
+        ready = [name for name, waits in remaining.items() if not waits]
+        visited = 0
+        while ready:
+            current = ready.pop()
+            visited += 1
+            for name, waits in remaining.items():
+                if current in waits:
+                    waits.discard(current)
+                    if not waits:
+                        ready.append(name)
+        if visited != len(deps):
+            raise StageGraphError("Stage graph contains a cycle")
+        return deps
+
+    async def run(self, artifacts: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Run the graph.
+
+        Args:
+            artifacts: Initial artifacts available to every stage
+
+        Returns:
+            All artifacts, including those produced by stages
+
+        Raises:
+            The exception of the first required stage that fails (running
+            stages are cancelled first), or asyncio.CancelledError when the
+            graph is cancelled.
+        """
+        artifacts = dict(artifacts or {})
+        deps = self._deps = self.dependencies(list(artifacts))
+        fatal: Optional[BaseException] = None
+
+        try:
+            while True:
+                if fatal is None and not self._cancelled:
+                    await self._start_ready(deps, artifacts)
+                if not self._running:
+                    break
+
+                done, _ = await asyncio.wait(list(self._running), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = self._running.pop(task)
+                    error = await self._finish(name, task, artifacts)
+                    if error is not None and fatal is None and not self.stages[name].optional:
+                        fatal = error
+                        self._cancel_running()
+        finally:
+            if self._running:
+                # Our caller was cancelled: stop everything still in flight
+                self._cancel_running()
+                await asyncio.gather(*self._running, return_exceptions=True)
+                for name in self._running.values():
+                    self._mark(name, "cancelled", "Build cancelled")
+                self._running.clear()
+
+        for outcome in self.outcomes.values():
+            if outcome.status == "pending":
+                outcome.status = "skipped"
+
+        if fatal is not None:
+            raise fatal
+        if self._cancelled:
+            raise asyncio.CancelledError("Stage graph cancelled")
+        return artifacts
+
+    def cancel(self) -> None:
+        """Cancel all running stages; ``run`` raises CancelledError"""
+        self._cancelled = True
+        self._cancel_running()
+
+    def timings(self) -> Dict[str, Dict[str, Any]]:
+        """Status and duration of every stage"""
+        return {name: outcome.to_dict() for name, outcome in self.outcomes.items()}
+
+    def critical_path(self) -> Dict[str, Any]:
+        """The chain of stages that determined the build's wall time.
+
+        Starting from the stage that finished last, walk back through the
+        dependency that finished last before it. With unlimited parallelism
+        the build cannot be faster than the sum of these stage durations.
+
+        Returns:
+            ``{"stages": [...], "seconds": float}`` (stages in execution order)
+        """
+        finished = {
+            name: outcome for name, outcome in self.outcomes.items()
+            if outcome.finished_at is not None and outcome.started_at is not None
+        }
+        if not finished:
+            return {"stages": [], "seconds": 0.0}
+
+        deps = self._deps
+        path = []
+        current: Optional[str] = max(finished, key=lambda name: finished[name].finished_at)
+        while current is not None:
+            path.append(current)
+            upstream = [dep for dep in deps[current] if dep in finished]
+            current = max(upstream, key=lambda name: finished[name].finished_at) if upstream else None
+        path.reverse()
+        return {
+            "stages": path,
+            "seconds": round(sum(finished[name].duration for name in path), 3),
+        }
+
+    @property
+    def progress(self) -> int:
+        total = sum(stage.weight for stage in self.stages.values()) or 1
+        done = sum(
+            self.stages[name].weight for name, outcome in self.outcomes.items() if outcome.status in TERMINAL
+        )
+        return int(done / total * 100)
+
+    # ------------------------------------------------------------------
+
+    async def _start_ready(self, deps: Dict[str, Set[str]], artifacts: Dict[str, Any]) -> None:
+        progressed = True
+        while progressed:
+            progressed = False
+            for name, stage in self.stages.items():
+                outcome = self.outcomes[name]
+                if outcome.status != "pending":
+                    continue
+                if any(self.outcomes[dep].status not in TERMINAL for dep in deps[name]):
+                    continue
+
+                missing = [artifact for artifact in stage.inputs if artifact not in artifacts]
+                if missing:
+                    # An upstream optional stage failed; nothing to work with
+                    self._mark(name, "skipped", f"Missing input: {', '.join(missing)}")
+                    await self._emit("stage_skipped", name)
+                    progressed = True
+                    continue
+
+                outcome.status = "running"
+                outcome.started_at = time.perf_counter()
+                inputs = {artifact: artifacts[artifact] for artifact in stage.inputs}
+                task = asyncio.create_task(self._execute(stage, inputs), name=f"stage:{name}")
+                self._running[task] = name
+                await self._emit("stage_started", name)
+
+    async def _execute(self, stage: Stage, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            if stage.timeout:
+                produced = await asyncio.wait_for(stage.run(inputs), timeout=stage.timeout)
+            else:
+                produced = await stage.run(inputs)
+        except asyncio.TimeoutError:
+            raise StageTimeoutError(f"Stage {stage.name} timed out after {stage.timeout}s")
+
+        produced = produced or {}
+        missing = [output for output in stage.outputs if output not in produced]
+        if missing:
+            raise StageGraphError(f"Stage {stage.name} did not produce: {', '.join(missing)}")
+        return produced
+
+    async def _finish(self, name: str, task: asyncio.Task, artifacts: Dict[str, Any]) -> Optional[BaseException]:
+        stage = self.stages[name]
+        if task.cancelled():
+            self._mark(name, "cancelled", "Build cancelled")
+            await self._emit("stage_cancelled", name)
+            return None
+
+        error = task.exception()
+        if error is None:
+            produced = task.result()
+            outcome = self.outcomes[name]
+            outcome.outputs = {key: produced[key] for key in stage.outputs}
+            artifacts.update(outcome.outputs)
+            self._mark(name, "completed")
+            await self._emit("stage_completed", name)
+            return None
+
+        status = "timeout" if isinstance(error, StageTimeoutError) else "failed"
+        self._mark(name, status, str(error))
+        await self._emit(f"stage_{status}", name)
+        return error
+
+    def _mark(self, name: str, status: str, error: Optional[str] = None) -> None:
+        outcome = self.outcomes[name]
+        outcome.status = status
+        outcome.error = error
+        if outcome.started_at is not None and outcome.finished_at is None:
+            outcome.finished_at = time.perf_counter()
+
+    def _cancel_running(self) -> None:
+        for task in self._running:
+            task.cancel()
+
+    async def _emit(self, event_type: str, name: str) -> None:
+        if not self.on_event:
+            return
+        stage = self.stages[name]
+        outcome = self.outcomes[name]
+        event = {
+            "type": event_type,
+            "stage": name,
+            "optional": stage.optional,
+            "progress": self.progress,
+            "duration": outcome.duration,
+            "error": outcome.error,
+            "outputs": outcome.outputs,
+            "message": None,
+        }
+        if event_type == "stage_completed" and stage.describe:
+            event["message"] = stage.describe(outcome.outputs)
+        result = self.on_event(event)
+        if inspect.isawaitable(result):
+            await result
@@ -0,0 +1,526 @@
+"""Structured tracing for builds, LLM calls and subprocesses.
+
+Spans are kept in an in-memory ring buffer and persisted to SQLite by a
+background thread. Traces can be exported as OpenTelemetry (OTLP/JSON)
+and aggregated into per-stage and per-provider latency/token profiles.
+"""
+
+import functools
+import json
+import math
+import os
+import queue
+import secrets
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+import structlog
+
+from superagent.core.metrics import record_llm_span
+
+logger = structlog.get_logger()
+
+SPAN_KINDS = ("build", "stage", "llm", "subprocess", "internal")
+
+
+class Span:
+    """A single timed operation within a trace."""
+
+    __slots__ = (
+        "trace_id", "span_id", "parent_id", "name", "kind", "stage",
+        "start_ns", "end_ns", "status", "attributes", "events"
+    )
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent_id: Optional[str],
+                 stage: Optional[str], attributes: Dict[str, Any]):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.stage = stage
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = "ok"
+        self.attributes = dict(attributes)
+        self.events: List[Dict[str, Any]] = []
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set a span attribute."""
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        """Set several span attributes."""
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        """Record a point-in-time event (e.g. first token received)."""
+        self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes})
+
+    def record_exception(self, error: BaseException) -> None:
+        """Mark the span as failed."""
+        self.status = "error"
+        self.attributes["error.type"] = type(error).__name__
+        self.attributes["error.message"] = str(error)[:500]
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns or time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "stage": self.stage,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "attributes": self.attributes,
+            "events": self.events,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("superagent_current_span", default=None)
+
+
+class _SQLiteSpanWriter:
+    """Background thread that batches finished spans into SQLite."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=10000)
+        self.dropped = 0
+        self._lock = threading.Lock()
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS spans (
+                    trace_id TEXT, span_id TEXT PRIMARY KEY, parent_id TEXT,
+                    name TEXT, kind TEXT, stage TEXT,
+                    start_ns INTEGER, end_ns INTEGER, status TEXT,
+                    attributes TEXT, events TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_spans_kind_start ON spans (kind, start_ns)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_spans_trace ON spans (trace_id)")
+        self._thread = threading.Thread(target=self._run, name="span-writer", daemon=True)
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def submit(self, span: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        conn = self._connect()
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < 500:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self._lock, conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO spans VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [
+                            (
+                                s["trace_id"], s["span_id"], s["parent_id"], s["name"], s["kind"],
+                                s["stage"], s["start_ns"], s["end_ns"], s["status"],
+                                json.dumps(s["attributes"], default=str), json.dumps(s["events"], default=str)
+                            )
+                            for s in batch
+                        ]
+                    )
+            except sqlite3.Error as e:
+                self.dropped += len(batch)
+                logger.warning(f"Failed to persist spans: {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Block until queued spans are written (used by tests and shutdown)."""
+        deadline = time.time() + timeout
+        while self.queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.01)
+
+    def query(self, since_ns: int, kinds: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        sql = "SELECT * FROM spans WHERE start_ns >= ?"
+        params: List[Any] = [since_ns]
+        if kinds:
+            sql += f" AND kind IN ({','.join('?' * len(kinds))})"
+            params.extend(kinds)
+        with self._lock:
+            conn = self._connect()
+            try:
+                rows = conn.execute(sql, params).fetchall()
+            finally:
+                conn.close()
+        columns = ["trace_id", "span_id", "parent_id", "name", "kind", "stage",
+                   "start_ns", "end_ns", "status", "attributes", "events"]
+        spans = []
+        for row in rows:
+            span = dict(zip(columns, row))
+            span["attributes"] = json.loads(span["attributes"] or "{}")
+            span["events"] = json.loads(span["events"] or "[]")
+            span["duration_ms"] = ((span["end_ns"] or span["start_ns"]) - span["start_ns"]) / 1e6
+            spans.append(span)
+        return spans
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class Tracer:
+    """Creates spans and keeps recent traces for inspection and export."""
+
+    def __init__(self, service_name: str = "superagent", buffer_size: int = 5000,
+                 db_path: Optional[str] = None):
+        """Initialize tracer.
+
+        Args:
+            service_name: Service name reported in OTLP exports
+            buffer_size: Number of finished spans kept in memory
+            db_path: SQLite file for durable storage. Defaults to
+                $SUPERAGENT_TRACE_DB or logs/traces.db; empty disables it.
+        """
+        self.service_name = service_name
+        self.buffer: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self._db_path = db_path
+        self._writer: Optional[_SQLiteSpanWriter] = None
+        self._writer_lock = threading.Lock()
+        self._writer_failed = False
+        self.enabled = os.getenv("SUPERAGENT_TRACING", "true").lower() not in ("0", "false", "no")
+
+    # ------------------------------------------------------------------
+    # Span creation
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes: Any) -> Iterator[Span]:
+        """Context manager that times a block as a span.
+
+        Works in sync and async code; the span becomes the parent of any
+        span started inside the block (including in awaited coroutines).
+        """
+        span = self.start_span(name, kind, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+
+    def start_span(self, name: str, kind: str = "internal", **attributes: Any) -> Span:
+        """Start a span under the current one without making it current.
+
+        For work that is suspended in between, such as an async generator
+        yielding to its consumer: spans the consumer opens meanwhile must not
+        become its children. Finish it with ``end_span``.
+        """
+        parent = _current_span.get()
+        trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        stage = name if kind == "stage" else (parent.stage if parent else None)
+        return Span(name, kind, trace_id, parent.span_id if parent else None, stage, attributes)
+
+    def end_span(self, span: Span) -> None:
+        """Finish a span started with ``start_span``."""
+        span.end_ns = time.time_ns()
+        self._finish(span)
+
+    def traced(self, name: Optional[str] = None, kind: str = "internal", **attributes: Any) -> Callable:
+        """Decorator that wraps an async function in a span.
+
+        If the function returns a dict with ``success: False`` the span is
+        marked as failed.
+        """
+        def decorator(func: Callable) -> Callable:
+            span_name = name or func.__name__
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                with self.span(span_name, kind, **attributes) as span:
+                    result = await func(*args, **kwargs)
+                    if isinstance(result, dict) and result.get("success") is False:
+                        span.status = "error"
+                        if result.get("error"):
+                            span.set_attribute("error.message", str(result["error"])[:500])
+                    return result
+            return wrapper
+        return decorator
+
+    def current_span(self) -> Optional[Span]:
+        """Get the active span, if any."""
+        return _current_span.get()
+
+    def current_trace_id(self) -> Optional[str]:
+        """Get the active trace id, if any."""
+        span = _current_span.get()
+        return span.trace_id if span else None
+
+    def _finish(self, span: Span) -> None:
+        if span.kind == "llm":
+            # Metrics are kept even when trace storage is switched off
+            record_llm_span(span)
+        if not self.enabled:
+            return
+        record = span.to_dict()
+        self.buffer.append(record)
+        writer = self._get_writer()
+        if writer:
+            writer.submit(record)
+
+    def _get_writer(self) -> Optional[_SQLiteSpanWriter]:
+        if self._writer or self._writer_failed:
+            return self._writer
+        with self._writer_lock:
+            if self._writer or self._writer_failed:
+                return self._writer
+            db_path = self._db_path if self._db_path is not None else os.getenv(
+                "SUPERAGENT_TRACE_DB", "logs/traces.db"
+            )
+            if not db_path:
+                self._writer_failed = True
+                return None
+            try:
+                self._writer = _SQLiteSpanWriter(db_path)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Trace persistence disabled: {e}")
+                self._writer_failed = True
+            return self._writer
+
+    def flush(self) -> None:
+        """Wait for pending spans to reach SQLite."""
+        if self._writer:
+            self._writer.flush()
+
+    # ------------------------------------------------------------------
+    # Convenience recorders
+    # ------------------------------------------------------------------
+
+    def record_llm_usage(self, span: Span, prompt_tokens: Optional[int] = None,
+                         output_tokens: Optional[int] = None,
+                         time_to_first_token_ms: Optional[float] = None,
+                         cache_hit: Optional[bool] = None) -> None:
+        """Attach token counts and timing to an LLM span."""
+        if prompt_tokens is not None:
+            span.set_attribute("llm.prompt_tokens", int(prompt_tokens))
+        if output_tokens is not None:
+            span.set_attribute("llm.output_tokens", int(output_tokens))
+        if time_to_first_token_ms is not None:
+            span.set_attribute("llm.ttft_ms", float(time_to_first_token_ms))
+        if cache_hit is not None:
+            span.set_attribute("llm.cache_hit", bool(cache_hit))
+
+    # ------------------------------------------------------------------
+    # Queries and export
+    # ------------------------------------------------------------------
+
+    def recent_traces(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Summaries of the most recent traces in the ring buffer."""
+        traces: Dict[str, Dict[str, Any]] = {}
+        for span in reversed(self.buffer):
+            summary = traces.setdefault(span["trace_id"], {
+                "trace_id": span["trace_id"],
+                "root": None,
+                "spans": 0,
+                "errors": 0,
+                "start_ns": span["start_ns"],
+                "end_ns": span["end_ns"],
+            })
+            summary["spans"] += 1
+            summary["errors"] += span["status"] == "error"
+            summary["start_ns"] = min(summary["start_ns"], span["start_ns"])
+            summary["end_ns"] = max(summary["end_ns"] or 0, span["end_ns"] or 0)
+            if span["parent_id"] is None:
+                summary["root"] = span["name"]
+            if len(traces) > limit:
+                break
+        result = list(traces.values())[:limit]
+        for summary in result:
+            summary["duration_ms"] = (summary["end_ns"] - summary["start_ns"]) / 1e6
+        return result
+
+    def get_trace(self, trace_id: str) -> List[Dict[str, Any]]:
+        """All spans of a trace, oldest first (ring buffer, then SQLite)."""
+        spans = [s for s in self.buffer if s["trace_id"] == trace_id]
+        if not spans and self._get_writer():
+            self._writer.flush()
+            spans = [s for s in self._writer.query(0) if s["trace_id"] == trace_id]
+        return sorted(spans, key=lambda s: s["start_ns"])
+
+    def export_otlp(self, spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Convert spans to OpenTelemetry OTLP/JSON (``resourceSpans``)."""
+        otel_kind = {"build": 1, "stage": 1, "internal": 1, "llm": 3, "subprocess": 3}
+
+        def attr(key: str, value: Any) -> Dict[str, Any]:
+            if isinstance(value, bool):
+                typed = {"boolValue": value}
+            elif isinstance(value, int):
+                typed = {"intValue": str(value)}
+            elif isinstance(value, float):
+                typed = {"doubleValue": value}
+            else:
+                typed = {"stringValue": str(value)}
+            return {"key": key, "value": typed}
+
+        otel_spans = []
+        for span in spans:
+            attributes = {"superagent.kind": span["kind"], **span["attributes"]}
+            if span.get("stage"):
+                attributes["superagent.stage"] = span["stage"]
+            otel_spans.append({
+                "traceId": span["trace_id"],
+                "spanId": span["span_id"],
+                "parentSpanId": span["parent_id"] or "",
+                "name": span["name"],
+                "kind": otel_kind.get(span["kind"], 1),
+                "startTimeUnixNano": str(span["start_ns"]),
+                "endTimeUnixNano": str(span["end_ns"] or span["start_ns"]),
+                "attributes": [attr(k, v) for k, v in attributes.items()],
+                "events": [
+                    {
+                        "timeUnixNano": str(event["time_ns"]),
+                        "name": event["name"],
+                        "attributes": [attr(k, v) for k, v in event["attributes"].items()],
+                    }
+                    for event in span.get("events", [])
+                ],
+                "status": {"code": 2 if span["status"] == "error" else 1},
+            })
+
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [attr("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "superagent.tracing", "version": "1.0.0"},
+                    "spans": otel_spans,
+                }],
+            }]
+        }
+
+    def aggregate(self, window_seconds: int = 3600) -> Dict[str, Any]:
+        """Latency and token profiles per build stage and per LLM provider.
+
+        Args:
+            window_seconds: Only consider spans started within this window
+
+        Returns:
+            p50/p95 durations per stage and latency/TTFT/token stats per provider
+        """
+        since_ns = time.time_ns() - window_seconds * 1_000_000_000
+        writer = self._get_writer()
+        if writer:
+            writer.flush()
+            spans = writer.query(since_ns, ["build", "stage", "llm", "subprocess"])
+        else:
+            spans = [s for s in self.buffer if s["start_ns"] >= since_ns]
+
+        stage_durations: Dict[str, List[float]] = {}
+        stage_errors: Dict[str, int] = {}
+        stage_tokens: Dict[tuple, int] = {}
+        stage_llm_ms: Dict[tuple, float] = {}
+        providers: Dict[str, Dict[str, List[float]]] = {}
+        subprocess_durations: Dict[str, List[float]] = {}
+
+        for span in spans:
+            attrs = span["attributes"]
+            if span["kind"] == "stage":
+                stage_durations.setdefault(span["name"], []).append(span["duration_ms"])
+                stage_errors[span["name"]] = stage_errors.get(span["name"], 0) + (span["status"] == "error")
+            elif span["kind"] == "llm":
+                tokens = attrs.get("llm.prompt_tokens", 0) + attrs.get("llm.output_tokens", 0)
+                if span.get("stage"):
+                    key = (span["stage"], span["trace_id"])
+                    stage_tokens[key] = stage_tokens.get(key, 0) + tokens
+                    stage_llm_ms[key] = stage_llm_ms.get(key, 0.0) + span["duration_ms"]
+                stats = providers.setdefault(attrs.get("llm.provider", "unknown"), {
+                    "latency": [], "ttft": [], "prompt_tokens": [], "output_tokens": [],
+                    "cache_hits": [], "errors": []
+                })
+                stats["latency"].append(span["duration_ms"])
+                if "llm.ttft_ms" in attrs:
+                    stats["ttft"].append(attrs["llm.ttft_ms"])
+                stats["prompt_tokens"].append(attrs.get("llm.prompt_tokens", 0))
+                stats["output_tokens"].append(attrs.get("llm.output_tokens", 0))
+                stats["cache_hits"].append(1.0 if attrs.get("llm.cache_hit") else 0.0)
+                stats["errors"].append(1.0 if span["status"] == "error" else 0.0)
+            elif span["kind"] == "subprocess":
+                command = str(attrs.get("command", span["name"])).split(" ")[0]
+                subprocess_durations.setdefault(command, []).append(span["duration_ms"])
+
+        stages = {}
+        for stage, durations in stage_durations.items():
+            tokens = [v for (s, _), v in stage_tokens.items() if s == stage]
+            llm_ms = [v for (s, _), v in stage_llm_ms.items() if s == stage]
+            stages[stage] = {
+                "count": len(durations),
+                "errors": stage_errors.get(stage, 0),
+                "p50_ms": percentile(durations, 50),
+                "p95_ms": percentile(durations, 95),
+                "max_ms": max(durations),
+                "tokens_p50": percentile(tokens, 50),
+                "tokens_p95": percentile(tokens, 95),
+                "llm_time_p50_ms": percentile(llm_ms, 50),
+            }
+
+        provider_profiles = {}
+        for provider, stats in providers.items():
+            count = len(stats["latency"])
+            provider_profiles[provider] = {
+                "calls": count,
+                "p50_ms": percentile(stats["latency"], 50),
+                "p95_ms": percentile(stats["latency"], 95),
+                "ttft_p50_ms": percentile(stats["ttft"], 50),
+                "ttft_p95_ms": percentile(stats["ttft"], 95),
+                "prompt_tokens": int(sum(stats["prompt_tokens"])),
+                "output_tokens": int(sum(stats["output_tokens"])),
+                "avg_output_tokens": sum(stats["output_tokens"]) / count if count else 0,
+                "cache_hit_rate": sum(stats["cache_hits"]) / count if count else 0.0,
+                "error_rate": sum(stats["errors"]) / count if count else 0.0,
+            }
+
+        return {
+            "window_seconds": window_seconds,
+            "spans_analyzed": len(spans),
+            "stages": stages,
+            "providers": provider_profiles,
+            "subprocesses": {
+                command: {
+                    "count": len(durations),
+                    "p50_ms": percentile(durations, 50),
+                    "p95_ms": percentile(durations, 95),
+                }
+                for command, durations in subprocess_durations.items()
+            },
+        }
+
+
+# Global tracer
+tracer = Tracer()
@@ -6,9 +6,10 @@ This is the KEY to matching Devin's #1 capability!
 """
 
 import asyncio
+import time
 from typing import Dict, Any, List, Optional
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime
 import structlog
 
 from superagent.core.memory import ProjectMemory
@@ -49,6 +50,8 @@ class AutonomousPlanner:
         Execute a project autonomously for extended time.
         
         This is like Devin - works for hours without human input.
+        Progress is checkpointed to memory after every iteration, so an
+        interrupted run can be continued with ``resume_autonomous_project``.
         
         Args:
             instruction: High-level project goal
@@ -60,8 +63,6 @@ class AutonomousPlanner:
             Project results after autonomous execution
         """
         max_time = max_time or self.max_autonomous_time
-        start_time = datetime.now()
-        end_time = start_time + timedelta(seconds=max_time)
         
         logger.info(
             "Starting autonomous execution",
@@ -70,36 +71,110 @@ class AutonomousPlanner:
         )
         
         # Add to memory
-        project_id = self.memory.add_project(project_name, instruction)
+        project_id = self.memory.create_project(project_name, instruction)
         
         # Create initial plan
         plan = await self._create_long_term_plan(instruction, project_id)
         
-        results = {
+        state = {
+            "project_id": project_id,
             "project_name": project_name,
             "instruction": instruction,
-            "start_time": start_time.isoformat(),
+            "start_time": datetime.now().isoformat(),
             "plan": plan,
-            "iterations": [],
-            "success": False
+            "current_phase": 0,
+            "iteration": 0,
+            "last_result": None,
+            "elapsed_seconds": 0.0,
+            "max_time": max_time
         }
+        self.memory.save_checkpoint(project_id, 0, state)
         
-        iteration = 0
-        current_phase = 0
+        return await self._run_loop(state, workspace, project_id, max_time)
+    
+    async def resume_autonomous_project(
+        self,
+        project_id: int,
+        workspace: Path,
+        max_time: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Continue an interrupted project from its last checkpoint.
         
-        # Autonomous execution loop
-        while datetime.now() < end_time and iteration < self.max_iterations:
-            iteration += 1
-            logger.info(f"Autonomous iteration {iteration}/{self.max_iterations}")
+        The saved plan is reused (no re-planning) and execution restarts at
+        the first phase that had not completed.
+        
+        Args:
+            project_id: Project ID returned in the original results
+            workspace: Working directory
+            max_time: Total time budget in seconds, including time already
+                spent (defaults to the original run's budget)
             
+        Returns:
+            Project results after autonomous execution
+        """
+        state = self.memory.load_checkpoint(project_id)
+        if state is None:
+            raise ValueError(f"No checkpoint found for project {project_id}")
+        
+        max_time = max_time or state.get("max_time") or self.max_autonomous_time
+        state["max_time"] = max_time
+        
+        logger.info(
+            "Resuming autonomous execution",
+            project=state["project_name"],
+            phase=state["current_phase"],
+            iteration=state["iteration"],
+            remaining=f"{(max_time - state['elapsed_seconds'])/60:.1f}min"
+        )
+        
+        self.memory.update_project_status(project_id, "active")
+        return await self._run_loop(state, workspace, project_id, max_time)
+    
+    async def _run_loop(
+        self,
+        state: Dict[str, Any],
+        workspace: Path,
+        project_id: int,
+        max_time: int
+    ) -> Dict[str, Any]:
+        """Run iterations from the given state until done, out of time or iterations."""
+        started = time.monotonic()
+        spent_before = state["elapsed_seconds"]
+        plan = state["plan"]
+        
+        def elapsed() -> float:
+            return spent_before + time.monotonic() - started
+        
+        results = {
+            "project_id": project_id,
+            "project_name": state["project_name"],
+            "instruction": state["instruction"],
+            "start_time": state["start_time"],
+            "plan": plan,
+            # The checkpoint only carries the latest result; history has its own rows
+            "iterations": self.memory.get_iteration_history(project_id),
+            "success": False
+        }
+        
+        # Autonomous execution loop
+        while elapsed() < max_time and state["iteration"] < self.max_iterations:
             # Check if plan is complete
-            if current_phase >= len(plan["phases"]):
+            if state["current_phase"] >= len(plan["phases"]):
                 results["success"] = True
                 results["message"] = "Project completed successfully"
                 break
             
+            # Pace by the provider's remaining rate-limit budget
+            if state["iteration"]:
+                await self._pace()
+            
+            state["iteration"] += 1
+            iteration = state["iteration"]
+            logger.info(f"Autonomous iteration {iteration}/{self.max_iterations}")
+            
             # Execute current phase
-            phase = plan["phases"][current_phase]
+            phase = plan["phases"][state["current_phase"]]
             phase_result = await self._execute_phase(
                 phase,
                 workspace,
@@ -107,21 +182,24 @@ class AutonomousPlanner:
                 iteration
             )
             
-            results["iterations"].append({
+            record = {
                 "iteration": iteration,
                 "phase": phase["name"],
                 "result": phase_result,
                 "timestamp": datetime.now().isoformat()
-            })
+            }
+            results["iterations"].append(record)
+            state["last_result"] = record
             
             # Decide next action based on result
             if phase_result["success"]:
                 # Phase succeeded - move to next
-                current_phase += 1
+                state["current_phase"] += 1
                 self.memory.add_learning(
                     project_id,
-                    f"Successfully completed: {phase['name']}",
-                    {"phase": phase, "iteration": iteration}
+                    "autonomous",
+                    f"Successfully completed: {phase['name']} (iteration {iteration})",
+                    True
                 )
             else:
                 # Phase failed - analyze and retry or adapt
@@ -135,11 +213,11 @@ class AutonomousPlanner:
                     logger.info(f"Retrying phase: {phase['name']}")
                     if adaptation:
                         # Adapt the phase based on failure analysis
-                        plan["phases"][current_phase] = adaptation
+                        plan["phases"][state["current_phase"]] = adaptation
                 else:
                     # Give up on this phase, try to work around it
                     logger.warning(f"Skipping failed phase: {phase['name']}")
-                    current_phase += 1
+                    state["current_phase"] += 1
             
             # Check if we should revise the plan
             if iteration % 10 == 0:
@@ -149,37 +227,57 @@ class AutonomousPlanner:
                     results,
                     project_id
                 )
+                state["plan"] = results["plan"] = plan
             
-            # Small delay to avoid hammering the LLM
-            await asyncio.sleep(2)
+            # Checkpoint so a restart resumes from here
+            state["elapsed_seconds"] = elapsed()
+            self.memory.save_checkpoint(project_id, iteration, state, history_record=record)
+        else:
+            if state["current_phase"] >= len(plan["phases"]):
+                results["success"] = True
+                results["message"] = "Project completed successfully"
         
         # Finalize results
+        state["elapsed_seconds"] = elapsed()
         results["end_time"] = datetime.now().isoformat()
-        results["total_time"] = (datetime.now() - start_time).total_seconds()
-        results["iterations_completed"] = iteration
+        results["total_time"] = state["elapsed_seconds"]
+        results["iterations_completed"] = state["iteration"]
+        results["current_phase"] = state["current_phase"]
         
         if not results["success"]:
-            if datetime.now() >= end_time:
+            if elapsed() >= max_time:
                 results["message"] = "Timeout: Reached max execution time"
             else:
                 results["message"] = "Failed: Exceeded max iterations"
         
         # Update memory with final result
+        self.memory.save_checkpoint(project_id, state["iteration"], state)
         self.memory.update_project_status(
             project_id,
-            "completed" if results["success"] else "failed",
-            str(results)
+            "completed" if results["success"] else "failed"
         )
         
         logger.info(
             "Autonomous execution complete",
             success=results["success"],
-            iterations=iteration,
+            iterations=state["iteration"],
             time=f"{results['total_time']/60:.1f}min"
         )
         
         return results
     
+    async def _pace(self):
+        """Wait as long as the LLM's rate-limit budget asks, instead of a fixed sleep."""
+        budget = getattr(self.llm, "rate_budget", None)
+        if budget is not None:
+            await budget.wait()
+        else:
+            await asyncio.sleep(0)
+    
+    async def _ask(self, prompt: str) -> str:
+        """Send a prompt to the LLM provider."""
+        return await self.llm.generate(prompt)
+    
     async def _create_long_term_plan(
         self,
         instruction: str,
@@ -201,7 +299,7 @@ Think like Devin - plan for hours of autonomous work.
 Format as JSON with phases list."""
         
         try:
-            response = await self.llm.complete(prompt)
+            response = await self._ask(prompt)
             
             # Parse plan (simplified - would use structured output in production)
             phases = self._parse_plan(response)
@@ -297,7 +395,7 @@ Work autonomously - don't ask for human input.
         
         try:
             # Execute phase (simplified - would integrate with code gen, testing, etc.)
-            response = await self.llm.complete(prompt)
+            response = await self._ask(prompt)
             
             # Evaluate success
             success = await self._evaluate_phase_success(phase, response)
@@ -310,11 +408,8 @@ Work autonomously - don't ask for human input.
             }
             
             # Update memory
-            self.memory.update_task_status(
-                task_id,
-                "completed" if success else "failed",
-                str(result)
-            )
+            if success:
+                self.memory.complete_task(task_id, result)
             
             return result
             
@@ -342,7 +437,7 @@ Output: {output[:1000]}
 Answer: YES or NO"""
         
         try:
-            response = await self.llm.complete(prompt)
+            response = await self._ask(prompt)
             return "yes" in response.lower()[:50]
         except:
             return False
@@ -372,7 +467,7 @@ Should we:
 Respond with: RETRY, ADAPT, or SKIP"""
         
         try:
-            response = await self.llm.complete(prompt)
+            response = await self._ask(prompt)
             decision = response.strip().upper()
             
             if "RETRY" in decision:
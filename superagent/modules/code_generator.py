@@ -7,6 +7,7 @@ import structlog
 
 from superagent.core.llm import LLMProvider
 from superagent.core.cache import CacheManager, cached
+from superagent.modules.formatter_service import get_formatter_service
 
 logger = structlog.get_logger()
 
@@ -263,16 +264,8 @@ Code:"""
         Returns:
             Formatted code
         """
-        # Simple formatting - could integrate with actual formatters
-        if language == "python":
-            try:
-                import black
-                mode = black.Mode(line_length=88)
-                code = black.format_str(code, mode=mode)
-            except Exception as e:
-                logger.warning(f"Black formatting failed: {e}")
-        
-        return code
+        # Runs in the formatter worker pool; results are cached by content
+        return await get_formatter_service().format(code, language, {"line_length": 88})
     
     def _detect_language(self, file_paths: List[str]) -> str:
         """Detect language from file extensions.
@@ -1,6 +1,7 @@
 """Enhanced code generation module with enterprise-quality output."""
 
 import asyncio
+import time
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import structlog
@@ -9,6 +10,7 @@ import re
 
 from superagent.core.llm import LLMProvider
 from superagent.core.cache import CacheManager, cached
+from superagent.core.stage_graph import Stage, StageGraph
 
 logger = structlog.get_logger()
 
@@ -127,42 +129,73 @@ class EnterpriseCodeGenerator:
         """
         logger.info(f"Generating ENTERPRISE-QUALITY {app_type}: {app_name}")
         
-        # Step 1: Analyze requirements in detail
-        requirements = await self._analyze_requirements_detailed(description, app_type)
+        # CSS and JavaScript only need the requirements, so they are generated
+        # alongside the HTML; each refinement starts as soon as its own draft
+        # exists instead of waiting for the other generators.
+        async def analyze(a):
+            return {"requirements": await self._analyze_requirements_detailed(a["description"], app_type)}
         
-        # Step 2: Create architecture plan
-        architecture = await self._create_architecture_plan(requirements, app_type)
+        async def plan(a):
+            return {"architecture": await self._create_architecture_plan(a["requirements"], app_type)}
         
-        # Step 3: Generate HTML with enterprise quality
-        html_code = await self._generate_enterprise_html(requirements, architecture, app_type)
+        async def html(a):
+            return {"html_draft": await self._generate_enterprise_html(a["requirements"], a["architecture"], app_type)}
         
-        # Step 4: Validate and refine HTML
-        html_code = await self._validate_and_refine_html(html_code, requirements)
+        async def refine_html(a):
+            return {"html": await self._validate_and_refine_html(a["html_draft"], a["requirements"])}
         
-        # Step 5: Generate complete CSS with professional styling
-        css_code = await self._generate_enterprise_css(requirements, app_type)
+        async def css(a):
+            return {"css": await self._generate_enterprise_css(a["requirements"], app_type)}
         
-        # Step 6: Generate fully functional JavaScript
-        js_code = await self._generate_enterprise_javascript(requirements, app_type)
+        async def javascript(a):
+            return {"js_draft": await self._generate_enterprise_javascript(a["requirements"], app_type)}
         
-        # Step 7: Validate JavaScript functionality
-        js_code = await self._validate_and_refine_javascript(js_code, requirements)
+        async def refine_javascript(a):
+            return {"js": await self._validate_and_refine_javascript(a["js_draft"], a["requirements"])}
         
-        # Step 8: Create integrated single-file app (or separate files)
-        final_files = self._integrate_files(html_code, css_code, js_code, app_name)
+        async def integrate(a):
+            return {"files": self._integrate_files(a["html"], a["css"], a["js"], app_name)}
         
-        # Step 9: Final quality check
-        quality_report = await self._final_quality_check(final_files, requirements)
+        async def quality_check(a):
+            return {"quality_report": await self._final_quality_check(a["files"], a["requirements"])}
+        
+        graph = StageGraph([
+            Stage("analyze_requirements", analyze, inputs=("description",), outputs=("requirements",)),
+            Stage("architecture", plan, inputs=("requirements",), outputs=("architecture",)),
+            Stage("html", html, inputs=("requirements", "architecture"), outputs=("html_draft",)),
+            Stage("refine_html", refine_html, inputs=("html_draft", "requirements"), outputs=("html",)),
+            Stage("css", css, inputs=("requirements",), outputs=("css",)),
+            Stage("javascript", javascript, inputs=("requirements",), outputs=("js_draft",)),
+            Stage("refine_javascript", refine_javascript, inputs=("js_draft", "requirements"), outputs=("js",)),
+            Stage("integrate", integrate, inputs=("html", "css", "js"), outputs=("files",)),
+            Stage("quality_check", quality_check, inputs=("files", "requirements"), outputs=("quality_report",)),
+        ])
+        
+        started = time.perf_counter()
+        artifacts = await graph.run({"description": description})
+        wall_time = time.perf_counter() - started
+        critical_path = graph.critical_path()
+        logger.info(
+            "Enterprise app generated",
+            app_name=app_name,
+            wall_time=round(wall_time, 3),
+            critical_path=critical_path["stages"],
+            critical_path_seconds=critical_path["seconds"],
+        )
+        quality_report = artifacts["quality_report"]
         
         return {
             "success": True,
             "app_name": app_name,
             "app_type": app_type,
-            "files": final_files,
-            "requirements": requirements,
+            "files": artifacts["files"],
+            "requirements": artifacts["requirements"],
             "quality_report": quality_report,
             "ready_to_use": quality_report["passed"],
-            "instructions": self._generate_usage_instructions(app_name, app_type)
+            "instructions": self._generate_usage_instructions(app_name, app_type),
+            "build_time": round(wall_time, 3),
+            "critical_path": critical_path,
+            "stage_timings": graph.timings(),
         }
     
     async def _analyze_requirements_detailed(
@@ -0,0 +1,496 @@
+"""
+Dependency Layer Cache
+
+Builds each distinct dependency set (requirements.txt / package.json) once,
+keyed by a hash of the normalized manifest, and materializes the result in
+new projects instead of reinstalling from scratch. Python environments are
+hard-linked (their files are made read-only first, so a project cannot edit
+the shared copy); node_modules trees are copied, because install scripts
+and tooling write into them. Downloaded wheels and npm
+tarballs are kept in a local store so rebuilds can run fully offline.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import platform
+import re
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import structlog
+
+from superagent.core.tracing import tracer
+
+logger = structlog.get_logger()
+
+# Builder signature: (manifest_dir, env_dir) -> None. Must populate env_dir.
+EnvBuilder = Callable[[Path, Path], Awaitable[None]]
+
+
+class DependencyCacheError(Exception):
+    """Raised when a dependency environment cannot be built."""
+
+
+class DependencyCache:
+    """Content-addressed cache of installed dependency environments."""
+
+    PYTHON_LINK_NAME = ".pydeps"
+    NODE_LINK_NAME = "node_modules"
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        offline: Optional[bool] = None,
+        install_timeout: int = 600
+    ):
+        """Initialize dependency cache.
+
+        Args:
+            cache_dir: Root directory for environments and the package store
+            max_bytes: Disk budget for cached environments (LRU-evicted)
+            offline: Install only from the local wheel/tarball store
+            install_timeout: Maximum seconds for a single install
+        """
+        default_dir = Path.home() / ".cache" / "superagent" / "deps"
+        self.cache_dir = Path(cache_dir or os.getenv("SUPERAGENT_DEPS_CACHE", str(default_dir)))
+        if max_bytes is None:
+            max_bytes = int(os.getenv("SUPERAGENT_DEPS_CACHE_MB", "5120")) * 1024 * 1024
+        self.max_bytes = max_bytes
+        if offline is None:
+            offline = os.getenv("SUPERAGENT_DEPS_OFFLINE", "").lower() in ("1", "true", "yes")
+        self.offline = offline
+        self.install_timeout = install_timeout
+
+        self.envs_dir = self.cache_dir / "envs"
+        self.wheelhouse = self.cache_dir / "wheelhouse"
+        self.npm_store = self.cache_dir / "npm-store"
+        self.index_file = self.cache_dir / "index.json"
+        for directory in (self.envs_dir, self.wheelhouse, self.npm_store):
+            directory.mkdir(parents=True, exist_ok=True)
+
+        self.index: Dict[str, Dict[str, Any]] = self._load_index()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # Environments currently being materialized in a project; never evicted
+        self._pins: Dict[str, int] = {}
+        self.stats = {"hits": 0, "misses": 0, "builds": 0, "build_seconds": 0.0, "evictions": 0}
+
+    # ------------------------------------------------------------------
+    # Manifest normalization and keys
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def normalize_requirements(text: str) -> str:
+        """Normalize requirements.txt content so equivalent files hash equally.
+
+        Comments, blank lines, whitespace, ordering and package-name
+        spelling (case, ``_`` vs ``-``) do not affect the result.
+        """
+        lines = set()
+        for raw in text.splitlines():
+            line = raw.split(" #", 1)[0].strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("-"):
+                # Options such as --index-url keep their argument separator
+                lines.add(" ".join(line.split()))
+                continue
+            line = re.sub(r"\s+", "", line)
+            match = re.match(r"^([A-Za-z0-9][A-Za-z0-9._-]*)(.*)$", line)
+            if match:
+                name = re.sub(r"[-_.]+", "-", match.group(1)).lower()
+                line = name + match.group(2)
+            lines.add(line)
+        return "\n".join(sorted(lines))
+
+    @staticmethod
+    def normalize_package_json(text: str, lockfile_text: Optional[str] = None) -> str:
+        """Normalize package.json down to the fields that affect node_modules."""
+        data = json.loads(text or "{}")
+        relevant = {
+            field: data.get(field) or {}
+            for field in ("dependencies", "devDependencies", "optionalDependencies", "overrides")
+        }
+        if lockfile_text:
+            relevant["lockfile"] = hashlib.sha256(lockfile_text.encode()).hexdigest()
+        return json.dumps(relevant, sort_keys=True, separators=(",", ":"))
+
+    @staticmethod
+    def cache_key(ecosystem: str, normalized: str, platform_tag: str) -> str:
+        """Compute the cache key for a normalized manifest."""
+        payload = f"{ecosystem}\0{platform_tag}\0{normalized}"
+        return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+    @staticmethod
+    def host_python_tag() -> str:
+        """Platform tag for environments built with the host interpreter."""
+        return f"cp{sys.version_info.major}{sys.version_info.minor}-{sys.platform}-{platform.machine()}"
+
+    # ------------------------------------------------------------------
+    # Environment resolution
+    # ------------------------------------------------------------------
+
+    async def get_or_build(
+        self,
+        ecosystem: str,
+        normalized: str,
+        manifest_files: Dict[str, str],
+        builder: EnvBuilder,
+        platform_tag: str,
+        pin: bool = False
+    ) -> Dict[str, Any]:
+        """Return a cached environment, building it on a miss.
+
+        Args:
+            ecosystem: "python" or "node" (or a custom tag)
+            normalized: Normalized manifest used for the cache key
+            manifest_files: Files written to the build directory before building
+            builder: Coroutine that installs into the environment directory
+            platform_tag: Interpreter/platform the environment is built for
+            pin: Protect the environment from eviction until ``unpin(key)``
+
+        Returns:
+            Dict with key, path, cache_hit and build_time
+        """
+        key = self.cache_key(ecosystem, normalized, platform_tag)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+
+        async with lock:
+            env_dir = self.envs_dir / key
+            if key in self.index and env_dir.exists():
+                self.stats["hits"] += 1
+                self.index[key]["last_used"] = time.time()
+                self.index[key]["uses"] = self.index[key].get("uses", 0) + 1
+                self._save_index()
+                if pin:
+                    self._pin(key)
+                logger.info("Dependency cache hit", ecosystem=ecosystem, key=key)
+                return {"key": key, "path": env_dir, "cache_hit": True, "build_time": 0.0}
+
+            self.stats["misses"] += 1
+            logger.info("Dependency cache miss, building environment", ecosystem=ecosystem, key=key)
+
+            started = time.perf_counter()
+            build_root = Path(tempfile.mkdtemp(prefix=f"build-{key}-", dir=self.envs_dir))
+            try:
+                manifest_dir = build_root / "manifest"
+                staging_dir = build_root / "env"
+                manifest_dir.mkdir()
+                staging_dir.mkdir()
+                for name, content in manifest_files.items():
+                    (manifest_dir / name).write_text(content)
+
+                await builder(manifest_dir, staging_dir)
+
+                if env_dir.exists():
+                    shutil.rmtree(env_dir, ignore_errors=True)
+                os.replace(staging_dir, env_dir)
+            finally:
+                shutil.rmtree(build_root, ignore_errors=True)
+
+            build_time = time.perf_counter() - started
+            self.stats["builds"] += 1
+            self.stats["build_seconds"] += build_time
+
+            now = time.time()
+            self.index[key] = {
+                "ecosystem": ecosystem,
+                "platform": platform_tag,
+                "manifest": normalized,
+                "size_bytes": await asyncio.to_thread(self._dir_size, env_dir),
+                "created": now,
+                "last_used": now,
+                "uses": 1,
+                "build_time": build_time
+            }
+            if pin:
+                self._pin(key)
+            await self._evict(keep=key)
+            self._save_index()
+
+            return {"key": key, "path": env_dir, "cache_hit": False, "build_time": build_time}
+
+    async def python_env(
+        self,
+        requirements_text: str,
+        builder: Optional[EnvBuilder] = None,
+        platform_tag: Optional[str] = None,
+        pin: bool = False
+    ) -> Dict[str, Any]:
+        """Get (or build) a relocatable ``pip install --target`` environment.
+
+        Args:
+            requirements_text: Contents of requirements.txt
+            builder: Custom builder (e.g. one that installs inside a container)
+            platform_tag: Platform tag matching the custom builder
+            pin: Protect the environment from eviction until ``unpin(key)``
+        """
+        normalized = self.normalize_requirements(requirements_text)
+        install = builder or self._build_python_env
+
+        async def build(manifest_dir: Path, env_dir: Path) -> None:
+            await install(manifest_dir, env_dir)
+            # Projects hard-link these files; read-only keeps edits out of the cache
+            await asyncio.to_thread(self._make_read_only, env_dir)
+
+        return await self.get_or_build(
+            "python",
+            normalized,
+            {"requirements.txt": normalized + "\n"},
+            build,
+            platform_tag or self.host_python_tag(),
+            pin=pin
+        )
+
+    async def node_env(self, package_json_text: str, lockfile_text: Optional[str] = None,
+                       pin: bool = False) -> Dict[str, Any]:
+        """Get (or build) a node_modules tree for a package.json."""
+        normalized = self.normalize_package_json(package_json_text, lockfile_text)
+        files = {"package.json": package_json_text}
+        if lockfile_text:
+            files["package-lock.json"] = lockfile_text
+        return await self.get_or_build(
+            "node",
+            normalized,
+            files,
+            self._build_node_env,
+            f"node-{sys.platform}-{platform.machine()}",
+            pin=pin
+        )
+
+    # ------------------------------------------------------------------
+    # Project installation
+    # ------------------------------------------------------------------
+
+    async def install_python(self, project_dir: str, requirements_text: Optional[str] = None) -> Dict[str, Any]:
+        """Install a project's Python dependencies from the cache.
+
+        The environment is hard-linked into ``<project>/.pydeps``; put that
+        directory on PYTHONPATH to use it.
+        """
+        project = Path(project_dir)
+        if requirements_text is None:
+            requirements_text = (project / "requirements.txt").read_text()
+
+        env = await self.python_env(requirements_text, pin=True)
+        target = project / self.PYTHON_LINK_NAME
+        try:
+            await asyncio.to_thread(self.link_tree, env["path"], target)
+        finally:
+            self.unpin(env["key"])
+        return {**env, "path": str(env["path"]), "target": str(target)}
+
+    async def install_node(self, project_dir: str) -> Dict[str, Any]:
+        """Install a project's node_modules from the cache.
+
+        The tree is copied rather than linked: postinstall scripts and
+        tooling write into node_modules, which must not reach the cache.
+        """
+        project = Path(project_dir)
+        lockfile = project / "package-lock.json"
+        env = await self.node_env(
+            (project / "package.json").read_text(),
+            lockfile.read_text() if lockfile.exists() else None,
+            pin=True
+        )
+        target = project / self.NODE_LINK_NAME
+        try:
+            await asyncio.to_thread(self.link_tree, env["path"], target, False)
+        finally:
+            self.unpin(env["key"])
+        return {**env, "path": str(env["path"]), "target": str(target)}
+
+    @staticmethod
+    def link_tree(source: Path, target: Path, hardlink: bool = True) -> None:
+        """Materialize a cached tree in a project, using hard links by default.
+
+        Falls back to copying when hard links are not possible (e.g. the
+        project lives on a different filesystem than the cache), or copies
+        outright when ``hardlink`` is False.
+        """
+        if target.is_symlink() or target.is_file():
+            target.unlink()
+        elif target.exists():
+            shutil.rmtree(target)
+
+        def link_or_copy(src, dst):
+            try:
+                os.link(src, dst)
+            except OSError:
+                shutil.copy2(src, dst)
+
+        shutil.copytree(source, target, symlinks=True,
+                        copy_function=link_or_copy if hardlink else shutil.copy2)
+
+    def _pin(self, key: str) -> None:
+        self._pins[key] = self._pins.get(key, 0) + 1
+
+    def unpin(self, key: str) -> None:
+        """Release a pin taken with ``pin=True``; the environment may be evicted again."""
+        count = self._pins.get(key, 0) - 1
+        if count > 0:
+            self._pins[key] = count
+        else:
+            self._pins.pop(key, None)
+
+    @staticmethod
+    def _make_read_only(path: Path) -> None:
+        for root, _, files in os.walk(path):
+            for name in files:
+                file_path = os.path.join(root, name)
+                if not os.path.islink(file_path):
+                    mode = os.stat(file_path).st_mode
+                    os.chmod(file_path, mode & ~0o222)
+
+    # ------------------------------------------------------------------
+    # Builders
+    # ------------------------------------------------------------------
+
+    async def _build_python_env(self, manifest_dir: Path, env_dir: Path) -> None:
+        requirements = str(manifest_dir / "requirements.txt")
+        if not self.offline:
+            # Fill the wheel store first so later builds can install offline
+            await self._run([
+                sys.executable, "-m", "pip", "wheel", "-q",
+                "-r", requirements,
+                "-w", str(self.wheelhouse),
+                "--find-links", str(self.wheelhouse)
+            ])
+        await self._run([
+            sys.executable, "-m", "pip", "install", "-q",
+            "--no-index", "--find-links", str(self.wheelhouse),
+            "--target", str(env_dir),
+            "-r", requirements
+        ])
+
+    async def _build_node_env(self, manifest_dir: Path, env_dir: Path) -> None:
+        command = "ci" if (manifest_dir / "package-lock.json").exists() else "install"
+        await self._run(
+            [
+                "npm", command,
+                "--cache", str(self.npm_store),
+                "--offline" if self.offline else "--prefer-offline",
+                "--no-audit", "--no-fund", "--loglevel=error"
+            ],
+            cwd=manifest_dir
+        )
+        node_modules = manifest_dir / "node_modules"
+        if node_modules.exists():
+            env_dir.rmdir()
+            os.replace(node_modules, env_dir)
+
+    async def _run(self, command: List[str], cwd: Optional[Path] = None) -> None:
+        with tracer.span(Path(command[0]).name, kind="subprocess", command=" ".join(command[:4])) as span:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                cwd=str(cwd) if cwd else None,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                _, stderr = await asyncio.wait_for(process.communicate(), timeout=self.install_timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                raise DependencyCacheError(f"{command[0]} timed out after {self.install_timeout}s")
+            span.set_attribute("exit_code", process.returncode)
+            if process.returncode != 0:
+                message = stderr.decode("utf-8", errors="replace").strip()[-2000:]
+                raise DependencyCacheError(f"{' '.join(command[:4])} failed: {message}")
+
+    # ------------------------------------------------------------------
+    # Index and eviction
+    # ------------------------------------------------------------------
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            index = json.loads(self.index_file.read_text())
+        except (OSError, ValueError):
+            return {}
+        # Drop entries whose environment vanished from disk
+        return {key: entry for key, entry in index.items() if (self.envs_dir / key).exists()}
+
+    def _save_index(self) -> None:
+        tmp = self.index_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.index, indent=2))
+        os.replace(tmp, self.index_file)
+
+    async def _evict(self, keep: Optional[str] = None) -> List[str]:
+        """Evict least-recently-used environments until within the disk budget.
+
+        Pinned environments (being linked into a project) are skipped.
+        """
+        evicted = []
+        trash = []
+        total = sum(entry["size_bytes"] for entry in self.index.values())
+        for key, entry in sorted(self.index.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep or key in self._pins:
+                continue
+            # Move it aside now so a rebuild of the same key never races the delete
+            doomed = self.envs_dir / f"evicted-{key}-{os.urandom(4).hex()}"
+            try:
+                os.replace(self.envs_dir / key, doomed)
+                trash.append(doomed)
+            except OSError:
+                pass
+            total -= entry["size_bytes"]
+            evicted.append(key)
+
+        for key in evicted:
+            del self.index[key]
+            self._locks.pop(key, None)
+        if trash:
+            await asyncio.to_thread(self._remove_trees, trash)
+        if evicted:
+            self.stats["evictions"] += len(evicted)
+            logger.info("Evicted dependency environments", count=len(evicted))
+        return evicted
+
+    @staticmethod
+    def _remove_trees(paths: List[Path]) -> None:
+        for path in paths:
+            shutil.rmtree(path, ignore_errors=True)
+
+    @staticmethod
+    def _dir_size(path: Path) -> int:
+        total = 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                try:
+                    total += os.lstat(os.path.join(root, name)).st_size
+                except OSError:
+                    pass
+        return total
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            "entries": len(self.index),
+            "total_bytes": sum(entry["size_bytes"] for entry in self.index.values()),
+            "max_bytes": self.max_bytes,
+            "offline": self.offline,
+            "wheelhouse_files": sum(1 for _ in self.wheelhouse.iterdir()),
+            "cache_dir": str(self.cache_dir)
+        }
+
+
+_dependency_cache: Optional[DependencyCache] = None
+
+
+def get_dependency_cache() -> DependencyCache:
+    """Get the process-wide dependency cache."""
+    global _dependency_cache
+    if _dependency_cache is None:
+        _dependency_cache = DependencyCache()
+    return _dependency_cache
@@ -0,0 +1,368 @@
+"""
+Code Formatter Service
+
+Formats generated code off the event loop. Formatters run in a process
+pool, and requests arriving within a short window are sent to a worker as
+one batch. Results are cached by (content hash, formatter version, config) in an
+in-memory LRU backed by an on-disk store, so identical boilerplate is only
+ever formatted once. Languages whose formatter is not installed are
+passed through without a pool round trip or cache entry; availability is
+re-checked periodically, so installing a formatter takes effect without a
+restart.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+from diskcache import Cache
+
+logger = structlog.get_logger()
+
+# Default formatter per language
+LANGUAGE_FORMATTERS = {
+    "python": "black",
+    "javascript": "prettier",
+    "typescript": "prettier",
+    "go": "gofmt",
+}
+
+# File extension prettier uses to pick a parser
+PRETTIER_EXTENSIONS = {"javascript": ".js", "typescript": ".ts"}
+
+# Seconds a formatter version (or its absence) is trusted before re-checking
+VERSION_TTL = 60.0
+
+# (formatter, language, code, config)
+FormatJob = Tuple[str, str, str, Dict[str, Any]]
+
+# (formatted code, seconds, error, cacheable)
+FormatResult = Tuple[str, float, Optional[str], bool]
+
+
+class FormatSyntaxError(ValueError):
+    """The formatter rejected the code itself; the same input always fails."""
+
+
+def _run_black(code: str, language: str, config: Dict[str, Any]) -> str:
+    import black
+    try:
+        return black.format_str(code, mode=black.Mode(line_length=config.get("line_length", 88)))
+    except black.InvalidInput as e:
+        raise FormatSyntaxError(str(e)) from e
+
+
+def _run_command(command: List[str], code: str, config: Dict[str, Any]) -> str:
+    result = subprocess.run(
+        command, input=code, capture_output=True, text=True, timeout=config.get("timeout", 30)
+    )
+    if result.returncode == 0:
+        return result.stdout
+    message = result.stderr.strip()[:500]
+    # prettier reports parse failures as SyntaxError; gofmt only fails on them
+    if "SyntaxError" in message or command[0] == "gofmt":
+        raise FormatSyntaxError(message)
+    raise RuntimeError(f"{command[0]} exited with code {result.returncode}: {message}")
+
+
+def _run_prettier(code: str, language: str, config: Dict[str, Any]) -> str:
+    filepath = f"file{PRETTIER_EXTENSIONS.get(language, '.js')}"
+    return _run_command(["prettier", "--stdin-filepath", filepath], code, config)
+
+
+def _run_gofmt(code: str, language: str, config: Dict[str, Any]) -> str:
+    return _run_command(["gofmt"], code, config)
+
+
+def _executable_version(name: str, *args: str) -> Optional[str]:
+    path = shutil.which(name)
+    if path is None:
+        return None
+    if args:
+        try:
+            result = subprocess.run([path, *args], capture_output=True, text=True, timeout=10)
+            if result.returncode == 0 and result.stdout.strip():
+                return result.stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return None
+    # No version flag: identify the installed binary instead
+    stat = os.stat(path)
+    return f"{os.path.realpath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _black_version() -> Optional[str]:
+    try:
+        import black
+    except ImportError:
+        return None
+    try:
+        return metadata.version("black")
+    except metadata.PackageNotFoundError:
+        return getattr(black, "__version__", "unknown")
+
+
+def formatter_version(formatter: str) -> Optional[str]:
+    """Installed version of a formatter, or None if it is not available."""
+    if formatter == "black":
+        return _black_version()
+    if formatter == "prettier":
+        return _executable_version("prettier", "--version")
+    if formatter == "gofmt":
+        return _executable_version("gofmt")
+    return None
+
+
+FORMATTERS = {
+    "black": _run_black,
+    "prettier": _run_prettier,
+    "gofmt": _run_gofmt,
+}
+
+
+def format_batch(jobs: List[FormatJob]) -> List[FormatResult]:
+    """Format a batch of files (runs inside a worker process).
+
+    Args:
+        jobs: (formatter, language, code, config) tuples
+
+    Returns:
+        (formatted code, seconds, error, cacheable) per job; failed jobs
+        return the input unchanged with the error message, and only
+        syntax errors are cacheable
+    """
+    results = []
+    for formatter, language, code, config in jobs:
+        started = time.perf_counter()
+        try:
+            formatted = FORMATTERS[formatter](code, language, config)
+            error, cacheable = None, True
+        except Exception as e:
+            formatted, error = code, f"{type(e).__name__}: {e}"
+            cacheable = isinstance(e, FormatSyntaxError)
+        results.append((formatted, time.perf_counter() - started, error, cacheable))
+    return results
+
+
+class FormatterService:
+    """Batched, cached code formatting in a process pool."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        lru_entries: int = 2048,
+        batch_window: float = 0.01,
+        max_batch: int = 16
+    ):
+        """Initialize formatter service.
+
+        Args:
+            cache_dir: Directory of the on-disk result store
+            max_workers: Formatter worker processes
+            lru_entries: Results kept in memory
+            batch_window: Seconds to wait for more files before dispatching
+            max_batch: Maximum files per worker round-trip
+        """
+        default_dir = Path.home() / ".cache" / "superagent" / "formatted"
+        self.cache_dir = Path(cache_dir or os.getenv("SUPERAGENT_FORMAT_CACHE", str(default_dir)))
+        self.max_workers = max_workers or int(
+            os.getenv("FORMATTER_WORKERS", str(min(4, os.cpu_count() or 1)))
+        )
+        self.lru_entries = lru_entries
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+
+        self.disk = Cache(str(self.cache_dir))
+        self._lru: "OrderedDict[str, str]" = OrderedDict()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending: List[Tuple[str, FormatJob, asyncio.Future]] = []
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._versions: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._version_checks: Dict[str, asyncio.Future] = {}
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self.batches = 0
+
+    @staticmethod
+    def cache_key(code: str, formatter: str, config: Dict[str, Any], version: str = "") -> str:
+        """Key identifying a formatting result."""
+        digest = hashlib.sha256(code.encode()).hexdigest()
+        return f"{formatter}@{version}:{json.dumps(config, sort_keys=True)}:{digest}"
+
+    async def _formatter_version(self, formatter: str) -> Optional[str]:
+        checked = self._versions.get(formatter)
+        if checked is not None and time.monotonic() - checked[0] < VERSION_TTL:
+            return checked[1]
+        # One probe per formatter, however many files are waiting for it
+        task = self._version_checks.get(formatter)
+        if task is None:
+            task = asyncio.ensure_future(asyncio.to_thread(formatter_version, formatter))
+            self._version_checks[formatter] = task
+        try:
+            version = await asyncio.shield(task)
+        finally:
+            if self._version_checks.get(formatter) is task:
+                del self._version_checks[formatter]
+        self._versions[formatter] = (time.monotonic(), version)
+        return version
+
+    def _language_stats(self, language: str) -> Dict[str, float]:
+        return self.stats.setdefault(language, {
+            "requests": 0, "cache_hits": 0, "formatted": 0, "errors": 0, "unavailable": 0,
+            "total_ms": 0.0, "max_ms": 0.0
+        })
+
+    def _remember(self, key: str, formatted: str):
+        self._lru[key] = formatted
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_entries:
+            self._lru.popitem(last=False)
+
+    async def format(self, code: str, language: str,
+                     config: Optional[Dict[str, Any]] = None) -> str:
+        """Format code with the language's formatter.
+
+        Args:
+            code: Code to format
+            language: Programming language
+            config: Formatter options (e.g. {"line_length": 88})
+
+        Returns:
+            Formatted code, or the input if there is no formatter or it fails
+        """
+        formatter = LANGUAGE_FORMATTERS.get(language)
+        if formatter is None or not code.strip():
+            return code
+
+        config = config or {}
+        stats = self._language_stats(language)
+        stats["requests"] += 1
+        version = await self._formatter_version(formatter)
+        if version is None:
+            stats["unavailable"] += 1
+            return code
+        key = self.cache_key(code, formatter, config, version)
+
+        cached = self._lru.get(key)
+        if cached is None:
+            cached = await asyncio.to_thread(self.disk.get, key)
+            if cached is not None:
+                self._remember(key, cached)
+        if cached is not None:
+            self._lru.move_to_end(key)
+            stats["cache_hits"] += 1
+            return cached
+
+        # Identical code already queued or formatting: share its result
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._in_flight[key] = future
+            self._enqueue(key, (formatter, language, code, config), future)
+        return await asyncio.shield(future)
+
+    async def format_many(self, items: List[Tuple[str, str]],
+                          config: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Format several (code, language) pairs; they share worker batches."""
+        return await asyncio.gather(*[self.format(code, language, config) for code, language in items])
+
+    def _enqueue(self, key: str, job: FormatJob, future: asyncio.Future):
+        self._pending.append((key, job, future))
+        if len(self._pending) >= self.max_batch:
+            self._dispatch()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_window, self._dispatch)
+
+    def _dispatch(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[Tuple[str, FormatJob, asyncio.Future]]):
+        self.batches += 1
+        jobs = [job for _, job, _ in batch]
+        try:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            results = await asyncio.get_running_loop().run_in_executor(self._pool, format_batch, jobs)
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                logger.warning(f"Formatter pool broke, restarting: {e}")
+                self._pool = None
+            results = [(job[2], 0.0, str(e), False) for job in jobs]
+
+        stored = {}
+
+        for (key, (_, language, code, _), future), (formatted, seconds, error, cacheable) in zip(batch, results):
+            stats = self._language_stats(language)
+            elapsed_ms = seconds * 1000
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            if error:
+                stats["errors"] += 1
+                logger.warning(f"Formatting failed ({language}): {error}")
+            else:
+                stats["formatted"] += 1
+            # Syntax errors are deterministic for the same input, so the
+            # unchanged code is cached too; timeouts, crashes and a broken
+            # pool may succeed next time
+            if cacheable:
+                self._remember(key, formatted)
+                stored[key] = formatted
+            self._in_flight.pop(key, None)
+            if not future.done():
+                future.set_result(formatted)
+
+        if stored:
+            await asyncio.to_thread(self._store, stored)
+
+    def _store(self, results: Dict[str, str]):
+        with self.disk.transact():
+            for key, formatted in results.items():
+                self.disk.set(key, formatted)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-language formatting timings and cache counters."""
+        languages = {}
+        for language, stats in self.stats.items():
+            languages[language] = {
+                **stats,
+                "avg_ms": stats["total_ms"] / stats["formatted"] if stats["formatted"] else 0.0,
+            }
+        return {
+            "languages": languages,
+            "batches": self.batches,
+            "lru_entries": len(self._lru),
+            "workers": self.max_workers,
+        }
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+_formatter_service: Optional[FormatterService] = None
+
+
+def get_formatter_service() -> FormatterService:
+    """Get the process-wide formatter service."""
+    global _formatter_service
+    if _formatter_service is None:
+        _formatter_service = FormatterService()
+    return _formatter_service
@@ -9,6 +9,8 @@ import time
 import asyncio
 import structlog
 
+from superagent.modules.sampling_profiler import IsolatedRunner, get_isolated_runner
+
 logger = structlog.get_logger()
 
 
@@ -22,15 +24,20 @@ class PerformanceProfiler:
     - Bottleneck detection
     - AI-powered optimization suggestions
     - Performance regression detection
+    
+    Files, benchmarks and memory profiles run in an isolated child process
+    with time and memory limits (see ``sampling_profiler``).
     """
     
-    def __init__(self, llm_provider):
+    def __init__(self, llm_provider, runner: Optional[IsolatedRunner] = None):
         """Initialize profiler.
         
         Args:
             llm_provider: LLM provider
+            runner: Isolated child-process runner (shared one by default)
         """
         self.llm = llm_provider
+        self.runner = runner or get_isolated_runner()
         self.profiles: Dict[str, Any] = {}
     
     async def profile_function(self, func: callable, *args, **kwargs) -> Dict[str, Any]:
@@ -69,36 +76,62 @@ class PerformanceProfiler:
             "result": result
         }
     
-    async def profile_file(self, file_path: Path) -> Dict[str, Any]:
+    async def profile_file(self, file_path: Path, mode: str = "sampling",
+                           timeout: Optional[float] = None,
+                           memory_mb: Optional[int] = None) -> Dict[str, Any]:
         """Profile a Python file.
         
         Args:
             file_path: Path to file
+            mode: "sampling" (isolated child process, default) or "cprofile"
+                (in-process, deterministic, for trusted code only)
+            timeout: Wall-clock limit for the sampled run
+            memory_mb: Memory limit for the sampled run
             
         Returns:
             Profile results
         """
-        logger.info(f"Profiling file: {file_path}")
-        
-        # Run file with profiling
-        profiler = cProfile.Profile()
+        logger.info(f"Profiling file: {file_path}", mode=mode)
         
         try:
-            with open(file_path) as f:
-                code = compile(f.read(), file_path, 'exec')
-                profiler.runcall(exec, code)
-            
-            # Analyze results
-            stats = self._analyze_profile(profiler)
+            if mode == "cprofile":
+                # Run file with profiling
+                profiler = cProfile.Profile()
+                with open(file_path) as f:
+                    code = compile(f.read(), file_path, 'exec')
+                    profiler.runcall(exec, code)
+                
+                # Analyze results
+                stats = self._analyze_profile(profiler)
+                extra = {}
+            else:
+                sampled = await self.runner.sample(Path(file_path), timeout=timeout, memory_mb=memory_mb)
+                if sampled.get("timed_out") or "samples" not in sampled:
+                    return {"file": str(file_path), "error": sampled.get("error")}
+                stats = {
+                    "top_functions": sampled["top_functions"],
+                    "top_self": sampled["top_self"],
+                    "execution_time": sampled["elapsed"],
+                    "samples": sampled["samples"],
+                }
+                extra = {
+                    "collapsed": sampled["collapsed"],
+                    "flame_graph": sampled["flame_graph"],
+                    "output": sampled["output"],
+                    "error": sampled["error"],
+                    "max_rss_mb": sampled["max_rss_mb"],
+                }
             
             # Get AI suggestions
             suggestions = await self._get_optimization_suggestions(stats, file_path)
             
             return {
                 "file": str(file_path),
+                "mode": mode,
                 "stats": stats,
                 "bottlenecks": self._identify_bottlenecks(stats),
-                "suggestions": suggestions
+                "suggestions": suggestions,
+                **extra
             }
         
         except Exception as e:
@@ -210,69 +243,65 @@ Format as JSON: [{{"issue": "...", "suggestion": "...", "impact": "high/medium/l
         except:
             return []
     
-    async def memory_profile(self, func: callable, *args, **kwargs) -> Dict[str, Any]:
-        """Profile memory usage.
+    async def memory_profile(self, func: Any, *args, timeout: Optional[float] = None,
+                             memory_mb: Optional[int] = None, **kwargs) -> Dict[str, Any]:
+        """Profile memory usage in an isolated process.
         
         Args:
-            func: Function to profile
-            *args, **kwargs: Arguments
+            func: Module-level function (coroutine functions are awaited),
+                code string or script ``Path``
+            *args, **kwargs: Arguments (must be picklable)
+            timeout: Wall-clock limit
+            memory_mb: Memory limit
             
         Returns:
-            Memory profile
+            Memory profile; ``result`` is the repr of the return value
         """
-        try:
-            import tracemalloc
-            
-            tracemalloc.start()
-            
-            # Execute function
-            if asyncio.iscoroutinefunction(func):
-                result = await func(*args, **kwargs)
-            else:
-                result = func(*args, **kwargs)
-            
-            current, peak = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
-            
-            return {
-                "function": func.__name__,
-                "current_memory_mb": current / 1024 / 1024,
-                "peak_memory_mb": peak / 1024 / 1024,
-                "result": result
-            }
+        outcome = await self.runner.run(
+            "memory", self.runner.target(func, *args, **kwargs), timeout=timeout, memory_mb=memory_mb
+        )
+        if "peak_memory_mb" not in outcome:
+            return {"error": outcome.get("error")}
         
-        except ImportError:
-            logger.warning("tracemalloc not available")
-            return {"error": "tracemalloc not available"}
+        return {
+            "function": getattr(func, "__name__", str(func)[:50]),
+            "current_memory_mb": outcome["current_memory_mb"],
+            "peak_memory_mb": outcome["peak_memory_mb"],
+            "max_rss_mb": outcome["max_rss_mb"],
+            "execution_time": outcome["elapsed"],
+            "result": outcome["result"],
+            "error": outcome["error"]
+        }
     
-    async def benchmark_code(self, code: str, iterations: int = 100) -> Dict[str, Any]:
-        """Benchmark code snippet.
+    async def benchmark_code(self, code: str, iterations: int = 100,
+                             timeout: Optional[float] = None,
+                             memory_mb: Optional[int] = None) -> Dict[str, Any]:
+        """Benchmark code snippet in an isolated process.
         
         Args:
             code: Code to benchmark
             iterations: Number of iterations
+            timeout: Wall-clock limit for all iterations
+            memory_mb: Memory limit
             
         Returns:
             Benchmark results
         """
-        times = []
-        
-        for _ in range(iterations):
-            start = time.time()
-            try:
-                exec(code)
-            except:
-                pass
-            times.append(time.time() - start)
-        
-        times.sort()
+        outcome = await self.runner.run(
+            "benchmark", self.runner.target(code), timeout=timeout, memory_mb=memory_mb,
+            iterations=iterations
+        )
+        times = sorted(outcome.get("times") or [])
+        if not times:
+            return {"iterations": 0, "error": outcome.get("error")}
         
         return {
-            "iterations": iterations,
+            "iterations": len(times),
             "min_time": times[0],
             "max_time": times[-1],
             "median_time": times[len(times) // 2],
-            "avg_time": sum(times) / len(times)
+            "avg_time": sum(times) / len(times),
+            "error": outcome.get("error")
         }
     
     def compare_performance(self, profile1: Dict[str, Any], 
@@ -269,14 +269,8 @@ class FormatterPlugin(Plugin):
         Returns:
             Formatted code
         """
-        if language == "python":
-            try:
-                import black
-                return black.format_str(code, mode=black.Mode())
-            except:
-                return code
-        
-        return code
+        from superagent.modules.formatter_service import get_formatter_service
+        return await get_formatter_service().format(code, language, {"line_length": 88})
 
 
 class LinterPlugin(Plugin):
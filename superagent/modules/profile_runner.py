@@ -0,0 +1,210 @@
+"""Child-process runner for isolated profiling.
+
+Executed as a script (``python profile_runner.py``) by the sampling
+profiler, so it only depends on the standard library. It reads a pickled
+request from stdin, applies memory and CPU limits, runs the target and
+writes a JSON result to stdout. Target output is captured, not mixed into
+the result stream.
+
+The sampler is a daemon thread that periodically reads the main thread's
+frame via ``sys._current_frames()``; the target runs with no per-call
+instrumentation.
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import pickle
+import resource
+import runpy
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, Optional
+
+# Frames belonging to the runner itself are dropped from stacks
+RUNNER_FILE = os.path.abspath(__file__)
+SKIPPED_FILES = (RUNNER_FILE, runpy.__file__)
+MAX_CAPTURED_OUTPUT = 10_000
+
+
+def frame_label(code) -> str:
+    """Readable, stable name for a code object: ``func (file:line)``."""
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame, skip_files=SKIPPED_FILES) -> str:
+    """Root-first ``a;b;c`` stack string for a frame."""
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        if code.co_filename not in skip_files and not code.co_filename.startswith("<frozen "):
+            labels.append(frame_label(code))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+class StackSampler:
+    """Samples one thread's stack at a fixed interval from a background thread."""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        """Initialize sampler.
+
+        Args:
+            thread_id: Thread to sample
+            interval: Seconds between samples
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None or self._stop.is_set():
+                continue
+            stack = collapse_stack(frame)
+            if stack:
+                self.stacks[stack] += 1
+                self.samples += 1
+
+    def __enter__(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _apply_limits(memory_mb: Optional[int], cpu_seconds: Optional[float]):
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        with contextlib.suppress(ValueError, OSError):
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if cpu_seconds:
+        seconds = int(cpu_seconds) + 1
+        with contextlib.suppress(ValueError, OSError):
+            resource.setrlimit(resource.RLIMIT_CPU, (seconds, seconds + 1))
+
+
+def _load_target(request: Dict[str, Any]):
+    """Zero-argument callable running the requested target."""
+    kind = request["target"]
+    if kind == "file":
+        path = request["path"]
+        sys.path.insert(0, os.path.dirname(os.path.abspath(path)))
+        return lambda: runpy.run_path(path, run_name="__main__")
+    if kind == "code":
+        code = compile(request["code"], "<snippet>", "exec")
+        return lambda: exec(code, {"__name__": "__main__"})
+    if kind == "callable":
+        module = __import__(request["module"], fromlist=["_"])
+        func = module
+        for part in request["qualname"].split("."):
+            func = getattr(func, part)
+        # Arguments are unpickled only now, once the caller's sys.path is in place
+        args, kwargs = pickle.loads(request["arguments"])
+
+        def call():
+            result = func(*args, **kwargs)
+            # Coroutine functions are run to completion, so their work is measured
+            return asyncio.run(result) if asyncio.iscoroutine(result) else result
+
+        return call
+    raise ValueError(f"Unknown target: {kind}")
+
+
+def _error(e: BaseException) -> str:
+    return f"{type(e).__name__}: {e}"
+
+
+def run(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one profiling request and return its JSON-serializable result."""
+    sys.path[:0] = request.get("sys_path", [])
+    _apply_limits(request.get("memory_mb"), request.get("timeout"))
+    target = _load_target(request)
+    mode = request.get("mode", "sample")
+    output = io.StringIO()
+    result: Dict[str, Any] = {"mode": mode, "error": None}
+
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        if mode == "sample":
+            started = time.perf_counter()
+            with StackSampler(threading.get_ident(), request.get("interval", 0.005)) as sampler:
+                try:
+                    target()
+                except SystemExit:
+                    pass
+                except BaseException as e:
+                    result["error"] = _error(e)
+            result.update(
+                elapsed=time.perf_counter() - started,
+                samples=sampler.samples,
+                interval=sampler.interval,
+                stacks=dict(sampler.stacks),
+            )
+
+        elif mode == "benchmark":
+            times = []
+            for _ in range(request.get("iterations", 100)):
+                started = time.perf_counter()
+                try:
+                    target()
+                except BaseException as e:
+                    result["error"] = result["error"] or _error(e)
+                times.append(time.perf_counter() - started)
+            result["times"] = times
+
+        elif mode == "memory":
+            tracemalloc.start()
+            started = time.perf_counter()
+            value = None
+            try:
+                value = target()
+            except BaseException as e:
+                result["error"] = _error(e)
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            result.update(
+                elapsed=time.perf_counter() - started,
+                current_memory_mb=current / 1024 / 1024,
+                peak_memory_mb=peak / 1024 / 1024,
+                result=repr(value)[:1000],
+            )
+
+        else:
+            raise ValueError(f"Unknown mode: {mode}")
+
+    result["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    result["output"] = output.getvalue()[-MAX_CAPTURED_OUTPUT:]
+    return result
+
+
+def main():
+    # Run as a script, the runner's own directory heads sys.path; keep it
+    # from shadowing the target's imports
+    if sys.path and os.path.abspath(sys.path[0]) == os.path.dirname(RUNNER_FILE):
+        sys.path.pop(0)
+    request = pickle.load(sys.stdin.buffer)
+    stdout = sys.stdout
+    try:
+        result = run(request)
+    except MemoryError:
+        result = {"error": "MemoryError: memory limit exceeded"}
+    except BaseException as e:
+        result = {"error": _error(e)}
+    stdout.write(json.dumps(result))
+    stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,132 @@ Validates generated code for enterprise-level quality before delivery.
 Ensures all generated apps are complete, functional, and professional.
 """
 
+import hashlib
 import re
-from typing import Dict, List, Any, Tuple
+import time
+from collections import OrderedDict
+from html.parser import HTMLParser
+from typing import Dict, List, Any, Optional, Tuple
 import structlog
 
 logger = structlog.get_logger()
 
+# Elements that never have a closing tag
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'source', 'track', 'wbr'
+}
+
+
+class DocumentScanner(HTMLParser):
+    """
+    Single streaming pass over an HTML document.
+    
+    Emits ("decl", text), ("starttag", tag, attrs) and ("endtag", tag) tokens
+    to the subscribed rules, and collects what the other checks need on the
+    way: tag counts, body content and the inline <style>/<script> blocks.
+    """
+    
+    def __init__(self, html_code: str, rules: Dict[str, List[Dict[str, Any]]],
+                 timings: Dict[str, Dict[str, float]]):
+        super().__init__(convert_charrefs=False)
+        self.html_code = html_code
+        self.rules = rules
+        self.timings = timings
+        self.satisfied: set = set()
+        self.opening_counts: Dict[str, int] = {}
+        self.closing_counts: Dict[str, int] = {}
+        self.styles: List[str] = []
+        self.scripts: List[str] = []
+        self.body_start: Optional[int] = None
+        self.body_end: Optional[int] = None
+        self._raw_target: Optional[List[str]] = None
+        self._line_offsets = [0]
+        for match in re.finditer("\n", html_code):
+            self._line_offsets.append(match.end())
+    
+    def scan(self) -> "DocumentScanner":
+        self.feed(self.html_code)
+        self.close()
+        return self
+    
+    def _offset(self) -> int:
+        line, column = self.getpos()
+        return self._line_offsets[line - 1] + column
+    
+    def _dispatch(self, event: str, *token) -> None:
+        for rule in self.rules.get(event, ()):
+            if rule["name"] in self.satisfied:
+                continue
+            started = time.perf_counter()
+            matched = rule["match"](*token)
+            timing = self.timings.setdefault(rule["name"], {"calls": 0, "total_ms": 0.0})
+            timing["calls"] += 1
+            timing["total_ms"] += (time.perf_counter() - started) * 1000
+            if matched:
+                self.satisfied.add(rule["name"])
+    
+    def handle_decl(self, decl: str) -> None:
+        self._dispatch("decl", decl)
+    
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self.opening_counts[tag] = self.opening_counts.get(tag, 0) + 1
+        attributes = {name: (value or "") for name, value in attrs}
+        self._dispatch("starttag", tag, attributes)
+        
+        if tag == "body" and self.body_start is None:
+            self.body_start = self._offset() + len(self.get_starttag_text() or "")
+        elif tag == "style":
+            self._raw_target = self.styles
+            self.styles.append("")
+        elif tag == "script" and "src" not in attributes:
+            self._raw_target = self.scripts
+            self.scripts.append("")
+    
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        # <br/>, <meta .../>: a start tag that needs no closing tag
+        attributes = {name: (value or "") for name, value in attrs}
+        self._dispatch("starttag", tag, attributes)
+    
+    def handle_endtag(self, tag: str) -> None:
+        self.closing_counts[tag] = self.closing_counts.get(tag, 0) + 1
+        self._dispatch("endtag", tag)
+        
+        if tag == "body" and self.body_end is None:
+            self.body_end = self._offset()
+        elif tag in ("style", "script"):
+            self._raw_target = None
+    
+    def handle_data(self, data: str) -> None:
+        if self._raw_target is not None:
+            self._raw_target[-1] += data
+    
+    @property
+    def body_content(self) -> Optional[str]:
+        if self.body_start is None or self.body_end is None:
+            return None
+        return self.html_code[self.body_start:self.body_end]
+
+
+def _has_tag(name: str):
+    return lambda tag, attrs: tag == name
+
+
+def _has_end_tag(name: str):
+    return lambda tag: tag == name
+
+
+def _is_utf8_meta(tag: str, attrs: Dict[str, str]) -> bool:
+    if tag != "meta":
+        return False
+    if attrs.get("charset", "").lower() == "utf-8":
+        return True
+    return "charset=utf-8" in attrs.get("content", "").lower().replace(" ", "")
+
+
+def _is_viewport_meta(tag: str, attrs: Dict[str, str]) -> bool:
+    return tag == "meta" and attrs.get("name", "").lower() == "viewport"
+
 
 class QualityValidator:
     """
@@ -22,11 +142,35 @@ class QualityValidator:
     - Professional styling (modern, clean design)
     - Responsiveness (mobile-friendly)
     - Accessibility (ARIA labels, semantic HTML)
+    
+    HTML is tokenized once and rules are dispatched on the token stream;
+    CSS/JS rules use regexes compiled once. Reports for unchanged regions
+    (the markup, each style and script section) are reused.
     """
     
-    def __init__(self):
-        """Initialize quality validator."""
+    def __init__(self, region_cache_size: int = 256):
+        """
+        Initialize quality validator.
+        
+        Args:
+            region_cache_size: Region reports kept for incremental validation
+        """
         self.validation_rules = self._load_validation_rules()
+        
+        # HTML rules indexed by the token type they listen to
+        self.token_rules: Dict[str, List[Dict[str, Any]]] = {}
+        for rule in self.validation_rules["html"]:
+            self.token_rules.setdefault(rule["token"], []).append(rule)
+        
+        for kind in ("css", "javascript"):
+            for rule in self.validation_rules[kind]:
+                rule["regex"] = re.compile(rule["pattern"], re.IGNORECASE)
+        
+        self.rule_timings: Dict[str, Dict[str, float]] = {}
+        self.region_cache_size = region_cache_size
+        self._region_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.region_hits = 0
+        self.region_misses = 0
     
     def _load_validation_rules(self) -> Dict[str, List[Dict[str, Any]]]:
         """Load validation rules for different file types."""
@@ -35,55 +179,64 @@ class QualityValidator:
             "html": [
                 {
                     "name": "DOCTYPE Declaration",
-                    "pattern": r"<!DOCTYPE\s+html>",
+                    "token": "decl",
+                    "match": lambda decl: re.fullmatch(r"doctype\s+html", decl.strip(), re.IGNORECASE) is not None,
                     "severity": "critical",
                     "message": "Missing DOCTYPE declaration"
                 },
                 {
                     "name": "HTML Tag",
-                    "pattern": r"<html[^>]*>",
+                    "token": "starttag",
+                    "match": _has_tag("html"),
                     "severity": "critical",
                     "message": "Missing <html> tag"
                 },
                 {
                     "name": "Head Section",
-                    "pattern": r"<head>",
+                    "token": "starttag",
+                    "match": _has_tag("head"),
                     "severity": "critical",
                     "message": "Missing <head> section"
                 },
                 {
                     "name": "Body Section",
-                    "pattern": r"<body>",
+                    "token": "starttag",
+                    "match": _has_tag("body"),
                     "severity": "critical",
                     "message": "Missing <body> section"
                 },
                 {
                     "name": "Charset Meta",
-                    "pattern": r'charset=["\']?UTF-8',
+                    "token": "starttag",
+                    "match": _is_utf8_meta,
                     "severity": "critical",
                     "message": "Missing charset meta tag"
                 },
                 {
                     "name": "Viewport Meta",
-                    "pattern": r'name=["\']viewport["\']',
+                    "token": "starttag",
+                    "match": _is_viewport_meta,
                     "severity": "critical",
                     "message": "Missing viewport meta tag (not mobile-friendly)"
                 },
                 {
                     "name": "Title Tag",
-                    "pattern": r"<title>",
+                    "token": "starttag",
+                    "match": _has_tag("title"),
                     "severity": "warning",
                     "message": "Missing <title> tag"
                 },
                 {
                     "name": "Closing HTML Tag",
-                    "pattern": r"</html>",
+                    "token": "endtag",
+                    "match": _has_end_tag("html"),
                     "severity": "critical",
                     "message": "Missing closing </html> tag"
                 },
                 {
                     "name": "Closing Body Tag",
-                    "pattern": r"</body>",
+                    "token": "endtag",
+                    "match": _has_end_tag("body"),
                     "severity": "critical",
                     "message": "Missing closing </body> tag"
                 }
@@ -130,31 +283,30 @@ class QualityValidator:
             ]
         }
     
-    def validate_html(self, html_code: str) -> Dict[str, Any]:
-        """
-        Validate HTML code for enterprise quality.
-        
-        Args:
-            html_code: HTML code to validate
-            
-        Returns:
-            Validation report with issues and score
-        """
+    def _scan(self, html_code: str) -> DocumentScanner:
+        """Tokenize the document once, evaluating the HTML rules on the way."""
+        return DocumentScanner(html_code, self.token_rules, self.rule_timings).scan()
+    
+    def _regex_issues(self, kind: str, code: str) -> List[Dict[str, Any]]:
         issues = []
-        
-        for rule in self.validation_rules["html"]:
-            if not re.search(rule["pattern"], html_code, re.IGNORECASE):
+        for rule in self.validation_rules[kind]:
+            started = time.perf_counter()
+            found = rule["regex"].search(code)
+            timing = self.rule_timings.setdefault(rule["name"], {"calls": 0, "total_ms": 0.0})
+            timing["calls"] += 1
+            timing["total_ms"] += (time.perf_counter() - started) * 1000
+            if not found:
                 issues.append({
-                    "type": "html",
+                    "type": kind,
                     "name": rule["name"],
                     "severity": rule["severity"],
                     "message": rule["message"]
                 })
-        
-        # Additional structural checks
-        issues.extend(self._check_html_structure(html_code))
-        
-        # Calculate score
+        return issues
+    
+    @staticmethod
+    def _report(kind: str, issues: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Score a list of issues."""
         critical_issues = len([i for i in issues if i["severity"] == "critical"])
         warning_issues = len([i for i in issues if i["severity"] == "warning"])
         
@@ -162,46 +314,67 @@ class QualityValidator:
         score = max(0, score)
         
         return {
-            "type": "html",
+            "type": kind,
             "score": score,
             "passed": critical_issues == 0,
             "issues": issues,
             "summary": f"{len(issues)} issues found ({critical_issues} critical, {warning_issues} warnings)"
         }
     
-    def _check_html_structure(self, html_code: str) -> List[Dict[str, Any]]:
-        """Check HTML structure for common issues."""
-        issues = []
+    def validate_html(self, html_code: str) -> Dict[str, Any]:
+        """
+        Validate HTML code for enterprise quality.
         
-        # Check for unclosed tags (basic check)
-        opening_tags = re.findall(r'<(\w+)[^>]*>', html_code)
-        closing_tags = re.findall(r'</(\w+)>', html_code)
+        Args:
+            html_code: HTML code to validate
+            
+        Returns:
+            Validation report with issues and score
+        """
+        return self._html_report(self._scan(html_code))
+    
+    def _html_report(self, scanner: DocumentScanner) -> Dict[str, Any]:
+        issues = [
+            {
+                "type": "html",
+                "name": rule["name"],
+                "severity": rule["severity"],
+                "message": rule["message"]
+            }
+            for rule in self.validation_rules["html"]
+            if rule["name"] not in scanner.satisfied
+        ]
         
-        # Self-closing tags that don't need closing
-        self_closing = {'img', 'br', 'hr', 'input', 'meta', 'link'}
+        # Additional structural checks
+        issues.extend(self._check_html_structure(scanner))
         
-        for tag in opening_tags:
-            if tag not in self_closing:
-                if opening_tags.count(tag) > closing_tags.count(tag):
-                    issues.append({
-                        "type": "html",
-                        "name": f"Unclosed {tag} tag",
-                        "severity": "critical",
-                        "message": f"Found {opening_tags.count(tag)} <{tag}> but only {closing_tags.count(tag)} </{tag}>"
-                    })
+        return self._report("html", issues)
+    
+    def _check_html_structure(self, scanner: DocumentScanner) -> List[Dict[str, Any]]:
+        """Check HTML structure for common issues."""
+        issues = []
         
-        # Check for empty body
-        body_match = re.search(r'<body[^>]*>(.*?)</body>', html_code, re.DOTALL)
-        if body_match:
-            body_content = body_match.group(1).strip()
-            if len(body_content) < 50:
+        # Check for unclosed tags (one issue per tag name)
+        for tag, opened in scanner.opening_counts.items():
+            closed = scanner.closing_counts.get(tag, 0)
+            if tag not in VOID_ELEMENTS and opened > closed:
                 issues.append({
                     "type": "html",
-                    "name": "Empty Body",
+                    "name": f"Unclosed {tag} tag",
                     "severity": "critical",
-                    "message": "Body section appears to be empty or minimal"
+                    "message": f"Found {opened} <{tag}> but only {closed} </{tag}>"
                 })
         
+        # Check for empty body
+        body_content = scanner.body_content
+        if body_content is not None and len(body_content.strip()) < 50:
+            issues.append({
+                "type": "html",
+                "name": "Empty Body",
+                "severity": "critical",
+                "message": "Body section appears to be empty or minimal"
+            })
+        
         return issues
     
     def validate_css(self, css_code: str) -> Dict[str, Any]:
@@ -214,16 +387,7 @@ class QualityValidator:
         Returns:
             Validation report with issues and score
         """
-        issues = []
-        
-        for rule in self.validation_rules["css"]:
-            if not re.search(rule["pattern"], css_code, re.IGNORECASE):
-                issues.append({
-                    "type": "css",
-                    "name": rule["name"],
-                    "severity": rule["severity"],
-                    "message": rule["message"]
-                })
+        issues = self._regex_issues("css", css_code)
         
         # Check for minimal CSS
         if len(css_code.strip()) < 100:
@@ -234,20 +398,7 @@ class QualityValidator:
                 "message": "CSS appears minimal - may lack professional styling"
             })
         
-        # Calculate score
-        critical_issues = len([i for i in issues if i["severity"] == "critical"])
-        warning_issues = len([i for i in issues if i["severity"] == "warning"])
-        
-        score = 100 - (critical_issues * 20) - (warning_issues * 5)
-        score = max(0, score)
-        
-        return {
-            "type": "css",
-            "score": score,
-            "passed": critical_issues == 0,
-            "issues": issues,
-            "summary": f"{len(issues)} issues found ({critical_issues} critical, {warning_issues} warnings)"
-        }
+        return self._report("css", issues)
     
     def validate_javascript(self, js_code: str) -> Dict[str, Any]:
         """
@@ -259,16 +410,7 @@ class QualityValidator:
         Returns:
             Validation report with issues and score
         """
-        issues = []
-        
-        for rule in self.validation_rules["javascript"]:
-            if not re.search(rule["pattern"], js_code, re.IGNORECASE):
-                issues.append({
-                    "type": "javascript",
-                    "name": rule["name"],
-                    "severity": rule["severity"],
-                    "message": rule["message"]
-                })
+        issues = self._regex_issues("javascript", js_code)
         
         # Check for minimal JavaScript
         if len(js_code.strip()) < 100:
@@ -288,41 +430,63 @@ class QualityValidator:
                 "message": "console.log statements found (remove for production)"
             })
         
-        # Calculate score
-        critical_issues = len([i for i in issues if i["severity"] == "critical"])
-        warning_issues = len([i for i in issues if i["severity"] == "warning"])
-        
-        score = 100 - (critical_issues * 20) - (warning_issues * 5)
-        score = max(0, score)
-        
-        return {
-            "type": "javascript",
-            "score": score,
-            "passed": critical_issues == 0,
-            "issues": issues,
-            "summary": f"{len(issues)} issues found ({critical_issues} critical, {warning_issues} warnings)"
-        }
+        return self._report("javascript", issues)
+    
+    def _region_report(self, kind: str, code: str, validate) -> Dict[str, Any]:
+        """Validate a region, reusing the report of identical content."""
+        key = f"{kind}:{hashlib.sha1(code.encode()).hexdigest()}"
+        report = self._region_cache.get(key)
+        if report is not None:
+            self._region_cache.move_to_end(key)
+            self.region_hits += 1
+            return report
+        
+        self.region_misses += 1
+        report = validate(code)
+        self._region_cache[key] = report
+        while len(self._region_cache) > self.region_cache_size:
+            self._region_cache.popitem(last=False)
+        return report
     
-    def validate_complete_app(self, html_code: str) -> Dict[str, Any]:
+    def validate_complete_app(self, html_code: str, previous: Optional[str] = None) -> Dict[str, Any]:
         """
         Validate a complete single-file application.
         
         Args:
             html_code: Complete HTML file with embedded CSS and JS
+            previous: Earlier version of the same app. Regions (markup,
+                styles, scripts) identical to an already validated version
+                are not re-validated either way; with ``previous`` the
+                report also lists the regions that differ from it
             
         Returns:
             Comprehensive validation report
         """
         logger.info("Validating complete application")
-        
-        # Extract sections
-        css_code = self._extract_css(html_code)
-        js_code = self._extract_javascript(html_code)
-        
-        # Validate each section
-        html_report = self.validate_html(html_code)
-        css_report = self.validate_css(css_code) if css_code else {"score": 0, "passed": False, "issues": [{"message": "No CSS found"}]}
-        js_report = self.validate_javascript(js_code) if js_code else {"score": 0, "passed": False, "issues": [{"message": "No JavaScript found"}]}
+        started = time.perf_counter()
+        
+        # Validate each section, reusing unchanged regions
+        def validate_markup(code: str) -> Dict[str, Any]:
+            scanner = self._scan(code)
+            return {
+                "report": self._html_report(scanner),
+                "css": "\n".join(scanner.styles),
+                "javascript": "\n".join(scanner.scripts),
+            }
+        
+        markup = self._region_report("markup", html_code, validate_markup)
+        html_report = markup["report"]
+        css_code = markup["css"]
+        js_code = markup["javascript"]
+        
+        if css_code:
+            css_report = self._region_report("css", css_code, self.validate_css)
+        else:
+            css_report = self._missing_section("css", "No CSS found")
+        if js_code:
+            js_report = self._region_report("javascript", js_code, self.validate_javascript)
+        else:
+            js_report = self._missing_section("javascript", "No JavaScript found")
         
         # Calculate overall score
         overall_score = (html_report["score"] + css_report["score"] + js_report["score"]) / 3
@@ -343,7 +507,7 @@ class QualityValidator:
         
         critical_count = len([i for i in all_issues if i["severity"] == "critical"])
         
-        return {
+        result = {
             "overall_score": round(overall_score, 1),
             "passed": passed,
             "ready_for_production": passed and overall_score >= 80,
@@ -352,18 +516,58 @@ class QualityValidator:
             "javascript": js_report,
             "total_issues": len(all_issues),
             "critical_issues": critical_count,
-            "recommendation": self._get_recommendation(overall_score, passed)
+            "recommendation": self._get_recommendation(overall_score, passed),
+            "validation_ms": round((time.perf_counter() - started) * 1000, 3)
+        }
+        
+        if previous is not None:
+            before = self._regions(previous)
+            after = {"html": html_code, "css": css_code, "javascript": js_code}
+            result["changed_regions"] = [region for region in after if after[region] != before[region]]
+        return result
+    
+    def _regions(self, html_code: str) -> Dict[str, str]:
+        """Markup, style and script text of a document, without running rules."""
+        key = f"markup:{hashlib.sha1(html_code.encode()).hexdigest()}"
+        markup = self._region_cache.get(key)
+        if markup is None:
+            scanner = self._scan(html_code)
+            markup = {"css": "\n".join(scanner.styles), "javascript": "\n".join(scanner.scripts)}
+        return {"html": html_code, "css": markup["css"], "javascript": markup["javascript"]}
+    
+    @staticmethod
+    def _missing_section(kind: str, message: str) -> Dict[str, Any]:
+        return {
+            "type": kind,
+            "score": 0,
+            "passed": False,
+            "issues": [{"type": kind, "name": message, "severity": "critical", "message": message}],
+            "summary": message
         }
     
     def _extract_css(self, html_code: str) -> str:
         """Extract CSS from HTML."""
-        css_match = re.search(r'<style[^>]*>(.*?)</style>', html_code, re.DOTALL | re.IGNORECASE)
-        return css_match.group(1) if css_match else ""
+        return "\n".join(self._scan(html_code).styles)
     
     def _extract_javascript(self, html_code: str) -> str:
         """Extract JavaScript from HTML."""
-        js_match = re.search(r'<script[^>]*>(.*?)</script>', html_code, re.DOTALL | re.IGNORECASE)
-        return js_match.group(1) if js_match else ""
+        return "\n".join(self._scan(html_code).scripts)
+    
+    def get_rule_timings(self) -> Dict[str, Any]:
+        """
+        Cumulative time spent in each rule.
+        
+        Returns:
+            Per-rule call counts and timings, plus region cache counters
+        """
+        return {
+            "rules": {
+                name: {**timing, "avg_ms": timing["total_ms"] / timing["calls"] if timing["calls"] else 0.0}
+                for name, timing in self.rule_timings.items()
+            },
+            "region_hits": self.region_hits,
+            "region_misses": self.region_misses,
+        }
     
     def _get_recommendation(self, score: float, passed: bool) -> str:
         """Get recommendation based on validation results."""
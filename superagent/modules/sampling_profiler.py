@@ -0,0 +1,239 @@
+"""Isolated, low-overhead statistical profiling.
+
+Targets run in a child Python process (``profile_runner.py``) with memory
+and time limits, so a slow or runaway script cannot block or crash the
+caller. Inside the child a background thread samples the main thread's
+stack at a fixed interval; the collapsed stacks it returns are turned into
+top self/cumulative function tables and a flame-graph tree here.
+"""
+
+import asyncio
+import json
+import os
+import pickle
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+RUNNER = Path(__file__).with_name("profile_runner.py")
+DEFAULT_TIMEOUT = float(os.getenv("PROFILER_TIMEOUT", "30"))
+DEFAULT_MEMORY_MB = int(os.getenv("PROFILER_MEMORY_MB", "512"))
+DEFAULT_INTERVAL = 0.005
+
+
+def collapsed_lines(stacks: Dict[str, int]) -> List[str]:
+    """Stacks in Brendan Gregg's collapsed format (``a;b;c 42``).
+
+    Args:
+        stacks: Sample count per root-first stack string
+
+    Returns:
+        Lines sorted by sample count, highest first
+    """
+    return [f"{stack} {count}" for stack, count in sorted(stacks.items(), key=lambda item: -item[1])]
+
+
+def flame_graph(stacks: Dict[str, int], root: str = "all") -> Dict[str, Any]:
+    """Nested ``{"name", "value", "children"}`` tree (d3-flame-graph format).
+
+    Args:
+        stacks: Sample count per root-first stack string
+        root: Name of the root node
+
+    Returns:
+        Flame graph tree
+    """
+    tree = {"name": root, "value": 0, "children": {}}
+    for stack, count in stacks.items():
+        tree["value"] += count
+        node = tree
+        for label in stack.split(";"):
+            node = node["children"].setdefault(label, {"name": label, "value": 0, "children": {}})
+            node["value"] += count
+
+    def finish(node):
+        children = sorted(node["children"].values(), key=lambda child: -child["value"])
+        return {"name": node["name"], "value": node["value"], "children": [finish(child) for child in children]}
+
+    return finish(tree)
+
+
+def top_functions(stacks: Dict[str, int], seconds_per_sample: float,
+                  limit: int = 20, by: str = "cumulative") -> List[Dict[str, Any]]:
+    """Functions ranked by cumulative (or self) samples.
+
+    A function's self samples are those where it was the innermost frame;
+    cumulative samples count each sample it appears in once, so recursion is
+    not double counted.
+
+    Args:
+        stacks: Sample count per root-first stack string
+        seconds_per_sample: Wall time represented by one sample
+        limit: Number of functions to return
+        by: "cumulative" or "self"
+
+    Returns:
+        Rows with function, self/cumulative samples and seconds
+    """
+    own: Dict[str, int] = {}
+    total: Dict[str, int] = {}
+    samples = sum(stacks.values()) or 1
+    for stack, count in stacks.items():
+        labels = stack.split(";")
+        own[labels[-1]] = own.get(labels[-1], 0) + count
+        for label in set(labels):
+            total[label] = total.get(label, 0) + count
+
+    if by == "self":
+        ranked = sorted(total, key=lambda label: (-own.get(label, 0), -total[label]))[:limit]
+    else:
+        ranked = sorted(total, key=lambda label: (-total[label], -own.get(label, 0)))[:limit]
+    return [
+        {
+            "function": label,
+            "self_samples": own.get(label, 0),
+            "samples": total[label],
+            "tottime": own.get(label, 0) * seconds_per_sample,
+            "cumtime": total[label] * seconds_per_sample,
+            "self_percent": 100 * own.get(label, 0) / samples,
+            "percent": 100 * total[label] / samples,
+        }
+        for label in ranked
+    ]
+
+
+class IsolatedRunner:
+    """Runs profiling targets in a resource-limited child process."""
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, memory_mb: int = DEFAULT_MEMORY_MB,
+                 python: str = sys.executable):
+        """Initialize runner.
+
+        Args:
+            timeout: Wall-clock limit per run in seconds
+            memory_mb: Address-space limit of the child process
+            python: Interpreter used for the child
+        """
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.python = python
+
+    @staticmethod
+    def target(source: Any, *args, **kwargs) -> Dict[str, Any]:
+        """Describe what to run: a file path, a code string or an importable function.
+
+        Args:
+            source: ``Path`` to a script, code string, or module-level callable
+            *args, **kwargs: Arguments for a callable target (must pickle)
+
+        Returns:
+            Target description for ``run``
+        """
+        if isinstance(source, Path):
+            return {"target": "file", "path": str(source)}
+        if isinstance(source, str):
+            return {"target": "code", "code": source}
+        if callable(source):
+            return {
+                "target": "callable",
+                "module": source.__module__,
+                "qualname": source.__qualname__,
+                "arguments": pickle.dumps((args, kwargs)),
+            }
+        raise TypeError(f"Cannot profile {type(source).__name__}")
+
+    async def run(self, mode: str, target: Dict[str, Any], timeout: Optional[float] = None,
+                  memory_mb: Optional[int] = None, **options) -> Dict[str, Any]:
+        """Run a target in a child process.
+
+        Args:
+            mode: "sample", "benchmark" or "memory"
+            target: Description from ``target``
+            timeout: Wall-clock limit (defaults to the runner's)
+            memory_mb: Memory limit (defaults to the runner's)
+            **options: Mode options (interval, iterations)
+
+        Returns:
+            Child result; ``error`` is set on failure, ``timed_out`` on timeout
+        """
+        timeout = timeout or self.timeout
+        request = {
+            **target,
+            **options,
+            "mode": mode,
+            "timeout": timeout,
+            "memory_mb": memory_mb or self.memory_mb,
+            "sys_path": [path for path in sys.path if path],
+        }
+        process = await asyncio.create_subprocess_exec(
+            self.python, str(RUNNER),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(pickle.dumps(request)), timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            logger.warning(f"Profiling run exceeded {timeout}s, killed")
+            return {"mode": mode, "error": f"Timed out after {timeout}s", "timed_out": True}
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+
+        try:
+            return json.loads(stdout.decode() or "null") or {
+                "mode": mode,
+                "error": f"Profiler exited with code {process.returncode}: {stderr.decode()[-500:]}",
+            }
+        except ValueError:
+            return {"mode": mode, "error": f"Unreadable profiler output (exit code {process.returncode})"}
+
+    async def sample(self, source: Any, *args, interval: float = DEFAULT_INTERVAL,
+                     timeout: Optional[float] = None, memory_mb: Optional[int] = None,
+                     top: int = 20, **kwargs) -> Dict[str, Any]:
+        """Statistically profile a target.
+
+        Args:
+            source: Script path, code string or module-level callable
+            *args, **kwargs: Arguments for a callable target
+            interval: Seconds between stack samples
+            timeout: Wall-clock limit
+            memory_mb: Memory limit
+            top: Number of functions in the top table
+
+        Returns:
+            Elapsed time, sample count, collapsed stacks, flame graph and top functions
+        """
+        raw = await self.run("sample", self.target(source, *args, **kwargs),
+                             timeout=timeout, memory_mb=memory_mb, interval=interval)
+        stacks = raw.pop("stacks", {}) or {}
+        samples = raw.get("samples") or 0
+        # Samples are taken on a timer, so spread the measured time over them
+        per_sample = raw["elapsed"] / samples if samples else interval
+        return {
+            **raw,
+            "collapsed": collapsed_lines(stacks),
+            "flame_graph": flame_graph(stacks),
+            "top_functions": top_functions(stacks, per_sample, top),
+            "top_self": top_functions(stacks, per_sample, top, by="self"),
+        }
+
+
+_isolated_runner: Optional[IsolatedRunner] = None
+
+
+def get_isolated_runner() -> IsolatedRunner:
+    """Get the shared isolated runner."""
+    global _isolated_runner
+    if _isolated_runner is None:
+        _isolated_runner = IsolatedRunner()
+    return _isolated_runner
@@ -13,12 +13,16 @@ from typing import Dict, Any, Optional, List
 import structlog
 import asyncio
 
+from superagent.modules.dependency_cache import get_dependency_cache
+
 logger = structlog.get_logger()
 
 
 class SandboxExecutor:
     """Executes code safely in Docker containers."""
     
+    PYTHON_IMAGE = "python:3.11-slim"
+    
     def __init__(self, timeout: int = 300):
         """
         Initialize sandbox executor.
@@ -27,6 +31,7 @@ class SandboxExecutor:
             timeout: Maximum execution time in seconds (default 5 min)
         """
         self.timeout = timeout
+        self.dependency_cache = get_dependency_cache()
         try:
             self.docker_client = docker.from_env()
             logger.info("Docker client initialized")
@@ -69,17 +74,23 @@ class SandboxExecutor:
             code_file = Path(tmpdir) / "main.py"
             code_file.write_text(code)
             
-            # Create requirements.txt if needed
+            volumes = {tmpdir: {"bind": "/workspace", "mode": "rw"}}
+            environment = {}
+            
+            # Mount cached dependencies instead of running pip in every container
             if requirements:
-                req_file = Path(tmpdir) / "requirements.txt"
-                req_file.write_text("\n".join(requirements))
+                deps_dir = await self._python_dependencies(requirements)
+                if deps_dir:
+                    volumes[str(deps_dir)] = {"bind": "/deps", "mode": "ro"}
+                    environment["PYTHONPATH"] = "/deps"
             
             try:
                 # Run in Python container
                 container = self.docker_client.containers.run(
-                    "python:3.11-slim",
-                    command=f"sh -c 'cd /workspace && pip install -q -r requirements.txt 2>/dev/null || true && {test_command}'",
-                    volumes={tmpdir: {"bind": "/workspace", "mode": "rw"}},
+                    self.PYTHON_IMAGE,
+                    command=f"sh -c 'cd /workspace && {test_command}'",
+                    volumes=volumes,
+                    environment=environment,
                     working_dir="/workspace",
                     detach=True,
                     mem_limit="512m",
@@ -118,6 +129,44 @@ class SandboxExecutor:
                     "timeout": "timeout" in str(e).lower()
                 }
     
+    async def _python_dependencies(self, requirements: List[str]) -> Optional[Path]:
+        """Get a cached dependency dir for the sandbox image, building it once."""
+        try:
+            env = await self.dependency_cache.python_env(
+                "\n".join(requirements),
+                builder=self._build_python_deps_in_container,
+                platform_tag=f"docker:{self.PYTHON_IMAGE}"
+            )
+            return env["path"]
+        except Exception as e:
+            logger.warning(f"Dependency install failed, running without requirements: {e}")
+            return None
+    
+    async def _build_python_deps_in_container(self, manifest_dir: Path, env_dir: Path) -> None:
+        """Install requirements with the sandbox image's interpreter."""
+        steps = []
+        if not self.dependency_cache.offline:
+            steps.append("pip wheel -q -r /manifest/requirements.txt -w /wheelhouse --find-links /wheelhouse")
+        steps.append(
+            "pip install -q --no-index --find-links /wheelhouse --target /deps -r /manifest/requirements.txt"
+        )
+        
+        def build():
+            # Network is only enabled for this one-off build, never for user code
+            self.docker_client.containers.run(
+                self.PYTHON_IMAGE,
+                command=["sh", "-c", " && ".join(steps)],
+                volumes={
+                    str(manifest_dir): {"bind": "/manifest", "mode": "ro"},
+                    str(env_dir): {"bind": "/deps", "mode": "rw"},
+                    str(self.dependency_cache.wheelhouse): {"bind": "/wheelhouse", "mode": "rw"}
+                },
+                mem_limit="1g",
+                remove=True
+            )
+        
+        await asyncio.to_thread(build)
+    
     async def execute_nodejs(
         self,
         code: str,
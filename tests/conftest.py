@@ -40,6 +40,7 @@ def reset_environment(monkeypatch):
     # Set test environment variables
     monkeypatch.setenv("ANTHROPIC_API_KEY", "test_key")
     monkeypatch.setenv("CACHE_ENABLED", "false")
+    monkeypatch.setenv("SUPERAGENT_TRACE_DB", "")
 
 
 
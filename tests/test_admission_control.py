@@ -0,0 +1,119 @@
+"""Tests for adaptive concurrency limits and load shedding."""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.admission_control import (
+    AdaptiveLimiter,
+    AdmissionController,
+    AdmissionMiddleware,
+    EndpointClass,
+    Overloaded,
+)
+
+
+@pytest.mark.asyncio
+async def test_limit_grows_additively_and_backs_off_multiplicatively():
+    """Saturated fast requests raise the limit; errors and latency spikes cut it."""
+    limiter = AdaptiveLimiter("test", initial_limit=2, max_limit=10)
+    for _ in range(20):
+        # Fill the limiter so it is actually saturated
+        in_use = int(limiter.limit)
+        for _ in range(in_use):
+            await limiter.acquire()
+        for _ in range(in_use):
+            limiter.release(0.1)
+    assert limiter.limit > 4
+
+    # Unused headroom does not grow the limit
+    before = limiter.limit
+    await limiter.acquire()
+    limiter.release(0.1)
+    assert limiter.limit == before
+
+    grown = limiter.limit
+    await limiter.acquire()
+    limiter.release(0.1, ok=False)
+    assert limiter.limit == pytest.approx(grown * 0.75)
+
+    limiter._decreased_at = 0.0
+    await limiter.acquire()
+    limiter.release(5.0)
+    assert limiter.limit == pytest.approx(grown * 0.75 * 0.75)
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_served_by_priority():
+    """When a slot frees up, interactive requests go ahead of queued builds."""
+    limiter = AdaptiveLimiter("shared", initial_limit=1, max_queue=5, max_wait=5.0)
+    await limiter.acquire()
+    order = []
+
+    async def request(name, priority):
+        await limiter.acquire(priority)
+        order.append(name)
+        limiter.release_slot()
+
+    build = asyncio.create_task(request("build", 2))
+    await asyncio.sleep(0)
+    chat = asyncio.create_task(request("chat", 0))
+    await asyncio.sleep(0)
+    assert limiter.queue_depth == 2
+
+    limiter.release_slot()
+    await asyncio.gather(build, chat)
+    assert order == ["chat", "build"]
+
+
+@pytest.mark.asyncio
+async def test_bounded_queue_and_wait():
+    """A full queue is refused at once; a queued request gives up after max_wait."""
+    limiter = AdaptiveLimiter("test", initial_limit=1, max_queue=1, max_wait=0.05)
+    await limiter.acquire()
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(Overloaded) as full:
+        await limiter.acquire()
+    assert full.value.reason == "queue_full"
+    with pytest.raises(Overloaded) as timed_out:
+        await waiting
+    assert timed_out.value.reason == "queue_timeout"
+    assert limiter.in_flight == 1
+    assert limiter.queue_depth == 0
+
+
+def test_middleware_sheds_with_retry_after_and_reports_status():
+    """Saturated classes get a 503 with Retry-After; other endpoints pass through."""
+    build = EndpointClass("build", 2, ("/build",), AdaptiveLimiter("build", initial_limit=1, max_limit=1, max_queue=0))
+    controller = AdmissionController([build])
+    app = FastAPI()
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+
+    @app.post("/build")
+    def run_build():
+        return {"ok": True}
+
+    @app.post("/other")
+    def other():
+        return {"ok": True}
+
+    client = TestClient(app)
+    assert client.post("/build").status_code == 200
+    assert controller.shared.in_flight == 0
+
+    build.limiter.in_flight = 1
+    response = client.post("/build")
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.json()["reason"] == "queue_full"
+    assert client.post("/other").status_code == 200
+
+    status = controller.get_status()
+    assert status["classes"]["build"]["limit"] >= 1
+    assert status["classes"]["build"]["queue_depth"] == 0
+    assert status["classes"]["build"]["rejected"] == 1
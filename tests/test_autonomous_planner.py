@@ -0,0 +1,84 @@
+"""Tests for autonomous planner checkpointing and rate-limit pacing."""
+
+import asyncio
+import pytest
+from superagent.core.memory import ProjectMemory
+from superagent.core.rate_budget import RateLimitBudget
+from superagent.modules.autonomous_planner import AutonomousPlanner
+
+
+class FakeLLM:
+    """LLM stub that succeeds every phase and can simulate a worker crash."""
+
+    def __init__(self, crash_on_phase=None):
+        self.crash_on_phase = crash_on_phase
+        self.prompts = []
+        self.rate_budget = RateLimitBudget()
+
+    async def generate(self, prompt):
+        self.prompts.append(prompt)
+        if self.crash_on_phase and prompt.startswith("Execute this phase") and self.crash_on_phase in prompt:
+            raise asyncio.CancelledError()
+        if prompt.startswith("Did this phase succeed?"):
+            return "YES"
+        return "done"
+
+
+@pytest.mark.asyncio
+async def test_resume_continues_from_last_completed_phase(tmp_path):
+    """Test a crashed run resumes from its checkpoint without re-planning."""
+    memory = ProjectMemory(str(tmp_path / "memory.db"))
+    crashing = AutonomousPlanner(FakeLLM(crash_on_phase="Testing & Debugging"), memory)
+
+    with pytest.raises(asyncio.CancelledError):
+        await crashing.execute_autonomous_project("Build an app", "app", tmp_path, max_time=60)
+
+    project_id = memory.get_project(1)["id"]
+    checkpoint = memory.load_checkpoint(project_id)
+    assert checkpoint["current_phase"] == 2
+    assert "iterations" not in checkpoint
+    assert checkpoint["last_result"]["phase"] == "Core Implementation"
+    history = memory.get_iteration_history(project_id)
+    assert [i["phase"] for i in history] == ["Research & Planning", "Core Implementation"]
+
+    llm = FakeLLM()
+    result = await AutonomousPlanner(llm, memory).resume_autonomous_project(project_id, tmp_path)
+
+    assert result["success"]
+    assert result["iterations_completed"] == 4
+    assert [i["phase"] for i in result["iterations"]][2:] == ["Testing & Debugging", "Polish & Documentation"]
+    assert not any(p.startswith("Create a detailed") for p in llm.prompts)
+    assert memory.get_project(project_id)["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_resume_without_checkpoint_raises(tmp_path):
+    """Test resuming an unknown project fails clearly."""
+    planner = AutonomousPlanner(FakeLLM(), ProjectMemory(str(tmp_path / "memory.db")))
+
+    with pytest.raises(ValueError):
+        await planner.resume_autonomous_project(42, tmp_path)
+
+
+def test_budget_spreads_remaining_requests_over_window():
+    """Test pacing follows the advertised rate-limit headers."""
+    budget = RateLimitBudget(reserve_requests=1)
+    assert budget.delay() == 0
+
+    budget.update_from_headers({
+        "anthropic-ratelimit-requests-limit": "50",
+        "anthropic-ratelimit-requests-remaining": "10",
+        "anthropic-ratelimit-requests-reset": "20",
+    })
+    assert 1.5 < budget.delay() <= 2.0
+
+    budget.update_from_headers({
+        "anthropic-ratelimit-requests-remaining": "1",
+        "anthropic-ratelimit-requests-reset": "30",
+    })
+    assert 29 < budget.delay() <= 30
+
+    blocked = RateLimitBudget(max_delay=5)
+    blocked.update_from_headers({"retry-after": "120"})
+    assert blocked.delay() == 5
+    assert blocked.snapshot()["blocked_for"] > 100
@@ -0,0 +1,97 @@
+"""Tests for the offline benchmark suite."""
+
+import pytest
+from structlog.testing import capture_logs
+from superagent.benchmarks.fake_llm import FakeLLMProvider, response_key
+from superagent.benchmarks.runner import BenchmarkRunner, compare_to_baseline
+from superagent.benchmarks.workloads import build_corpus
+
+
+@pytest.mark.asyncio
+async def test_fake_llm_is_deterministic():
+    """Test identical prompts produce identical canned responses."""
+    llm = FakeLLMProvider()
+    first = await llm.generate("Generate python code for file: app.py")
+    second = await FakeLLMProvider().generate("Generate python code for file: app.py")
+
+    assert first == second
+    assert "def app_op_0" in first
+    assert llm.total_tokens_used > 0
+
+
+@pytest.mark.asyncio
+async def test_fake_llm_prefers_recordings():
+    """Test recorded responses take precedence over canned ones."""
+    llm = FakeLLMProvider(recordings={response_key("hello", "sys"): "recorded"})
+
+    assert await llm.generate("hello", system="sys") == "recorded"
+    assert llm.recorded_hits == 1
+
+
+def test_corpus_is_reproducible(tmp_path):
+    """Test the synthetic corpus is identical for the same seed."""
+    a = build_corpus(tmp_path / "a", modules=5, seed=7)
+    b = build_corpus(tmp_path / "b", modules=5, seed=7)
+
+    assert [p.read_text() for p in a] == [p.read_text() for p in b]
+
+
+@pytest.mark.asyncio
+async def test_runner_reports_percentiles():
+    """Test the runner reports percentile summaries per workload."""
+    runner = BenchmarkRunner(iterations=2, warmup=0)
+    results = await runner.run(["supervisor_verification", "memory_search"])
+
+    summary = results["workloads"]["supervisor_verification"]
+    assert summary["iterations"] == 2
+    assert summary["min_ms"] <= summary["p50_ms"] <= summary["p95_ms"] <= summary["max_ms"]
+    assert summary["llm_calls_per_iteration"] == 12
+
+
+@pytest.mark.asyncio
+async def test_security_scan_gets_parseable_llm_replies():
+    """Test the security workload exercises the success path, not parse errors."""
+    with capture_logs() as logs:
+        results = await BenchmarkRunner(iterations=1, warmup=0).run(["security_scan"])
+
+    errors = [entry["event"] for entry in logs if entry["log_level"] == "error"]
+    assert errors == []
+    assert results["workloads"]["security_scan"]["llm_calls_per_iteration"] == 60
+
+
+@pytest.mark.asyncio
+async def test_unknown_workload_rejected():
+    """Test unknown workload names raise a ValueError."""
+    with pytest.raises(ValueError):
+        await BenchmarkRunner(iterations=1).run(["nope"])
+
+
+def test_compare_to_baseline_flags_regressions():
+    """Test slowdowns beyond the threshold are reported as regressions."""
+    baseline = {"workloads": {"a": {"p50_ms": 10.0, "p95_ms": 12.0}, "b": {"p50_ms": 10.0, "p95_ms": 12.0}},
+                "thresholds": {"b": 1.0}}
+    results = {"workloads": {"a": {"p50_ms": 14.0, "p95_ms": 12.5}, "b": {"p50_ms": 14.0, "p95_ms": 12.0},
+                             "c": {"p50_ms": 1.0, "p95_ms": 1.0}}}
+
+    comparison = compare_to_baseline(results, baseline, threshold=0.15)
+
+    assert comparison["passed"] is False
+    assert [(r["workload"], r["metric"]) for r in comparison["regressions"]] == [("a", "p50_ms")]
+    assert comparison["workloads"]["b"]["status"] == "ok"
+    assert comparison["workloads"]["c"]["status"] == "new"
+
+
+def test_benchmark_command_restores_logging_config(tmp_path):
+    """Test the CLI quiets logging only while the benchmark runs."""
+    import structlog
+    from click.testing import CliRunner
+    from superagent.cli import main
+
+    before = structlog.get_config()
+    result = CliRunner().invoke(main, [
+        "benchmark", "-w", "plan_execution", "-n", "1", "--warmup", "0", "--json",
+        "-b", str(tmp_path / "baseline.json")
+    ])
+
+    assert result.exit_code == 0, result.output
+    assert structlog.get_config() == before
@@ -0,0 +1,147 @@
+"""Tests for the shared E2E browser pool and ephemeral app server."""
+
+import asyncio
+import re
+import urllib.error
+import urllib.request
+import pytest
+from api.browser_pool import BrowserBackend, BrowserPool, StaticAppServer
+from api.e2e_test_runner import E2ETestRunner
+
+
+class FakePage:
+    """Page that fetches the served app over real HTTP."""
+
+    def __init__(self, context):
+        self.context = context
+        self.html = ""
+
+    async def goto(self, url, wait_until=None):
+        self.context.urls.append(url)
+        await asyncio.sleep(0.02)
+        self.html = await asyncio.to_thread(lambda: urllib.request.urlopen(url).read().decode())
+
+    async def title(self):
+        match = re.search(r"<title>(.*?)</title>", self.html)
+        return match.group(1) if match else ""
+
+    def locator(self, selector):
+        tags = [tag for tag in ("button", "input", "select") if tag in selector]
+        count = sum(len(re.findall(f"<{tag}\\b", self.html)) for tag in tags)
+
+        class Locator:
+            async def count(self):
+                return count
+
+        return Locator()
+
+    async def text_content(self, selector):
+        return re.sub(r"<[^>]+>", "", self.html)
+
+
+class FakeContext:
+    def __init__(self, backend):
+        self.backend = backend
+        self.urls = []
+        self.closed = False
+
+    async def new_page(self):
+        return FakePage(self)
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBackend(BrowserBackend):
+    """Browser backend that records launches and contexts."""
+
+    instances = []
+
+    def __init__(self):
+        self.contexts = []
+        self.connected = False
+        FakeBackend.instances.append(self)
+
+    async def start(self):
+        self.connected = True
+
+    async def new_context(self, **options):
+        context = FakeContext(self)
+        self.contexts.append(context)
+        return context
+
+    def is_connected(self):
+        return self.connected
+
+    async def close(self):
+        self.connected = False
+
+
+APP = "<html><head><title>{name}</title></head><body><button>Go</button><p>{text}</p></body></html>"
+
+
+def make_app(tmp_path, name):
+    app = tmp_path / name
+    app.mkdir()
+    (app / "index.html").write_text(APP.format(name=name, text="Welcome to the generated app " * 3))
+    return app
+
+
+@pytest.mark.asyncio
+async def test_concurrent_runs_share_one_browser_with_isolated_contexts(tmp_path):
+    """Test apps are verified concurrently on one browser within the context limit."""
+    FakeBackend.instances.clear()
+    pool = BrowserPool(FakeBackend, max_contexts=2)
+    runner = E2ETestRunner(pool)
+    apps = [
+        {"app_path": make_app(tmp_path, f"app{i}"), "app_type": "website", "required_features": []}
+        for i in range(4)
+    ]
+
+    results = await asyncio.gather(*[
+        runner.verify_app_features(app["app_path"], app["app_type"], app["required_features"]) for app in apps
+    ])
+
+    assert all(r["success"] and r["passed"] == 3 for r in results)
+    assert [r["passed_tests"][0] for r in results] == [f"Page loads (title: app{i})" for i in range(4)]
+    backend, = FakeBackend.instances
+    assert len(backend.contexts) == 4 and all(c.closed for c in backend.contexts)
+    ports = {c.urls[0].split(":")[2].split("/")[0] for c in backend.contexts}
+    assert len(ports) == 4
+    stats = pool.get_stats()
+    assert stats["launches"] == 1 and stats["peak_contexts"] == 2 and stats["active_contexts"] == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_relaunches_disconnected_browser():
+    """Test a crashed browser is replaced on the next checkout."""
+    FakeBackend.instances.clear()
+    pool = BrowserPool(FakeBackend, max_contexts=1)
+    async with pool.context():
+        pass
+    FakeBackend.instances[0].connected = False
+    async with pool.context():
+        pass
+
+    assert pool.get_stats()["launches"] == 2
+    await pool.close()
+    assert not FakeBackend.instances[1].connected
+
+
+@pytest.mark.asyncio
+async def test_static_server_serves_only_files_under_root(tmp_path):
+    """Test the ephemeral server serves app files and rejects traversal."""
+    app = make_app(tmp_path, "site")
+    (tmp_path / "secret.txt").write_text("nope")
+
+    async with StaticAppServer(app) as server:
+        def fetch(path):
+            try:
+                response = urllib.request.urlopen(server.url + path)
+                return response.status, response.headers["Content-Type"]
+            except urllib.error.HTTPError as e:
+                return e.code, None
+
+        assert await asyncio.to_thread(fetch, "/") == (200, "text/html")
+        assert (await asyncio.to_thread(fetch, "/../secret.txt"))[0] == 404
+        assert (await asyncio.to_thread(fetch, "/%2e%2e/secret.txt"))[0] == 404
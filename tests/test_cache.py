@@ -0,0 +1,79 @@
+"""Tests for the two-tier cache manager."""
+
+import pytest
+from superagent.core.cache import CacheManager
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Create cache manager without Redis."""
+    return CacheManager(cache_dir=str(tmp_path / ".cache"), l1_max_entries=2)
+
+
+@pytest.mark.asyncio
+async def test_values_round_trip_through_l1_and_disk(cache, tmp_path):
+    """Test L1 hits, LRU eviction and disk fallback with compact serialization."""
+    await cache.set("query:a", {"answer": (1, 2)})
+    await cache.set("query:b", "b")
+    await cache.set("query:c", "c")
+    await cache.flush()
+
+    assert len(cache._l1) == 2
+    assert await cache.get("query:c") == "c"
+    assert await cache.get("query:a") == {"answer": (1, 2)}
+    assert await cache.get("query:missing") is None
+
+    stats = cache.get_stats()["namespaces"]["query"]
+    assert stats["l1_hits"] == 1 and stats["l2_hits"] == 1 and stats["misses"] == 1
+
+    # A fresh process sees the disk tier
+    other = CacheManager(cache_dir=str(tmp_path / ".cache"))
+    assert await other.get("query:b") == "b"
+
+
+@pytest.mark.asyncio
+async def test_invalidation_is_scoped_to_namespace(cache):
+    """Test invalidating one namespace leaves the others intact."""
+    await cache.set("query:q", "old")
+    await cache.set("generate_file:f", "code")
+
+    await cache.invalidate("query:*")
+    assert await cache.get("query:q") is None
+    assert await cache.get("generate_file:f") == "code"
+
+    await cache.set("query:q", "new")
+    assert await cache.get("query:q") == "new"
+
+    # A pattern finer than a namespace invalidates the whole namespace
+    await cache.invalidate("generate_file:f*")
+    assert await cache.get("generate_file:f") is None
+    with pytest.raises(ValueError):
+        await cache.invalidate("gen*")
+
+    await cache.set("generate_file:f", "code")
+    await cache.invalidate()
+    assert await cache.get("generate_file:f") is None
+    assert cache.get_stats()["namespaces"]["generate_file"]["invalidations"] == 2
+
+
+@pytest.mark.asyncio
+async def test_callers_cannot_mutate_cached_values(cache):
+    """Test L1 hits return a fresh copy, like the L2 path."""
+    await cache.set("query:d", {"a": [1]})
+    first = await cache.get("query:d")
+    first["a"].append(2)
+
+    assert await cache.get("query:d") == {"a": [1]}
+
+
+@pytest.mark.asyncio
+async def test_invalidation_is_seen_by_other_processes(tmp_path):
+    """Test namespace versions are shared through the disk tier."""
+    first = CacheManager(cache_dir=str(tmp_path / ".cache"), version_refresh=0)
+    second = CacheManager(cache_dir=str(tmp_path / ".cache"), version_refresh=0)
+    await first.set("query:q", "old")
+    await first.flush()
+    assert await second.get("query:q") == "old"
+
+    await first.invalidate("query")
+    assert await second.get("query:q") is None
@@ -0,0 +1,73 @@
+"""Tests for the trigram code index and the search endpoints built on it."""
+
+import os
+from api.code_index import CodeIndex, query_trigrams
+from api.codebase_search import CodebaseSearch
+from api.file_operations import FileOperations
+
+
+def make_workspace(root):
+    (root / "app").mkdir()
+    (root / "app" / "models.py").write_text("class User:\n    def save(self):\n        pass\n")
+    (root / "app" / "views.js").write_text("function renderUser(user) {\n  return user.name;\n}\n")
+    (root / "node_modules").mkdir()
+    (root / "node_modules" / "lib.js").write_text("function renderUser() {}\n")
+
+
+def test_query_trigrams_extracts_required_literals():
+    """Alternations yield one trigram set per branch; wildcards constrain nothing."""
+    alternatives = query_trigrams(r"def foo|function\s+bar")
+    assert len(alternatives) == 2
+    assert {"def", "foo"} <= alternatives[0]
+    assert {"fun", "bar"} <= alternatives[1]
+    assert query_trigrams(r".*") is None
+
+
+def test_search_only_reads_candidate_files(tmp_path):
+    """Regex is verified only in files holding the query's trigrams."""
+    make_workspace(tmp_path)
+    index = CodeIndex(tmp_path)
+
+    result = index.search(r"render\w+\(", extensions=["js"])
+
+    assert [(m["file"], m["line"]) for m in result["matches"]] == [("app/views.js", 1)]
+    assert result["files_searched"] == 1
+    assert result["files_indexed"] == 2
+    assert result["latency_ms"] >= 0
+
+
+def test_index_follows_writes_and_mtime_changes(tmp_path):
+    """Writes through FileOperations and external edits are both picked up."""
+    make_workspace(tmp_path)
+    file_ops = FileOperations()
+    file_ops.base_dir = tmp_path
+    search = CodebaseSearch()
+    search.base_dir = tmp_path
+
+    assert search.find_class("Order")["total"] == 0
+    file_ops.write_file("app/orders.py", "class Order:\n    pass\n")
+    assert search.find_class("Order")["matches"][0]["file"] == "app/orders.py"
+
+    index = CodeIndex(tmp_path, refresh_interval=0)
+    assert index.search("pass")["total"] == 2
+    models = tmp_path / "app" / "models.py"
+    models.write_text("class User:\n    id = 1\n")
+    os.utime(models, ns=(0, 0))
+    assert index.search("pass")["total"] == 1
+
+    file_ops.delete_file("app/orders.py")
+    assert search.find_class("Order")["total"] == 0
+
+
+def test_search_results_are_paginated(tmp_path):
+    """offset/limit page through matches while total counts all of them."""
+    (tmp_path / "log.txt").write_text("".join(f"TODO item {i}\n" for i in range(25)))
+    file_ops = FileOperations()
+    file_ops.base_dir = tmp_path
+
+    first = file_ops.search_in_files("todo", limit=10)
+    last = file_ops.search_in_files("todo", offset=20, limit=10)
+
+    assert first["total"] == 25 and len(first["matches"]) == 10 and first["has_more"]
+    assert [m["line"] for m in last["matches"]] == [21, 22, 23, 24, 25]
+    assert not last["has_more"]
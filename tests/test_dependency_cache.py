@@ -0,0 +1,115 @@
+"""Tests for the dependency layer cache."""
+
+import pytest
+from superagent.modules.dependency_cache import DependencyCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Create an isolated dependency cache."""
+    return DependencyCache(cache_dir=str(tmp_path / "deps"), max_bytes=10 * 1024 * 1024)
+
+
+def make_builder(calls, payload_size=10):
+    """Create a fake builder that records calls instead of running pip."""
+    async def builder(manifest_dir, env_dir):
+        calls.append((manifest_dir / "requirements.txt").read_text())
+        (env_dir / "pkg").mkdir()
+        (env_dir / "pkg" / "__init__.py").write_text("x" * payload_size)
+    return builder
+
+
+def test_normalize_requirements_is_order_and_spelling_insensitive():
+    """Test equivalent requirement files normalize identically."""
+    a = "Flask>=2.0\n# web\nSQLAlchemy == 2.0.1\n\n"
+    b = "sqlalchemy==2.0.1  # orm\nflask >= 2.0"
+
+    assert DependencyCache.normalize_requirements(a) == DependencyCache.normalize_requirements(b)
+
+
+def test_normalize_package_json_ignores_metadata():
+    """Test package.json normalization only keeps dependency fields."""
+    a = '{"name": "one", "version": "1.0.0", "dependencies": {"express": "^4.18.0"}}'
+    b = '{"dependencies": {"express": "^4.18.0"}, "name": "two"}'
+
+    assert DependencyCache.normalize_package_json(a) == DependencyCache.normalize_package_json(b)
+
+
+@pytest.mark.asyncio
+async def test_environment_built_once(cache):
+    """Test a second lookup with the same requirements is a cache hit."""
+    calls = []
+    first = await cache.python_env("flask\nrequests", builder=make_builder(calls), platform_tag="test")
+    second = await cache.python_env("requests\nFlask", builder=make_builder(calls), platform_tag="test")
+
+    assert first["cache_hit"] is False
+    assert second["cache_hit"] is True
+    assert first["key"] == second["key"]
+    assert len(calls) == 1
+    assert cache.get_stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_link_into_project(cache, tmp_path):
+    """Test cached environments are materialized inside projects."""
+    env = await cache.python_env("flask", builder=make_builder([]), platform_tag="test")
+    project = tmp_path / "project"
+    project.mkdir()
+
+    target = project / cache.PYTHON_LINK_NAME
+    cache.link_tree(env["path"], target)
+
+    assert (target / "pkg" / "__init__.py").exists()
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_by_disk_budget(tmp_path):
+    """Test least-recently-used environments are evicted over budget."""
+    cache = DependencyCache(cache_dir=str(tmp_path / "deps"), max_bytes=2500)
+    builder = make_builder([], payload_size=1000)
+
+    first = await cache.python_env("a", builder=builder, platform_tag="test")
+    second = await cache.python_env("b", builder=builder, platform_tag="test")
+    await cache.python_env("a", builder=builder, platform_tag="test")  # refresh "a"
+    await cache.python_env("c", builder=builder, platform_tag="test")
+
+    assert first["key"] in cache.index
+    assert second["key"] not in cache.index
+    assert not second["path"].exists()
+    assert cache.get_stats()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_pinned_environment_is_not_evicted(tmp_path):
+    """Test an environment being linked into a project survives concurrent misses."""
+    cache = DependencyCache(cache_dir=str(tmp_path / "deps"), max_bytes=1500)
+    builder = make_builder([], payload_size=1000)
+
+    linking = await cache.python_env("a", builder=builder, platform_tag="test", pin=True)
+    await cache.python_env("b", builder=builder, platform_tag="test")
+
+    assert linking["path"].exists()
+    assert linking["key"] in cache.index
+
+    cache.unpin(linking["key"])
+    await cache.python_env("c", builder=builder, platform_tag="test")
+    assert not linking["path"].exists()
+    assert not [p for p in (tmp_path / "deps" / "envs").iterdir() if p.name.startswith("evicted-")]
+
+
+@pytest.mark.asyncio
+async def test_projects_cannot_modify_the_cached_copy(cache, tmp_path):
+    """Test linked Python files are read-only and copied trees are independent."""
+    env = await cache.python_env("flask", builder=make_builder([]), platform_tag="test")
+    linked = tmp_path / "linked"
+    cache.link_tree(env["path"], linked)
+    assert not (linked / "pkg" / "__init__.py").stat().st_mode & 0o222
+
+    source = tmp_path / "node_env"
+    (source / "pkg").mkdir(parents=True)
+    (source / "pkg" / "index.js").write_text("original")
+    copied = tmp_path / "node_modules"
+    cache.link_tree(source, copied, hardlink=False)
+    (copied / "pkg" / "index.js").write_text("postinstall")
+
+    assert (source / "pkg" / "index.js").read_text() == "original"
@@ -0,0 +1,82 @@
+"""Tests for the cached, watched workspace file tree."""
+
+import asyncio
+import pytest
+from api.file_operations import FileOperations
+from api.file_tree import FileTreeService
+
+
+def make_workspace(root):
+    for path in ["a/b/c/deep.py", "a/one.py", "a/two.py", "top.txt", "node_modules/pkg/index.js"]:
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(path)
+
+
+def test_listing_is_depth_limited_and_paginated(tmp_path):
+    """Pages follow path order, honour max_depth and never enter excluded dirs."""
+    make_workspace(tmp_path)
+    tree = FileTreeService(tmp_path)
+
+    shallow = tree.list(".", max_depth=2)
+    assert [e["path"] for e in shallow["entries"]] == ["a", "a/b", "a/one.py", "a/two.py", "top.txt"]
+    assert shallow["next_cursor"] is None
+
+    paths, cursor = [], None
+    while True:
+        page = tree.list("a", cursor=cursor, limit=2)
+        paths += [e["path"] for e in page["entries"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert paths == ["a/b", "a/b/c", "a/b/c/deep.py", "a/one.py", "a/two.py"]
+
+    with pytest.raises(FileNotFoundError):
+        tree.list("missing")
+
+
+def test_changes_are_recorded_as_versioned_deltas(tmp_path):
+    """Writes through FileOperations produce deltas clients can fetch by version."""
+    make_workspace(tmp_path)
+    file_ops = FileOperations()
+    file_ops.base_dir = tmp_path
+    listing = file_ops.list_files("a", recursive=False)
+    assert listing["files"][0]["path"] == "a/one.py" and listing["directories"] == ["a/b"]
+
+    from api.file_tree import get_file_tree
+    tree = get_file_tree(tmp_path)
+    version = listing["version"]
+
+    file_ops.write_file("a/new/three.py", "x = 3\n")
+    file_ops.delete_file("a/one.py")
+
+    changes = tree.changes_since(version)
+    assert [(c["op"], c["path"]) for c in changes["changes"]] == [
+        ("added", "a/new"), ("added", "a/new/three.py"), ("removed", "a/one.py")
+    ]
+    assert tree.changes_since(changes["version"])["changes"] == []
+
+
+@pytest.mark.asyncio
+async def test_subscribers_receive_deltas_from_polling_watcher(tmp_path):
+    """Without watchfiles the polling watcher pushes external edits to subscribers."""
+    make_workspace(tmp_path)
+    tree = FileTreeService(tmp_path, poll_interval=0.02)
+    queue = tree.subscribe()
+    try:
+        # Listing right after subscribing must not see an empty, unbuilt tree
+        listing = tree.list(".", max_depth=1)
+        assert [e["path"] for e in listing["entries"]] == ["a", "top.txt"]
+        await asyncio.sleep(0.05)
+        (tmp_path / "top.txt").write_text("changed contents")
+        (tmp_path / "later.md").write_text("# later")
+
+        expected = {("modified", "top.txt"), ("added", "later.md")}
+        ops = set()
+        while not expected <= ops:
+            message = await asyncio.wait_for(queue.get(), 2)
+            assert message["type"] == "changes"
+            ops |= {(c["op"], c["path"]) for c in message["changes"]}
+        assert ops == expected
+    finally:
+        tree.unsubscribe(queue)
+        await tree.stop()
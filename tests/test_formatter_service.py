@@ -0,0 +1,87 @@
+"""Tests for the batched, cached formatter service."""
+
+import pytest
+from superagent.modules import formatter_service
+from superagent.modules.formatter_service import FormatterService
+
+
+UGLY = "def add( a,b ):\n  return a+b\n"
+PRETTY = "def add(a, b):\n    return a + b\n"
+
+
+@pytest.fixture
+def service(tmp_path):
+    """Create a formatter service with an isolated store."""
+    service = FormatterService(cache_dir=str(tmp_path / "fmt"), max_workers=1)
+    yield service
+    service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_files_are_batched_into_one_worker_round_trip(service):
+    """Test concurrent requests share a batch and identical code is formatted once."""
+    items = [(UGLY, "python"), (UGLY, "python"), ("x=[1,2]\n", "python"), ("var a", "rust")]
+
+    results = await service.format_many(items)
+
+    assert results == [PRETTY, PRETTY, "x = [1, 2]\n", "var a"]
+    stats = service.get_stats()
+    assert stats["batches"] == 1
+    assert stats["languages"]["python"]["formatted"] == 2
+    assert stats["languages"]["python"]["avg_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_results_are_cached_in_memory_and_on_disk(service, tmp_path):
+    """Test repeat formatting is served from the LRU, then from disk in a new service."""
+    assert await service.format(UGLY, "python") == PRETTY
+    assert await service.format(UGLY, "python") == PRETTY
+    assert service.get_stats()["languages"]["python"]["cache_hits"] == 1
+    assert service.get_stats()["batches"] == 1
+
+    fresh = FormatterService(cache_dir=str(tmp_path / "fmt"), max_workers=1)
+    assert await fresh.format(UGLY, "python") == PRETTY
+    assert fresh.get_stats()["batches"] == 0
+
+    # Different config is a different cache entry
+    narrow = await fresh.format("call(alpha, beta, gamma, delta)\n", "python", {"line_length": 20})
+    assert narrow.startswith("call(\n    alpha,")
+    assert fresh.get_stats()["batches"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_code_is_returned_unchanged(service):
+    """Test formatter errors fall back to the input and are counted."""
+    broken = "def broken(:\n"
+
+    assert await service.format(broken, "python") == broken
+    assert service.get_stats()["languages"]["python"]["errors"] == 1
+    # A syntax error is deterministic, so it is cached
+    assert await service.format(broken, "python") == broken
+    assert service.get_stats()["batches"] == 1
+
+
+@pytest.mark.asyncio
+async def test_missing_formatter_is_skipped_and_not_cached(service, monkeypatch):
+    """Test languages without an installed formatter skip the pool and the store."""
+    monkeypatch.setattr(formatter_service.shutil, "which", lambda name: None)
+    code = "const a = {b:1}\n"
+
+    assert await service.format(code, "javascript") == code
+    stats = service.get_stats()
+    assert stats["batches"] == 0
+    assert stats["languages"]["javascript"]["unavailable"] == 1
+    assert stats["languages"]["javascript"]["formatted"] == 0
+    assert len(service.disk) == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_key_includes_formatter_version(service, monkeypatch):
+    """Test upgrading a formatter bypasses results cached for the old version."""
+    assert await service.format(UGLY, "python") == PRETTY
+    assert service.get_stats()["batches"] == 1
+
+    monkeypatch.setattr(formatter_service, "formatter_version", lambda formatter: "99.0")
+    service._versions.clear()
+    assert await service.format(UGLY, "python") == PRETTY
+    assert service.get_stats()["batches"] == 2
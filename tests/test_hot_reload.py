@@ -0,0 +1,64 @@
+"""Tests for diff-based preview hot reload."""
+
+import asyncio
+import pytest
+from api.hot_reload import HotReloadManager, compute_update
+
+
+PAGE = """<html><head><style>body {{ color: {color}; }}</style><style>p {{ margin: 0; }}</style></head>
+<body><p>{text}</p>{extra}</body></html>"""
+
+
+def page(color="red", text="hello", extra=""):
+    return PAGE.format(color=color, text=text, extra=extra)
+
+
+def test_css_only_change_is_injected():
+    """Test changing only style contents produces CSS patches for changed blocks."""
+    update = compute_update(page(), page(color="blue"))
+
+    assert update == {"type": "css", "patches": [{"index": 0, "css": "body { color: blue; }"}]}
+
+
+def test_markup_change_on_static_page_patches_dom():
+    """Test body edits on a script-free page patch the DOM instead of reloading."""
+    update = compute_update(page(), page(text="hi there"))
+
+    assert update["type"] == "dom"
+    assert update["html"] == "<p>hi there</p>"
+    assert compute_update(page(), page()) == {"type": "none"}
+
+
+def test_unsafe_changes_fall_back_to_reload():
+    """Test pages with scripts or handlers, or mixed CSS/markup edits, reload."""
+    script = "<script>document.querySelector('p').onclick = go;</script>"
+    assert compute_update(page(extra=script), page(text="bye", extra=script)) == {"type": "reload"}
+    assert compute_update(page(), page(text='<button onclick="go()">x</button>')) == {"type": "reload"}
+    assert compute_update(page(), page(color="blue", text="bye")) == {"type": "reload"}
+    assert compute_update(page(), page().replace("<style>p", "<style media='print'>p")) == {"type": "reload"}
+
+
+@pytest.mark.asyncio
+async def test_bursts_are_debounced_into_one_message():
+    """Test rapid updates send a single diff against what clients last saw."""
+    sent = []
+
+    async def broadcast(preview_id, message):
+        sent.append(message)
+
+    manager = HotReloadManager(broadcast, debounce=0.05, history_limit=3)
+    manager.open("p1", page())
+    for color in ("blue", "green", "purple", "black"):
+        manager.submit("p1", page(color=color))
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.1)
+
+    assert len(sent) == 1
+    assert sent[0]["type"] == "css" and sent[0]["version"] == 5
+    assert sent[0]["patches"][0]["css"] == "body { color: black; }"
+    assert [v["version"] for v in manager.versions("p1")] == [3, 4, 5]
+
+    manager.submit("p1", page(color="white"))
+    manager.close("p1")
+    await asyncio.sleep(0.1)
+    assert len(sent) == 1 and manager.versions("p1") == []
@@ -0,0 +1,96 @@
+"""Tests for the incremental, deduplicating log monitor."""
+
+import os
+import pytest
+from api.log_monitor import LogMonitor
+
+PATTERNS = {
+    "python_error": r"Traceback \(most recent call last\)|Error:|Exception:",
+    "api_error": r"HTTP.*Error",
+}
+
+
+def traceback(user_id):
+    return (
+        "Traceback (most recent call last):\n"
+        '  File "/app/api/index.py", line 42, in handler\n'
+        "    user = users[user_id]\n"
+        f"KeyError: 'user-{user_id}'\n"
+    )
+
+
+def test_reads_only_new_complete_lines(tmp_path):
+    """Each poll returns lines appended since the last one; partial lines wait."""
+    log = tmp_path / "app.log"
+    log.write_text("old line\n")
+    monitor = LogMonitor(PATTERNS)
+
+    assert monitor.read_new_lines(str(log)) == ["old line"]
+    assert monitor.read_new_lines(str(log)) == []
+
+    with open(log, "a") as f:
+        f.write("first\nsecond, unfinished")
+    assert monitor.read_new_lines(str(log)) == ["first"]
+
+    with open(log, "a") as f:
+        f.write(" now done\n")
+    assert monitor.read_new_lines(str(log)) == ["second, unfinished now done"]
+    assert monitor.get_stats()["files"][str(log)] == log.stat().st_size
+
+
+def test_rotation_drains_backup_then_follows_new_file(tmp_path):
+    """Lines written just before rotation are read from the .1 backup."""
+    log = tmp_path / "app.log"
+    log.write_text("a\n")
+    monitor = LogMonitor(PATTERNS)
+    assert monitor.read_new_lines(str(log)) == ["a"]
+
+    with open(log, "a") as f:
+        f.write("b\n")
+    os.rename(log, tmp_path / "app.log.1")
+    log.write_text("c\n")
+
+    assert monitor.read_new_lines(str(log)) == ["b", "c"]
+    assert monitor.get_stats()["rotations"] == 1
+
+    # Truncated in place (copytruncate)
+    log.write_text("")
+    assert monitor.read_new_lines(str(log)) == []
+    with open(log, "a") as f:
+        f.write("d\n")
+    assert monitor.read_new_lines(str(log)) == ["d"]
+    assert monitor.get_stats()["rotations"] == 2
+
+
+@pytest.mark.asyncio
+async def test_repeated_traceback_is_reported_once(tmp_path):
+    """Tracebacks differing only in volatile values share a fingerprint."""
+    log = tmp_path / "app.log"
+    log.write_text("")
+    monitor = LogMonitor(PATTERNS)
+    await monitor.poll([str(log)])
+
+    with open(log, "a") as f:
+        for user_id in range(5):
+            f.write(traceback(user_id))
+        f.write("HTTP 502 Error from upstream\n")
+
+    events = await monitor.poll([str(log)])
+
+    assert [event.error_type for event in events] == ["python_error", "api_error"]
+    first = events[0]
+    assert '  File "/app/api/index.py", line 42, in handler' in first.context
+    assert first.occurrences == 5
+    assert monitor.get_stats()["duplicates"] == 4
+    assert monitor.get_stats()["top_errors"][0]["count"] == 5
+
+
+def test_event_rate_is_limited():
+    """Distinct errors beyond the per-minute budget are dropped."""
+    monitor = LogMonitor(PATTERNS, max_events_per_minute=3)
+    lines = [f"ValueError: bad input in step_{chr(97 + i)}" for i in range(10)]
+
+    events = monitor.process(lines)
+
+    assert len(events) == 3
+    assert monitor.get_stats()["rate_limited"] == 7
@@ -0,0 +1,95 @@
+"""Tests for the metrics registry, request middleware and loop lag probe."""
+
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.metrics import LoopLagProbe, MetricsMiddleware
+from superagent.core.metrics import MetricsRegistry, get_metrics_registry
+from superagent.core.tracing import Tracer
+
+
+def test_registry_renders_prometheus_text():
+    """Counters, callback gauges and histograms render in exposition format."""
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "Calls", ("provider",))
+    calls.inc(provider="groq")
+    calls.inc(2, provider="groq")
+    registry.gauge("rooms", "Rooms", callback=lambda: 3)
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    latency.observe(0.05)
+    latency.observe(0.5)
+
+    text = registry.render()
+
+    assert "# TYPE calls_total counter" in text
+    assert 'calls_total{provider="groq"} 3' in text
+    assert "rooms 3" in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+    assert "latency_seconds_count 2" in text
+    assert text.endswith("\n")
+
+
+def test_label_cardinality_is_bounded():
+    """Series beyond the limit fold into a single "other" series."""
+    registry = MetricsRegistry()
+    counter = registry.counter("paths_total", "Paths", ("path",))
+    counter.max_series = 3
+    for i in range(10):
+        counter.inc(path=f"/items/{i}")
+
+    assert len(counter._values) == 4
+    assert counter.value(path="other") == 7
+
+
+def test_middleware_labels_route_templates():
+    """Requests are counted by route template and status class, not raw path."""
+    app = FastAPI()
+    registry = MetricsRegistry()
+    app.add_middleware(MetricsMiddleware, registry=registry, probe=LoopLagProbe(registry=registry))
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    for item_id in range(5):
+        assert client.get(f"/items/{item_id}").status_code == 200
+    assert client.get("/missing/1").status_code == 404
+
+    requests = registry.get("superagent_http_requests_total")
+    assert requests.value(method="GET", route="/items/{item_id}", status="2xx") == 5
+    assert requests.value(method="GET", route="<unmatched>", status="4xx") == 1
+    latency = registry.get("superagent_http_request_duration_seconds")
+    assert latency.count(method="GET", route="/items/{item_id}") == 5
+    assert registry.get("superagent_http_requests_in_flight").value() == 0
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_and_llm_spans_are_recorded():
+    """A blocked loop shows up as lag; LLM spans count calls and tokens even with tracing off."""
+    registry = MetricsRegistry()
+    probe = LoopLagProbe(interval=0.01, registry=registry)
+    probe.start()
+    await asyncio.sleep(0.02)
+    time.sleep(0.1)
+    await asyncio.sleep(0.03)
+    await probe.stop()
+    lag = registry.get("superagent_event_loop_lag_seconds")
+    assert lag.count() >= 2
+    assert lag._values[()]["sum"] >= 0.08
+
+    tracer = Tracer(db_path="")
+    tracer.enabled = False
+    calls = get_metrics_registry().counter("superagent_llm_calls_total", "LLM provider calls", ("provider", "status"))
+    before = calls.value(provider="test-provider", status="ok")
+    with tracer.span("llm.generate", kind="llm", **{"llm.provider": "test-provider"}) as span:
+        tracer.record_llm_usage(span, prompt_tokens=12, output_tokens=30)
+    assert calls.value(provider="test-provider", status="ok") == before + 1
+    tokens = get_metrics_registry().get("superagent_llm_tokens_total")
+    assert tokens.value(provider="test-provider", kind="output") >= 30
+    assert len(tracer.buffer) == 0
@@ -1,5 +1,7 @@
 """Tests for multi-agent system."""
 
+import asyncio
+
 import pytest
 from superagent.core.multi_agent import (
     MultiAgentOrchestrator,
@@ -97,3 +99,110 @@ def test_task_prompt_creation():
 
 
 
+
+
+class FakeAgent:
+    """Agent stand-in that records executions instead of calling the LLM."""
+    
+    def __init__(self, role, agent_id, delay=0.01, log=None):
+        self.role = role
+        self.agent_id = agent_id
+        self.delay = delay
+        self.log = log if log is not None else []
+        self.tasks_completed = 0
+    
+    async def execute_task(self, task):
+        await asyncio.sleep(task.get("delay", self.delay))
+        if task.get("fail"):
+            raise RuntimeError("boom")
+        self.log.append((self.agent_id, task.get("id")))
+        self.tasks_completed += 1
+        return {
+            "agent_id": self.agent_id,
+            "role": self.role.value,
+            "task": task,
+            "result": f"done {task.get('id')}",
+            "success": True
+        }
+
+
+@pytest.mark.asyncio
+async def test_scheduler_routes_by_role_and_keeps_order():
+    """Test tasks go to role-matching agents and results keep submission order."""
+    from superagent.core.scheduler import RoleAwareScheduler
+    
+    agents = [FakeAgent(AgentRole.CODER, 0), FakeAgent(AgentRole.DEBUGGER, 1)]
+    scheduler = RoleAwareScheduler(agents)
+    tasks = [
+        {"id": "a", "type": "debug", "delay": 0.05},
+        {"id": "b", "type": "code"},
+    ]
+    
+    results = await scheduler.run(tasks)
+    
+    assert [r["task_id"] for r in results] == ["a", "b"]
+    assert results[0]["role"] == "debugger"
+    assert results[1]["role"] == "coder"
+
+
+@pytest.mark.asyncio
+async def test_scheduler_work_stealing():
+    """Test idle agents steal compatible work from other role queues."""
+    from superagent.core.scheduler import RoleAwareScheduler
+    
+    agents = [FakeAgent(AgentRole.CODER, 0), FakeAgent(AgentRole.DEBUGGER, 1)]
+    scheduler = RoleAwareScheduler(agents)
+    tasks = [{"id": i, "type": "code", "delay": 0.05} for i in range(4)]
+    
+    results = await scheduler.run(tasks)
+    
+    assert all(r["success"] for r in results)
+    assert {r["agent_id"] for r in results} == {0, 1}
+    # Code tasks sit in the coder's queue: everything the debugger ran was stolen
+    by_agent = {m["agent_id"]: m for m in scheduler.last_metrics["agents"]}
+    assert by_agent[0]["role"] == "coder" and by_agent[0]["stolen"] == 0
+    assert by_agent[1]["role"] == "debugger" and by_agent[1]["stolen"] == by_agent[1]["tasks"] >= 1
+    assert by_agent[0]["tasks"] + by_agent[1]["tasks"] == 4
+    assert all(r["stolen"] == (r["agent_id"] == 1) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_priority_and_dependencies():
+    """Test dependencies run first and higher priority tasks are picked first."""
+    from superagent.core.scheduler import RoleAwareScheduler
+    
+    log = []
+    agents = [FakeAgent(AgentRole.CODER, 0, log=log)]
+    scheduler = RoleAwareScheduler(agents)
+    tasks = [
+        {"id": "low", "type": "code", "priority": 0},
+        {"id": "high", "type": "code", "priority": 5},
+        {"id": "after", "type": "code", "priority": 10, "depends_on": ["low"]},
+    ]
+    
+    await scheduler.run(tasks)
+    
+    assert [task_id for _, task_id in log] == ["high", "low", "after"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_failures_propagate_to_dependents():
+    """Test failed tasks, cycles and unroutable tasks produce error results."""
+    from superagent.core.scheduler import RoleAwareScheduler
+    
+    agents = [FakeAgent(AgentRole.CODER, 0)]
+    scheduler = RoleAwareScheduler(agents)
+    tasks = [
+        {"id": "bad", "type": "code", "fail": True},
+        {"id": "child", "type": "code", "depends_on": ["bad"]},
+        {"id": "x", "type": "code", "depends_on": ["y"]},
+        {"id": "y", "type": "code", "depends_on": ["x"]},
+        {"id": "review", "type": "supreme_review"},
+    ]
+    
+    results = await scheduler.run(tasks)
+    
+    assert [r["success"] for r in results] == [False] * 5
+    assert "failed" in results[1]["error"]
+    assert "cycle" in results[2]["error"]
+    assert "No agent" in results[4]["error"]
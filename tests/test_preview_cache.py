@@ -0,0 +1,138 @@
+"""Tests for the preview asset cache."""
+
+import gzip
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from api.preview_cache import PreviewAssetCache, choose_encoding, etag_matches
+
+
+PAGE = "<html><body>" + "<p>hello preview</p>" * 100 + "</body></html>"
+
+
+@pytest.fixture
+def preview_client(tmp_path, monkeypatch):
+    """A client for the streaming build router serving previews from tmp_path."""
+    from api import streaming_realtime_build
+    from api.preview_cache import preview_cache
+
+    monkeypatch.chdir(tmp_path)
+    preview_cache.clear()
+    app = FastAPI()
+    app.include_router(streaming_realtime_build.router)
+    (tmp_path / "demo").mkdir()
+    (tmp_path / "demo" / "index.html").write_text(PAGE)
+    yield TestClient(app), tmp_path / "demo", preview_cache
+    preview_cache.clear()
+
+
+def test_preview_is_served_from_memory_with_etag_and_gzip(preview_client):
+    """Test repeat requests hit the cache, get compressed bodies and 304s."""
+    client, project, cache = preview_client
+
+    first = client.get("/api/v1/preview/demo/index.html", headers={"Accept-Encoding": "gzip"})
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.text == PAGE  # the client transparently decodes
+    etag = first.headers["etag"]
+    assert etag.endswith('-gzip"')
+
+    again = client.get("/api/v1/preview/demo/index.html", headers={"Accept-Encoding": "identity"})
+    assert again.text == PAGE
+    assert again.headers["etag"] == etag.replace("-gzip", "")
+
+    # A tag for any coding of the same content revalidates
+    cached = client.get("/api/v1/preview/demo/index.html", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cache.get_stats()["hits"] == 2 and cache.get_stats()["misses"] == 1
+
+
+def test_invalidation_serves_new_content(preview_client):
+    """Test the write path invalidation makes the next request read the new file."""
+    client, project, cache = preview_client
+    etag = client.get("/api/v1/preview/demo/index.html").headers["etag"]
+
+    (project / "index.html").write_text("<html>v2</html>")
+    cache.invalidate_prefix(project)
+
+    response = client.get("/api/v1/preview/demo/index.html", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.text == "<html>v2</html>"
+    assert response.headers["etag"] != etag
+    assert client.get("/api/v1/preview/demo/missing.html").status_code == 404
+
+
+def test_editor_writes_and_external_changes_are_served_fresh(preview_client):
+    """Test saves through FileOperations and writes elsewhere both reach the preview."""
+    from api.file_operations import FileOperations
+
+    client, project, cache = preview_client
+    file_ops = FileOperations()
+    assert client.get("/api/v1/preview/demo/index.html").text == PAGE
+
+    assert file_ops.write_file("demo/index.html", PAGE.replace("hello", "edited"))["success"]
+    assert "edited preview" in client.get("/api/v1/preview/demo/index.html").text
+
+    # Not invalidated by anyone: caught by the mtime/size check
+    (project / "index.html").write_text("<html>external</html>")
+    assert client.get("/api/v1/preview/demo/index.html").text == "<html>external</html>"
+
+    assert file_ops.delete_file("demo/index.html")["success"]
+    assert client.get("/api/v1/preview/demo/index.html").status_code == 404
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_byte_budget_evicts_least_recently_used(tmp_path):
+    """Test the cache stays within its byte budget, evicting the LRU entry."""
+    cache = PreviewAssetCache(max_bytes=250)
+    for name in "abc":
+        (tmp_path / f"{name}.txt").write_text(name * 100)
+
+    cache.get(tmp_path / "a.txt")
+    cache.get(tmp_path / "b.txt")
+    cache.get(tmp_path / "a.txt")  # a is now most recently used
+    cache.get(tmp_path / "c.txt")
+
+    stats = cache.get_stats()
+    assert stats["total_bytes"] <= 250
+    assert stats["evictions"] == 1
+    cache.get(tmp_path / "a.txt")
+    assert cache.get_stats()["hits"] == 2  # a survived, b was evicted
+
+
+def test_compressed_variants_and_negotiation(tmp_path):
+    """Test gzip variants decode to the original and encodings honor q-values."""
+    (tmp_path / "app.js").write_text("console.log('x');\n" * 200)
+    asset = PreviewAssetCache().get(tmp_path / "app.js")
+
+    assert gzip.decompress(asset.variants["gzip"]) == asset.body
+    assert asset.media_type == "application/javascript"
+    assert choose_encoding("gzip, br;q=0", {"gzip": b"", "br": b""}) == "gzip"
+    assert choose_encoding("identity", {"gzip": b""}) is None
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches('"abc-br"', '"abc"') and not etag_matches('"abd-br"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_live_preview_revalidates_and_sees_updates():
+    """Test live previews answer 304 until the preview is updated."""
+    from api import live_preview
+
+    app = FastAPI()
+    app.include_router(live_preview.router)
+    client = TestClient(app)
+
+    preview_id = client.post("/api/v1/preview/create", json={"code": PAGE}).json()["preview_id"]
+    try:
+        first = client.get(f"/api/v1/preview/{preview_id}")
+        assert "hello preview" in first.json()["html"]
+        etag = first.headers["etag"]
+        assert client.get(f"/api/v1/preview/{preview_id}", headers={"If-None-Match": etag}).status_code == 304
+
+        client.post(f"/api/v1/preview/{preview_id}/update", json={"code": "<body>v2</body>"})
+        updated = client.get(f"/api/v1/preview/{preview_id}", headers={"If-None-Match": etag})
+        assert updated.status_code == 200
+        assert "v2" in updated.json()["html"]
+    finally:
+        client.delete(f"/api/v1/preview/{preview_id}")
@@ -0,0 +1,79 @@
+"""Tests for the single-pass quality validator."""
+
+from superagent.modules.quality_validator import QualityValidator
+
+
+APP = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>Calculator</title>
+<style>
+* {{ box-sizing: border-box; margin: 0; }}
+.calculator {{ display: grid; grid-template-columns: repeat(4, 1fr); color: {color}; }}
+@media (max-width: 600px) {{ .calculator {{ padding: 4px; }} }}
+</style>
+</head>
+<body>
+<div class="calculator"><input type="text" id="display" aria-label="Display"><button>7</button></div>
+<p>A calculator with keyboard support and operator precedence.</p>
+<script>
+document.addEventListener('DOMContentLoaded', () => {{
+    const display = document.getElementById('display');
+    try {{ display.value = '0'; }} catch (error) {{ display.value = 'Error'; }}
+}});
+</script>
+</body>
+</html>"""
+
+
+def test_complete_app_passes_from_a_single_scan():
+    """Test a well-formed app passes and all sections are found in one tokenization."""
+    validator = QualityValidator()
+    result = validator.validate_complete_app(APP.format(color="red"))
+
+    assert result["passed"] and result["overall_score"] == 100
+    timings = validator.get_rule_timings()["rules"]
+    assert timings["Viewport Meta"]["calls"] >= 1
+    assert timings["DOM Ready Handler"]["calls"] == 1
+
+
+def test_structural_issues_are_reported_once_per_tag():
+    """Test missing elements and unclosed tags are detected on the token stream."""
+    validator = QualityValidator()
+    broken = APP.format(color="red").replace("<title>Calculator</title>", "").replace(
+        '<div class="calculator">', '<div class="calculator"><div>'
+    ).replace('<meta name="viewport" content="width=device-width, initial-scale=1.0">', "")
+
+    names = [issue["name"] for issue in validator.validate_html(broken)["issues"]]
+
+    assert names == ["Viewport Meta", "Title Tag", "Unclosed div tag"]
+
+
+def test_markup_in_scripts_is_not_counted_as_tags():
+    """Test HTML inside script strings does not produce unclosed-tag issues."""
+    validator = QualityValidator()
+    app = APP.format(color="red").replace("display.value = '0';", "display.innerHTML = '<div><span>0';")
+
+    assert validator.validate_html(app)["passed"]
+
+
+def test_unchanged_regions_are_reused():
+    """Test only changed style/script regions are re-validated against a previous version."""
+    validator = QualityValidator()
+    first = APP.format(color="red")
+    second = APP.format(color="blue")
+    validator.validate_complete_app(first)
+
+    result = validator.validate_complete_app(second, previous=first)
+
+    assert result["changed_regions"] == ["html", "css"]
+    assert validator.get_rule_timings()["rules"]["DOM Ready Handler"]["calls"] == 1
+
+    # The comparison is against ``previous`` itself, not against what this
+    # validator happens to have cached
+    fresh = QualityValidator()
+    assert fresh.validate_complete_app(second, previous=first)["changed_regions"] == ["html", "css"]
+    assert fresh.validate_complete_app(second, previous=second)["changed_regions"] == []
+    assert validator.validate_complete_app("<html><body></body></html>")["css"]["issues"][0]["severity"] == "critical"
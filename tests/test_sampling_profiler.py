@@ -0,0 +1,96 @@
+"""Tests for isolated sampling profiling."""
+
+import pytest
+from superagent.modules.performance_profiler import PerformanceProfiler
+from superagent.modules.sampling_profiler import IsolatedRunner, flame_graph, top_functions
+
+HOT_SCRIPT = """
+import time
+
+def spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def main():
+    print("running")
+    spin(0.3)
+
+main()
+"""
+
+
+class FakeLLM:
+    """LLM returning no suggestions."""
+
+    async def generate_structured(self, prompt, schema):
+        return {"suggestions": []}
+
+
+def allocate(megabytes):
+    """Module-level target for memory profiling."""
+    block = bytearray(megabytes * 1024 * 1024)
+    return len(block)
+
+
+async def allocate_async(megabytes):
+    """Coroutine target for memory profiling."""
+    block = bytearray(megabytes * 1024 * 1024)
+    return len(block)
+
+
+def test_top_functions_and_flame_graph_from_collapsed_stacks():
+    """Self samples go to the leaf; cumulative counts each frame once per sample."""
+    stacks = {"main;parse;tokenize": 6, "main;parse": 2, "main;render": 2}
+
+    rows = {row["function"]: row for row in top_functions(stacks, 0.01)}
+    assert rows["main"]["samples"] == 10 and rows["main"]["self_samples"] == 0
+    assert rows["parse"]["samples"] == 8 and rows["parse"]["self_samples"] == 2
+    assert top_functions(stacks, 0.01, by="self")[0]["function"] == "tokenize"
+
+    graph = flame_graph(stacks)
+    assert graph["value"] == 10
+    main = graph["children"][0]
+    assert [(c["name"], c["value"]) for c in main["children"]] == [("parse", 8), ("render", 2)]
+
+
+@pytest.mark.asyncio
+async def test_profile_file_samples_in_child_process(tmp_path):
+    """The script runs in a child process and its hot function dominates the samples."""
+    script = tmp_path / "hot.py"
+    script.write_text(HOT_SCRIPT)
+    profiler = PerformanceProfiler(FakeLLM(), runner=IsolatedRunner(timeout=20))
+
+    result = await profiler.profile_file(script)
+
+    assert result["mode"] == "sampling" and result["error"] is None
+    assert result["output"] == "running\n"
+    assert result["stats"]["samples"] > 5
+    hottest = result["stats"]["top_self"][0]
+    assert hottest["function"].startswith("spin (hot.py:")
+    assert hottest["self_percent"] > 50
+    assert any(line.startswith("<module> (hot.py:1);main (hot.py:9);spin") for line in result["collapsed"])
+    assert result["flame_graph"]["value"] == result["stats"]["samples"]
+
+
+@pytest.mark.asyncio
+async def test_limits_contain_runaway_and_memory_hungry_code():
+    """Timeouts kill the child; memory limits surface as errors; the caller survives."""
+    profiler = PerformanceProfiler(FakeLLM(), runner=IsolatedRunner(timeout=1, memory_mb=512))
+
+    runaway = await profiler.benchmark_code("while True: pass", iterations=1)
+    assert runaway["iterations"] == 0 and "Timed out" in runaway["error"]
+
+    small = await profiler.memory_profile(allocate, 8, timeout=20)
+    assert small["error"] is None and small["result"] == str(8 * 1024 * 1024)
+    assert small["peak_memory_mb"] >= 8
+
+    awaited = await profiler.memory_profile(allocate_async, 8, timeout=20)
+    assert awaited["error"] is None and awaited["result"] == str(8 * 1024 * 1024)
+    assert awaited["peak_memory_mb"] >= 8
+
+    huge = await profiler.memory_profile(allocate, 2048, timeout=20)
+    assert huge["error"].startswith("MemoryError")
+
+    bench = await profiler.benchmark_code("sum(range(100))", iterations=20, timeout=20)
+    assert bench["iterations"] == 20 and bench["min_time"] <= bench["median_time"] <= bench["max_time"]
@@ -0,0 +1,127 @@
+"""Tests for the warm sandbox worker pool."""
+
+import pytest
+from api.sandbox_pool import SandboxWorkerPool
+
+
+pytestmark = pytest.mark.skipif(
+    not SandboxWorkerPool().is_available(),
+    reason="Warm sandbox pool requires a POSIX host"
+)
+
+
+@pytest.fixture
+async def pool():
+    """Create a small warm pool."""
+    pool = SandboxWorkerPool(size=2, max_runs_per_worker=2)
+    await pool.start()
+    yield pool
+    await pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_execute_reports_measurements(pool):
+    """Test execution returns output and real resource measurements."""
+    result = await pool.execute("print('hello from the pool')")
+
+    assert result["status"] == "success"
+    assert result["output"] == "hello from the pool\n"
+    assert result["sandbox"] == "warm_pool"
+    assert result["sandboxed"] is False and result["isolation"] == "rlimits"
+    assert 0 < result["execution_time"] < 5
+    assert result["cpu_time"] >= 0
+    assert result["peak_memory_kb"] > 0
+
+
+@pytest.mark.asyncio
+async def test_runs_are_isolated(pool):
+    """Test each run gets a fresh temp dir and namespace."""
+    await pool.execute("open('leftover.txt', 'w').write('x')\nSTATE = 1")
+    result = await pool.execute("import os\nprint(os.listdir('.'))\nprint('STATE' in globals())")
+
+    assert "leftover.txt" not in result["output"]
+    assert result["output"].strip().endswith("False")
+
+
+@pytest.mark.asyncio
+async def test_worker_environment_has_no_server_secrets(monkeypatch):
+    """Test user code cannot read server secrets from its worker's environment."""
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-server-secret")
+    pool = SandboxWorkerPool(size=1)
+    try:
+        result = await pool.execute(
+            "import os\nprint(open(f'/proc/{os.getppid()}/environ', 'rb').read())\nprint(dict(os.environ))"
+        )
+    finally:
+        await pool.shutdown()
+
+    assert result["status"] == "success"
+    assert "sk-server-secret" not in result["output"]
+
+
+@pytest.mark.asyncio
+async def test_docker_is_preferred_when_available(monkeypatch):
+    """Test the pool is only the no-Docker fallback unless explicitly chosen."""
+    from api.docker_sandbox import DockerSandbox
+    from api.sandbox_pool import sandbox_pool
+
+    sandbox = DockerSandbox()
+    sandbox._docker_available = True
+    calls = []
+    monkeypatch.setattr(sandbox, "create_sandbox", lambda *args: calls.append(args) or {"success": True})
+    monkeypatch.delenv("SANDBOX_ISOLATION", raising=False)
+
+    await sandbox.execute("python", "print(1)")
+    assert len(calls) == 1
+
+    monkeypatch.setenv("SANDBOX_ISOLATION", "pool")
+    try:
+        result = await sandbox.execute("python", "print(1)")
+    finally:
+        await sandbox_pool.shutdown()
+    assert len(calls) == 1
+    assert result["sandboxed"] is False and result["isolation"] == "rlimits"
+
+
+@pytest.mark.asyncio
+async def test_timeout_is_enforced(pool):
+    """Test runaway code is killed at the timeout."""
+    result = await pool.execute("while True:\n    pass", timeout=1)
+
+    assert result["status"] == "timeout"
+    assert result["execution_time"] < 3
+
+
+@pytest.mark.asyncio
+async def test_memory_limit_is_enforced():
+    """Test allocations beyond the memory rlimit fail inside the sandbox."""
+    pool = SandboxWorkerPool(size=1, memory_mb=128)
+    try:
+        result = await pool.execute("data = bytearray(512 * 1024 * 1024)")
+    finally:
+        await pool.shutdown()
+
+    assert result["status"] == "error"
+    assert "MemoryError" in result["stderr"]
+
+
+@pytest.mark.asyncio
+async def test_workers_recycled_after_max_runs(pool):
+    """Test workers are replaced after max_runs_per_worker executions."""
+    for _ in range(4):
+        result = await pool.execute("print(1)")
+        assert result["status"] == "success"
+
+    stats = pool.get_stats()
+    assert stats["executions"] == 4
+    assert stats["recycled"] == 2
+    assert stats["workers"] == 2
+
+
+@pytest.mark.asyncio
+async def test_unsupported_language(pool):
+    """Test non-Python languages are rejected by the pool."""
+    result = await pool.execute("console.log(1)", language="javascript")
+
+    assert result["status"] == "error"
+    assert "not supported" in result["error"]
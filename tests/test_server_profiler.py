@@ -0,0 +1,123 @@
+"""Tests for the always-on server sampling profiler."""
+
+import asyncio
+import threading
+import time
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from api.server_profiler import ProfilerMiddleware, ServerProfiler
+
+
+def burn(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(100))
+
+
+def make_app(profiler):
+    app = FastAPI()
+    app.add_middleware(ProfilerMiddleware, profiler=profiler)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        burn(0.15)
+        return {"id": item_id}
+
+    @app.get("/sync/{item_id}")
+    def get_sync(item_id: int):
+        burn(0.15)
+        return {"id": item_id}
+
+    @app.get("/offloaded")
+    async def get_offloaded():
+        await asyncio.to_thread(burn, 0.15)
+        return {}
+
+    return app
+
+
+def test_samples_are_attributed_to_route_templates():
+    """Busy async handlers show up under their route, not the concrete URL."""
+    profiler = ServerProfiler(hz=200)
+    client = TestClient(make_app(profiler))
+    profiler.start()
+    try:
+        for item_id in range(3):
+            assert client.get(f"/items/{item_id}").status_code == 200
+    finally:
+        profiler.stop()
+
+    report = profiler.report(top=5)
+    assert report["endpoints"][0]["endpoint"] == "GET /items/{item_id}"
+    assert report["endpoints"][0]["percent"] > 80
+    assert report["top_self"][0]["function"].startswith("burn (test_server_profiler.py:")
+
+    only_items = profiler.report(endpoint="GET /items/{item_id}")
+    assert only_items["samples"] == report["endpoints"][0]["samples"]
+    collapsed = profiler.collapsed("GET /items/{item_id}")
+    assert collapsed and all(line.startswith("GET /items/{item_id};") for line in collapsed)
+
+
+def test_threadpool_work_is_attributed_to_its_route():
+    """Sync routes and asyncio.to_thread work are reported under their route."""
+    profiler = ServerProfiler(hz=200)
+    client = TestClient(make_app(profiler))
+    original_to_thread = asyncio.to_thread
+    profiler.start()
+    try:
+        for item_id in range(2):
+            assert client.get(f"/sync/{item_id}").status_code == 200
+            assert client.get("/offloaded").status_code == 200
+    finally:
+        profiler.stop()
+
+    endpoints = {row["endpoint"]: row["samples"] for row in profiler.report()["endpoints"]}
+    assert endpoints["GET /sync/{item_id}"] > 20
+    assert endpoints["GET /offloaded"] > 20
+    # Worker threads may be caught in their runner's own bookkeeping between
+    # jobs, but none of the route's work is left unattributed
+    for name in endpoints:
+        if name.startswith("<thread"):
+            assert not any("burn (test_server_profiler.py:" in line for line in profiler.collapsed(name))
+    assert profiler._thread_scopes == {}
+    assert asyncio.to_thread is original_to_thread
+
+
+def test_idle_threads_are_excluded_and_window_rolls():
+    """Threads blocked on waits do not appear as hot; old buckets age out."""
+    profiler = ServerProfiler(hz=100, window=60, bucket_seconds=1)
+    stop = threading.Event()
+    waiter = threading.Thread(target=stop.wait, name="parked")
+    worker = threading.Thread(target=burn, args=(0.2,), name="busy")
+    waiter.start()
+    worker.start()
+    for _ in range(10):
+        profiler.sample_once()
+        time.sleep(0.01)
+    worker.join()
+    stop.set()
+    waiter.join()
+
+    endpoints = {row["endpoint"] for row in profiler.report()["endpoints"]}
+    assert "<thread busy>" in endpoints and "<thread parked>" not in endpoints
+    assert profiler.idle_samples >= 10
+
+    # Shift every bucket outside the window
+    profiler._buckets = type(profiler._buckets)(
+        [(started - 120, counts) for started, counts in profiler._buckets], maxlen=profiler._buckets.maxlen
+    )
+    assert profiler.report()["samples"] == 0
+
+
+def test_default_settings_stay_under_two_percent_overhead():
+    """At the default rate the sampler's own CPU time is a small fraction of wall time."""
+    profiler = ServerProfiler()
+    profiler.start()
+    try:
+        burn(1.0)
+    finally:
+        profiler.stop()
+
+    assert profiler.hz == 50
+    assert profiler.report()["samples"] > 20
+    assert profiler.overhead_percent() < 2
@@ -0,0 +1,85 @@
+"""Tests for single-flight request coalescing."""
+
+import asyncio
+import pytest
+from superagent.core.llm import LLMProvider
+from superagent.core.single_flight import SingleFlight
+from api.multi_provider_ai import AIProvider, MultiProviderAI
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_llm_calls_share_one_request(monkeypatch):
+    """Test identical in-flight generate calls hit the provider once."""
+    llm = LLMProvider("test_key")
+    calls = []
+
+    async def fake_generate(prompt, system, temperature, max_tokens):
+        calls.append((prompt, system, temperature))
+        await asyncio.sleep(0.05)
+        return f"answer to {prompt}"
+
+    monkeypatch.setattr(llm, "_generate", fake_generate)
+
+    results = await asyncio.gather(
+        *[llm.generate("hello") for _ in range(5)],
+        llm.generate("hello", system="be brief"),
+        llm.generate("hello", temperature=0.1),
+    )
+
+    assert results[:5] == ["answer to hello"] * 5
+    assert len(calls) == 3
+    stats = llm.get_stats()["single_flight"]
+    assert stats["collapsed"] == 4 and stats["executed"] == 3 and stats["in_flight"] == 0
+
+    # Once settled, the next call goes to the provider again
+    await llm.generate("hello")
+    assert len(calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_cancellation_is_isolated():
+    """Test waiters share failures and one cancelled caller does not cancel the rest."""
+    flight = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.02)
+        raise RuntimeError("provider down")
+
+    results = await asyncio.gather(*[flight.do("k", failing) for _ in range(3)], return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    first = asyncio.create_task(flight.do("s", slow))
+    second = asyncio.create_task(flight.do("s", slow))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert await second == "ok"
+    assert flight.get_stats()["executed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_multi_provider_generate_coalesces_per_provider(monkeypatch):
+    """Test MultiProviderAI collapses identical prompts and returns independent copies."""
+    ai = MultiProviderAI()
+    calls = []
+
+    async def fake_generate(prompt, provider):
+        calls.append(provider)
+        await asyncio.sleep(0.02)
+        return {"success": True, "text": prompt, "provider": provider.value}
+
+    monkeypatch.setattr(ai, "_generate", fake_generate)
+
+    results = await asyncio.gather(
+        ai.generate("todo app", AIProvider.GROQ),
+        ai.generate("todo app", AIProvider.GROQ),
+        ai.generate("todo app", AIProvider.CLAUDE),
+    )
+
+    assert calls == [AIProvider.GROQ, AIProvider.CLAUDE]
+    results[0]["text"] = "changed"
+    assert results[1]["text"] == "todo app"
+    assert ai.get_stats()["single_flight"]["collapsed"] == 1
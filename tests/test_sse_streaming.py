@@ -0,0 +1,103 @@
+"""Tests for SSE token coalescing and stream statistics."""
+
+import asyncio
+import json
+import time
+import pytest
+from api.sse_streaming import StreamStats, coalesce
+
+
+async def tokens(items):
+    """Yield (delay, text) pairs like a provider stream."""
+    for delay, text in items:
+        await asyncio.sleep(delay)
+        yield text
+
+
+async def collect(source, **kwargs):
+    out = []
+    async for text in coalesce(source, **kwargs):
+        out.append((time.perf_counter(), text))
+    return out
+
+
+@pytest.mark.asyncio
+async def test_first_chunk_is_forwarded_immediately_and_rest_coalesced():
+    """Test TTFB is not delayed and bursts of tiny tokens are merged."""
+    stats = StreamStats("test")
+    out = await collect(tokens([(0, "Hello")] + [(0, " w")] * 20), interval=0.05, stats=stats)
+
+    texts = [text for _, text in out]
+    assert texts[0] == "Hello"
+    assert "".join(texts) == "Hello" + " w" * 20
+    assert len(texts) == 2
+    assert stats.chunks == 2
+    assert stats.bytes == len("Hello" + " w" * 20)
+
+
+@pytest.mark.asyncio
+async def test_size_window_flushes_without_waiting():
+    """Test the buffer is flushed as soon as it reaches max_bytes."""
+    out = await collect(tokens([(0, "x" * 10) for _ in range(7)]), interval=10, max_bytes=30)
+
+    assert [len(text) for _, text in out] == [10, 30, 30]
+
+
+@pytest.mark.asyncio
+async def test_time_window_flushes_while_provider_is_silent():
+    """Test buffered text is sent after the interval even if no new token arrives."""
+    start = time.perf_counter()
+    out = await collect(tokens([(0, "a"), (0, "b"), (0.3, "c")]), interval=0.03)
+
+    assert [text for _, text in out] == ["a", "b", "c"]
+    assert out[1][0] - start < 0.2  # "b" did not wait for "c"
+
+
+@pytest.mark.asyncio
+async def test_source_is_closed_when_consumer_stops_early():
+    """Test the provider stream is closed when the client disconnects mid-stream."""
+    closed = []
+
+    async def source():
+        try:
+            yield "first"
+            await asyncio.sleep(10)
+            yield "never"
+        finally:
+            closed.append(True)
+
+    stream = coalesce(source(), interval=0.01)
+    assert await stream.__anext__() == "first"
+    await asyncio.sleep(0.01)  # source is now blocked mid-iteration
+    await stream.aclose()
+
+    assert closed == [True]
+
+
+def test_stream_stats_reports_ttfb_and_gaps():
+    """Test stats expose time-to-first-byte and inter-chunk gap percentiles."""
+    stats = StreamStats("test")
+    stats.record("a")
+    time.sleep(0.02)
+    stats.record("bc")
+
+    report = stats.to_dict()
+    assert report["ttfb_ms"] is not None
+    assert report["chunks"] == 2 and report["bytes"] == 3
+    assert report["gap_max_ms"] >= 15
+    assert json.dumps(report)
+
+
+@pytest.mark.asyncio
+async def test_log_messages_are_sent_without_artificial_delay():
+    """Test a long log line is emitted as one delta plus completion, instantly."""
+    from api.streaming_realtime_build import stream_log_message
+
+    message = " ".join(["word"] * 500)
+    start = time.perf_counter()
+    events = [json.loads(chunk[6:]) async for chunk in stream_log_message(message, "📝")]
+
+    assert time.perf_counter() - start < 0.1
+    assert events[0]["delta"] == message
+    assert events[1]["complete"] is True
+    assert events[0]["id"] == events[1]["id"]
@@ -0,0 +1,308 @@
+"""Tests for the build stage graph engine."""
+
+import asyncio
+import pytest
+from superagent.core.stage_graph import Stage, StageGraph, StageGraphError
+
+
+def make_stage(name, log, outputs=(), inputs=(), delay=0.0, fail=False, **kwargs):
+    """Create a stage that records start/end and produces its outputs."""
+    async def run(received):
+        log.append(("start", name))
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError(f"{name} broke")
+        log.append(("end", name))
+        return {output: f"{name}:{output}" for output in outputs}
+    return Stage(name, run, inputs=tuple(inputs), outputs=tuple(outputs), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_independent_stages_run_concurrently():
+    """Test stages sharing only an upstream input overlap in time."""
+    log = []
+    graph = StageGraph([
+        make_stage("files", log, outputs=["project_dir"]),
+        make_stage("scan", log, inputs=["project_dir"], outputs=["issues"], delay=0.05),
+        make_stage("deps", log, inputs=["project_dir"], outputs=["installed"], delay=0.05),
+    ])
+
+    artifacts = await graph.run()
+
+    assert log.index(("start", "deps")) < log.index(("end", "scan"))
+    assert log.index(("start", "scan")) < log.index(("end", "deps"))
+    assert artifacts["issues"] == "scan:issues"
+
+
+@pytest.mark.asyncio
+async def test_optional_timeout_does_not_fail_build():
+    """Test a slow optional stage times out while the rest completes."""
+    log, events = [], []
+    graph = StageGraph([
+        make_stage("files", log, outputs=["project_dir"]),
+        make_stage("scan", log, inputs=["project_dir"], outputs=["issues"], delay=5, timeout=0.05, optional=True),
+        make_stage("report", log, inputs=["issues"], outputs=["report"]),
+        make_stage("outputs", log, inputs=["project_dir"], outputs=["docker"]),
+    ], on_event=lambda event: events.append((event["type"], event["stage"])))
+
+    artifacts = await graph.run()
+
+    assert "docker" in artifacts
+    assert graph.outcomes["scan"].status == "timeout"
+    assert graph.outcomes["report"].status == "skipped"
+    assert ("stage_timeout", "scan") in events
+
+
+@pytest.mark.asyncio
+async def test_required_failure_cancels_running_stages():
+    """Test a failing required stage cancels siblings and re-raises."""
+    log = []
+    graph = StageGraph([
+        make_stage("files", log, outputs=["project_dir"]),
+        make_stage("e2e", log, inputs=["project_dir"], outputs=["e2e"], delay=0.01, fail=True),
+        make_stage("tests", log, inputs=["project_dir"], outputs=["passed"], delay=5, optional=True),
+        make_stage("final", log, after=("e2e", "tests")),
+    ])
+
+    with pytest.raises(RuntimeError, match="e2e broke"):
+        await graph.run()
+
+    assert graph.outcomes["tests"].status == "cancelled"
+    assert graph.outcomes["final"].status == "skipped"
+
+
+@pytest.mark.asyncio
+async def test_cancel_stops_graph():
+    """Test cancel() stops running stages."""
+    log = []
+    graph = StageGraph([make_stage("slow", log, outputs=["x"], delay=5)])
+    task = asyncio.create_task(graph.run())
+    await asyncio.sleep(0.01)
+
+    graph.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert graph.outcomes["slow"].status == "cancelled"
+
+
+@pytest.mark.asyncio
+async def test_missing_output_is_a_stage_failure():
+    """Test a stage that does not return its declared outputs fails."""
+    async def run(inputs):
+        return {}
+
+    graph = StageGraph([Stage("broken", run, outputs=("x",))])
+
+    with pytest.raises(StageGraphError):
+        await graph.run()
+
+
+def test_invalid_graphs_rejected():
+    """Test unknown inputs and cycles are rejected before running."""
+    log = []
+    with pytest.raises(StageGraphError):
+        StageGraph([make_stage("a", log, inputs=["nothing"])]).dependencies()
+    with pytest.raises(StageGraphError):
+        StageGraph([
+            make_stage("a", log, inputs=["b_out"], outputs=["a_out"]),
+            make_stage("b", log, inputs=["a_out"], outputs=["b_out"]),
+        ]).dependencies()
+
+
+class FakeRollback:
+    """Rollback system stub."""
+
+    def __init__(self):
+        self.count = 0
+
+    def create_checkpoint(self, description):
+        self.count += 1
+        return {"checkpoint_id": f"cp{self.count}"}
+
+
+@pytest.mark.asyncio
+async def test_enterprise_build_delivers_preview_before_slow_scan(monkeypatch):
+    """Test the preview URL is reported while a slow optional scan times out."""
+    from api.enterprise_builder import EnterpriseBuildSystem
+
+    builder = EnterpriseBuildSystem(None, FakeRollback(), None, None)
+    monkeypatch.setattr(builder, "STAGE_TIMEOUTS", {**builder.STAGE_TIMEOUTS, "security_scan": 0.1})
+
+    def stage(**result):
+        async def run(*args, **kwargs):
+            return {"success": True, **result}
+        return run
+
+    async def slow_scan(files):
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(builder, "_stage_architecture_planning", stage(architecture={"type": "generic"}))
+    monkeypatch.setattr(builder, "_stage_code_generation", stage(files=[{"name": "main.py"}]))
+    monkeypatch.setattr(builder, "_stage_create_files", stage(project_dir="/tmp/p", preview_url="/preview/p"))
+    monkeypatch.setattr(builder, "_stage_install_dependencies", stage(installed=["flask"]))
+    monkeypatch.setattr(builder, "_stage_run_tests", stage(tests_passed=3))
+    monkeypatch.setattr(builder, "_stage_security_scan", slow_scan)
+    monkeypatch.setattr(builder, "_stage_code_verification", stage(score=95))
+    monkeypatch.setattr(builder, "_stage_production_outputs", stage(files=["Dockerfile"]))
+
+    updates, previews = [], []
+
+    async def progress(message, percent):
+        updates.append((message, percent))
+
+    async def preview(url):
+        previews.append((url, len(updates)))
+
+    result = await builder.enterprise_build(
+        "cli tool that renames files", "python",
+        progress_callback=progress, preview_callback=preview
+    )
+
+    assert result["success"] is True
+    assert result["preview_url"] == "/preview/p"
+    assert previews and previews[0][0] == "/preview/p"
+    assert result["degraded_stages"] == ["security_scan"]
+    assert result["stage_timings"]["security_scan"]["status"] == "timeout"
+    assert result["checkpoint_before"] == "cp1" and result["checkpoint_after"] == "cp2"
+    assert result["tests_passed"] == 3
+    assert updates[-1][1] == 100
+
+
+@pytest.mark.asyncio
+async def test_enterprise_build_gates_and_revokes_preview(monkeypatch):
+    """Test the preview waits for the E2E gate and is revoked if the build fails later."""
+    from api.enterprise_builder import EnterpriseBuildSystem
+
+    builder = EnterpriseBuildSystem(None, FakeRollback(), None, None)
+    log = []
+
+    def stage(name, **result):
+        async def run(*args, **kwargs):
+            log.append(("start", name))
+            await asyncio.sleep(0.01)
+            log.append(("end", name))
+            return {"success": True, **result}
+        return run
+
+    monkeypatch.setattr(builder, "_stage_architecture_planning", stage("plan", architecture={"type": "generic"}))
+    monkeypatch.setattr(builder, "_stage_code_generation", stage("code", files=[{"name": "index.html"}]))
+    monkeypatch.setattr(builder, "_stage_create_files", stage("files", project_dir="/tmp/p", preview_url="/preview/p"))
+    monkeypatch.setattr(builder, "_stage_install_dependencies", stage("deps", installed=[]))
+    monkeypatch.setattr(builder, "_stage_run_tests", stage("tests", tests_passed=1))
+    monkeypatch.setattr(builder, "_stage_security_scan", stage("scan", issues=[]))
+    monkeypatch.setattr(builder, "_stage_code_verification", stage("verify", score=90))
+    monkeypatch.setattr(builder, "_stage_production_outputs", stage("production", files=[]))
+    monkeypatch.setattr(builder, "_stage_e2e_verification",
+                        stage("e2e", critical_issues=["button does nothing"], passed=0, total=1))
+
+    previews = []
+
+    async def preview(url):
+        previews.append(url)
+
+    failed = await builder.enterprise_build("a calculator", "html", preview_callback=preview)
+    assert failed["success"] is False
+    assert previews == [] and "preview_url" not in failed
+
+    # Gate passes, but the final checkpoint fails after the preview went out
+    monkeypatch.setattr(builder, "_stage_e2e_verification", stage("e2e", passed=1, total=1, coverage_percent=100))
+    checkpoints = iter([{"checkpoint_id": "cp1"}, {"success": False, "error": "disk full"}])
+
+    async def checkpoint(description):
+        return next(checkpoints)
+
+    monkeypatch.setattr(builder, "_stage_create_checkpoint", checkpoint)
+    log.clear()
+    result = await builder.enterprise_build("a calculator", "html", preview_callback=preview)
+
+    assert result["success"] is False
+    assert previews == ["/preview/p", None]
+    # Production files are only written once nothing is testing or serving the project
+    assert log.index(("start", "production")) > max(log.index(("end", "e2e")), log.index(("end", "tests")))
+
+
+@pytest.mark.asyncio
+async def test_critical_path_follows_the_slowest_chain():
+    """Test the critical path walks back through the last-finishing dependency."""
+    log = []
+    graph = StageGraph([
+        make_stage("plan", log, outputs=["plan"], delay=0.01),
+        make_stage("fast", log, inputs=["plan"], outputs=["a"], delay=0.01),
+        make_stage("slow", log, inputs=["plan"], outputs=["b"], delay=0.08),
+        make_stage("merge", log, inputs=["a", "b"], outputs=["out"]),
+    ])
+
+    await graph.run()
+    path = graph.critical_path()
+
+    assert path["stages"] == ["plan", "slow", "merge"]
+    assert 0.08 <= path["seconds"] < 0.3
+
+
+@pytest.mark.asyncio
+async def test_enterprise_generator_overlaps_css_and_js_with_html():
+    """Test CSS/JS generation does not wait for the HTML draft or its refinement."""
+    from superagent.benchmarks.fake_llm import FakeLLMProvider, NullCache
+    from superagent.modules.code_generator_enhanced import EnterpriseCodeGenerator
+
+    generator = EnterpriseCodeGenerator(FakeLLMProvider(), NullCache())
+    log = []
+
+    def slow(name, value):
+        async def run(*args, **kwargs):
+            log.append(("start", name))
+            await asyncio.sleep(0.05)
+            log.append(("end", name))
+            return value
+        return run
+
+    generator._generate_enterprise_html = slow("html", "<!DOCTYPE html><html><head></head><body></body></html>")
+    generator._generate_enterprise_css = slow("css", "body { display: flex; }")
+    generator._generate_enterprise_javascript = slow("js", "document.addEventListener('DOMContentLoaded', f)")
+
+    result = await generator.generate_enterprise_web_app("A calculator", "calc")
+
+    assert {event for event in log[:3]} == {("start", "html"), ("start", "css"), ("start", "js")}
+    assert result["files"]["calc.css"] == "body { display: flex; }"
+    assert result["critical_path"]["stages"][0] == "analyze_requirements"
+    assert result["critical_path"]["stages"][-1] == "quality_check"
+    assert result["stage_timings"]["refine_html"]["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_multi_tier_builder_runs_generators_concurrently(monkeypatch):
+    """Test independent multi-tier generators overlap and planning errors short-circuit."""
+    from api import multi_tier_builder as module
+
+    builder = module.MultiTierBuilder()
+    active, peak = [0], [0]
+
+    def gen(value):
+        async def run(*args, **kwargs):
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(0.03)
+            active[0] -= 1
+            return value
+        return run
+
+    analysis = {"app_type": "crm", "key_features": ["contacts"], "data_requirements": {"primary_data": ["Contact"]}}
+    monkeypatch.setattr(module.architecture_planner, "plan_complete_architecture",
+                        gen({"architecture": {"tiers": 3}, "analysis": analysis}))
+    monkeypatch.setattr(module.schema_designer, "design_complete_schema", gen({"schema": {"tables": 1}}))
+    monkeypatch.setattr(module.api_generator, "generate_complete_api", gen({"spec": {"paths": 5}}))
+    for name in ("generate_frontend_code", "generate_backend_code", "generate_docker_compose",
+                 "generate_dockerfile_backend", "generate_dockerfile_frontend", "generate_github_actions_ci_cd"):
+        monkeypatch.setattr(builder, name, gen(name))
+
+    result = await builder.build_complete_application("A CRM")
+
+    assert result["success"] is True
+    assert result["files_to_create"]["frontend"]["App.tsx"] == "generate_frontend_code"
+    assert result["schema"] == {"tables": 1}
+    assert peak[0] >= 5
+    assert result["critical_path"]["stages"][0] == "architecture"
+
+    monkeypatch.setattr(module.schema_designer, "design_complete_schema", gen({"error": "bad schema"}))
+    assert await builder.build_complete_application("A CRM") == {"error": "bad schema"}
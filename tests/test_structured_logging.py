@@ -0,0 +1,113 @@
+"""Tests for the queue-backed structured logger."""
+
+import json
+import threading
+import time
+import uuid
+import pytest
+from api.structured_logging import EventThrottle, RotatingLogWriter, StructuredLogger
+
+
+@pytest.fixture
+def make_logger(tmp_path):
+    """Create isolated loggers writing to tmp_path."""
+    created = []
+
+    def make(**kwargs):
+        logger = StructuredLogger(f"test-{uuid.uuid4().hex}", log_dir=str(tmp_path), console=False, **kwargs)
+        created.append(logger)
+        return logger
+
+    yield make
+    for logger in created:
+        logger.close()
+
+
+def read_records(tmp_path):
+    return [json.loads(line) for line in (tmp_path / "superagent.log").read_text().splitlines()]
+
+
+def test_records_are_written_in_batches_off_thread(make_logger, tmp_path):
+    """Test logging returns immediately and the writer batches JSON lines."""
+    logger = make_logger()
+    for i in range(50):
+        logger.info("Build step", step=i)
+    logger.flush()
+
+    records = read_records(tmp_path)
+    assert [r["step"] for r in records] == list(range(50))
+    assert records[0]["message"] == "Build step"
+    stats = logger.get_stats()
+    assert stats["written"] == 50 and stats["dropped"] == 0
+    assert stats["batches"] < 50
+
+
+def test_noisy_events_are_sampled_and_rate_limited(make_logger, tmp_path):
+    """Test per-event sampling and rate limits; warnings are never throttled."""
+    logger = make_logger()
+    logger.set_sampling("cache_hit", 0.1)
+    logger.set_rate_limit("websocket_message", 5)
+
+    for _ in range(100):
+        logger.info("Cache hit", event="cache_hit")
+        logger.info("WebSocket message", event="websocket_message")
+        logger.warning("Cache hit", event="cache_hit")
+    logger.flush()
+
+    records = read_records(tmp_path)
+    infos = [r for r in records if r["level"] == "INFO"]
+    assert sum(r["event"] == "cache_hit" for r in infos) == 10
+    assert sum(r["event"] == "websocket_message" for r in infos) == 5
+    assert sum(r["level"] == "WARNING" for r in records) == 100
+    assert logger.get_stats()["sampled_out"] == 90
+    assert logger.get_stats()["rate_limited"] == 95
+
+
+def test_overload_drops_and_counts_records(make_logger, monkeypatch):
+    """Test a full queue drops records instead of blocking the caller."""
+    monkeypatch.setenv("LOG_QUEUE_SIZE", "5")
+    logger = make_logger()
+    writing = threading.Event()
+    gate = threading.Event()
+    original = logger.handler._write
+    logger.handler._write = lambda records: (writing.set(), gate.wait(), original(records))
+
+    # Park the writer thread inside a write so the queue cannot drain
+    logger.info("first")
+    assert writing.wait(timeout=5)
+
+    start = time.perf_counter()
+    for i in range(200):
+        logger.info("flood", i=i)
+    assert time.perf_counter() - start < 1.0
+
+    gate.set()
+    logger.flush()
+    stats = logger.get_stats()
+    assert stats["dropped"] == 195
+    assert stats["written"] == 6
+
+
+def test_writer_rotates_by_size_and_age(tmp_path):
+    """Test rotation keeps a bounded number of backups."""
+    writer = RotatingLogWriter(str(tmp_path / "app.log"), max_bytes=100, max_age=0, backup_count=2)
+    for i in range(10):
+        writer.write(["x" * 60])
+    assert writer.rotations == 9
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["app.log", "app.log.1", "app.log.2"]
+
+    aged = RotatingLogWriter(str(tmp_path / "aged.log"), max_bytes=0, max_age=0.01, backup_count=1)
+    aged.write(["first"])
+    time.sleep(0.02)
+    aged.write(["second"])
+    assert (tmp_path / "aged.log").read_text() == "second\n"
+    assert (tmp_path / "aged.log.1").read_text() == "first\n"
+    writer.close()
+    aged.close()
+
+
+def test_throttle_passes_unconfigured_events():
+    """Test events without settings are always allowed."""
+    throttle = EventThrottle(sampling={"noisy": 0})
+    assert all(throttle.allow("build") for _ in range(10))
+    assert not throttle.allow("noisy")
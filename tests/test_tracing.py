@@ -0,0 +1,138 @@
+"""Tests for build and LLM call tracing."""
+
+import asyncio
+import pytest
+from superagent.core.tracing import Tracer, percentile
+
+
+@pytest.fixture
+def tracer(tmp_path):
+    """Create a tracer persisting to a temporary database."""
+    return Tracer(db_path=str(tmp_path / "traces.db"))
+
+
+def test_nested_spans_share_trace_and_inherit_stage(tracer):
+    """Test child spans link to their parent and inherit the stage."""
+    with tracer.span("build", kind="build") as root:
+        with tracer.span("code_generation", kind="stage") as stage:
+            with tracer.span("llm.generate", kind="llm") as llm:
+                tracer.record_llm_usage(llm, prompt_tokens=100, output_tokens=50)
+
+    assert stage.parent_id == root.span_id
+    assert llm.parent_id == stage.span_id
+    assert llm.trace_id == root.trace_id
+    assert llm.stage == "code_generation"
+    assert [s["name"] for s in tracer.get_trace(root.trace_id)] == ["build", "code_generation", "llm.generate"]
+
+
+@pytest.mark.asyncio
+async def test_traced_marks_failed_results(tracer):
+    """Test stage results with success False mark the span as failed."""
+    @tracer.traced("security_scan", kind="stage")
+    async def stage():
+        return {"success": False, "error": "boom"}
+
+    await stage()
+
+    span = tracer.buffer[-1]
+    assert span["status"] == "error"
+    assert span["attributes"]["error.message"] == "boom"
+
+
+@pytest.mark.asyncio
+async def test_context_propagates_across_tasks(tracer):
+    """Test spans started in gathered tasks attach to the caller's span."""
+    async def call(i):
+        with tracer.span(f"llm-{i}", kind="llm"):
+            await asyncio.sleep(0)
+
+    with tracer.span("build", kind="build") as root:
+        await asyncio.gather(call(1), call(2))
+
+    children = [s for s in tracer.get_trace(root.trace_id) if s["kind"] == "llm"]
+    assert len(children) == 2
+    assert all(s["parent_id"] == root.span_id for s in children)
+
+
+@pytest.mark.asyncio
+async def test_stream_span_does_not_adopt_consumer_spans(tracer, monkeypatch):
+    """Test spans opened between streamed chunks stay siblings of the stream span."""
+    from superagent.core import llm as llm_module
+
+    class FakeStream:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        @property
+        async def text_stream(self):
+            for text in ("a", "b"):
+                yield text
+
+        async def get_final_message(self):
+            usage = type("Usage", (), {"input_tokens": 3, "output_tokens": 2})
+            return type("Message", (), {"usage": usage})
+
+    llm = llm_module.LLMProvider("test_key")
+    monkeypatch.setattr(llm.client.messages, "stream", lambda **kwargs: FakeStream())
+    monkeypatch.setattr(llm_module, "tracer", tracer)
+
+    with tracer.span("build", kind="build") as root:
+        async for _ in llm.stream_generate("hi"):
+            with tracer.span("consume"):
+                pass
+        # Abandoning a stream early still closes its span cleanly
+        stream = llm.stream_generate("hi")
+        await stream.__anext__()
+        await stream.aclose()
+        assert tracer.current_span() is root
+
+    spans = tracer.get_trace(root.trace_id)
+    assert all(s["parent_id"] == root.span_id for s in spans if s["name"] != "build")
+    streams = [s for s in spans if s["name"] == "llm.stream"]
+    assert len(streams) == 2 and all(s["status"] == "ok" for s in streams)
+    assert streams[0]["attributes"]["llm.output_tokens"] == 2
+
+
+def test_otlp_export_format(tracer):
+    """Test OTLP/JSON export uses resourceSpans with typed attributes."""
+    with tracer.span("llm.generate", kind="llm", **{"llm.provider": "groq"}) as span:
+        tracer.record_llm_usage(span, prompt_tokens=10, output_tokens=5, cache_hit=False)
+
+    export = tracer.export_otlp(tracer.get_trace(span.trace_id))
+    otel_span = export["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    attributes = {a["key"]: a["value"] for a in otel_span["attributes"]}
+
+    assert otel_span["traceId"] == span.trace_id
+    assert attributes["llm.prompt_tokens"] == {"intValue": "10"}
+    assert attributes["llm.cache_hit"] == {"boolValue": False}
+    assert attributes["llm.provider"] == {"stringValue": "groq"}
+
+
+def test_aggregate_profiles_from_sqlite(tracer):
+    """Test stage and provider profiles are computed from persisted spans."""
+    for tokens in (100, 300):
+        with tracer.span("build", kind="build"):
+            with tracer.span("code_generation", kind="stage"):
+                with tracer.span("llm.generate", kind="llm", **{"llm.provider": "gemini"}) as llm:
+                    tracer.record_llm_usage(llm, prompt_tokens=tokens, output_tokens=tokens, time_to_first_token_ms=20.0)
+    tracer.buffer.clear()  # force reads from SQLite
+
+    profile = tracer.aggregate(window_seconds=60)
+
+    assert profile["stages"]["code_generation"]["count"] == 2
+    assert profile["stages"]["code_generation"]["tokens_p95"] == 600
+    assert profile["providers"]["gemini"]["calls"] == 2
+    assert profile["providers"]["gemini"]["prompt_tokens"] == 400
+    assert profile["providers"]["gemini"]["ttft_p50_ms"] == 20.0
+    assert profile["providers"]["gemini"]["error_rate"] == 0.0
+
+
+def test_percentile():
+    """Test nearest-rank percentiles."""
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile([], 95) == 0.0
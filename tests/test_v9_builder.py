@@ -0,0 +1,101 @@
+"""Tests for concurrent file generation in the V9 builder."""
+
+import asyncio
+import pytest
+from api.v9_builder import SuperAgentV9Builder
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """Stands in for a Gemini model; each file takes a configurable delay."""
+
+    def __init__(self, delays=None, failures=None):
+        self.delays = delays or {}
+        self.failures = dict(failures or {})
+        self.active = 0
+        self.peak = 0
+        self.prompts = []
+
+    async def generate_content_async(self, prompt):
+        path = prompt.splitlines()[0].replace("GENERATE FILE: ", "")
+        self.prompts.append(prompt)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delays.get(path, 0.01))
+            if self.failures.get(path, 0) > 0:
+                self.failures[path] -= 1
+                raise RuntimeError("503 unavailable")
+            return FakeResponse(f"```tsx\nexport const file = '{path}'\n```")
+        finally:
+            self.active -= 1
+
+
+def make_builder(model, concurrency=6):
+    builder = SuperAgentV9Builder()
+    builder.max_concurrency = concurrency
+    builder.retry_base_delay = 0.001
+    builder.contexts = []
+
+    def create_model(shared_context):
+        builder.contexts.append(shared_context)
+        return model
+    builder._create_file_model = create_model
+    return builder
+
+
+def make_plan(count):
+    return {
+        "project_name": "demo",
+        "files": [{"path": f"app/page_{i}.tsx", "description": f"Page {i}"} for i in range(count)],
+    }
+
+
+@pytest.mark.asyncio
+async def test_generates_all_files_concurrently_in_plan_order():
+    """Test files overlap in time, none are dropped and order follows the plan."""
+    model = FakeModel(delays={"app/page_0.tsx": 0.15})
+    builder = make_builder(model, concurrency=8)
+
+    files = await builder._generate_all_files(make_plan(16), "a dashboard")
+
+    assert [f["path"] for f in files] == [f"app/page_{i}.tsx" for i in range(16)]
+    assert files[3]["content"] == "export const file = 'app/page_3.tsx'"
+    assert model.peak == 8
+    # The shared context is built once and names every planned file
+    assert len(builder.contexts) == 1
+    assert "app/page_15.tsx" in builder.contexts[0]
+    assert "a dashboard" in builder.contexts[0]
+    assert all("a dashboard" not in prompt for prompt in model.prompts)
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_files_before_the_build_finishes():
+    """Test early files are streamed while a slow later file is still running."""
+    model = FakeModel(delays={"app/page_2.tsx": 0.2})
+    builder = make_builder(model)
+
+    received = []
+    async for file in builder.stream_generated_files(make_plan(3), "a blog"):
+        received.append((file["path"], model.active))
+
+    assert [path for path, _ in received] == ["app/page_0.tsx", "app/page_1.tsx", "app/page_2.tsx"]
+    assert received[0][1] == 1  # page_2 still generating when page_0 arrived
+
+
+@pytest.mark.asyncio
+async def test_failed_file_is_retried_then_reported():
+    """Test transient errors are retried and persistent errors become comments."""
+    model = FakeModel(failures={"app/page_0.tsx": 1, "app/page_1.tsx": 10})
+    builder = make_builder(model)
+    builder.max_retries = 2
+
+    files = await builder._generate_all_files(make_plan(2), "a shop")
+
+    assert files[0]["content"] == "export const file = 'app/page_0.tsx'"
+    assert files[1]["content"].startswith("// Error generating app/page_1.tsx")
+    assert sum("page_1" in prompt for prompt in model.prompts) == 3